@@ -10,12 +10,13 @@ import pybreaker
 
 from app.agent_client_setup import agent_client_manager
 from app.azure_openai_client import AzureOpenAIClient, azure_openai_client
-from app.database import get_session_context
+from app.database import run_in_session
 from app.models.db_models import ConversationThread
 
 if TYPE_CHECKING:
     from azure.ai.agents.models import AsyncToolSet, FunctionToolDefinition
     from azure.ai.inference import ChatCompletionsClient
+    from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
@@ -194,19 +195,22 @@ class BaseAgent:
             return self._sdk_thread_ids[session_id]
 
         # Check the database for a previously persisted SDK thread ID
-        try:
-            with get_session_context() as db:
-                thread_row = (
-                    db.query(ConversationThread)
-                    .filter(
-                        ConversationThread.session_id == session_id,
-                        ConversationThread.agent_name == self.agent_name,
-                    )
-                    .first()
+        def _lookup(db: Session) -> str | None:
+            thread_row = (
+                db.query(ConversationThread)
+                .filter(
+                    ConversationThread.session_id == session_id,
+                    ConversationThread.agent_name == self.agent_name,
                 )
-                if thread_row and thread_row.sdk_thread_id:
-                    self._sdk_thread_ids[session_id] = thread_row.sdk_thread_id
-                    return thread_row.sdk_thread_id
+                .first()
+            )
+            return thread_row.sdk_thread_id if thread_row else None
+
+        try:
+            stored_thread_id = await run_in_session(_lookup)
+            if stored_thread_id:
+                self._sdk_thread_ids[session_id] = stored_thread_id
+                return stored_thread_id
         except Exception as exc:
             logger.debug(
                 "%s: failed to look up SDK thread from DB for session %s: %s",
@@ -220,32 +224,35 @@ class BaseAgent:
         if thread_id is not None:
             self._sdk_thread_ids[session_id] = thread_id
             # Persist the new SDK thread ID to the database
-            self._persist_sdk_thread_id(session_id, thread_id)
+            await self._persist_sdk_thread_id(session_id, thread_id)
         return thread_id
 
-    def _persist_sdk_thread_id(
+    async def _persist_sdk_thread_id(
         self, session_id: str, sdk_thread_id: str
     ) -> None:
         """Save an SDK thread ID to the ConversationThread row in the database."""
-        try:
-            with get_session_context() as db:
-                thread_row = (
-                    db.query(ConversationThread)
-                    .filter(
-                        ConversationThread.session_id == session_id,
-                        ConversationThread.agent_name == self.agent_name,
-                    )
-                    .first()
+
+        def _write(db: Session) -> None:
+            thread_row = (
+                db.query(ConversationThread)
+                .filter(
+                    ConversationThread.session_id == session_id,
+                    ConversationThread.agent_name == self.agent_name,
                 )
-                if thread_row:
-                    thread_row.sdk_thread_id = sdk_thread_id
-                    db.commit()
-                    logger.debug(
-                        "%s: persisted SDK thread %s for session %s",
-                        self.agent_name,
-                        sdk_thread_id,
-                        session_id,
-                    )
+                .first()
+            )
+            if thread_row:
+                thread_row.sdk_thread_id = sdk_thread_id
+                db.commit()
+                logger.debug(
+                    "%s: persisted SDK thread %s for session %s",
+                    self.agent_name,
+                    sdk_thread_id,
+                    session_id,
+                )
+
+        try:
+            await run_in_session(_write)
         except Exception as exc:
             logger.warning(
                 "%s: failed to persist SDK thread ID for session %s: %s",
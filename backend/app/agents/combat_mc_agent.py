@@ -5,6 +5,7 @@ Uses the Microsoft Agent Framework SDK for combat resolution when available,
 falling back to direct plugin-based or deterministic mechanics otherwise.
 """
 
+import contextlib
 import json
 import logging
 import random
@@ -13,6 +14,8 @@ from typing import Any
 
 from app.agents.base_agent import BaseAgent
 from app.utils.dice import DiceRoller
+from app.utils.dice_engine import compile_dice
+from app.utils.dice_stats import attack_odds, check_odds
 
 logger = logging.getLogger(__name__)
 
@@ -38,14 +41,22 @@ def resolve_attack(
     :param damage_dice: Damage dice notation (e.g., 1d8+3).
     :param advantage: Whether the attack has advantage.
     :param disadvantage: Whether the attack has disadvantage.
-    :return: JSON-encoded attack resolution result.
+    :return: JSON-encoded attack resolution result, including the exact
+        chance the attack had to hit and its expected damage.
     """
     roll = DiceRoller.roll_d20(attack_bonus, advantage, disadvantage)
-    hit = roll["total"] >= target_ac
+    critical = DiceRoller.is_critical_hit(roll["natural"])
+    hit = critical or (
+        not DiceRoller.is_critical_miss(roll["natural"]) and roll["total"] >= target_ac
+    )
     result: dict[str, Any] = {"attack_roll": roll, "hit": hit, "target_ac": target_ac}
+    # Odds are informational; roll_damage reports bad notation
+    with contextlib.suppress(ValueError):
+        result.update(
+            attack_odds(attack_bonus, target_ac, advantage, disadvantage, damage_dice)
+        )
     if hit:
-        damage = DiceRoller.roll_damage(damage_dice)
-        result["damage"] = damage
+        result["damage"] = json.loads(calculate_damage(damage_dice, critical))
     return json.dumps(result)
 
 
@@ -64,7 +75,14 @@ def skill_check(
         modifier += 2  # Default proficiency bonus
     roll = DiceRoller.roll_d20(modifier)
     success = roll["total"] >= dc
-    return json.dumps({"roll": roll, "dc": dc, "success": success})
+    return json.dumps(
+        {
+            "roll": roll,
+            "dc": dc,
+            "success": success,
+            "success_probability": check_odds(modifier, dc),
+        }
+    )
 
 
 def calculate_damage(
@@ -79,9 +97,11 @@ def calculate_damage(
     result = DiceRoller.roll_damage(damage_dice)
     if is_critical:
         # Double the dice portion (roll again), keep same modifier
-        extra = DiceRoller.roll_damage(damage_dice)
-        result["total"] += extra["total"]
-        result["rolls"].extend(extra["rolls"])
+        extra_dice = compile_dice(damage_dice).critical_dice()
+        if extra_dice is not None:
+            extra = extra_dice.roll()
+            result["total"] += extra.total
+            result["rolls"].extend(extra.rolls)
         result["is_critical"] = True
     return json.dumps(result)
 
@@ -8,18 +8,19 @@ direct AzureOpenAIClient calls when the SDK is unavailable.
 
 import json
 import logging
-import random
-import re
 import uuid
 from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any
 
+from sqlalchemy.orm import Session
+
 from app.agents.base_agent import BaseAgent
 from app.azure_openai_client import azure_openai_client
-from app.database import get_session_context
-from app.models.db_models import ConversationThread
+from app.database import current_unit_of_work, run_in_session
+from app.models.db_models import ConversationMessage, ConversationThread
 from app.utils.dice import DiceRoller
+from app.utils.dice_engine import DiceNotationError, compile_dice
 
 if TYPE_CHECKING:
     from starlette.websockets import WebSocket
@@ -29,6 +30,50 @@ logger = logging.getLogger(__name__)
 
 MAX_HISTORY_MESSAGES = 20
 
+# Messages kept just before the window so the history summary can be built
+SUMMARY_SOURCE_MESSAGES = 10
+
+# Session threads held in memory; the least recently used are evicted first
+MAX_CACHED_THREADS = 256
+
+_WINDOW_SIZE = MAX_HISTORY_MESSAGES + SUMMARY_SOURCE_MESSAGES
+
+
+class ConversationWindow(list):
+    """In-memory tail of a session's conversation thread.
+
+    Behaves as a plain list of ``{"role", "content"}`` dicts. ``offset`` is the
+    number of older messages that live only in the database, and ``persisted``
+    is how many of this list's entries have already been written, so each
+    persist appends just the new messages.
+    """
+
+    def __init__(
+        self,
+        messages: list[dict[str, str]] | None = None,
+        offset: int = 0,
+        persisted: int | None = None,
+    ) -> None:
+        super().__init__(messages or [])
+        self.offset = offset
+        self.persisted = len(self) if persisted is None else persisted
+
+
+def _move_inline_messages(db: Session, thread_row: ConversationThread) -> None:
+    """Move a legacy thread's inline ``messages`` JSON into message rows."""
+    base = thread_row.message_count or 0
+    db.add_all(
+        ConversationMessage(
+            thread_id=thread_row.id,
+            seq=base + i,
+            role=msg.get("role", "user"),
+            content=msg.get("content", ""),
+        )
+        for i, msg in enumerate(thread_row.messages, start=1)
+    )
+    thread_row.message_count = base + len(thread_row.messages)
+    thread_row.messages = []
+
 
 # ---------------------------------------------------------------------------
 # Callable tool functions for the SDK's AsyncFunctionTool
@@ -36,14 +81,18 @@ MAX_HISTORY_MESSAGES = 20
 
 
 def roll_dice(notation: str) -> str:
-    """Roll dice using standard D&D notation (e.g., 1d20, 2d6+3).
+    """Roll dice using standard D&D notation (e.g., 1d20, 2d6+3, 4d6kh3).
 
     Use this whenever a dice roll is needed during gameplay.
 
-    :param notation: Dice notation like 1d20, 2d6+3, 4d8-1.
+    :param notation: Dice notation like 1d20, 2d6+3, 4d8-1, 2d20kh1, 1d6!.
     :return: JSON-encoded roll result with total, rolls, and modifier.
     """
-    result = DiceRoller.parse_dice_from_text(notation)
+    try:
+        result = DiceRoller.roll_dice(notation)
+    except ValueError:
+        # Tolerate notation wrapped in prose ("roll a d20 for initiative")
+        result = DiceRoller.parse_dice_from_text(notation)
     if result is None:
         return json.dumps({"error": f"Invalid dice notation: {notation}"})
     return json.dumps(result)
@@ -63,9 +112,28 @@ def roll_ability_check(
     return json.dumps(result)
 
 
+def lookup_srd(query: str, kind: str = "") -> str:
+    """Look up D&D 5e SRD spells, monsters, weapons or armor by free text.
+
+    Use this to resolve loose references such as "that fire spell" or
+    "the goblin boss" to exact rules entries.
+
+    :param query: Words from the name, description or properties.
+    :param kind: Optional filter: spell, monster, weapon or armor.
+    :return: JSON-encoded list of the best matches with their full entries.
+    """
+    from app.srd_search import KINDS, get_srd_search_index
+
+    kinds = [kind] if kind in KINDS else None
+    hits = get_srd_search_index().search(query, kinds=kinds, limit=5)
+    return json.dumps(
+        [{"kind": hit.kind, "score": hit.score, **hit.record} for hit in hits]
+    )
+
+
 def _get_dm_tool_functions() -> list[Callable[..., Any]]:
     """Return the callable tool functions for the DM agent."""
-    return [roll_dice, roll_ability_check]
+    return [roll_dice, roll_ability_check, lookup_srd]
 
 
 class DungeonMasterAgent(BaseAgent):
@@ -79,7 +147,7 @@ class DungeonMasterAgent(BaseAgent):
 
     def _post_init(self) -> None:
         """Initialize DM-specific components after base client setup."""
-        self._threads: dict[str, list[dict[str, str]]] = {}
+        self._threads: dict[str, ConversationWindow] = {}
 
         if not self._fallback_mode:
             try:
@@ -100,7 +168,7 @@ class DungeonMasterAgent(BaseAgent):
         return self._get_dm_system_prompt()
 
     def _get_sdk_tool_functions(self) -> list[Callable[..., Any]]:
-        """Return callable dice-rolling tool functions for the SDK agent."""
+        """Return callable dice-rolling and SRD lookup tools for the SDK agent."""
         return _get_dm_tool_functions()
 
     def _get_dm_system_prompt(self) -> str:
@@ -122,56 +190,81 @@ class DungeonMasterAgent(BaseAgent):
             "- Describe outcomes clearly\n"
             "- Suggest or prompt for dice rolls when appropriate "
             "(but don't roll for the player)\n"
+            "- Look up spells, monsters and equipment with lookup_srd rather "
+            "than quoting rules from memory\n"
             "- Maintain the fantasy adventure atmosphere\n\n"
             "Always respond as a helpful, creative DM who wants players to have an "
             "exciting adventure. Keep responses focused and not overly long. You are "
             "the single point of coordination for the entire game experience."
         )
 
-    def _get_or_create_thread(
+    async def _get_or_create_thread(
         self, session_id: str, campaign_id: str | None = None
     ) -> list[dict[str, str]]:
         """Return the message thread for a session, creating one if needed.
 
-        Checks the in-memory cache first, then the database. Creates a new
-        DB record if neither contains an existing thread.  When *campaign_id*
-        is provided the thread row is associated with the campaign so that
-        conversation history can be resumed when the campaign is loaded later.
+        Checks the in-memory LRU cache first, then the database, which only
+        returns the most recent messages needed by :meth:`_build_messages`.
+        Creates a new DB record if neither contains an existing thread.  When
+        *campaign_id* is provided the thread row is associated with the
+        campaign so that conversation history can be resumed when the
+        campaign is loaded later.
         """
-        if session_id in self._threads:
-            return self._threads[session_id]
+        cached = self._threads.pop(session_id, None)
+        if cached is not None:
+            # Re-insert to mark as most recently used
+            self._threads[session_id] = cached
+            return cached
+
+        sdk_ids = getattr(self, "_sdk_thread_ids", {})
+
+        def _load_or_create(db: Session) -> ConversationWindow:
+            thread_row = (
+                db.query(ConversationThread)
+                .filter(
+                    ConversationThread.session_id == session_id,
+                    ConversationThread.agent_name == "DM",
+                )
+                .first()
+            )
+            if thread_row:
+                # Ensure campaign_id is set on existing threads
+                if campaign_id and not thread_row.campaign_id:
+                    thread_row.campaign_id = campaign_id
+                if thread_row.messages:
+                    _move_inline_messages(db, thread_row)
+                db.commit()
 
-        # Try loading from database
-        try:
-            with get_session_context() as db:
-                thread_row = (
-                    db.query(ConversationThread)
-                    .filter(
-                        ConversationThread.session_id == session_id,
-                        ConversationThread.agent_name == "DM",
-                    )
-                    .first()
+                rows = (
+                    db.query(ConversationMessage)
+                    .filter(ConversationMessage.thread_id == thread_row.id)
+                    .order_by(ConversationMessage.seq.desc())
+                    .limit(_WINDOW_SIZE)
+                    .all()
                 )
-                if thread_row:
-                    # Ensure campaign_id is set on existing threads
-                    if campaign_id and not thread_row.campaign_id:
-                        thread_row.campaign_id = campaign_id
-                        db.commit()
-                    self._threads[session_id] = list(thread_row.messages or [])
-                    return self._threads[session_id]
-
-                # Not in DB either -- create a new record
-                sdk_ids = getattr(self, "_sdk_thread_ids", {})
-                new_thread = ConversationThread(
-                    id=str(uuid.uuid4()),
-                    session_id=session_id,
-                    campaign_id=campaign_id,
-                    agent_name="DM",
-                    messages=[],
-                    sdk_thread_id=sdk_ids.get(session_id),
+                rows.reverse()
+                return ConversationWindow(
+                    [{"role": r.role, "content": r.content} for r in rows],
+                    offset=(thread_row.message_count or 0) - len(rows),
                 )
-                db.add(new_thread)
-                db.commit()
+
+            # Not in DB either -- create a new record
+            new_thread = ConversationThread(
+                id=str(uuid.uuid4()),
+                session_id=session_id,
+                campaign_id=campaign_id,
+                agent_name="DM",
+                messages=[],
+                message_count=0,
+                sdk_thread_id=sdk_ids.get(session_id),
+            )
+            db.add(new_thread)
+            db.commit()
+            return ConversationWindow()
+
+        window = ConversationWindow()
+        try:
+            window = await run_in_session(_load_or_create)
         except Exception as e:
             logger.warning(
                 "Failed to load/create thread from DB for session %s: %s",
@@ -179,47 +272,103 @@ class DungeonMasterAgent(BaseAgent):
                 e,
             )
 
-        self._threads[session_id] = []
-        return self._threads[session_id]
+        # Another coroutine may have populated the cache while we awaited
+        thread = self._threads.setdefault(session_id, window)
+        while len(self._threads) > MAX_CACHED_THREADS:
+            self._threads.pop(next(iter(self._threads)))
+        return thread
 
-    def _persist_thread(self, session_id: str) -> None:
-        """Persist the current thread messages to the database."""
-        if session_id not in self._threads:
+    async def _persist_thread(
+        self, session_id: str, thread: list[dict[str, str]] | None = None
+    ) -> None:
+        """Append the thread's not-yet-persisted messages to the database.
+
+        Each call writes only the messages added since the previous one, so
+        the cost per exchange stays constant however long the thread gets.
+        Afterwards the in-memory window is trimmed back to the messages that
+        :meth:`_build_messages` needs.
+
+        Args:
+            session_id: Session whose thread to persist.
+            thread: The thread list to persist. Callers holding a reference
+                should pass it, since the cache may have evicted the entry
+                while they were awaiting the model response.
+        """
+        if thread is None:
+            thread = self._threads.get(session_id)
+            if thread is None:
+                return
+        persisted = getattr(thread, "persisted", 0)
+        snapshot = list(thread)
+        new_messages = snapshot[persisted:]
+        if not new_messages:
             return
-        try:
-            with get_session_context() as db:
-                thread = (
-                    db.query(ConversationThread)
-                    .filter(
-                        ConversationThread.session_id == session_id,
-                        ConversationThread.agent_name == "DM",
-                    )
-                    .first()
+        sdk_ids = getattr(self, "_sdk_thread_ids", {})
+
+        def _write(db: Session) -> None:
+            row = (
+                db.query(ConversationThread)
+                .filter(
+                    ConversationThread.session_id == session_id,
+                    ConversationThread.agent_name == "DM",
                 )
-                if thread:
-                    thread.messages = list(self._threads[session_id])
-                    db.commit()
-                else:
-                    # Row was deleted externally — recreate it
-                    sdk_ids = getattr(self, "_sdk_thread_ids", {})
-                    new_thread = ConversationThread(
-                        id=str(uuid.uuid4()),
-                        session_id=session_id,
-                        agent_name="DM",
-                        messages=list(self._threads[session_id]),
-                        sdk_thread_id=sdk_ids.get(session_id),
-                        created_at=datetime.now(UTC),
-                        updated_at=datetime.now(UTC),
-                    )
-                    db.add(new_thread)
-                    db.commit()
-                    logger.info(
-                        "Recreated deleted thread for session %s", session_id
-                    )
+                .first()
+            )
+            to_write = new_messages
+            if row is None:
+                # Row was deleted externally — recreate it from the window
+                row = ConversationThread(
+                    id=str(uuid.uuid4()),
+                    session_id=session_id,
+                    agent_name="DM",
+                    messages=[],
+                    message_count=0,
+                    sdk_thread_id=sdk_ids.get(session_id),
+                    created_at=datetime.now(UTC),
+                    updated_at=datetime.now(UTC),
+                )
+                db.add(row)
+                db.flush()
+                to_write = snapshot
+                logger.info(
+                    "Recreated deleted thread for session %s", session_id
+                )
+            base = row.message_count or 0
+            db.add_all(
+                ConversationMessage(
+                    thread_id=row.id,
+                    seq=base + i,
+                    role=msg.get("role", "user"),
+                    content=msg.get("content", ""),
+                )
+                for i, msg in enumerate(to_write, start=1)
+            )
+            row.message_count = base + len(to_write)
+            row.updated_at = datetime.now(UTC)
+            db.commit()
+
+        try:
+            await run_in_session(_write)
         except Exception as e:
             logger.warning(
                 "Failed to persist thread for session %s: %s", session_id, e
             )
+            return
+
+        uow = current_unit_of_work()
+        if uow is not None:
+            # The rows only exist once the request commits; if it rolls back,
+            # drop the cached window so the next turn reloads from the database.
+            uow.after_rollback(lambda: self._threads.pop(session_id, None))
+
+        if isinstance(thread, ConversationWindow):
+            thread.persisted = len(snapshot)
+            # Drop persisted messages that fall outside the window
+            drop = min(len(thread) - _WINDOW_SIZE, thread.persisted)
+            if drop > 0:
+                del thread[:drop]
+                thread.offset += drop
+                thread.persisted -= drop
 
     def _summarise_history(self, messages: list[dict[str, str]]) -> str:
         """Create a brief summary of older conversation messages."""
@@ -231,7 +380,7 @@ class DungeonMasterAgent(BaseAgent):
                 summaries.append(f"Player: {content}")
             elif role == "assistant":
                 summaries.append(f"DM: {content}")
-        return " | ".join(summaries[-10:])  # Last 10 exchanges summary
+        return " | ".join(summaries[-SUMMARY_SOURCE_MESSAGES:])
 
     def _build_messages(
         self,
@@ -284,7 +433,7 @@ class DungeonMasterAgent(BaseAgent):
             "campaign_id", "default"
         )
         campaign_id = context.get("campaign_id")
-        thread = self._get_or_create_thread(session_id, campaign_id=campaign_id)
+        thread = await self._get_or_create_thread(session_id, campaign_id=campaign_id)
 
         # Build the user message (may include character name prefix)
         user_message = user_input
@@ -300,7 +449,7 @@ class DungeonMasterAgent(BaseAgent):
             thread.append(
                 {"role": "assistant", "content": result.get("message", "")}
             )
-            self._persist_thread(session_id)
+            await self._persist_thread(session_id, thread)
             return result
 
         # --- Try the Microsoft Agent Framework SDK first ---
@@ -309,6 +458,7 @@ class DungeonMasterAgent(BaseAgent):
             logger.info("DM received response via Microsoft Agent Framework SDK.")
             thread.append({"role": "user", "content": user_message})
             thread.append({"role": "assistant", "content": sdk_response})
+            await self._persist_thread(session_id, thread)
             return {
                 "message": sdk_response,
                 "visuals": [],
@@ -343,7 +493,7 @@ class DungeonMasterAgent(BaseAgent):
             thread.append({"role": "assistant", "content": ai_response})
 
             logger.info("DM received Azure OpenAI response successfully.")
-            self._persist_thread(session_id)
+            await self._persist_thread(session_id, thread)
             return {
                 "message": ai_response,
                 "visuals": [],
@@ -359,7 +509,7 @@ class DungeonMasterAgent(BaseAgent):
             thread.append(
                 {"role": "assistant", "content": result.get("message", "")}
             )
-            self._persist_thread(session_id)
+            await self._persist_thread(session_id, thread)
             return result
 
     async def process_input_stream(
@@ -391,7 +541,7 @@ class DungeonMasterAgent(BaseAgent):
             "campaign_id", "default"
         )
         campaign_id = context.get("campaign_id")
-        thread = self._get_or_create_thread(session_id, campaign_id=campaign_id)
+        thread = await self._get_or_create_thread(session_id, campaign_id=campaign_id)
 
         # Build the user message (may include character name prefix)
         user_message = user_input
@@ -406,7 +556,7 @@ class DungeonMasterAgent(BaseAgent):
             # Record the exchange and persist (mirrors the non-stream path)
             thread.append({"role": "user", "content": user_message})
             thread.append({"role": "assistant", "content": fallback_msg})
-            self._persist_thread(session_id)
+            await self._persist_thread(session_id, thread)
             return
 
         try:
@@ -433,7 +583,7 @@ class DungeonMasterAgent(BaseAgent):
             if full_response:
                 thread.append({"role": "assistant", "content": full_response})
 
-            self._persist_thread(session_id)
+            await self._persist_thread(session_id, thread)
 
         except Exception as e:
             logger.error("Error in streaming processing: %s", str(e))
@@ -514,13 +664,10 @@ class DungeonMasterAgent(BaseAgent):
 
         self._fallback_mode = True
 
+        # compile_dice caches the parse; rolls draw from the campaign stream
         self._fallback_dice = {
-            "d4": lambda: random.randint(1, 4),  # noqa: S311
-            "d6": lambda: random.randint(1, 6),  # noqa: S311
-            "d8": lambda: random.randint(1, 8),  # noqa: S311
-            "d10": lambda: random.randint(1, 10),  # noqa: S311
-            "d12": lambda: random.randint(1, 12),  # noqa: S311
-            "d20": lambda: random.randint(1, 20),  # noqa: S311
+            f"d{sides}": (lambda notation=f"1d{sides}": compile_dice(notation).roll().total)
+            for sides in (4, 6, 8, 10, 12, 20)
         }
 
         self._fallback_responses = {
@@ -554,20 +701,15 @@ class DungeonMasterAgent(BaseAgent):
 
     def _fallback_dice_roll(self, notation: str) -> dict[str, Any]:
         """Roll dice based on notation like '2d6+1'."""
-        match = re.fullmatch(r"(\d*)d(\d+)([+-]\d+)?", notation.strip())
-        if not match:
+        try:
+            result = compile_dice(notation).roll()
+        except DiceNotationError:
             return {"error": "Invalid dice notation"}
-
-        num = int(match.group(1)) if match.group(1) else 1
-        sides = int(match.group(2))
-        modifier = int(match.group(3)) if match.group(3) else 0
-        rolls = [random.randint(1, sides) for _ in range(num)]  # noqa: S311
-        total = sum(rolls) + modifier
         return {
             "notation": notation,
-            "rolls": rolls,
-            "total": total,
-            "modifier": modifier,
+            "rolls": result.rolls,
+            "total": result.total,
+            "modifier": result.modifier,
         }
 
     def _fallback_generate_response(self, context: str) -> str:
@@ -10,8 +10,18 @@ import logging
 from collections.abc import Callable
 from typing import Any
 
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+
 from app.agents.base_agent import BaseAgent
-from app.database import get_session_context, init_db
+from app.character_store import (
+    PatchError,
+    VersionConflictError,
+    modify_character,
+    patch_character,
+)
+from app.database import init_db, run_in_session
+from app.entity_cache import invalidate_character, load_character_data
 from app.models.db_models import NPC, Character, NPCInteraction
 
 logger = logging.getLogger(__name__)
@@ -22,50 +32,59 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 
-def get_character_tool(character_id: str) -> str:
+async def get_character_tool(character_id: str) -> str:
     """Retrieve a character's full sheet including stats, inventory, and equipment by their character ID.
 
     :param character_id: The unique character identifier.
     :return: JSON-encoded character data, or an error message.
     """
+
+    def _load(db: Session) -> str:
+        character = db.query(Character).filter(Character.id == character_id).first()
+        if character is None:
+            return json.dumps({"error": f"Character {character_id} not found"})
+        return json.dumps(character.data, default=str)
+
     try:
-        with get_session_context() as db:
-            character = db.query(Character).filter(Character.id == character_id).first()
-            if character is None:
-                return json.dumps({"error": f"Character {character_id} not found"})
-            return json.dumps(character.data, default=str)
+        return await run_in_session(_load)
     except Exception as exc:
         return json.dumps({"error": f"Failed to retrieve character: {exc}"})
 
 
-def get_npc_tool(npc_id: str) -> str:
+async def get_npc_tool(npc_id: str) -> str:
     """Retrieve NPC details including personality, relationships, and interaction history.
 
     :param npc_id: The unique NPC identifier.
     :return: JSON-encoded NPC data, or an error message.
     """
+
+    def _load(db: Session) -> str:
+        npc = db.query(NPC).filter(NPC.id == npc_id).first()
+        if npc is None:
+            return json.dumps({"error": f"NPC {npc_id} not found"})
+        return json.dumps(npc.data, default=str)
+
     try:
-        with get_session_context() as db:
-            npc = db.query(NPC).filter(NPC.id == npc_id).first()
-            if npc is None:
-                return json.dumps({"error": f"NPC {npc_id} not found"})
-            return json.dumps(npc.data, default=str)
+        return await run_in_session(_load)
     except Exception as exc:
         return json.dumps({"error": f"Failed to retrieve NPC: {exc}"})
 
 
-def get_inventory_tool(character_id: str) -> str:
+async def get_inventory_tool(character_id: str) -> str:
     """Retrieve a character's current inventory and equipment.
 
     :param character_id: The unique character identifier.
     :return: JSON-encoded inventory list, or an error message.
     """
+
+    def _load(db: Session) -> str:
+        character = db.query(Character).filter(Character.id == character_id).first()
+        if character is None:
+            return json.dumps({"error": f"Character {character_id} not found"})
+        return json.dumps(character.data.get("inventory", []), default=str)
+
     try:
-        with get_session_context() as db:
-            character = db.query(Character).filter(Character.id == character_id).first()
-            if character is None:
-                return json.dumps({"error": f"Character {character_id} not found"})
-            return json.dumps(character.data.get("inventory", []), default=str)
+        return await run_in_session(_load)
     except Exception as exc:
         return json.dumps({"error": f"Failed to retrieve inventory: {exc}"})
 
@@ -102,18 +121,21 @@ class ScribeAgent(BaseAgent):
         """Return callable character/NPC query tool functions for the SDK agent."""
         return _get_scribe_tool_functions()
 
-    @property
-    def characters(self) -> dict[str, Any]:
+    async def get_characters(self) -> dict[str, Any]:
         """Return all characters from the database."""
-        with get_session_context() as db:
+
+        def _load(db: Session) -> dict[str, Any]:
             return {c.id: c.data for c in db.query(Character).all()}
 
-    @property
-    def npcs(self) -> dict[str, Any]:
+        return await run_in_session(_load)
+
+    async def get_npcs(self) -> dict[str, Any]:
         """Return NPCs from the database."""
-        with get_session_context() as db:
-            npcs = db.query(NPC).all()
-            return {npc.id: npc.data for npc in npcs}
+
+        def _load(db: Session) -> dict[str, Any]:
+            return {npc.id: npc.data for npc in db.query(NPC).all()}
+
+        return await run_in_session(_load)
 
     def create_npc(self, npc_data: dict[str, Any]) -> dict[str, Any]:
         """Create a new NPC with personality generation."""
@@ -189,11 +211,12 @@ class ScribeAgent(BaseAgent):
 
         return npc_data
 
-    def update_npc_relationship(
+    async def update_npc_relationship(
         self, npc_id: str, character_id: str, change: int
     ) -> dict[str, Any]:
         """Update relationship between NPC and character."""
-        with get_session_context() as db:
+
+        def _txn(db: Session) -> dict[str, Any]:
             # Get current NPC and relationship data
             npc = db.query(NPC).filter(NPC.id == npc_id).first()
             if not npc:
@@ -209,8 +232,6 @@ class ScribeAgent(BaseAgent):
             npc.data["relationships"] = relationships
 
             # Mark as modified and commit
-            from sqlalchemy.orm.attributes import flag_modified
-
             flag_modified(npc, "data")
             db.commit()
 
@@ -222,7 +243,9 @@ class ScribeAgent(BaseAgent):
                 "change": change,
             }
 
-    def log_npc_interaction(self, interaction_data: dict[str, Any]) -> str:
+        return await run_in_session(_txn)
+
+    async def log_npc_interaction(self, interaction_data: dict[str, Any]) -> str:
         """Log an interaction with an NPC."""
         import uuid
         from datetime import UTC, datetime
@@ -230,7 +253,7 @@ class ScribeAgent(BaseAgent):
         interaction_id = str(uuid.uuid4())
 
         # Store interaction in database
-        with get_session_context() as db:
+        def _insert(db: Session) -> None:
             interaction_record = NPCInteraction(
                 id=interaction_id,
                 npc_id=interaction_data.get("npc_id"),
@@ -247,6 +270,7 @@ class ScribeAgent(BaseAgent):
             db.add(interaction_record)
             db.commit()
 
+        await run_in_session(_insert)
         return interaction_id
 
     def generate_npc_stats(self, npc_id: str, level: int, role: str) -> dict[str, Any]:
@@ -291,13 +315,15 @@ class ScribeAgent(BaseAgent):
             "proficiency_bonus": 2 + ((level - 1) // 4),
         }
 
-    @property
-    def inventory(self) -> dict[str, Any]:
+    async def get_inventories(self) -> dict[str, Any]:
         """Return all inventories from all characters."""
+
+        def _load(db: Session) -> dict[str, Any]:
+            characters = db.query(Character).all()
+            return {c.id: c.data.get("inventory", []) for c in characters}
+
         try:
-            with get_session_context() as db:
-                characters = db.query(Character).all()
-                return {c.id: c.data.get("inventory", []) for c in characters}
+            return await run_in_session(_load)
         except Exception as e:
             logger.error("Error retrieving inventory data: %s", str(e))
             return {}
@@ -452,13 +478,15 @@ class ScribeAgent(BaseAgent):
                 )
 
             # Store character in database
-            with get_session_context() as db:
+            def _insert(db: Session) -> None:
                 db_character = Character(
                     id=character_id, name=character_sheet["name"], data=character_sheet
                 )
                 db.add(db_character)
                 db.commit()
 
+            await run_in_session(_insert)
+
             return character_sheet
 
         except Exception as e:
@@ -466,38 +494,121 @@ class ScribeAgent(BaseAgent):
             return {"error": f"Failed to create character: {str(e)}"}
 
     async def update_character(
-        self, character_id: str, updates: dict[str, Any]
+        self,
+        character_id: str,
+        updates: dict[str, Any],
+        expected_version: int | None = None,
     ) -> dict[str, Any]:
         """
         Update an existing character sheet.
 
+        Only the fields that actually change are written, as a partial
+        update (see :mod:`app.character_store`).
+
         Args:
             character_id: The ID of the character to update
             updates: Dictionary containing fields to update
+            expected_version: If given, fail instead of overwriting when the
+                character has been written since this version was read
 
         Returns:
             Dict[str, Any]: The updated character sheet
         """
         try:
-            with get_session_context() as db:
-                db_character = db.get(Character, character_id)
-                if not db_character:
-                    return {"error": f"Character {character_id} not found"}
-                character = db_character.data
-
-                # Apply updates inside session context
+            def _apply(character: dict[str, Any]) -> None:
                 for key, value in updates.items():
                     if key in character and key != "id":
                         character[key] = value
 
-                db_character.data = character
+            def _txn(db: Session) -> Any:  # noqa: ANN401
+                modified = modify_character(
+                    db, character_id, _apply, expected_version=expected_version
+                )
+                if modified is None:
+                    return {"error": f"Character {character_id} not found"}
                 db.commit()
-            return character
+                return modified[1]
+
+            result = await run_in_session(_txn)
+            invalidate_character(character_id)
+            return result
 
+        except VersionConflictError as e:
+            logger.warning("Character update conflict: %s", str(e))
+            return {"error": str(e), "conflict": True}
         except Exception as e:
             logger.error("Error updating character: %s", str(e))
             return {"error": "Failed to update character"}
 
+    async def patch_character(
+        self,
+        character_id: str,
+        ops: list[dict[str, Any]],
+        expected_version: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Apply a JSON Patch to a character sheet.
+
+        Args:
+            character_id: The ID of the character to patch
+            ops: RFC 6902 operations (add, remove, replace, test)
+            expected_version: If given, only apply the patch when the
+                character is still at this version
+
+        Returns:
+            Dict[str, Any]: The character ID and its new version
+        """
+        try:
+            def _txn(db: Session) -> Any:  # noqa: ANN401
+                version = patch_character(db, character_id, ops, expected_version)
+                if version is None:
+                    return {"error": f"Character {character_id} not found"}
+                db.commit()
+                return {"character_id": character_id, "version": version}
+
+            result = await run_in_session(_txn)
+            invalidate_character(character_id)
+            return result
+
+        except VersionConflictError as e:
+            logger.warning("Character patch conflict: %s", str(e))
+            return {"error": str(e), "conflict": True}
+        except PatchError as e:
+            return {"error": f"Invalid patch: {e}"}
+        except Exception as e:
+            logger.error("Error patching character: %s", str(e))
+            return {"error": "Failed to patch character"}
+
+    async def modify_character[T](
+        self,
+        character_id: str,
+        mutate: Callable[[dict[str, Any]], T],
+        expected_version: int | None = None,
+    ) -> tuple[T, dict[str, Any], int] | None:
+        """
+        Read-decide-write a character sheet with optimistic retries.
+
+        Thin async wrapper over :func:`app.character_store.modify_character`;
+        conflicts and errors propagate to the caller.
+
+        Args:
+            character_id: The ID of the character to modify
+            mutate: Callback changing the sheet in place
+            expected_version: If given, fail instead of retrying on conflict
+
+        Returns:
+            ``(mutate's result, updated sheet, new version)``, or None if the
+            character does not exist
+        """
+        def _txn(db: Session) -> Any:  # noqa: ANN401
+            modified = modify_character(db, character_id, mutate, expected_version)
+            db.commit()
+            return modified
+
+        result = await run_in_session(_txn)
+        invalidate_character(character_id)
+        return result
+
     async def get_character(self, character_id: str) -> dict[str, Any] | None:
         """
         Retrieve a character sheet by ID.
@@ -508,9 +619,8 @@ class ScribeAgent(BaseAgent):
         Returns:
             Optional[Dict[str, Any]]: The character sheet if found, None otherwise
         """
-        with get_session_context() as db:
-            db_character = db.get(Character, character_id)
-            return db_character.data if db_character else None
+
+        return await load_character_data(character_id)
 
     async def add_to_inventory(
         self, character_id: str, item: dict[str, Any]
@@ -528,28 +638,23 @@ class ScribeAgent(BaseAgent):
         try:
             import uuid
 
-            with get_session_context() as db:
-                db_character = db.get(Character, character_id)
-                if not db_character:
-                    return {"error": f"Character {character_id} not found"}
+            # Ensure item has required structure
+            if "id" not in item:
+                item["id"] = f"item_{str(uuid.uuid4())[:8]}"
 
-                character = db_character.data
-                inventory = character.get("inventory", [])
+            # Set default values for item properties
+            item.setdefault("name", "Unknown Item")
+            item.setdefault("type", "misc")
+            item.setdefault("weight", 0)
+            item.setdefault("value", 0)
+            item.setdefault("quantity", 1)
+            item.setdefault("rarity", "common")
+            item.setdefault("description", "")
+            item.setdefault("magical", False)
+            item.setdefault("effects", {})
 
-                # Ensure item has required structure
-                if "id" not in item:
-                    item["id"] = f"item_{str(uuid.uuid4())[:8]}"
-
-                # Set default values for item properties
-                item.setdefault("name", "Unknown Item")
-                item.setdefault("type", "misc")
-                item.setdefault("weight", 0)
-                item.setdefault("value", 0)
-                item.setdefault("quantity", 1)
-                item.setdefault("rarity", "common")
-                item.setdefault("description", "")
-                item.setdefault("magical", False)
-                item.setdefault("effects", {})
+            def _add(character: dict[str, Any]) -> list[dict[str, Any]]:
+                inventory = character.setdefault("inventory", [])
 
                 # Check if item already exists in inventory (stack if possible)
                 existing_item = None
@@ -569,13 +674,19 @@ class ScribeAgent(BaseAgent):
                     ) + item.get("quantity", 1)
                 else:
                     # Add as new item
-                    inventory.append(item)
+                    inventory.append(dict(item))
+                return inventory
 
-                character["inventory"] = inventory
-                db_character.data = character
+            def _txn(db: Session) -> Any:  # noqa: ANN401
+                modified = modify_character(db, character_id, _add)
+                if modified is None:
+                    return {"error": f"Character {character_id} not found"}
                 db.commit()
+                return {"inventory": modified[0], "added_item": item}
 
-            return {"inventory": inventory, "added_item": item}
+            result = await run_in_session(_txn)
+            invalidate_character(character_id)
+            return result
 
         except Exception as e:
             logger.error("Error adding to inventory: %s", str(e))
@@ -592,7 +703,7 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: The character's inventory data
         """
         try:
-            with get_session_context() as db:
+            def _txn(db: Session) -> Any:  # noqa: ANN401
                 db_character = db.get(Character, character_id)
                 if not db_character:
                     return {"error": f"Character {character_id} not found"}
@@ -614,6 +725,8 @@ class ScribeAgent(BaseAgent):
                     "total_weight": total_weight,
                 }
 
+            return await run_in_session(_txn)
+
         except Exception as e:
             logger.error("Error getting inventory: %s", str(e))
             return {"error": "Failed to get inventory"}
@@ -633,7 +746,7 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: The result of the removal operation
         """
         try:
-            with get_session_context() as db:
+            def _txn(db: Session) -> Any:  # noqa: ANN401
                 db_character = db.get(Character, character_id)
                 if not db_character:
                     return {"error": f"Character {character_id} not found"}
@@ -667,6 +780,7 @@ class ScribeAgent(BaseAgent):
 
                 character["inventory"] = inventory
                 db_character.data = character
+                flag_modified(db_character, "data")
                 db.commit()
 
                 return {
@@ -676,6 +790,10 @@ class ScribeAgent(BaseAgent):
                     "inventory": inventory,
                 }
 
+            result = await run_in_session(_txn)
+            invalidate_character(character_id)
+            return result
+
         except Exception as e:
             logger.error("Error removing from inventory: %s", str(e))
             return {"error": "Failed to remove item from inventory"}
@@ -695,7 +813,7 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: The result of the update operation
         """
         try:
-            with get_session_context() as db:
+            def _txn(db: Session) -> Any:  # noqa: ANN401
                 db_character = db.get(Character, character_id)
                 if not db_character:
                     return {"error": f"Character {character_id} not found"}
@@ -718,6 +836,7 @@ class ScribeAgent(BaseAgent):
 
                 character["inventory"] = inventory
                 db_character.data = character
+                flag_modified(db_character, "data")
                 db.commit()
 
                 return {
@@ -726,6 +845,10 @@ class ScribeAgent(BaseAgent):
                     "inventory": inventory,
                 }
 
+            result = await run_in_session(_txn)
+            invalidate_character(character_id)
+            return result
+
         except Exception as e:
             logger.error("Error updating inventory item: %s", str(e))
             return {"error": "Failed to update inventory item"}
@@ -745,12 +868,7 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: The result of the equip operation
         """
         try:
-            with get_session_context() as db:
-                db_character = db.get(Character, character_id)
-                if not db_character:
-                    return {"error": f"Character {character_id} not found"}
-
-                character = db_character.data
+            def _equip(character: dict[str, Any]) -> dict[str, Any]:
                 inventory = character.get("inventory", [])
                 equipment = character.get("equipment", {})
 
@@ -787,8 +905,6 @@ class ScribeAgent(BaseAgent):
 
                 character["inventory"] = inventory
                 character["equipment"] = equipment
-                db_character.data = character
-                db.commit()
 
                 return {
                     "character_id": character_id,
@@ -799,6 +915,17 @@ class ScribeAgent(BaseAgent):
                     "inventory": inventory,
                 }
 
+            def _txn(db: Session) -> Any:  # noqa: ANN401
+                modified = modify_character(db, character_id, _equip)
+                if modified is None:
+                    return {"error": f"Character {character_id} not found"}
+                db.commit()
+                return modified[0]
+
+            result = await run_in_session(_txn)
+            invalidate_character(character_id)
+            return result
+
         except Exception as e:
             logger.error("Error equipping item: %s", str(e))
             return {"error": "Failed to equip item"}
@@ -833,7 +960,7 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: The result of the unequip operation
         """
         try:
-            with get_session_context() as db:
+            def _txn(db: Session) -> Any:  # noqa: ANN401
                 db_character = db.get(Character, character_id)
                 if not db_character:
                     return {"error": f"Character {character_id} not found"}
@@ -856,6 +983,7 @@ class ScribeAgent(BaseAgent):
                 character["inventory"] = inventory
                 character["equipment"] = equipment
                 db_character.data = character
+                flag_modified(db_character, "data")
                 db.commit()
 
                 return {
@@ -866,6 +994,10 @@ class ScribeAgent(BaseAgent):
                     "inventory": inventory,
                 }
 
+            result = await run_in_session(_txn)
+            invalidate_character(character_id)
+            return result
+
         except Exception as e:
             logger.error("Error unequipping item: %s", str(e))
             return {"error": "Failed to unequip item"}
@@ -881,7 +1013,7 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: Encumbrance data including weight limits and penalties
         """
         try:
-            with get_session_context() as db:
+            def _txn(db: Session) -> Any:  # noqa: ANN401
                 db_character = db.get(Character, character_id)
                 if not db_character:
                     return {"error": f"Character {character_id} not found"}
@@ -932,6 +1064,8 @@ class ScribeAgent(BaseAgent):
                     },
                 }
 
+            return await run_in_session(_txn)
+
         except Exception as e:
             logger.error("Error calculating encumbrance: %s", str(e))
             return {"error": "Failed to calculate encumbrance"}
@@ -947,7 +1081,7 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: The total stat modifications from equipped items
         """
         try:
-            with get_session_context() as db:
+            def _txn(db: Session) -> Any:  # noqa: ANN401
                 db_character = db.get(Character, character_id)
                 if not db_character:
                     return {"error": f"Character {character_id} not found"}
@@ -991,6 +1125,8 @@ class ScribeAgent(BaseAgent):
                     "equipped_items": list(equipment.keys()),
                 }
 
+            return await run_in_session(_txn)
+
         except Exception as e:
             logger.error("Error applying item effects: %s", str(e))
             return {"error": "Failed to apply item effects"}
@@ -1018,11 +1154,13 @@ class ScribeAgent(BaseAgent):
 
             rules_engine = RulesEnginePlugin()
 
-            with get_session_context() as db:
+            def _load(db: Session) -> dict[str, Any] | None:
                 db_character = db.get(Character, character_id)
-                if not db_character:
-                    return {"error": f"Character {character_id} not found"}
-                character = db_character.data
+                return db_character.data if db_character else None
+
+            character = await run_in_session(_load)
+            if character is None:
+                return {"error": f"Character {character_id} not found"}
 
             current_experience = character.get("experience", 0)
             current_level = character.get("level", 1)
@@ -1162,12 +1300,16 @@ class ScribeAgent(BaseAgent):
 
             character["ability_score_improvements_used"] = asi_used
 
-            with get_session_context() as db:
+            def _save(db: Session) -> None:
                 db_character = db.get(Character, character_id)
                 if db_character:
                     db_character.data = character
+                    flag_modified(db_character, "data")
                     db.commit()
 
+            await run_in_session(_save)
+            invalidate_character(character_id)
+
             hp_calculation: dict[str, Any] = {
                 "total_hp_gain": total_hp_gained,
                 "per_level": hp_gain_details,
@@ -1211,16 +1353,24 @@ class ScribeAgent(BaseAgent):
             Dict[str, Any]: The result of awarding experience
         """
         try:
-            with get_session_context() as db:
+            def _txn(db: Session) -> tuple[int, int] | None:
                 db_character = db.get(Character, character_id)
                 if not db_character:
-                    return {"error": f"Character {character_id} not found"}
+                    return None
                 character = db_character.data
                 old_experience = character.get("experience", 0)
                 new_experience = old_experience + experience_points
                 character["experience"] = new_experience
                 db_character.data = character
+                flag_modified(db_character, "data")
                 db.commit()
+                return old_experience, new_experience
+
+            experience = await run_in_session(_txn)
+            invalidate_character(character_id)
+            if experience is None:
+                return {"error": f"Character {character_id} not found"}
+            old_experience, new_experience = experience
 
             # Check if character can now level up
             from app.plugins.rules_engine_plugin import RulesEnginePlugin
@@ -13,12 +13,14 @@ from .rest_routes import router as rest_router
 from .save_routes import router as save_router
 from .session_routes import router as session_router
 from .spell_routes import router as spell_router
+from .srd_routes import router as srd_router
 
 all_routers = [
     character_router,
     campaign_router,
     combat_router,
     spell_router,
+    srd_router,
     dice_router,
     npc_router,
     ai_router,
@@ -1,7 +1,10 @@
 """Shared utilities for domain route modules."""
 
+import hashlib
+
 from slowapi import Limiter
 from starlette.requests import Request
+from starlette.responses import Response
 
 from app.image_budget import ImageBudgetTracker
 
@@ -40,3 +43,41 @@ def _get_image_budget() -> ImageBudgetTracker:
             window_minutes=cfg.image_session_window_minutes,
         )
     return _image_budget
+
+
+# ---------------------------------------------------------------------------
+# Conditional GET for static JSON
+# ---------------------------------------------------------------------------
+
+
+def strong_etag(body: bytes) -> str:
+    """Return a strong entity tag (quoted content hash) for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches *etag*.
+
+    ``If-None-Match`` uses weak comparison, so ``W/`` prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def conditional_json_response(
+    body: bytes, etag: str, if_none_match: str | None
+) -> Response:
+    """Return *body* as JSON, or an empty 304 if the client already has it.
+
+    Clients are told to revalidate on every use, which costs them one
+    304 round trip while the body is unchanged.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
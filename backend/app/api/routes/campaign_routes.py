@@ -1,14 +1,18 @@
 """Campaign CRUD routes."""
 
 import logging
-from typing import Any
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
 from app.config import ConfigDep
 from app.models.game_models import (
     Campaign,
     CampaignListResponse,
+    CampaignSummary,
+    CampaignSummaryPage,
     CampaignUpdateRequest,
     CloneCampaignRequest,
     CreateCampaignRequest,
@@ -25,7 +29,7 @@ async def create_campaign(campaign_data: CreateCampaignRequest, config: ConfigDe
     """Create a new campaign."""
     try:
         # Campaign creation doesn't require Azure OpenAI - it's just database operations
-        return campaign_service.create_campaign(campaign_data)
+        return await campaign_service.create_campaign(campaign_data)
     except HTTPException:
         # Re-raise HTTPExceptions as-is
         raise
@@ -50,13 +54,52 @@ async def create_campaign(campaign_data: CreateCampaignRequest, config: ConfigDe
 
 
 @router.get("/campaigns", response_model=CampaignListResponse)
-async def list_campaigns() -> dict[str, Any]:
-    """List all campaigns including templates and custom campaigns."""
+async def list_campaigns(
+    limit: Annotated[int | None, Query(ge=1, le=500)] = None,
+    cursor: str | None = None,
+    is_template: bool | None = None,
+) -> CampaignListResponse:
+    """List campaign summaries, newest first, plus the templates.
+
+    Rows are column-only summaries, as in ``/campaigns/summaries``; fetch a
+    full campaign with ``/campaign/{campaign_id}``.
+
+    Query parameters:
+        - ``limit``: Page size, 1-500; with neither ``limit`` nor
+          ``cursor`` every campaign is listed.
+        - ``cursor``: ``next_cursor`` from the previous page.
+        - ``is_template``: Only templates (true) or only non-templates
+          (false); ``templates`` is empty for false and on later pages.
+    """
     try:
-        all_campaigns = campaign_service.list_campaigns()
-        templates = campaign_service.get_templates()
+        if limit is None and cursor is None:
+            campaigns = [
+                summary
+                async for summary in campaign_service.iter_campaign_summaries(
+                    is_template=is_template
+                )
+            ]
+            next_cursor = None
+        else:
+            campaigns, next_cursor = await campaign_service.list_campaign_summaries(
+                limit=limit or 50, cursor=cursor, is_template=is_template
+            )
+        templates: list[CampaignSummary] = []
+        if is_template is not False and cursor is None:
+            templates = [
+                summary
+                async for summary in campaign_service.iter_campaign_summaries(
+                    is_template=True
+                )
+            ]
 
-        return CampaignListResponse(campaigns=all_campaigns, templates=templates)
+        return CampaignListResponse(
+            campaigns=campaigns, templates=templates, next_cursor=next_cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from None
     except Exception as e:
         logger.exception("Error listing campaigns")
         raise HTTPException(
@@ -65,11 +108,56 @@ async def list_campaigns() -> dict[str, Any]:
         ) from e
 
 
+@router.get("/campaigns/summaries", response_model=CampaignSummaryPage)
+async def list_campaign_summaries(
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+    cursor: str | None = None,
+    is_template: bool | None = None,
+) -> CampaignSummaryPage:
+    """Return one keyset page of column-only campaign summaries, newest first.
+
+    Query parameters:
+        - ``limit``: Page size, 1-500.
+        - ``cursor``: ``next_cursor`` from the previous page.
+        - ``is_template``: Only templates (true) or only non-templates (false).
+    """
+    try:
+        summaries, next_cursor = await campaign_service.list_campaign_summaries(
+            limit=limit, cursor=cursor, is_template=is_template
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from None
+    return CampaignSummaryPage(campaigns=summaries, next_cursor=next_cursor)
+
+
+@router.get("/campaigns/summaries/stream", response_class=StreamingResponse)
+async def stream_campaign_summaries(is_template: bool | None = None) -> StreamingResponse:
+    """Stream every campaign summary as NDJSON (one JSON object per line).
+
+    Query parameters:
+        - ``is_template``: Only templates (true) or only non-templates (false).
+    """
+    return StreamingResponse(
+        _stream_campaign_summaries(is_template),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _stream_campaign_summaries(is_template: bool | None) -> AsyncIterator[str]:
+    """Yield campaign summaries as NDJSON lines."""
+    async for summary in campaign_service.iter_campaign_summaries(
+        is_template=is_template
+    ):
+        yield summary.model_dump_json() + "\n"
+
+
 @router.get("/campaign/templates")
 async def get_campaign_templates() -> dict[str, Any]:
     """Get pre-built campaign templates."""
     try:
-        templates = campaign_service.get_templates()
+        templates = await campaign_service.get_templates()
         return {"templates": templates}
     except Exception as e:
         logger.exception("Error getting campaign templates")
@@ -83,7 +171,7 @@ async def get_campaign_templates() -> dict[str, Any]:
 async def get_campaign(campaign_id: str) -> dict[str, Any]:
     """Get a specific campaign by ID."""
     try:
-        campaign = campaign_service.get_campaign(campaign_id)
+        campaign = await campaign_service.get_campaign(campaign_id)
         if not campaign:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -112,7 +200,7 @@ async def update_campaign(campaign_id: str, updates: CampaignUpdateRequest) -> d
                 detail="No valid updates provided",
             ) from None
 
-        updated_campaign = campaign_service.update_campaign(campaign_id, update_data)
+        updated_campaign = await campaign_service.update_campaign(campaign_id, update_data)
         if not updated_campaign:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -133,7 +221,7 @@ async def update_campaign(campaign_id: str, updates: CampaignUpdateRequest) -> d
 async def clone_campaign(clone_data: CloneCampaignRequest) -> dict[str, Any]:
     """Clone a template campaign for customization."""
     try:
-        cloned_campaign = campaign_service.clone_campaign(
+        cloned_campaign = await campaign_service.clone_campaign(
             clone_data.template_id, clone_data.new_name
         )
 
@@ -157,7 +245,7 @@ async def clone_campaign(clone_data: CloneCampaignRequest) -> dict[str, Any]:
 async def delete_campaign(campaign_id: str) -> dict[str, Any]:
     """Delete a custom campaign (templates cannot be deleted)."""
     try:
-        success = campaign_service.delete_campaign(campaign_id)
+        success = await campaign_service.delete_campaign(campaign_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
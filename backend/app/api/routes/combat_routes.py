@@ -1,70 +1,208 @@
 """Combat system routes."""
 
+import asyncio
 import logging
+import time
 import uuid
 from datetime import UTC, datetime
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from app.agents.scribe_agent import get_scribe
-from app.database import get_session_context
-from app.models.db_models import CombatState
+from app.combat_engine import CombatantRecord, LiveCombat, get_combat_engine
+from app.config import get_settings
+from app.database import run_in_session
+from app.models.db_models import CombatEvent, CombatState
+from app.models.game_models import (
+    EncounterBatchRequest,
+    EncounterBatchResponse,
+    EncounterSimulationRequest,
+    EncounterSimulationResponse,
+)
+from app.models.map_models import MapEffect
+from app.rng import campaign_rng
 from app.utils.dice import DiceRoller
+from app.utils.dice_engine import compile_dice
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["combat"])
 
 
-def _persist_combat(combat_id: str, data: dict[str, Any]) -> None:
-    """Save or update a combat encounter in the database."""
+# Attempts made when a concurrent turn grabs the same event sequence number
+_EVENT_APPEND_RETRIES = 5
+
+
+async def _persist_combat(combat_id: str, data: dict[str, Any]) -> None:
+    """Save or update a combat encounter header in the database.
+
+    Only the compact header (status, round, turn, initiative) is written here;
+    per-action history goes through :func:`_append_combat_event`.
+    """
+
+    def _write(db: Session) -> None:
+        row = db.query(CombatState).filter(CombatState.id == combat_id).first()
+        if row:
+            row.status = data.get("status", row.status)
+            row.round = data.get("round", row.round)
+            row.current_turn = data.get("current_turn", row.current_turn)
+            row.initiative_order = data.get("initiative_order", row.initiative_order)
+            row.updated_at = datetime.now(UTC)
+        else:
+            row = CombatState(
+                id=combat_id,
+                session_id=data.get("session_id", ""),
+                status=data.get("status", "active"),
+                round=data.get("round", 1),
+                current_turn=data.get("current_turn", 0),
+                initiative_order=data.get("initiative_order", []),
+                participants=data.get("participants", []),
+                environment=data.get("environment", "standard"),
+                combat_log=[],
+            )
+            db.add(row)
+        db.commit()
+
     try:
-        with get_session_context() as db:
-            row = db.query(CombatState).filter(CombatState.id == combat_id).first()
-            if row:
-                row.status = data.get("status", row.status)
-                row.round = data.get("round", row.round)
-                row.current_turn = data.get("current_turn", row.current_turn)
-                row.initiative_order = data.get("initiative_order", row.initiative_order)
-                row.combat_log = data.get("combat_log", row.combat_log)
-                row.updated_at = datetime.now(UTC)
-            else:
-                row = CombatState(
-                    id=combat_id,
-                    session_id=data.get("session_id", ""),
-                    status=data.get("status", "active"),
-                    round=data.get("round", 1),
-                    current_turn=data.get("current_turn", 0),
-                    initiative_order=data.get("initiative_order", []),
-                    participants=data.get("participants", []),
-                    environment=data.get("environment", "standard"),
-                    combat_log=data.get("combat_log", []),
-                )
-                db.add(row)
-            db.commit()
+        await run_in_session(_write)
     except Exception as exc:
         logger.warning("Failed to persist combat state %s: %s", combat_id, exc)
 
 
-def _load_combat(combat_id: str) -> dict[str, Any] | None:
-    """Load a combat encounter from the database, or None if not found."""
-    try:
-        with get_session_context() as db:
-            row = db.query(CombatState).filter(CombatState.id == combat_id).first()
-            if row is None:
+def _event_to_dict(event: CombatEvent) -> dict[str, Any]:
+    """Serialise a combat event row for API responses."""
+    return {
+        "seq": event.seq,
+        "event_type": event.event_type,
+        "data": event.data,
+        "created_at": str(event.created_at),
+    }
+
+
+async def _append_combat_event(
+    combat_id: str, entry: dict[str, Any], event_type: str = "action"
+) -> int | None:
+    """Append one entry to a combat's event log.
+
+    Writes a single ``combat_events`` row, so the cost of a turn does not grow
+    with the length of the fight. The ``(combat_id, seq)`` unique constraint
+    makes concurrent turns retry with the next sequence number rather than
+    overwrite each other. Legacy rows whose history still lives in the inline
+    ``combat_log`` column are folded into events on their first append.
+
+    Returns:
+        The sequence number assigned to the entry, or None if the combat
+        does not exist.
+    """
+
+    def _write(db: Session) -> int | None:
+        for _ in range(_EVENT_APPEND_RETRIES):
+            header = db.query(CombatState).filter(CombatState.id == combat_id).first()
+            if header is None:
                 return None
-            return {
-                "combat_id": row.id,
-                "session_id": row.session_id,
-                "status": row.status,
-                "round": row.round,
-                "current_turn": row.current_turn,
-                "initiative_order": row.initiative_order,
-                "participants": row.participants,
-                "environment": row.environment,
-                "combat_log": row.combat_log,
-            }
+            last_seq = (
+                db.query(func.max(CombatEvent.seq))
+                .filter(CombatEvent.combat_id == combat_id)
+                .scalar()
+            ) or 0
+            if header.combat_log:
+                for legacy in header.combat_log:
+                    last_seq += 1
+                    db.add(CombatEvent(combat_id=combat_id, seq=last_seq, data=legacy))
+                header.combat_log = []
+            seq = last_seq + 1
+            db.add(
+                CombatEvent(combat_id=combat_id, seq=seq, event_type=event_type, data=entry)
+            )
+            header.updated_at = datetime.now(UTC)
+            try:
+                db.commit()
+                return seq
+            except IntegrityError:
+                db.rollback()
+        raise RuntimeError(f"Could not allocate an event sequence for combat {combat_id}")
+
+    try:
+        return await run_in_session(_write)
+    except Exception as exc:
+        logger.warning("Failed to append combat event for %s: %s", combat_id, exc)
+        return None
+
+
+async def _load_combat_events(
+    combat_id: str,
+    after_seq: int = 0,
+    limit: int | None = None,
+    tail: int | None = None,
+) -> list[dict[str, Any]]:
+    """Load a slice of a combat's event log in sequence order.
+
+    Args:
+        combat_id: Combat encounter identifier.
+        after_seq: Only return events with a sequence number above this.
+        limit: Maximum number of events to return (forward pagination).
+        tail: Return only the last ``tail`` events; overrides ``after_seq``
+            and ``limit``.
+    """
+
+    def _read(db: Session) -> list[dict[str, Any]]:
+        query = db.query(CombatEvent).filter(CombatEvent.combat_id == combat_id)
+        if tail is not None:
+            rows = query.order_by(CombatEvent.seq.desc()).limit(tail).all()
+            rows.reverse()
+        else:
+            query = query.filter(CombatEvent.seq > after_seq).order_by(CombatEvent.seq)
+            if limit is not None:
+                query = query.limit(limit)
+            rows = query.all()
+        return [_event_to_dict(row) for row in rows]
+
+    try:
+        return await run_in_session(_read)
+    except Exception as exc:
+        logger.warning("Failed to load combat events for %s: %s", combat_id, exc)
+        return []
+
+
+async def _load_combat(combat_id: str, include_log: bool = False) -> dict[str, Any] | None:
+    """Load a combat encounter from the database, or None if not found.
+
+    The full ``combat_log`` is only rebuilt from ``combat_events`` when
+    ``include_log`` is set, for clients that still expect the inline list.
+    """
+
+    def _read(db: Session) -> dict[str, Any] | None:
+        row = db.query(CombatState).filter(CombatState.id == combat_id).first()
+        if row is None:
+            return None
+        result = {
+            "combat_id": row.id,
+            "session_id": row.session_id,
+            "status": row.status,
+            "round": row.round,
+            "current_turn": row.current_turn,
+            "initiative_order": row.initiative_order,
+            "participants": row.participants,
+            "environment": row.environment,
+            "effects": list(row.effects or []),
+        }
+        if include_log:
+            events = (
+                db.query(CombatEvent.data)
+                .filter(CombatEvent.combat_id == combat_id)
+                .order_by(CombatEvent.seq)
+                .all()
+            )
+            result["combat_log"] = list(row.combat_log or []) + [e.data for e in events]
+        return result
+
+    try:
+        return await run_in_session(_read)
     except Exception as exc:
         logger.warning("Failed to load combat state %s: %s", combat_id, exc)
         return None
@@ -103,28 +241,30 @@ async def initialize_combat(combat_data: dict[str, Any]) -> dict[str, Any]:
                     )
 
                 roll = DiceRoller.roll_d20(modifier=dex_modifier)
-                initiative_order.append(
-                    {
-                        "type": "player",
-                        "id": participant.get("character_id", participant.get("id")),
-                        "name": participant.get("name", "Player"),
-                        "initiative": roll["total"],
-                    }
-                )
+                entry = {
+                    "type": "player",
+                    "id": participant.get("character_id", participant.get("id")),
+                    "name": participant.get("name", "Player"),
+                    "initiative": roll["total"],
+                }
             else:
                 # NPCs / enemies
                 roll = DiceRoller.roll_d20(modifier=dex_modifier)
-                initiative_order.append(
-                    {
-                        "type": "npc",
-                        "id": participant.get("id", "npc"),
-                        "name": participant.get("name", "NPC"),
-                        "initiative": roll["total"],
-                    }
-                )
-
-        # Sort by initiative (highest first)
-        initiative_order.sort(key=lambda x: x["initiative"], reverse=True)
+                entry = {
+                    "type": "npc",
+                    "id": participant.get("id", "npc"),
+                    "name": participant.get("name", "NPC"),
+                    "initiative": roll["total"],
+                }
+            entry["dex_modifier"] = dex_modifier
+            # Optional stats let the combat engine track hit points and AC
+            for field in ("hp", "max_hp", "ac"):
+                if participant.get(field) is not None:
+                    entry[field] = participant[field]
+            initiative_order.append(entry)
+
+        # Sort by initiative (highest first), DEX modifier breaking ties
+        initiative_order.sort(key=lambda x: (x["initiative"], x["dex_modifier"]), reverse=True)
 
         combat_id = f"combat_{session_id}_{uuid.uuid4().hex[:8]}"
         result = {
@@ -140,7 +280,7 @@ async def initialize_combat(combat_data: dict[str, Any]) -> dict[str, Any]:
         }
 
         # Persist to database so combat survives restarts (#701)
-        _persist_combat(combat_id, {
+        await _persist_combat(combat_id, {
             "session_id": session_id,
             "status": "active",
             "round": 1,
@@ -148,8 +288,8 @@ async def initialize_combat(combat_data: dict[str, Any]) -> dict[str, Any]:
             "initiative_order": initiative_order,
             "participants": participants,
             "environment": environment,
-            "combat_log": [],
         })
+        get_combat_engine().start(combat_id, initiative_order)
 
         return result
 
@@ -160,9 +300,104 @@ async def initialize_combat(combat_data: dict[str, Any]) -> dict[str, Any]:
         ) from e
 
 
+def _joining_combatant(combatant: dict[str, Any]) -> dict[str, Any]:
+    """Initiative entry for a combatant joining mid-fight, rolling initiative if needed."""
+    dex_modifier = int(combatant.get("dex_modifier", 0))
+    entry = {
+        "type": combatant.get("type", "npc"),
+        "id": combatant.get("id", f"npc_{uuid.uuid4().hex[:8]}"),
+        "name": combatant.get("name", "NPC"),
+        "initiative": combatant.get("initiative"),
+        "dex_modifier": dex_modifier,
+    }
+    if entry["initiative"] is None:
+        entry["initiative"] = DiceRoller.roll_d20(modifier=dex_modifier)["total"]
+    for field in ("hp", "max_hp", "ac"):
+        if combatant.get(field) is not None:
+            entry[field] = combatant[field]
+    return entry
+
+
+def _turn_conflict(combat: LiveCombat, action_type: str, character_id: str | None) -> str | None:
+    """Why *character_id* cannot delay, resume, ready or trigger now, if it cannot."""
+    if action_type not in ("delay", "resume", "ready", "trigger"):
+        return None
+    actor = combat.get(character_id)
+    if actor is None:
+        return f"Combatant {character_id} is not in combat {combat.combat_id}"
+    tracker = combat.tracker
+    if action_type == "delay" and tracker.active != actor.id:
+        return "Only the active combatant can delay"
+    if action_type == "resume" and actor.id not in tracker.delayed:
+        return f"{actor.name} is not delaying"
+    if action_type == "ready" and actor.id not in tracker:
+        return f"{actor.name} is not in the initiative order"
+    if action_type == "trigger" and actor.id not in tracker.readied:
+        return f"{actor.name} has no readied action"
+    return None
+
+
+def _map_effect(effect: dict[str, Any], remove: bool) -> dict[str, Any]:
+    """Validate a ``map_effect`` turn's effect; ending one needs only its id."""
+    if remove:
+        if not effect.get("id"):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Removing a map effect requires its id",
+            )
+        return {"id": effect["id"]}
+    try:
+        return MapEffect.model_validate(effect).model_dump()
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid map effect: {e.errors(include_url=False)}",
+        ) from e
+
+
+async def _broadcast_expiries(campaign_id: str, combat_id: str, expired: list[dict[str, Any]]) -> None:
+    """Tell a campaign's players which timed effects ended; never fails the turn."""
+    from app.api.websocket_routes import broadcast_effect_expiries
+
+    try:
+        await broadcast_effect_expiries(campaign_id, combat_id, expired)
+    except Exception as e:
+        logger.warning("Failed to broadcast effect expiries for combat %s: %s", combat_id, e)
+
+
+def _live_summary(combat: LiveCombat, target: CombatantRecord | None) -> dict[str, Any]:
+    """Round, turn and target hit points after a turn was applied."""
+    active = combat.active
+    summary: dict[str, Any] = {
+        "status": combat.status,
+        "round": combat.round,
+        "current_turn": combat.current_turn,
+        "active_combatant": active.key if active is not None else None,
+    }
+    if target is not None and target.hp is not None:
+        summary["target_hp"] = target.hp
+    return summary
+
+
 @router.post("/combat/{combat_id}/turn", response_model=dict[str, Any])
 async def process_combat_turn(combat_id: str, turn_data: dict[str, Any]) -> dict[str, Any]:
-    """Process a single combat turn."""
+    """Process a single combat turn.
+
+    The action is logged to the combat's event log and applied to the live
+    combat (see :mod:`app.combat_engine`). Besides ``attack``, the actions
+    ``damage``/``heal`` (with ``amount``), ``join`` (with ``combatant``),
+    ``remove``, ``condition`` (with ``condition`` and optional ``remove``)
+    and ``end_combat`` change the tracked state; ``delay``,
+    ``resume``, ``ready`` (with ``readied``) and ``trigger`` act on
+    ``character_id``'s place in the initiative order (409 if they cannot),
+    and ``end_turn: true`` passes the turn to the next combatant.
+
+    A ``condition`` with ``duration_rounds``, ``concentration`` (with
+    ``spell``) and ``map_effect`` (with a :class:`MapEffect` ``effect``)
+    start timed effects; ``remove`` ends them early. Effects that run out
+    as a new round starts are listed in ``expired_effects`` and, when
+    ``campaign_id`` is given, broadcast to the campaign.
+    """
     try:
         action_type = turn_data.get(
             "action", "attack"
@@ -170,6 +405,9 @@ async def process_combat_turn(combat_id: str, turn_data: dict[str, Any]) -> dict
         target_id = turn_data.get("target_id")
         character_id = turn_data.get("character_id")
         dice_result = turn_data.get("dice_result")
+        engine = get_combat_engine()
+        combat = await engine.get(combat_id)
+        target = combat.get(target_id) if combat is not None else None
 
         # Process the combat action
         turn_result: dict[str, Any] = {
@@ -186,14 +424,33 @@ async def process_combat_turn(combat_id: str, turn_data: dict[str, Any]) -> dict
         if action_type == "attack":
             # Roll attack if the caller did not supply a pre-rolled result
             attack_bonus = turn_data.get("attack_bonus", 0)
+            # Conditions on tracked combatants decide advantage and auto-crits
+            attacker = combat.get(character_id) if combat is not None else None
+            modifiers = None
+            if attacker is not None and target is not None:
+                modifiers = attacker.conditions.attack_modifiers(
+                    target.conditions, ranged=bool(turn_data.get("ranged"))
+                )
+                turn_result["advantage"] = modifiers.advantage
+                turn_result["disadvantage"] = modifiers.disadvantage
             if dice_result is None:
-                dice_result = DiceRoller.roll_d20(modifier=attack_bonus)
+                dice_result = DiceRoller.roll_d20(
+                    modifier=attack_bonus,
+                    advantage=modifiers is not None and modifiers.advantage,
+                    disadvantage=modifiers is not None and modifiers.disadvantage,
+                )
 
-            target_ac = turn_data.get("target_ac", 15)
+            default_ac = target.ac if target is not None and target.ac is not None else 15
+            target_ac = turn_data.get("target_ac", default_ac)
             if dice_result["total"] >= target_ac:
                 # Hit -- roll damage
                 damage_dice = turn_data.get("damage_dice", "1d6")
                 damage_result = DiceRoller.roll_damage(damage_dice)
+                if modifiers is not None and modifiers.auto_crit:
+                    extra = compile_dice(damage_dice).critical_dice()
+                    if extra is not None:
+                        damage_result["total"] += extra.roll().total
+                    turn_result["critical"] = True
 
                 turn_result.update(
                     {
@@ -216,16 +473,62 @@ async def process_combat_turn(combat_id: str, turn_data: dict[str, Any]) -> dict
                     }
                 )
 
+        elif action_type in ("damage", "heal"):
+            amount = max(0, int(turn_data.get("amount", 0)))
+            field = "damage" if action_type == "damage" else "healing"
+            turn_result.update({"success": True, field: amount})
+        elif action_type == "join":
+            turn_result["combatant"] = _joining_combatant(turn_data.get("combatant") or {})
+        elif action_type == "ready":
+            turn_result["readied"] = turn_data.get("readied") or True
+        elif action_type == "condition":
+            turn_result.update(
+                {"success": True, "condition": turn_data.get("condition"), "remove": bool(turn_data.get("remove"))}
+            )
+            if turn_data.get("duration_rounds") is not None:
+                turn_result["duration_rounds"] = int(turn_data["duration_rounds"])
+        elif action_type == "concentration":
+            turn_result.update(
+                {
+                    "success": True,
+                    "spell": turn_data.get("spell"),
+                    "duration_rounds": int(turn_data.get("duration_rounds") or 10),
+                    "remove": bool(turn_data.get("remove")),
+                }
+            )
+        elif action_type == "map_effect":
+            turn_result["effect"] = _map_effect(turn_data.get("effect") or {}, bool(turn_data.get("remove")))
+            turn_result.update({"success": True, "remove": bool(turn_data.get("remove"))})
+
+        if turn_data.get("end_turn"):
+            turn_result["end_turn"] = True
         turn_result["timestamp"] = str(datetime.now(UTC))
 
-        # Append to the persistent combat log (#701)
-        existing = _load_combat(combat_id)
-        if existing is not None:
-            log = list(existing.get("combat_log", []))
-            log.append(turn_result)
-            _persist_combat(combat_id, {"combat_log": log})
+        if combat is None:
+            # Unknown combat: nothing to apply, and the append is a no-op
+            seq = await _append_combat_event(combat_id, turn_result, event_type=action_type)
+        else:
+            expired: list[dict[str, Any]] = []
+            async with combat.lock:
+                conflict = _turn_conflict(combat, action_type, character_id)
+                if conflict is not None:
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=conflict)
+                # Append to the persistent combat event log (#701)
+                seq = await _append_combat_event(combat_id, turn_result, event_type=action_type)
+                if seq is not None:
+                    await engine.apply(combat, action_type, turn_result, seq)
+                    turn_result.update(_live_summary(combat, target))
+                    expired = combat.expired
+            if seq is not None and expired:
+                turn_result["expired_effects"] = expired
+                if turn_data.get("campaign_id"):
+                    await _broadcast_expiries(turn_data["campaign_id"], combat_id, expired)
+        if seq is not None:
+            turn_result["seq"] = seq
         return turn_result
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -233,6 +536,74 @@ async def process_combat_turn(combat_id: str, turn_data: dict[str, Any]) -> dict
         ) from e
 
 
+@router.get("/combat/{combat_id}", response_model=dict[str, Any])
+async def get_combat(combat_id: str, include_log: bool = False) -> dict[str, Any]:
+    """Get a combat encounter's header, optionally with its full log.
+
+    A combat that is live in this process reports its in-memory state,
+    which can be ahead of the last checkpoint in the database.
+    """
+    combat = await _load_combat(combat_id, include_log=include_log)
+    if combat is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Combat {combat_id} not found",
+        )
+    live = get_combat_engine().peek(combat_id)
+    if live is not None:
+        header = live.header()
+        header.pop("checkpoint_seq")
+        combat.update(header)
+    return combat
+
+
+@router.get("/combat/{combat_id}/events", response_model=dict[str, Any])
+async def get_combat_events(
+    combat_id: str,
+    after_seq: int = 0,
+    limit: int = 50,
+    tail: int | None = None,
+) -> dict[str, Any]:
+    """Page through a combat's event log.
+
+    Query parameters:
+        - ``after_seq``: Return events after this sequence number (default 0).
+        - ``limit``: Page size, 1-500 (default 50).
+        - ``tail``: Return only the most recent ``tail`` events instead.
+    """
+    if not 1 <= limit <= 500:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="limit must be between 1 and 500",
+        )
+    if tail is not None and not 1 <= tail <= 500:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="tail must be between 1 and 500",
+        )
+    if await _load_combat(combat_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Combat {combat_id} not found",
+        )
+
+    # Fetch one extra row to know whether another page follows
+    events = await _load_combat_events(
+        combat_id,
+        after_seq=after_seq,
+        limit=None if tail is not None else limit + 1,
+        tail=tail,
+    )
+    has_more = tail is None and len(events) > limit
+    events = events[:limit] if tail is None else events
+    return {
+        "combat_id": combat_id,
+        "events": events,
+        "next_after_seq": events[-1]["seq"] if events else after_seq,
+        "has_more": has_more,
+    }
+
+
 @router.post("/encounter/generate", response_model=dict[str, Any])
 async def generate_encounter(encounter_request: dict[str, Any]) -> dict[str, Any]:
     """Generate a balanced encounter for the party.
@@ -243,6 +614,12 @@ async def generate_encounter(encounter_request: dict[str, Any]) -> dict[str, Any
           or ``deadly`` (default ``"medium"``).
         - ``location``: Thematic location hint, e.g. ``"dungeon"``, ``"forest"``
           (default ``"dungeon"``).
+        - ``max_monsters``: Optional cap on the number of monsters (default 10).
+        - ``max_copies``: Optional cap on copies of one stat block.
+        - ``max_per_cr``: Optional cap on monsters of one challenge rating.
+        - ``party``: Optional list of character game contexts; when given,
+          candidate encounters are compared by simulation (see
+          ``/encounter/simulate``) and the result includes ``simulation``.
 
     Returns a dict describing the generated encounter, including selected
     monsters, adjusted XP, and XP award per character.
@@ -290,10 +667,33 @@ async def generate_encounter(encounter_request: dict[str, Any]) -> dict[str, Any
                 detail=f"difficulty must be one of: {', '.join(sorted(valid_difficulties))}",
             )
 
+        limits: dict[str, int] = {}
+        for key in ("max_monsters", "max_copies", "max_per_cr"):
+            value = encounter_request.get(key)
+            if value is None:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= 50:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"{key} must be an integer from 1 to 50",
+                )
+            limits[key] = value
+
+        party = encounter_request.get("party")
+        if party is not None and (
+            not isinstance(party, list) or not all(isinstance(member, dict) for member in party)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="party must be a list of character objects",
+            )
+
         return generate_balanced_encounter(
             party_levels=party_levels,
             difficulty=difficulty,
             location=location,
+            party=party or None,
+            **limits,
         )
 
     except HTTPException:
@@ -305,6 +705,79 @@ async def generate_encounter(encounter_request: dict[str, Any]) -> dict[str, Any
         ) from e
 
 
+@router.post("/encounter/generate-batch", response_model=EncounterBatchResponse)
+async def generate_encounter_batch(request: EncounterBatchRequest) -> EncounterBatchResponse:
+    """Generate encounters for many parties in one call.
+
+    Results come back in request order, each with its own ``elapsed_ms``.
+    Parties at the same location share one pre-filtered monster pool.
+    """
+    from app.encounter_balancer import generate_encounters
+
+    specs = [spec.model_dump() for spec in request.encounters]
+    workers = get_settings().encounter_batch_workers
+
+    def run() -> list[dict[str, Any]]:
+        with campaign_rng(request.campaign_id):
+            return generate_encounters(specs, workers=workers)
+
+    started = time.perf_counter()
+    try:
+        encounters = await asyncio.to_thread(run)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate encounters: {str(e)}",
+        ) from e
+    return EncounterBatchResponse(
+        encounters=encounters, elapsed_ms=(time.perf_counter() - started) * 1000
+    )
+
+
+@router.post("/encounter/simulate", response_model=EncounterSimulationResponse)
+async def simulate_encounter_outcome(
+    request: EncounterSimulationRequest,
+) -> EncounterSimulationResponse:
+    """Play an encounter many times and report how it tends to go.
+
+    The party is ``character_ids`` (stats from their game context: computed
+    AC, equipped weapon, current HP) plus any explicit ``party`` entries;
+    monsters are SRD ``monster_ids`` plus any explicit ``monsters``.
+    """
+    from app.encounter_simulator import Combatant, simulate_encounter
+    from app.services.game_context_service import build_game_context, load_character_state
+    from app.srd_data import get_monster_by_id
+
+    party = [Combatant(**member.model_dump()) for member in request.party]
+    for character_id in request.character_ids:
+        state = await load_character_state(character_id)
+        if not state:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Character {character_id} not found",
+            )
+        context = await build_game_context(character_id, "", character_data=state)
+        party.append(Combatant.from_context(context))
+
+    monsters = [Combatant(**monster.model_dump()) for monster in request.monsters]
+    for monster_id in request.monster_ids:
+        stat_block = get_monster_by_id(monster_id)
+        if stat_block is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Monster {monster_id} not found",
+            )
+        monsters.append(Combatant.from_monster(stat_block))
+
+    try:
+        result = await asyncio.to_thread(
+            simulate_encounter, party, monsters, request.trials, request.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    return EncounterSimulationResponse(**result.as_dict())
+
+
 @router.post("/encounter/xp-award", response_model=dict[str, Any])
 async def encounter_xp_award(award_request: dict[str, Any]) -> dict[str, Any]:
     """Calculate XP awarded to each character after completing an encounter.
@@ -3,10 +3,28 @@
 import logging
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.agents.scribe_agent import get_scribe
-from app.models.game_models import DiceRollRequest, ManualDiceRollRequest
+from app.config import ConfigDep
+from app.models.game_models import (
+    AttackOddsRequest,
+    AttackOddsResponse,
+    DiceBatchRequest,
+    DiceBatchResponse,
+    DiceBatchResult,
+    DiceOutcome,
+    DiceRollRequest,
+    DiceStatsRequest,
+    DiceStatsResponse,
+    ManualDiceRollRequest,
+    RNGSeedRequest,
+    RNGStreamState,
+)
+from app.rng import campaign_rng, get_stream, seed_stream
+from app.utils.dice_batch import BatchItem, make_generator, roll_batch
+from app.utils.dice_engine import DiceNotationError
+from app.utils.dice_stats import attack_odds, dice_distribution
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +45,8 @@ async def roll_dice(request: DiceRollRequest) -> dict[str, Any]:
             )
 
         rules_engine = RulesEnginePlugin()
-        result = rules_engine.roll_dice(dice_notation)
+        with campaign_rng(request.campaign_id):
+            result = rules_engine.roll_dice(dice_notation)
 
         if "error" in result:
             raise HTTPException(
@@ -44,6 +63,87 @@ async def roll_dice(request: DiceRollRequest) -> dict[str, Any]:
         ) from None
 
 
+@router.post("/dice/roll-batch", response_model=DiceBatchResponse)
+async def roll_dice_batch(request: DiceBatchRequest) -> DiceBatchResponse:
+    """Roll many dice expressions, each any number of times, in one call.
+
+    Totals come back as one compact list per expression, so a whole round
+    of a large fight resolves in a single request.
+    """
+    items = [BatchItem(r.notation, r.count, r.label) for r in request.rolls]
+    try:
+        with campaign_rng(request.campaign_id):
+            gen = make_generator(request.seed)
+        results = roll_batch(items, gen, request.include_rolls)
+    except DiceNotationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from None
+
+    return DiceBatchResponse(
+        results=[
+            DiceBatchResult(
+                notation=r.notation, label=r.label, totals=r.totals, rolls=r.rolls
+            )
+            for r in results
+        ],
+        total_rolls=sum(len(r.totals) for r in results),
+    )
+
+
+@router.post("/dice/stats", response_model=DiceStatsResponse)
+async def dice_stats(request: DiceStatsRequest) -> DiceStatsResponse:
+    """Exact distribution of a dice expression: mean, spread, percentiles, odds."""
+    if any(not 0 <= q <= 100 for q in request.percentiles):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Percentiles must be between 0 and 100",
+        )
+    try:
+        dist = dice_distribution(request.notation)
+    except DiceNotationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from None
+
+    return DiceStatsResponse(
+        notation=request.notation,
+        min=dist.min,
+        max=dist.max,
+        mean=dist.mean,
+        variance=dist.variance,
+        std_dev=dist.std_dev,
+        percentiles={f"{q:g}": dist.percentile(q) for q in request.percentiles},
+        target=request.target,
+        probability_at_least=(
+            None if request.target is None else dist.prob_at_least(request.target)
+        ),
+        distribution=(
+            [DiceOutcome(total=t, probability=p) for t, p in dist.items()]
+            if request.include_distribution
+            else None
+        ),
+    )
+
+
+@router.post("/dice/attack-odds", response_model=AttackOddsResponse)
+async def dice_attack_odds(request: AttackOddsRequest) -> AttackOddsResponse:
+    """Exact chance an attack hits or crits against an AC, and its expected damage."""
+    try:
+        odds = attack_odds(
+            request.attack_bonus,
+            request.target_ac,
+            request.advantage,
+            request.disadvantage,
+            request.damage_dice,
+        )
+    except DiceNotationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        ) from None
+    return AttackOddsResponse(**odds)
+
+
 @router.post("/dice/roll-with-character", response_model=dict[str, Any])
 async def roll_dice_with_character(roll_data: dict[str, Any]) -> dict[str, Any]:
     """Roll dice with character context for skill checks."""
@@ -105,3 +205,33 @@ async def input_manual_roll(body: ManualDiceRollRequest) -> dict[str, Any]:
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to input manual roll: {str(e)}",
         ) from None
+
+
+# ---------------------------------------------------------------------------
+# Campaign random streams (off unless RNG_ADMIN_ENDPOINTS is set)
+# ---------------------------------------------------------------------------
+
+
+def _require_rng_admin(config: ConfigDep) -> None:
+    if not config.rng_admin_endpoints:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.put(
+    "/campaign/{campaign_id}/rng",
+    response_model=RNGStreamState,
+    dependencies=[Depends(_require_rng_admin)],
+)
+async def seed_campaign_rng(campaign_id: str, body: RNGSeedRequest) -> RNGStreamState:
+    """Restart a campaign's random stream from a known seed."""
+    return RNGStreamState(**seed_stream(campaign_id, body.seed).state())
+
+
+@router.get(
+    "/campaign/{campaign_id}/rng/recording",
+    response_model=dict[str, Any],
+    dependencies=[Depends(_require_rng_admin)],
+)
+async def get_campaign_rng_recording(campaign_id: str) -> dict[str, Any]:
+    """A campaign stream's seed and journal, for ``python -m app.rng replay``."""
+    return get_stream(campaign_id).recording()
@@ -7,8 +7,9 @@ from datetime import UTC, datetime
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, status
+from sqlalchemy.orm import Session
 
-from app.database import DbDep
+from app.database import run_in_session
 from app.models.db_models import NPC as NPCDB
 from app.models.db_models import NPCProfileDB, NPCRelationshipDB
 from app.models.game_models import (
@@ -36,7 +37,7 @@ router = APIRouter(tags=["npcs"])
 
 
 @router.post("/campaign/{campaign_id}/npcs", response_model=NPC)
-async def create_campaign_npc(campaign_id: str, request: CreateNPCRequest, db: DbDep) -> dict[str, Any]:
+async def create_campaign_npc(campaign_id: str, request: CreateNPCRequest) -> dict[str, Any]:
     """Create and manage campaign NPCs."""
     try:
         # Generate basic personality traits if not provided
@@ -129,8 +130,7 @@ async def create_campaign_npc(campaign_id: str, request: CreateNPCRequest, db: D
             relationships=[],
             data=npc.model_dump(),
         )
-        db.add(db_row)
-        db.commit()
+        await run_in_session(_add_row, db_row)
 
         return npc
 
@@ -141,6 +141,11 @@ async def create_campaign_npc(campaign_id: str, request: CreateNPCRequest, db: D
         ) from e
 
 
+def _add_row(db: Session, row: Any) -> None:  # noqa: ANN401
+    db.add(row)
+    db.commit()
+
+
 @router.get("/npc/{npc_id}/personality", response_model=NPCPersonality)
 async def get_npc_personality(npc_id: str) -> dict[str, Any]:
     """Get NPC personality traits and behaviors."""
@@ -305,57 +310,7 @@ _MIN_DISPOSITION_SCORE = -100
 _MAX_DISPOSITION_SCORE = 100
 
 
-@router.get("/npcs/{campaign_id}", response_model=NPCProfileListResponse)
-async def list_npc_profiles(
-    campaign_id: str,
-    db: DbDep,
-) -> NPCProfileListResponse:
-    """List all NPC profiles for a campaign."""
-    rows = (
-        db.query(NPCProfileDB)
-        .filter(NPCProfileDB.campaign_id == campaign_id)
-        .all()
-    )
-    profiles = [
-        NPCProfile(
-            id=row.id,
-            name=row.name,
-            description=row.description or "",
-            personality_traits=row.personality_traits or [],
-            disposition=row.disposition,
-            location=row.location or "",
-            is_alive=row.is_alive,
-            conversation_notes=row.conversation_notes or [],
-            conversation_history=row.conversation_history or [],
-        )
-        for row in rows
-    ]
-    return NPCProfileListResponse(npcs=profiles, total_count=len(profiles))
-
-
-@router.post("/npcs/{campaign_id}", response_model=NPCProfile, status_code=status.HTTP_201_CREATED)
-async def create_npc_profile(
-    campaign_id: str,
-    request: CreateNPCProfileRequest,
-    db: DbDep,
-) -> NPCProfile:
-    """Create a new NPC profile in a campaign."""
-    npc_id = str(uuid.uuid4())
-    row = NPCProfileDB(
-        id=npc_id,
-        campaign_id=campaign_id,
-        name=request.name,
-        description=request.description,
-        personality_traits=request.personality_traits,
-        disposition=request.disposition,
-        location=request.location,
-        is_alive=True,
-        conversation_notes=[],
-        conversation_history=[],
-    )
-    db.add(row)
-    db.commit()
-    db.refresh(row)
+def _profile_from_row(row: NPCProfileDB) -> NPCProfile:
     return NPCProfile(
         id=row.id,
         name=row.name,
@@ -369,13 +324,18 @@ async def create_npc_profile(
     )
 
 
-@router.get("/npcs/{campaign_id}/{npc_id}", response_model=NPCProfileWithRelationship)
-async def get_npc_profile(
-    campaign_id: str,
-    npc_id: str,
-    db: DbDep,
-) -> NPCProfileWithRelationship:
-    """Get an NPC profile with its relationship data."""
+def _relationship_from_row(row: NPCRelationshipDB) -> NPCRelationship:
+    return NPCRelationship(
+        npc_id=row.npc_id,
+        campaign_id=row.campaign_id,
+        disposition_score=row.disposition_score,
+        interactions_count=row.interactions_count,
+        key_events=row.key_events or [],
+        last_interaction=row.last_interaction or "",
+    )
+
+
+def _require_profile(db: Session, campaign_id: str, npc_id: str) -> NPCProfileDB:
     row = (
         db.query(NPCProfileDB)
         .filter(NPCProfileDB.id == npc_id, NPCProfileDB.campaign_id == campaign_id)
@@ -386,18 +346,11 @@ async def get_npc_profile(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"NPC {npc_id} not found in campaign {campaign_id}",
         )
-    profile = NPCProfile(
-        id=row.id,
-        name=row.name,
-        description=row.description or "",
-        personality_traits=row.personality_traits or [],
-        disposition=row.disposition,
-        location=row.location or "",
-        is_alive=row.is_alive,
-        conversation_notes=row.conversation_notes or [],
-        conversation_history=row.conversation_history or [],
-    )
-    rel_row = (
+    return row
+
+
+def _relationship_row(db: Session, campaign_id: str, npc_id: str) -> NPCRelationshipDB | None:
+    return (
         db.query(NPCRelationshipDB)
         .filter(
             NPCRelationshipDB.npc_id == npc_id,
@@ -405,48 +358,70 @@ async def get_npc_profile(
         )
         .first()
     )
-    relationship = None
-    if rel_row is not None:
-        relationship = NPCRelationship(
-            npc_id=rel_row.npc_id,
-            campaign_id=rel_row.campaign_id,
-            disposition_score=rel_row.disposition_score,
-            interactions_count=rel_row.interactions_count,
-            key_events=rel_row.key_events or [],
-            last_interaction=rel_row.last_interaction or "",
-        )
-    return NPCProfileWithRelationship(profile=profile, relationship=relationship)
 
 
-@router.patch("/npcs/{campaign_id}/{npc_id}/disposition", response_model=NPCRelationship)
-async def update_npc_disposition(
-    campaign_id: str,
-    npc_id: str,
-    request: UpdateDispositionRequest,
-    db: DbDep,
-) -> NPCRelationship:
-    """Update the disposition score for an NPC in a campaign."""
-    npc_row = (
+def _list_npc_profiles(db: Session, campaign_id: str) -> NPCProfileListResponse:
+    rows = (
         db.query(NPCProfileDB)
-        .filter(NPCProfileDB.id == npc_id, NPCProfileDB.campaign_id == campaign_id)
-        .first()
+        .filter(NPCProfileDB.campaign_id == campaign_id)
+        .all()
     )
-    if npc_row is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"NPC {npc_id} not found in campaign {campaign_id}",
-        )
+    profiles = [_profile_from_row(row) for row in rows]
+    return NPCProfileListResponse(npcs=profiles, total_count=len(profiles))
 
-    clamped_score = max(_MIN_DISPOSITION_SCORE, min(_MAX_DISPOSITION_SCORE, request.disposition_score))
 
-    rel_row = (
-        db.query(NPCRelationshipDB)
-        .filter(
-            NPCRelationshipDB.npc_id == npc_id,
-            NPCRelationshipDB.campaign_id == campaign_id,
-        )
-        .first()
+@router.get("/npcs/{campaign_id}", response_model=NPCProfileListResponse)
+async def list_npc_profiles(campaign_id: str) -> NPCProfileListResponse:
+    """List all NPC profiles for a campaign."""
+    return await run_in_session(_list_npc_profiles, campaign_id)
+
+
+def _create_npc_profile(db: Session, campaign_id: str, request: CreateNPCProfileRequest) -> NPCProfile:
+    row = NPCProfileDB(
+        id=str(uuid.uuid4()),
+        campaign_id=campaign_id,
+        name=request.name,
+        description=request.description,
+        personality_traits=request.personality_traits,
+        disposition=request.disposition,
+        location=request.location,
+        is_alive=True,
+        conversation_notes=[],
+        conversation_history=[],
     )
+    db.add(row)
+    db.commit()
+    db.refresh(row)
+    return _profile_from_row(row)
+
+
+@router.post("/npcs/{campaign_id}", response_model=NPCProfile, status_code=status.HTTP_201_CREATED)
+async def create_npc_profile(campaign_id: str, request: CreateNPCProfileRequest) -> NPCProfile:
+    """Create a new NPC profile in a campaign."""
+    return await run_in_session(_create_npc_profile, campaign_id, request)
+
+
+def _get_npc_profile(db: Session, campaign_id: str, npc_id: str) -> NPCProfileWithRelationship:
+    profile = _profile_from_row(_require_profile(db, campaign_id, npc_id))
+    rel_row = _relationship_row(db, campaign_id, npc_id)
+    relationship = _relationship_from_row(rel_row) if rel_row is not None else None
+    return NPCProfileWithRelationship(profile=profile, relationship=relationship)
+
+
+@router.get("/npcs/{campaign_id}/{npc_id}", response_model=NPCProfileWithRelationship)
+async def get_npc_profile(campaign_id: str, npc_id: str) -> NPCProfileWithRelationship:
+    """Get an NPC profile with its relationship data."""
+    return await run_in_session(_get_npc_profile, campaign_id, npc_id)
+
+
+def _update_npc_disposition(
+    db: Session, campaign_id: str, npc_id: str, request: UpdateDispositionRequest
+) -> NPCRelationship:
+    _require_profile(db, campaign_id, npc_id)
+
+    clamped_score = max(_MIN_DISPOSITION_SCORE, min(_MAX_DISPOSITION_SCORE, request.disposition_score))
+
+    rel_row = _relationship_row(db, campaign_id, npc_id)
     now_str = datetime.now(UTC).isoformat()
     if rel_row is None:
         key_events: list[str] = []
@@ -473,14 +448,17 @@ async def update_npc_disposition(
 
     db.commit()
     db.refresh(rel_row)
-    return NPCRelationship(
-        npc_id=rel_row.npc_id,
-        campaign_id=rel_row.campaign_id,
-        disposition_score=rel_row.disposition_score,
-        interactions_count=rel_row.interactions_count,
-        key_events=rel_row.key_events or [],
-        last_interaction=rel_row.last_interaction or "",
-    )
+    return _relationship_from_row(rel_row)
+
+
+@router.patch("/npcs/{campaign_id}/{npc_id}/disposition", response_model=NPCRelationship)
+async def update_npc_disposition(
+    campaign_id: str,
+    npc_id: str,
+    request: UpdateDispositionRequest,
+) -> NPCRelationship:
+    """Update the disposition score for an NPC in a campaign."""
+    return await run_in_session(_update_npc_disposition, campaign_id, npc_id, request)
 
 
 # ---------------------------------------------------------------------------
@@ -488,14 +466,14 @@ async def update_npc_disposition(
 # ---------------------------------------------------------------------------
 
 
+def _npc_dialogue_context(db: Session, campaign_id: str, npc_id: str) -> dict:
+    return npc_dialogue_service.get_npc_context(npc_id, campaign_id, db)
+
+
 @router.get("/npcs/{campaign_id}/{npc_id}/dialogue-context")
-async def get_npc_dialogue_context(
-    campaign_id: str,
-    npc_id: str,
-    db: DbDep,
-) -> dict:
+async def get_npc_dialogue_context(campaign_id: str, npc_id: str) -> dict:
     """Get NPC context for dialogue generation."""
-    ctx = npc_dialogue_service.get_npc_context(npc_id, campaign_id, db)
+    ctx = await run_in_session(_npc_dialogue_context, campaign_id, npc_id)
     if not ctx:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -504,6 +482,20 @@ async def get_npc_dialogue_context(
     return ctx
 
 
+def _record_npc_conversation(
+    db: Session, campaign_id: str, npc_id: str, request: RecordConversationRequest
+) -> None:
+    _require_profile(db, campaign_id, npc_id)
+    npc_dialogue_service.record_conversation(
+        npc_id=npc_id,
+        campaign_id=campaign_id,
+        summary=request.summary,
+        disposition_change=request.disposition_change,
+        topics=request.topics,
+        db=db,
+    )
+
+
 @router.post(
     "/npcs/{campaign_id}/{npc_id}/conversation",
     status_code=status.HTTP_201_CREATED,
@@ -512,27 +504,7 @@ async def record_npc_conversation(
     campaign_id: str,
     npc_id: str,
     request: RecordConversationRequest,
-    db: DbDep,
 ) -> dict:
     """Record a conversation interaction with an NPC."""
-    # Verify NPC exists
-    npc_row = (
-        db.query(NPCProfileDB)
-        .filter(NPCProfileDB.id == npc_id, NPCProfileDB.campaign_id == campaign_id)
-        .first()
-    )
-    if npc_row is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"NPC {npc_id} not found in campaign {campaign_id}",
-        )
-
-    npc_dialogue_service.record_conversation(
-        npc_id=npc_id,
-        campaign_id=campaign_id,
-        summary=request.summary,
-        disposition_change=request.disposition_change,
-        topics=request.topics,
-        db=db,
-    )
+    await run_in_session(_record_npc_conversation, campaign_id, npc_id, request)
     return {"status": "recorded", "npc_id": npc_id, "campaign_id": campaign_id}
@@ -1,10 +1,12 @@
 """Short and long rest routes for D&D rest mechanics."""
 
 import logging
-import random
+from collections.abc import Callable
+from typing import Any
 
 from fastapi import APIRouter, HTTPException, status
 
+from app.character_store import VersionConflictError
 from app.models.game_models import (
     CharacterClass,
     CharacterSheet,
@@ -12,6 +14,8 @@ from app.models.game_models import (
     RestResponse,
     RestType,
 )
+from app.rng import campaign_rng
+from app.rules_engine import spend_hit_dice
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +36,25 @@ HIT_DIE_SIZE: dict[CharacterClass, int] = {
     CharacterClass.SORCERER: 6,
 }
 
+# Sheet fields the rest calculations read, and the subset they change
+_REST_INPUT_FIELDS = (
+    "name",
+    "race",
+    "character_class",
+    "level",
+    "abilities",
+    "hit_points",
+    "hit_dice_remaining",
+    "spellcasting",
+    "exhaustion_level",
+)
+_REST_OUTPUT_FIELDS = (
+    "hit_points",
+    "hit_dice_remaining",
+    "spellcasting",
+    "exhaustion_level",
+)
+
 
 def _con_modifier(character: CharacterSheet) -> int:
     """Calculate Constitution modifier from ability score."""
@@ -59,11 +82,7 @@ def calculate_short_rest(
     die_size = HIT_DIE_SIZE.get(character.character_class, 8)
     con_mod = _con_modifier(character)
 
-    hp_recovered = 0
-    for _ in range(dice_to_use):
-        roll = random.randint(1, die_size)  # noqa: S311
-        healing = max(1, roll + con_mod)
-        hp_recovered += healing
+    hp_recovered = spend_hit_dice(die_size, dice_to_use, con_mod)
 
     new_hp = min(
         character.hit_points.current + hp_recovered,
@@ -139,6 +158,33 @@ def calculate_long_rest(character: CharacterSheet) -> dict:
     }
 
 
+def _rest_mutation(request: RestRequest) -> Callable[[dict[str, Any]], dict]:
+    """Return a callback applying the requested rest to a stored sheet.
+
+    Only the fields rest mechanics read are validated, and only the fields
+    they change are written back, so the update stays a small partial one.
+    """
+
+    def _rest(sheet: dict[str, Any]) -> dict:
+        character = CharacterSheet.model_validate(
+            {key: sheet[key] for key in _REST_INPUT_FIELDS if key in sheet}
+        )
+        if request.rest_type == RestType.SHORT:
+            result = calculate_short_rest(character, request.hit_dice_to_spend)
+        else:
+            result = calculate_long_rest(character)
+        changed = character.model_dump(mode="json", include=set(_REST_OUTPUT_FIELDS))
+        for key, value in changed.items():
+            default = CharacterSheet.model_fields[key].get_default(
+                call_default_factory=True
+            )
+            if key in sheet or value != default:
+                sheet[key] = value
+        return result
+
+    return _rest
+
+
 @router.post("/game/rest", response_model=RestResponse)
 async def rest(request: RestRequest) -> RestResponse:
     """Take a short or long rest."""
@@ -146,30 +192,19 @@ async def rest(request: RestRequest) -> RestResponse:
         from app.agents.scribe_agent import get_scribe
 
         scribe = get_scribe()
-        character = await scribe.get_character(request.character_id)
-        if character is None:
+        with campaign_rng(request.campaign_id):
+            modified = await scribe.modify_character(
+                request.character_id, _rest_mutation(request)
+            )
+        if modified is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Character {request.character_id} not found",
             )
+        result = modified[0]
 
-        if request.rest_type == RestType.SHORT:
-            result = calculate_short_rest(
-                character, request.hit_dice_to_spend
-            )
-            message = (
-                f"Short rest complete. Recovered {result['hp_recovered']} HP."
-            )
-        else:
-            result = calculate_long_rest(character)
-            message = (
-                f"Long rest complete. Recovered {result['hp_recovered']} HP."
-            )
-
-        character_data = result["character"]
-        if hasattr(character_data, "model_dump"):
-            character_data = character_data.model_dump()
-        await scribe.update_character(request.character_id, character_data)
+        rest_name = "Short" if request.rest_type == RestType.SHORT else "Long"
+        message = f"{rest_name} rest complete. Recovered {result['hp_recovered']} HP."
 
         return RestResponse(
             success=True,
@@ -181,6 +216,11 @@ async def rest(request: RestRequest) -> RestResponse:
         )
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Character was modified concurrently, please retry",
+        ) from e
     except Exception as e:
         logger.exception("Rest failed")
         raise HTTPException(
@@ -7,8 +7,10 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException, status
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
-from app.database import DbDep
+from app.auto_save import list_auto_saves, restore_auto_save
+from app.database import run_in_session
 from app.models.db_models import Campaign as CampaignDB
 from app.models.db_models import SaveSlot as SaveSlotDB
 from app.models.game_models import (
@@ -17,7 +19,13 @@ from app.models.game_models import (
     SaveSlot,
     SaveSlotListResponse,
 )
-from app.services.game_state_service import game_state_service
+from app.save_store import (
+    prune_unreferenced_sections,
+    slot_state,
+    slot_state_dict,
+    store_state,
+)
+from app.services.game_state_service import RestoreConflictError, game_state_service
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +37,7 @@ router = APIRouter(tags=["saves"])
 # ---------------------------------------------------------------------------
 
 
-def _save_slot_from_db(db_slot: Any) -> SaveSlot:  # noqa: ANN401
+def _save_slot_from_db(db_slot: Any, db: Session) -> SaveSlot:  # noqa: ANN401
     """Convert a SaveSlotDB ORM object to a SaveSlot Pydantic model."""
     return SaveSlot(
         id=db_slot.id,
@@ -42,57 +50,55 @@ def _save_slot_from_db(db_slot: Any) -> SaveSlot:  # noqa: ANN401
         interaction_count=db_slot.interaction_count,
         character_level=db_slot.character_level,
         current_location=db_slot.current_location,
-        save_data=db_slot.save_data or {},
+        save_data=slot_state_dict(db, db_slot),
     )
 
 
 # ---------------------------------------------------------------------------
 # Save Slot endpoints
+#
+# Each route's database work is a plain function of a session, run through
+# run_in_session so it never blocks the event loop.
 # ---------------------------------------------------------------------------
 
 
-@router.get("/campaign/{campaign_id}/saves", response_model=SaveSlotListResponse)
-async def list_save_slots(campaign_id: str, db: DbDep) -> dict[str, Any]:
-    """List all save slots for a campaign."""
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
+def _require_campaign(db: Session, campaign_id: str) -> None:
+    """Raise 404 unless the campaign exists."""
+    campaign = db.query(CampaignDB.id).filter(CampaignDB.id == campaign_id).first()
     if not campaign:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Campaign {campaign_id} not found",
         )
-    db_slots = (
-        db.query(SaveSlotDB)
-        .filter(SaveSlotDB.campaign_id == campaign_id)
-        .order_by(SaveSlotDB.slot_number)
-        .all()
-    )
-    slots = [_save_slot_from_db(s) for s in db_slots]
-    return SaveSlotListResponse(saves=slots, total_count=len(slots))
 
 
-@router.post(
-    "/campaign/{campaign_id}/saves",
-    response_model=SaveSlot,
-    status_code=status.HTTP_201_CREATED,
-)
-async def create_save_slot(campaign_id: str, request: CreateSaveSlotRequest, db: DbDep) -> dict[str, Any]:
-    """Create a new save slot for a campaign, picking the next available slot number (1-5)."""
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
-    if not campaign:
+def _require_slot(db: Session, campaign_id: str, slot_number: int) -> Any:  # noqa: ANN401
+    """Return the campaign's save slot, raising 404 if either is missing."""
+    _require_campaign(db, campaign_id)
+    db_slot = (
+        db.query(SaveSlotDB)
+        .filter(
+            SaveSlotDB.campaign_id == campaign_id,
+            SaveSlotDB.slot_number == slot_number,
+        )
+        .first()
+    )
+    if not db_slot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign {campaign_id} not found",
+            detail=f"Save slot {slot_number} not found for campaign {campaign_id}",
         )
+    return db_slot
 
-    # Find occupied slot numbers
+
+def _next_free_slot(db: Session, campaign_id: str) -> int:
+    """Lowest unused slot number (1-5), or 409 if every slot is taken."""
     existing = (
         db.query(SaveSlotDB.slot_number)
         .filter(SaveSlotDB.campaign_id == campaign_id)
         .all()
     )
     occupied = {row.slot_number for row in existing}
-
-    # Pick next available slot (1-5)
     next_slot = next(
         (n for n in range(1, MAX_SAVE_SLOTS + 1) if n not in occupied), None
     )
@@ -101,116 +107,107 @@ async def create_save_slot(campaign_id: str, request: CreateSaveSlotRequest, db:
             status_code=status.HTTP_409_CONFLICT,
             detail=f"All {MAX_SAVE_SLOTS} save slots are occupied for campaign {campaign_id}",
         )
+    return next_slot
 
-    now = datetime.now(UTC)
-    slot_id = str(_uuid.uuid4())
-    db_slot = SaveSlotDB(
-        id=slot_id,
-        campaign_id=campaign_id,
-        slot_number=next_slot,
-        name=request.name,
-        created_at=now,
-        updated_at=now,
-        play_time_seconds=request.play_time_seconds,
-        interaction_count=request.interaction_count,
-        character_level=request.character_level,
-        current_location=request.current_location,
-        save_data=request.save_data,
-    )
+
+def _commit_new_slot(db: Session, db_slot: Any, race_label: str) -> SaveSlot:  # noqa: ANN401
+    """Insert a new slot, turning a lost slot-number race into a 409."""
     db.add(db_slot)
     try:
         db.commit()
     except IntegrityError:
         db.rollback()
         logger.warning(
-            "Duplicate save slot race: campaign=%s slot=%d",
-            campaign_id,
-            next_slot,
+            "Duplicate save slot race%s: campaign=%s slot=%d",
+            race_label,
+            db_slot.campaign_id,
+            db_slot.slot_number,
         )
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=(
-                f"Save slot {next_slot} was just claimed by another request. "
+                f"Save slot {db_slot.slot_number} was just claimed by another request. "
                 "Please try again."
             ),
         ) from None
     db.refresh(db_slot)
-    return _save_slot_from_db(db_slot)
+    return _save_slot_from_db(db_slot, db)
 
 
-@router.get("/campaign/{campaign_id}/saves/{slot_number}", response_model=SaveSlot)
-async def get_save_slot(campaign_id: str, slot_number: int, db: DbDep) -> dict[str, Any]:
-    """Get a specific save slot by slot number."""
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign {campaign_id} not found",
-        )
-    db_slot = (
+def _list_save_slots(db: Session, campaign_id: str) -> SaveSlotListResponse:
+    _require_campaign(db, campaign_id)
+    db_slots = (
         db.query(SaveSlotDB)
-        .filter(
-            SaveSlotDB.campaign_id == campaign_id,
-            SaveSlotDB.slot_number == slot_number,
-        )
-        .first()
+        .filter(SaveSlotDB.campaign_id == campaign_id)
+        .order_by(SaveSlotDB.slot_number)
+        .all()
     )
-    if not db_slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Save slot {slot_number} not found for campaign {campaign_id}",
-        )
-    return _save_slot_from_db(db_slot)
+    slots = [_save_slot_from_db(s, db) for s in db_slots]
+    return SaveSlotListResponse(saves=slots, total_count=len(slots))
 
 
-@router.delete("/campaign/{campaign_id}/saves/{slot_number}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_save_slot(campaign_id: str, slot_number: int, db: DbDep) -> None:
-    """Delete a save slot, freeing that slot number for future use."""
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign {campaign_id} not found",
-        )
-    db_slot = (
-        db.query(SaveSlotDB)
-        .filter(
-            SaveSlotDB.campaign_id == campaign_id,
-            SaveSlotDB.slot_number == slot_number,
-        )
-        .first()
+@router.get("/campaign/{campaign_id}/saves", response_model=SaveSlotListResponse)
+async def list_save_slots(campaign_id: str) -> dict[str, Any]:
+    """List all save slots for a campaign."""
+    return await run_in_session(_list_save_slots, campaign_id)
+
+
+def _create_save_slot(db: Session, campaign_id: str, request: CreateSaveSlotRequest) -> SaveSlot:
+    _require_campaign(db, campaign_id)
+    next_slot = _next_free_slot(db, campaign_id)
+    now = datetime.now(UTC)
+    db_slot = SaveSlotDB(
+        id=str(_uuid.uuid4()),
+        campaign_id=campaign_id,
+        slot_number=next_slot,
+        name=request.name,
+        created_at=now,
+        updated_at=now,
+        play_time_seconds=request.play_time_seconds,
+        interaction_count=request.interaction_count,
+        character_level=request.character_level,
+        current_location=request.current_location,
+        section_refs=store_state(db, request.save_data),
+        summary=game_state_service.get_save_summary(request.save_data),
     )
-    if not db_slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Save slot {slot_number} not found for campaign {campaign_id}",
-        )
-    db.delete(db_slot)
+    return _commit_new_slot(db, db_slot, "")
+
+
+@router.post(
+    "/campaign/{campaign_id}/saves",
+    response_model=SaveSlot,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_save_slot(campaign_id: str, request: CreateSaveSlotRequest) -> dict[str, Any]:
+    """Create a new save slot for a campaign, picking the next available slot number (1-5)."""
+    return await run_in_session(_create_save_slot, campaign_id, request)
+
+
+def _get_save_slot(db: Session, campaign_id: str, slot_number: int) -> SaveSlot:
+    return _save_slot_from_db(_require_slot(db, campaign_id, slot_number), db)
+
+
+@router.get("/campaign/{campaign_id}/saves/{slot_number}", response_model=SaveSlot)
+async def get_save_slot(campaign_id: str, slot_number: int) -> dict[str, Any]:
+    """Get a specific save slot by slot number."""
+    return await run_in_session(_get_save_slot, campaign_id, slot_number)
+
+
+def _delete_save_slot(db: Session, campaign_id: str, slot_number: int) -> None:
+    db.delete(_require_slot(db, campaign_id, slot_number))
+    db.flush()
+    prune_unreferenced_sections(db)
     db.commit()
 
 
-@router.post("/campaign/{campaign_id}/saves/{slot_number}/load")
-async def load_save_slot(campaign_id: str, slot_number: int, db: DbDep) -> dict[str, Any]:
-    """Load a save slot, returning the full save_data state blob."""
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign {campaign_id} not found",
-        )
-    db_slot = (
-        db.query(SaveSlotDB)
-        .filter(
-            SaveSlotDB.campaign_id == campaign_id,
-            SaveSlotDB.slot_number == slot_number,
-        )
-        .first()
-    )
-    if not db_slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Save slot {slot_number} not found for campaign {campaign_id}",
-        )
+@router.delete("/campaign/{campaign_id}/saves/{slot_number}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_save_slot(campaign_id: str, slot_number: int) -> None:
+    """Delete a save slot, freeing that slot number for future use."""
+    await run_in_session(_delete_save_slot, campaign_id, slot_number)
+
+
+def _load_save_slot(db: Session, campaign_id: str, slot_number: int) -> dict[str, Any]:
+    db_slot = _require_slot(db, campaign_id, slot_number)
     return {
         "slot_number": db_slot.slot_number,
         "name": db_slot.name,
@@ -218,33 +215,23 @@ async def load_save_slot(campaign_id: str, slot_number: int, db: DbDep) -> dict[
         "current_location": db_slot.current_location,
         "play_time_seconds": db_slot.play_time_seconds,
         "interaction_count": db_slot.interaction_count,
-        "save_data": db_slot.save_data or {},
+        "save_data": slot_state_dict(db, db_slot),
     }
 
 
+@router.post("/campaign/{campaign_id}/saves/{slot_number}/load")
+async def load_save_slot(campaign_id: str, slot_number: int) -> dict[str, Any]:
+    """Load a save slot, returning the full save_data state blob."""
+    return await run_in_session(_load_save_slot, campaign_id, slot_number)
+
+
 # ---------------------------------------------------------------------------
 # Full state capture / restore endpoints
 # ---------------------------------------------------------------------------
 
 
-@router.post(
-    "/campaign/{campaign_id}/saves/capture",
-    response_model=SaveSlot,
-    status_code=status.HTTP_201_CREATED,
-)
-async def capture_game_state(campaign_id: str, db: DbDep):
-    """Capture the current game state into a new save slot.
-
-    Serialises all campaign data, characters, NPCs, NPC profiles,
-    relationships, and conversation history, then writes the blob into the
-    next available save slot.
-    """
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign {campaign_id} not found",
-        )
+def _capture_game_state(db: Session, campaign_id: str) -> SaveSlot:
+    _require_campaign(db, campaign_id)
 
     # Capture the full state
     try:
@@ -255,31 +242,12 @@ async def capture_game_state(campaign_id: str, db: DbDep):
             detail=str(exc),
         ) from exc
 
-    # Find next available slot
-    existing = (
-        db.query(SaveSlotDB.slot_number)
-        .filter(SaveSlotDB.campaign_id == campaign_id)
-        .all()
-    )
-    occupied = {row.slot_number for row in existing}
-    next_slot = next(
-        (n for n in range(1, MAX_SAVE_SLOTS + 1) if n not in occupied), None
-    )
-    if next_slot is None:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=(
-                f"All {MAX_SAVE_SLOTS} save slots are occupied"
-                f" for campaign {campaign_id}"
-            ),
-        )
-
+    next_slot = _next_free_slot(db, campaign_id)
     summary = game_state_service.get_save_summary(state_data)
 
     now = datetime.now(UTC)
-    slot_id = str(_uuid.uuid4())
     db_slot = SaveSlotDB(
-        id=slot_id,
+        id=str(_uuid.uuid4()),
         campaign_id=campaign_id,
         slot_number=next_slot,
         name=summary.get("campaign_name", ""),
@@ -289,58 +257,32 @@ async def capture_game_state(campaign_id: str, db: DbDep):
         interaction_count=summary.get("conversation_entries", 0),
         character_level=1,
         current_location=summary.get("current_location", ""),
-        save_data=state_data,
+        section_refs=store_state(db, state_data),
+        summary=summary,
     )
-    db.add(db_slot)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        logger.warning(
-            "Duplicate save slot race on capture: campaign=%s slot=%d",
-            campaign_id,
-            next_slot,
-        )
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=(
-                f"Save slot {next_slot} was just claimed by another request. "
-                "Please try again."
-            ),
-        ) from None
-    db.refresh(db_slot)
-    return _save_slot_from_db(db_slot)
+    return _commit_new_slot(db, db_slot, " on capture")
 
 
-@router.post("/campaign/{campaign_id}/saves/{slot_number}/restore")
-async def restore_game_state(campaign_id: str, slot_number: int, db: DbDep):
-    """Restore game state from a save slot.
+@router.post(
+    "/campaign/{campaign_id}/saves/capture",
+    response_model=SaveSlot,
+    status_code=status.HTTP_201_CREATED,
+)
+async def capture_game_state(campaign_id: str) -> dict[str, Any]:
+    """Capture the current game state into a new save slot.
 
-    Reads the state blob from the specified save slot and recreates campaign
-    data, characters, NPCs, profiles, and relationships in the database.
+    Serialises all campaign data, characters, NPCs, NPC profiles,
+    relationships, and conversation history, then writes the blob into the
+    next available save slot.
     """
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign {campaign_id} not found",
-        )
+    return await run_in_session(_capture_game_state, campaign_id)
 
-    db_slot = (
-        db.query(SaveSlotDB)
-        .filter(
-            SaveSlotDB.campaign_id == campaign_id,
-            SaveSlotDB.slot_number == slot_number,
-        )
-        .first()
-    )
-    if not db_slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Save slot {slot_number} not found for campaign {campaign_id}",
-        )
 
-    state_data = db_slot.save_data or {}
+def _restore_game_state(db: Session, campaign_id: str, slot_number: int, bulk: bool) -> dict[str, Any]:
+    db_slot = _require_slot(db, campaign_id, slot_number)
+
+    # Sections are inflated as restore_state reads them
+    state_data = slot_state(db, db_slot)
     if not state_data:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -348,12 +290,26 @@ async def restore_game_state(campaign_id: str, slot_number: int, db: DbDep):
         )
 
     try:
-        restored = game_state_service.restore_state(campaign_id, state_data, db)
+        restored = game_state_service.restore_state(
+            campaign_id, state_data, db, bulk=bulk
+        )
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(exc),
         ) from exc
+    except (RestoreConflictError, IntegrityError) as exc:
+        # Bulk and ORM restores both refuse ids another campaign owns
+        db.rollback()
+        logger.warning("Restore conflict: campaign=%s slot=%d: %s", campaign_id, slot_number, exc)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=(
+                str(exc)
+                if isinstance(exc, RestoreConflictError)
+                else "Save conflicts with rows that already exist"
+            ),
+        ) from None
 
     return {
         "status": "restored",
@@ -363,30 +319,55 @@ async def restore_game_state(campaign_id: str, slot_number: int, db: DbDep):
     }
 
 
+@router.post("/campaign/{campaign_id}/saves/{slot_number}/restore")
+async def restore_game_state(campaign_id: str, slot_number: int, bulk: bool = False) -> dict[str, Any]:
+    """Restore game state from a save slot.
+
+    Reads the state blob from the specified save slot and recreates campaign
+    data, characters, NPCs, profiles, and relationships in the database.
+
+    Query parameters:
+        - ``bulk``: Use batched ``INSERT ... ON CONFLICT`` upserts instead of
+          per-row ORM merges (faster for campaigns with many NPCs).
+    """
+    return await run_in_session(_restore_game_state, campaign_id, slot_number, bulk)
+
+
+def _get_save_summary(db: Session, campaign_id: str, slot_number: int) -> dict[str, Any]:
+    db_slot = _require_slot(db, campaign_id, slot_number)
+    # Precomputed at save time; legacy slots fall back to the inline blob
+    if db_slot.summary is not None:
+        return db_slot.summary
+    return game_state_service.get_save_summary(slot_state(db, db_slot))
+
+
 @router.get("/campaign/{campaign_id}/saves/{slot_number}/summary")
-async def get_save_summary(campaign_id: str, slot_number: int, db: DbDep):
+async def get_save_summary(campaign_id: str, slot_number: int) -> dict[str, Any]:
     """Return a human-readable summary of the state in a save slot."""
-    campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Campaign {campaign_id} not found",
-        )
+    return await run_in_session(_get_save_summary, campaign_id, slot_number)
 
-    db_slot = (
-        db.query(SaveSlotDB)
-        .filter(
-            SaveSlotDB.campaign_id == campaign_id,
-            SaveSlotDB.slot_number == slot_number,
-        )
-        .first()
-    )
-    if not db_slot:
+
+@router.get("/campaign/{campaign_id}/auto-saves")
+async def list_campaign_auto_saves(campaign_id: str) -> dict[str, Any]:
+    """List a campaign's auto-save snapshots, newest first."""
+    await run_in_session(_require_campaign, campaign_id)
+    auto_saves = await list_auto_saves(campaign_id)
+    return {"auto_saves": auto_saves, "total_count": len(auto_saves)}
+
+
+@router.post("/campaign/{campaign_id}/auto-saves/{auto_save_id}/restore")
+async def restore_campaign_auto_save(campaign_id: str, auto_save_id: int) -> dict[str, Any]:
+    """Restore the character stats captured by an auto-save snapshot.
+
+    Auto-saves hold the character's level, hit points, conditions and spell
+    slots plus recent conversation history; only the character stats are
+    written back.
+    """
+    try:
+        restored = await restore_auto_save(campaign_id, auto_save_id)
+    except LookupError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Save slot {slot_number} not found for campaign {campaign_id}",
-        )
-
-    state_data = db_slot.save_data or {}
-    summary = game_state_service.get_save_summary(state_data)
-    return summary
+            detail=str(exc),
+        ) from None
+    return {"status": "restored", **restored}
@@ -21,12 +21,14 @@ from app.api.routes.combat_routes import (
     process_general_action,
     process_skill_check,
 )
-from app.auto_save import check_and_schedule_auto_save
+from app.auto_save import check_and_schedule_auto_save, load_interaction_counter
 from app.config import get_settings
+from app.database import unit_of_work
 from app.models.game_models import (
     GameResponse,
     PlayerInput,
 )
+from app.rng import campaign_rng
 from app.services.campaign_service import campaign_service
 from app.services.game_context_service import build_game_context, build_state_updates
 from app.services.prompt_shield_service import prompt_shield_service
@@ -41,7 +43,17 @@ router = APIRouter(tags=["sessions"])
 async def process_player_input(  # noqa: ARG001
     request: Request, player_input: PlayerInput,
 ) -> GameResponse:
-    """Process player input and get game response."""
+    """Process player input and get game response.
+
+    The whole turn runs in one unit of work: the character and campaign
+    reads, the DM and specialist agents' tool reads and thread writes, and
+    the interaction counter and auto-save all share one session and land in
+    a single commit, so the turn sees one consistent snapshot and a failure
+    anywhere rolls all of it back. The trade-off is that once the turn has
+    touched the database, its connection stays checked out while the model
+    call runs. Cache hits (see :mod:`app.entity_cache`) open no session at
+    all, so a warm turn often holds no connection until its first write.
+    """
     try:
         # Check for prompt injection attacks before processing
         shield_result = await prompt_shield_service.check_user_input(
@@ -54,93 +66,96 @@ async def process_player_input(  # noqa: ARG001
                 detail="Input blocked: potential prompt injection attack detected.",
             )
 
-        # Retrieve the player's character -- fail explicitly if not found
-        character = None
-        try:
-            character = await get_scribe().get_character(
-                player_input.character_id,
-            )
-        except Exception as e:
-            logger.error(
-                "Failed to retrieve character %s: %s",
-                player_input.character_id,
-                str(e),
+        # Dice and other mechanics draw from the campaign's reproducible
+        # stream; every read and write in the turn shares one unit of work.
+        with campaign_rng(player_input.campaign_id):
+            async with unit_of_work():
+                # Retrieve the player's character -- fail explicitly if not found
+                character = None
+                try:
+                    character = await get_scribe().get_character(
+                        player_input.character_id,
+                    )
+                except Exception as e:
+                    logger.error(
+                        "Failed to retrieve character %s: %s",
+                        player_input.character_id,
+                        str(e),
+                    )
+
+                if character is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=(
+                            f"Character {player_input.character_id} not found. "
+                            "Please select a valid character before playing."
+                        ),
+                    )
+
+                # Build rich game context from campaign state, character stats,
+                # equipment, and combat-derived values (Step 1 of #416).
+                context = await build_game_context(
+                    character_id=player_input.character_id,
+                    campaign_id=player_input.campaign_id,
+                    character_data=character,
+                )
+
+                # Process the input through the Dungeon Master agent
+                dm_response = await get_dungeon_master().process_input(
+                    player_input.message, context
+                )
+                logger.info("DM response payload: %s", dm_response)
+
+                # Auto-detect and invoke specialist agents based on context
+                dm_message = dm_response.get("message", "")
+                triggers = detect_agent_triggers(dm_message, player_input.message)
+                specialist_results: dict[str, Any] = {}
+                if triggers:
+                    logger.info("Orchestration triggers detected: %s", triggers)
+                    specialist_results = await orchestrate_specialist_agents(
+                        triggers=triggers,
+                        player_input=player_input.message,
+                        game_state=context,
+                        session_id=player_input.campaign_id or "",
+                    )
+                    logger.info("Specialist agent results: %s", list(specialist_results.keys()))
+
+                # Build enriched state_updates with character HP, conditions,
+                # equipped weapon, and spell slots (Step 5 of #416).
+                merged_state = build_state_updates(context, dm_response)
+                merged_state.update(specialist_results)
+
+                # If combat was triggered by orchestration, surface it as combat_updates
+                combat_updates = dm_response.get("combat_updates")
+                if "combat_update" in specialist_results and combat_updates is None:
+                    combat_updates = specialist_results["combat_update"]
+
+                # Auto-save: persist game state every N player interactions
+                settings = get_settings()
+                conversation_history = dm_response.get("conversation_history", [])
+                await load_interaction_counter(player_input.campaign_id or "")
+                auto_saved, interaction_count = check_and_schedule_auto_save(
+                    campaign_id=player_input.campaign_id or "",
+                    auto_save_interval=settings.auto_save_interval,
+                    conversation_history=conversation_history,
+                    character_data=character,
+                )
+            if auto_saved:
+                merged_state["auto_saved"] = True
+                merged_state["last_auto_save"] = datetime.now(UTC).isoformat()
+
+            # Transform the DM response to the GameResponse format
+            images = []
+            for visual in dm_response.get("visuals", []):
+                if visual and "image_url" in visual and visual["image_url"]:
+                    images.append(visual["image_url"])
+
+            return GameResponse(
+                message=dm_message,
+                images=images,
+                state_updates=merged_state,
+                combat_updates=combat_updates,
             )
-
-        if character is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=(
-                    f"Character {player_input.character_id} not found. "
-                    "Please select a valid character before playing."
-                ),
-            )
-
-        # Build rich game context from campaign state, character stats,
-        # equipment, and combat-derived values (Step 1 of #416).
-        context = build_game_context(
-            character_id=player_input.character_id,
-            campaign_id=player_input.campaign_id,
-            character_data=character,
-        )
-
-        # Process the input through the Dungeon Master agent
-        dm_response = await get_dungeon_master().process_input(
-            player_input.message, context
-        )
-        logger.info("DM response payload: %s", dm_response)
-
-        # Auto-detect and invoke specialist agents based on context
-        dm_message = dm_response.get("message", "")
-        triggers = detect_agent_triggers(dm_message, player_input.message)
-        specialist_results: dict[str, Any] = {}
-        if triggers:
-            logger.info("Orchestration triggers detected: %s", triggers)
-            specialist_results = await orchestrate_specialist_agents(
-                triggers=triggers,
-                player_input=player_input.message,
-                game_state=context,
-                session_id=player_input.campaign_id or "",
-            )
-            logger.info("Specialist agent results: %s", list(specialist_results.keys()))
-
-        # Build enriched state_updates with character HP, conditions,
-        # equipped weapon, and spell slots (Step 5 of #416).
-        merged_state = build_state_updates(context, dm_response)
-        merged_state.update(specialist_results)
-
-        # If combat was triggered by orchestration, surface it as combat_updates
-        combat_updates = dm_response.get("combat_updates")
-        if "combat_update" in specialist_results and combat_updates is None:
-            combat_updates = specialist_results["combat_update"]
-
-        # Auto-save: persist game state every N player interactions
-        settings = get_settings()
-        conversation_history = dm_response.get("conversation_history", [])
-        auto_saved, interaction_count = check_and_schedule_auto_save(
-            campaign_id=player_input.campaign_id or "",
-            auto_save_interval=settings.auto_save_interval,
-            conversation_history=conversation_history,
-            character_data=character,
-        )
-        if auto_saved:
-            from datetime import UTC, datetime
-
-            merged_state["auto_saved"] = True
-            merged_state["last_auto_save"] = datetime.now(UTC).isoformat()
-
-        # Transform the DM response to the GameResponse format
-        images = []
-        for visual in dm_response.get("visuals", []):
-            if visual and "image_url" in visual and visual["image_url"]:
-                images.append(visual["image_url"])
-
-        return GameResponse(
-            message=dm_message,
-            images=images,
-            state_updates=merged_state,
-            combat_updates=combat_updates,
-        )
     except HTTPException:
         raise
     except Exception as e:
@@ -223,7 +238,7 @@ async def get_opening_narrative(campaign_id: str, request_data: dict[str, Any])
     the campaign setting and character context.
     """
     try:
-        campaign = campaign_service.get_campaign(campaign_id)
+        campaign = await campaign_service.get_campaign(campaign_id)
         if not campaign:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -678,7 +693,7 @@ async def create_multiplayer_session(body: dict[str, Any]) -> dict[str, Any]:
             detail="campaign_id is required",
         )
     try:
-        return session_manager.create_session(campaign_id)
+        return await session_manager.create_session(campaign_id)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -691,7 +706,7 @@ async def get_multiplayer_session(session_id: str) -> dict[str, Any]:
     """Get session details including participants."""
     from app.services.session_manager import session_manager
 
-    result = session_manager.get_session(session_id)
+    result = await session_manager.get_session(session_id)
     if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -705,7 +720,7 @@ async def list_session_participants(session_id: str) -> list[dict[str, Any]]:
     """List participants in a session."""
     from app.services.session_manager import session_manager
 
-    return session_manager.get_participants(session_id)
+    return await session_manager.get_participants(session_id)
 
 
 @router.post("/session/{session_id}/turn/advance", response_model=dict[str, Any])
@@ -715,9 +730,9 @@ async def advance_session_turn(session_id: str) -> dict[str, Any]:
     from app.services.session_manager import session_manager
 
     try:
-        next_character_id = session_manager.advance_turn(session_id)
+        next_character_id = await session_manager.advance_turn(session_id)
         # Look up participant name for the broadcast
-        participants = session_manager.get_participants(session_id)
+        participants = await session_manager.get_participants(session_id)
         player_name = "Unknown"
         campaign_id: str | None = None
         for p in participants:
@@ -725,7 +740,7 @@ async def advance_session_turn(session_id: str) -> dict[str, Any]:
                 player_name = p["player_name"]
                 break
 
-        session_data = session_manager.get_session(session_id)
+        session_data = await session_manager.get_session(session_id)
         if session_data:
             campaign_id = session_data.get("campaign_id")
 
@@ -749,7 +764,7 @@ async def end_multiplayer_session(session_id: str) -> dict[str, Any]:
     from app.services.session_manager import session_manager
 
     try:
-        return session_manager.end_session(session_id)
+        return await session_manager.end_session(session_id)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
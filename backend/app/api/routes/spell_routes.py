@@ -2,12 +2,14 @@
 
 import logging
 import random
-from typing import Any
+from functools import lru_cache
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException, Response, status
+from fastapi import APIRouter, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
-from app.database import DbDep
+from app.api.routes._shared import conditional_json_response, strong_etag
+from app.database import run_in_session
 from app.models.game_models import (
     CastSpellRequest,
     CharacterClass,
@@ -72,11 +74,11 @@ async def manage_spell_slots(
 
 
 @router.post("/combat/{combat_id}/cast-spell", response_model=SpellCastingResponse)
-async def cast_spell_in_combat(combat_id: str, request: CastSpellRequest, db: DbDep) -> dict[str, Any]:
+async def cast_spell_in_combat(combat_id: str, request: CastSpellRequest) -> dict[str, Any]:
     """Cast spells during combat with sophisticated effect resolution."""
     try:
         # Load spell from database if available, otherwise use default effects
-        spell_data = await _get_spell_data(request.spell_id, db)
+        spell_data = await _get_spell_data(request.spell_id)
 
         # Calculate spell effects based on spell data and casting level
         spell_effects = await _calculate_spell_effects(
@@ -120,27 +122,12 @@ async def cast_spell_in_combat(combat_id: str, request: CastSpellRequest, db: Db
         ) from e
 
 
-async def _get_spell_data(spell_id: str, db: Session) -> dict[str, Any]:
+async def _get_spell_data(spell_id: str) -> dict[str, Any]:
     """Get spell data from database or return default spell structure."""
-    from app.models.db_models import Spell as DBSpell
-
     try:
-        spell = db.query(DBSpell).filter(DBSpell.id == spell_id).first()
-        if spell:
-            return {
-                "id": spell.id,
-                "name": spell.name,
-                "level": spell.level,
-                "school": spell.school,
-                "damage_dice": spell.damage_dice,
-                "save_type": spell.save_type,
-                "concentration": spell.concentration,
-                "ritual": spell.ritual,
-                "components": spell.components,
-                "description": spell.description,
-                "higher_levels": spell.higher_levels,
-                **spell.data,
-            }
+        spell_data = await run_in_session(_stored_spell_data, spell_id)
+        if spell_data is not None:
+            return spell_data
     except Exception:  # noqa: S110
         pass  # SRD lookup failed; fall back to basic spell data below
 
@@ -148,6 +135,29 @@ async def _get_spell_data(spell_id: str, db: Session) -> dict[str, Any]:
     return _get_default_spell_data(spell_id)
 
 
+def _stored_spell_data(db: Session, spell_id: str) -> dict[str, Any] | None:
+    """The spell's row from the spells table, flattened, or None."""
+    from app.models.db_models import Spell as DBSpell
+
+    spell = db.query(DBSpell).filter(DBSpell.id == spell_id).first()
+    if spell is None:
+        return None
+    return {
+        "id": spell.id,
+        "name": spell.name,
+        "level": spell.level,
+        "school": spell.school,
+        "damage_dice": spell.damage_dice,
+        "save_type": spell.save_type,
+        "concentration": spell.concentration,
+        "ritual": spell.ritual,
+        "components": spell.components,
+        "description": spell.description,
+        "higher_levels": spell.higher_levels,
+        **spell.data,
+    }
+
+
 def _get_default_spell_data(spell_id: str) -> dict[str, Any]:
     """Get default spell data for common spells."""
     # Common D&D 5e spells with basic data
@@ -299,60 +309,85 @@ def _get_upcast_scaling(spell_name: str) -> int:
     return scaling_table.get(spell_name, 1)
 
 
+@lru_cache(maxsize=1)
+def _srd_spell_models() -> dict[str, Spell]:
+    """Validate every SRD spell into a :class:`Spell` once, keyed by id."""
+    from app.srd_data import get_srd_catalog
+
+    return {
+        spell_dict.get("id", ""): Spell(
+            id=spell_dict.get("id", ""),
+            name=spell_dict.get("name", ""),
+            level=spell_dict.get("level", 0),
+            school=spell_dict.get("school", ""),
+            casting_time=spell_dict.get("casting_time", ""),
+            range=spell_dict.get("range", ""),
+            components=spell_dict.get("components", ""),
+            duration=spell_dict.get("duration", ""),
+            description=spell_dict.get("description", ""),
+            requires_concentration=spell_dict.get("requires_concentration", False),
+            available_classes=list(spell_dict.get("available_classes", [])),
+        )
+        for spell_dict in get_srd_catalog().spells
+    }
+
+
+# Serialised responses per (class, level, school); the SRD is static, so an
+# entry never goes stale and only the number of distinct filters is bounded.
+@lru_cache(maxsize=512)
+def _spell_list_body(
+    character_class: str | None, spell_level: int | None, school: str | None
+) -> tuple[bytes, str]:
+    """Return the JSON body and strong ETag for one spell-list filter."""
+    from app.srd_data import get_srd_catalog
+
+    catalog = get_srd_catalog()
+    candidates = [catalog.spells]
+    if character_class:
+        candidates.append(catalog.spells_by_class(character_class))
+    if spell_level is not None:
+        candidates.append(catalog.spells_by_level(spell_level))
+    if school:
+        candidates.append(catalog.spells_by_school(school))
+    # Walk the narrowest index and keep spells present in all the others
+    narrowest = min(candidates, key=len)
+    others = [{id(s) for s in c} for c in candidates if c is not narrowest]
+    models = _srd_spell_models()
+    spells = [
+        models[s.get("id", "")]
+        for s in narrowest
+        if all(id(s) in other for other in others)
+    ]
+    body = SpellListResponse(spells=spells, total_count=len(spells)).model_dump_json()
+    encoded = body.encode()
+    return encoded, strong_etag(encoded)
+
+
 @router.get("/spells/list", response_model=SpellListResponse)
 async def get_spell_list(
     character_class: CharacterClass | None = None,
     spell_level: int | None = None,
     school: str | None = None,
-) -> dict[str, Any]:
-    """Get available spells by class and level."""
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """Get available spells by class and level.
+
+    Each filter combination is serialised once and served from memory with
+    a strong ``ETag``; a request whose ``If-None-Match`` carries that tag
+    gets an empty ``304 Not Modified``.
+    """
     try:
-        from app.srd_data import load_spells
-
-        # Load spells from SRD data
-        spell_data = load_spells()
-
-        # Convert to Spell objects
-        spells = []
-        for spell_dict in spell_data:
-            spell = Spell(
-                id=spell_dict.get("id", ""),
-                name=spell_dict.get("name", ""),
-                level=spell_dict.get("level", 0),
-                school=spell_dict.get("school", ""),
-                casting_time=spell_dict.get("casting_time", ""),
-                range=spell_dict.get("range", ""),
-                components=spell_dict.get("components", ""),
-                duration=spell_dict.get("duration", ""),
-                description=spell_dict.get("description", ""),
-                requires_concentration=spell_dict.get("requires_concentration", False),
-                available_classes=spell_dict.get("available_classes", []),
-            )
-            spells.append(spell)
-
-        # Filter spells based on parameters
-        filtered_spells = spells
-        if character_class:
-            filtered_spells = [
-                s
-                for s in filtered_spells
-                if character_class.value in s.available_classes
-            ]
-        if spell_level is not None:
-            filtered_spells = [s for s in filtered_spells if s.level == spell_level]
-        if school:
-            filtered_spells = [
-                s for s in filtered_spells if s.school.lower() == school.lower()
-            ]
-
-        return SpellListResponse(
-            spells=filtered_spells, total_count=len(filtered_spells)
+        body, etag = _spell_list_body(
+            character_class.value if character_class else None,
+            spell_level,
+            school.lower() if school else None,
         )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get spell list: {str(e)}",
         ) from e
+    return conditional_json_response(body, etag, if_none_match)
 
 
 @router.post("/spells/save-dc", response_model=dict[str, Any])
@@ -0,0 +1,54 @@
+"""SRD reference search routes."""
+
+import logging
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.models.game_models import SRDSearchResponse
+from app.srd_search import KINDS, get_srd_search_index
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["srd"])
+
+
+@router.get("/srd/search", response_model=SRDSearchResponse)
+async def search_srd(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    kind: Annotated[list[str] | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+) -> dict[str, Any]:
+    """Full-text search over SRD spells, monsters, weapons and armor.
+
+    Results are ranked with BM25, names weigh more than descriptions, and
+    each query term also matches as a prefix, so partial input works for
+    autocomplete.
+
+    Query parameters:
+        - ``q``: Search text.
+        - ``kind``: Restrict to ``spell``, ``monster``, ``weapon`` or
+          ``armor``; repeat for several.
+        - ``limit``: Maximum number of results, 1-50.
+    """
+    unknown = sorted(set(kind or ()) - set(KINDS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"kind must be one of: {', '.join(KINDS)}",
+        )
+    hits = get_srd_search_index().search(q, kinds=kind, limit=limit)
+    return {
+        "query": q,
+        "results": [
+            {
+                "kind": hit.kind,
+                "id": hit.id,
+                "name": hit.name,
+                "score": hit.score,
+                "record": hit.record,
+            }
+            for hit in hits
+        ],
+        "total_count": len(hits),
+    }
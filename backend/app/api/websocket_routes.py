@@ -16,8 +16,9 @@ from typing import Any
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
+from sqlalchemy.orm import Session
 
-from app.database import get_session_context
+from app.database import run_in_session
 from app.models.db_models import Campaign as CampaignDB
 
 logger = logging.getLogger(__name__)
@@ -33,9 +34,10 @@ _GLOBAL_WS_WINDOW_SECONDS = 60
 _global_ws_rate: dict[str, tuple[int, float]] = {}
 
 
-def _campaign_exists(campaign_id: str) -> bool:
+async def _campaign_exists(campaign_id: str) -> bool:
     """Return True if *campaign_id* refers to an existing campaign row."""
-    with get_session_context() as db:
+
+    def _lookup(db: Session) -> bool:
         return (
             db.query(CampaignDB.id)
             .filter(CampaignDB.id == campaign_id)
@@ -43,6 +45,8 @@ def _campaign_exists(campaign_id: str) -> bool:
             is not None
         )
 
+    return await run_in_session(_lookup)
+
 
 def _rate_limit_ok(client_key: str) -> bool:
     """Return True if the client has not exceeded the global WS message rate.
@@ -211,7 +215,7 @@ async def chat_websocket(websocket: WebSocket, campaign_id: str) -> None:
 
     Validates that *campaign_id* exists before accepting the connection.
     """
-    if not _campaign_exists(campaign_id):
+    if not await _campaign_exists(campaign_id):
         await websocket.close(code=4004, reason="Campaign not found")
         return
 
@@ -246,7 +250,7 @@ async def campaign_websocket(
     Query params ``player_name`` and ``character_id`` are used for multiplayer
     player tracking.
     """
-    if not _campaign_exists(campaign_id):
+    if not await _campaign_exists(campaign_id):
         await websocket.close(code=4004, reason="Campaign not found")
         return
 
@@ -725,6 +729,25 @@ async def broadcast_turn_advance(
     await manager.send_campaign_message(json.dumps(response), campaign_id)
 
 
+async def broadcast_effect_expiries(
+    campaign_id: str, combat_id: str | None, expiries: list[dict[str, Any]]
+) -> None:
+    """Broadcast timed combat effects that just ended to all players in a campaign.
+
+    *expiries* are :meth:`app.effect_scheduler.ScheduledEffect.expiry_event`
+    dicts.
+    """
+    import datetime
+
+    response: dict[str, Any] = {
+        "type": "effects_expired",
+        "combat_id": combat_id,
+        "effects": expiries,
+        "timestamp": datetime.datetime.now(tz=datetime.UTC).isoformat(),
+    }
+    await manager.send_campaign_message(json.dumps(response), campaign_id)
+
+
 # ---------------------------------------------------------------------------
 # Battle-map helpers
 # ---------------------------------------------------------------------------
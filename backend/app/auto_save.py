@@ -1,29 +1,69 @@
 """
 Auto-save functionality for game state.
 
-Persists conversation history, character stats, and campaign metadata
-to the Campaign model's session_log field every N player interactions.
+Every N player interactions a snapshot of the conversation history,
+character stats and campaign metadata is written to the
+``auto_save_snapshots`` table, keeping the newest ``_MAX_SNAPSHOTS`` rows
+per campaign. The interaction counters behind the interval are stored in
+``interaction_counters`` so they survive restarts.
+
+Writes are coalesced per campaign: the first save in a quiet period is
+written straight away, and saves arriving within
+``auto_save_debounce_seconds`` of it replace one another in memory until a
+single trailing write flushes the newest. Inside a request's unit of work
+the write (and the counter update) joins the request's commit.
+:func:`flush_pending_auto_saves` writes whatever is still pending and is
+awaited on shutdown.
+
+Snapshots are listed through :func:`list_auto_saves`, and
+:func:`restore_auto_save` puts a snapshot's character stats back onto the
+character; both are served under ``/game/campaign/{id}/auto-saves``.
 """
 
 import asyncio
 import logging
+import time
 from datetime import UTC, datetime
 from typing import Any
 
-from app.services.campaign_service import campaign_service
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import current_unit_of_work, dialect_insert, run_in_session
+from app.entity_cache import invalidate_character
+from app.models.db_models import AutoSaveSnapshot, Character, InteractionCounter
 
 logger = logging.getLogger(__name__)
 
-# Per-campaign interaction counter (in-memory; resets on server restart)
+# Per-campaign interaction counter, hydrated from interaction_counters
 _interaction_counters: dict[str, int] = {}
 
-# Maximum number of auto-save snapshots to retain in session_log
+# Maximum number of auto-save snapshots to retain per campaign
 _MAX_SNAPSHOTS = 10
 
+# Writes waiting to be flushed, newest wins per campaign
+_pending_snapshots: dict[str, dict[str, Any]] = {}
+_pending_counters: dict[str, int] = {}
+
+# time.monotonic() of the last snapshot write started per campaign
+_last_snapshot_write: dict[str, float] = {}
+
+# Trailing flushes still waiting out their window, one per campaign, and
+# every flush task not yet finished (so shutdown can await them)
+_flush_tasks: dict[str, asyncio.Task[None]] = {}
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+# ---------------------------------------------------------------------------
+# Interaction counters
+# ---------------------------------------------------------------------------
+
 
 def increment_and_get_counter(campaign_id: str) -> int:
     """Increment and return the interaction count for a campaign."""
     _interaction_counters[campaign_id] = _interaction_counters.get(campaign_id, 0) + 1
+    _pending_counters[campaign_id] = _interaction_counters[campaign_id]
     return _interaction_counters[campaign_id]
 
 
@@ -33,8 +73,45 @@ def get_interaction_counter(campaign_id: str) -> int:
 
 
 def reset_interaction_counter(campaign_id: str) -> None:
-    """Reset the interaction counter for a campaign (used in tests)."""
+    """Forget a campaign's in-memory counter and pending writes (used in tests)."""
     _interaction_counters.pop(campaign_id, None)
+    _pending_counters.pop(campaign_id, None)
+    _pending_snapshots.pop(campaign_id, None)
+    _last_snapshot_write.pop(campaign_id, None)
+
+
+def _read_counter(db: Session, campaign_id: str) -> int:
+    count = db.scalar(
+        select(InteractionCounter.count).where(
+            InteractionCounter.campaign_id == campaign_id
+        )
+    )
+    return count or 0
+
+
+async def load_interaction_counter(campaign_id: str) -> int:
+    """Hydrate a campaign's counter from the database on first use.
+
+    Later calls return the in-memory value without touching the database.
+    A failed read is logged and counting starts from zero.
+    """
+    if campaign_id in _interaction_counters or not campaign_id:
+        return get_interaction_counter(campaign_id)
+    try:
+        stored = await run_in_session(_read_counter, campaign_id)
+    except Exception:
+        logger.exception("Auto-save: could not load counter for %s", campaign_id)
+        stored = 0
+    # A concurrent turn may have counted while we were reading
+    _interaction_counters[campaign_id] = max(
+        stored, _interaction_counters.get(campaign_id, 0)
+    )
+    return _interaction_counters[campaign_id]
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
 
 
 def _extract_character_stats(character_data: dict[str, Any] | None) -> dict[str, Any]:
@@ -52,32 +129,94 @@ def _extract_character_stats(character_data: dict[str, Any] | None) -> dict[str,
     }
 
 
-async def _write_snapshot_to_campaign(
+def _write_auto_save(
+    db: Session,
     campaign_id: str,
-    snapshot: dict[str, Any],
+    snapshot: dict[str, Any] | None,
+    count: int | None,
+) -> None:
+    """Upsert the counter, append the snapshot and trim old ones in SQL."""
+    if count is not None:
+        insert = dialect_insert(db)
+        stmt = insert(InteractionCounter).values(
+            campaign_id=campaign_id, count=count, updated_at=datetime.now(UTC)
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["campaign_id"],
+                set_={"count": stmt.excluded.count, "updated_at": stmt.excluded.updated_at},
+            )
+        )
+    if snapshot is not None:
+        db.add(
+            AutoSaveSnapshot(
+                campaign_id=campaign_id,
+                interaction_count=snapshot.get("interaction_count", 0),
+                data=snapshot,
+            )
+        )
+        db.flush()
+        keep = (
+            select(AutoSaveSnapshot.id)
+            .where(AutoSaveSnapshot.campaign_id == campaign_id)
+            .order_by(AutoSaveSnapshot.id.desc())
+            .limit(_MAX_SNAPSHOTS)
+        )
+        db.execute(
+            delete(AutoSaveSnapshot)
+            .where(AutoSaveSnapshot.campaign_id == campaign_id)
+            .where(AutoSaveSnapshot.id.notin_(keep.scalar_subquery()))
+        )
+    db.commit()
+
+
+def _requeue(
+    campaign_id: str, snapshot: dict[str, Any] | None, count: int | None
 ) -> None:
-    """Append a snapshot to the campaign's session_log (background task)."""
+    """Put writes back after a failure unless something newer replaced them."""
+    if snapshot is not None:
+        _pending_snapshots.setdefault(campaign_id, snapshot)
+    if count is not None:
+        _pending_counters[campaign_id] = max(count, _pending_counters.get(campaign_id, 0))
+
+
+async def _flush_campaign(campaign_id: str, include_snapshot: bool = True) -> None:
+    """Write a campaign's pending counter and, optionally, its pending snapshot."""
+    snapshot = _pending_snapshots.pop(campaign_id, None) if include_snapshot else None
+    count = _pending_counters.pop(campaign_id, None)
+    if (snapshot is None and count is None) or not campaign_id:
+        return
+
+    uow = current_unit_of_work()
+    if uow is not None:
+        uow.after_rollback(lambda: _requeue(campaign_id, snapshot, count))
     try:
-        existing = campaign_service.get_campaign(campaign_id)
-        if existing is None:
-            logger.warning("Auto-save: campaign %s not found, skipping.", campaign_id)
-            return
-
-        current_log: list[dict[str, Any]] = list(existing.session_log or [])
-        # Keep only the most recent snapshots to prevent unbounded growth
-        auto_save_entries = [e for e in current_log if e.get("type") == "auto_save"]
-        other_entries = [e for e in current_log if e.get("type") != "auto_save"]
-        trimmed = auto_save_entries[-(  _MAX_SNAPSHOTS - 1):] if len(auto_save_entries) >= _MAX_SNAPSHOTS else auto_save_entries
-        updated_log = other_entries + trimmed + [snapshot]
-
-        campaign_service.update_campaign(campaign_id, {"session_log": updated_log})
+        await run_in_session(_write_auto_save, campaign_id, snapshot, count)
+    except Exception:
+        logger.exception("Auto-save DB write failed for campaign %s", campaign_id)
+        _requeue(campaign_id, snapshot, count)
+        return
+    if snapshot is not None:
         logger.info(
             "Auto-saved game state for campaign %s (interaction #%d)",
             campaign_id,
-            snapshot.get("interaction_count", "?"),
+            snapshot.get("interaction_count", 0),
         )
-    except Exception:
-        logger.exception("Auto-save DB write failed for campaign %s", campaign_id)
+
+
+async def _flush_after(campaign_id: str, delay: float) -> None:
+    await asyncio.sleep(delay)
+    # Past this point shutdown awaits the write instead of cancelling it
+    _flush_tasks.pop(campaign_id, None)
+    _last_snapshot_write[campaign_id] = time.monotonic()
+    await _flush_campaign(campaign_id)
+
+
+def _coalesce_window_remaining(campaign_id: str) -> float:
+    last = _last_snapshot_write.get(campaign_id)
+    if last is None:
+        return 0.0
+    return get_settings().auto_save_debounce_seconds - (time.monotonic() - last)
 
 
 def schedule_auto_save(
@@ -87,12 +226,16 @@ def schedule_auto_save(
     character_data: dict[str, Any] | None,
 ) -> None:
     """
-    Build an auto-save snapshot and schedule the DB write as a background task.
+    Build an auto-save snapshot and schedule the DB write.
 
-    This is intentionally fire-and-forget so it never blocks the game response.
+    Outside a coalescing window inside a unit of work (as in ``/game/input``)
+    the write is deferred to the end of the request and committed with the
+    rest of the turn. Otherwise the snapshot waits in memory, replacing any
+    older pending one for the campaign, and a tracked background task
+    writes it once the window closes.
     """
     now = datetime.now(UTC)
-    snapshot: dict[str, Any] = {
+    _pending_snapshots[campaign_id] = {
         "type": "auto_save",
         "timestamp": now.isoformat(),
         "interaction_count": interaction_count,
@@ -102,12 +245,21 @@ def schedule_auto_save(
             "session_interactions": interaction_count,
         },
     }
+    if campaign_id in _flush_tasks:
+        return  # the trailing flush picks up the newest snapshot
 
-    # Schedule as an asyncio background task so we don't block the response
-    asyncio.create_task(
-        _write_snapshot_to_campaign(campaign_id, snapshot),
-        name=f"auto_save_{campaign_id}",
+    delay = max(_coalesce_window_remaining(campaign_id), 0.0)
+    uow = current_unit_of_work()
+    if uow is not None and delay == 0:
+        _last_snapshot_write[campaign_id] = time.monotonic()
+        uow.defer(lambda: _flush_campaign(campaign_id))
+        return
+    task = asyncio.create_task(
+        _flush_after(campaign_id, delay), name=f"auto_save_{campaign_id}"
     )
+    _flush_tasks[campaign_id] = task
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
 
 
 def check_and_schedule_auto_save(
@@ -120,6 +272,9 @@ def check_and_schedule_auto_save(
     Increment the interaction counter and trigger an auto-save when the
     interval threshold is reached.
 
+    Inside a unit of work the new count is persisted with the request's
+    commit; otherwise it is written with the next flush.
+
     Returns:
         (auto_saved, interaction_count) – auto_saved is True when a save
         was scheduled on this call.
@@ -128,4 +283,105 @@ def check_and_schedule_auto_save(
     if count % auto_save_interval == 0:
         schedule_auto_save(campaign_id, count, conversation_history, character_data)
         return True, count
+
+    uow = current_unit_of_work()
+    if uow is not None and campaign_id:
+        uow.defer(lambda: _flush_campaign(campaign_id, include_snapshot=False))
     return False, count
+
+
+async def flush_pending_auto_saves() -> None:
+    """Write every pending snapshot and counter now (called on shutdown)."""
+    for task in _flush_tasks.values():
+        task.cancel()  # still waiting out its window
+    _flush_tasks.clear()
+    await asyncio.gather(*list(_background_tasks), return_exceptions=True)
+    for campaign_id in set(_pending_snapshots) | set(_pending_counters):
+        await _flush_campaign(campaign_id)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+def _snapshot_view(row: AutoSaveSnapshot) -> dict[str, Any]:
+    return {**row.data, "id": row.id, "created_at": row.created_at.isoformat()}
+
+
+def _select_auto_saves(db: Session, campaign_id: str, limit: int) -> list[dict[str, Any]]:
+    rows = db.scalars(
+        select(AutoSaveSnapshot)
+        .where(AutoSaveSnapshot.campaign_id == campaign_id)
+        .order_by(AutoSaveSnapshot.id.desc())
+        .limit(limit)
+    )
+    return [_snapshot_view(row) for row in rows]
+
+
+async def list_auto_saves(
+    campaign_id: str, limit: int = _MAX_SNAPSHOTS
+) -> list[dict[str, Any]]:
+    """Return a campaign's stored auto-save snapshots, newest first.
+
+    Each snapshot carries its row ``id`` and ``created_at`` alongside the
+    saved payload.
+    """
+    return await run_in_session(_select_auto_saves, campaign_id, limit)
+
+
+# ---------------------------------------------------------------------------
+# Restoring
+# ---------------------------------------------------------------------------
+
+
+def _apply_auto_save(db: Session, campaign_id: str, auto_save_id: int) -> dict[str, Any]:
+    row = db.scalar(
+        select(AutoSaveSnapshot).where(
+            AutoSaveSnapshot.id == auto_save_id,
+            AutoSaveSnapshot.campaign_id == campaign_id,
+        )
+    )
+    if row is None:
+        raise LookupError(f"Auto-save {auto_save_id} not found for campaign {campaign_id}")
+    stats = row.data.get("character_snapshot") or {}
+    character = db.get(Character, stats["id"]) if stats.get("id") else None
+    if character is None:
+        raise LookupError(f"Auto-save {auto_save_id} has no character to restore")
+
+    data = dict(character.data or {})
+    restored = [key for key in ("level", "hit_points", "conditions") if stats.get(key) is not None]
+    for key in restored:
+        data[key] = stats[key]
+    if stats.get("spell_slots") is not None:
+        data["spellcasting"] = {**(data.get("spellcasting") or {}), "spell_slots": stats["spell_slots"]}
+        restored.append("spell_slots")
+    character.data = data
+    db.commit()
+    return {
+        "auto_save_id": row.id,
+        "interaction_count": row.interaction_count,
+        "character_id": character.id,
+        "restored_fields": restored,
+        "character_snapshot": stats,
+    }
+
+
+async def restore_auto_save(campaign_id: str, auto_save_id: int) -> dict[str, Any]:
+    """Write an auto-save's character stats back onto the character.
+
+    Restores the snapshot's level, hit points, conditions and spell slots;
+    the rest of the character sheet is left as it is.
+
+    Raises:
+        LookupError: The snapshot or its character does not exist.
+    """
+    result = await run_in_session(_apply_auto_save, campaign_id, auto_save_id)
+    invalidate_character(result["character_id"])
+    logger.info(
+        "Restored auto-save %d for campaign %s (interaction #%d)",
+        auto_save_id,
+        campaign_id,
+        result["interaction_count"],
+    )
+    return result
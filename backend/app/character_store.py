@@ -0,0 +1,404 @@
+"""
+Path-targeted partial updates for character sheets.
+
+``Character.data`` holds the whole sheet as one JSON blob. Rather than
+loading it, mutating it in Python and writing every byte back, writers
+describe their change as a JSON Patch (RFC 6902 ``add``, ``remove``,
+``replace`` and ``test`` operations) and :func:`patch_character` applies it
+under optimistic concurrency: ``characters.version`` is bumped on every
+write, and a patch carrying an ``expected_version`` only lands if nobody
+wrote the row in between.
+
+On PostgreSQL patches made only of ``add``/``replace``/``remove`` compile to
+a single ``UPDATE`` built from ``jsonb_set``/``jsonb_insert``/``#-``, so the
+blob never leaves the database. Those functions quietly do nothing when a
+path is missing, so the ``UPDATE`` is also guarded by ``#> ... IS NOT NULL``
+on every path an operation needs, and a patch that matches no row because
+of them raises :class:`PatchError` just as the Python path does. Other
+dialects (and patches with ``test`` operations, or whose operations build
+on one another) read the row, apply the patch in Python and write it back
+guarded by the version they read.
+
+:func:`modify_character` wraps the common read-decide-write case: it hands
+a copy of the sheet to a callback, diffs the result into a patch with
+:func:`diff_patch` and retries on conflict.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from sqlalchemy import Text, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, array
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.db_models import Character
+
+# Index jsonb_insert uses to append after the last array element
+_PG_LAST = "-1"
+
+_SERVER_SIDE_OPS = frozenset({"add", "replace", "remove"})
+
+
+class PatchError(ValueError):
+    """A patch operation is malformed or does not apply to the document."""
+
+
+class VersionConflictError(Exception):
+    """The character was written by someone else since its version was read."""
+
+    def __init__(self, character_id: str, expected_version: int | None) -> None:
+        super().__init__(
+            f"Character {character_id} was modified concurrently "
+            f"(expected version {expected_version})"
+        )
+        self.character_id = character_id
+        self.expected_version = expected_version
+
+
+# ---------------------------------------------------------------------------
+# JSON Pointer / JSON Patch
+# ---------------------------------------------------------------------------
+
+
+def parse_pointer(pointer: str) -> list[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if not pointer.startswith("/"):
+        raise PatchError(f"Invalid JSON pointer '{pointer}'")
+    return [t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/")]
+
+
+def _pointer(tokens: Iterable[Any]) -> str:
+    return "".join(
+        "/" + str(t).replace("~", "~0").replace("/", "~1") for t in tokens
+    )
+
+
+def _array_index(container: list[Any], ref: str, allow_end: bool) -> int:
+    if ref == "-" and allow_end:
+        return len(container)
+    if not ref.isdigit() or (ref != "0" and ref.startswith("0")):
+        raise PatchError(f"Invalid array index '{ref}'")
+    index = int(ref)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"Array index {index} out of range")
+    return index
+
+
+def _resolve_parent(document: Any, tokens: list[str]) -> Any:  # noqa: ANN401
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, list):
+            target = target[_array_index(target, token, allow_end=False)]
+        elif isinstance(target, dict) and token in target:
+            target = target[token]
+        else:
+            raise PatchError(f"Path '{_pointer(tokens)}' does not exist")
+    return target
+
+
+def apply_patch(document: Any, ops: Iterable[Mapping[str, Any]]) -> Any:  # noqa: ANN401
+    """Apply JSON Patch *ops* to *document* in place and return it.
+
+    Raises:
+        PatchError: If an operation is malformed, targets a missing path,
+            or a ``test`` operation fails.
+    """
+    for op in ops:
+        kind = op.get("op")
+        tokens = parse_pointer(op.get("path", ""))
+        parent = _resolve_parent(document, tokens)
+        key = tokens[-1]
+        if kind == "test":
+            if isinstance(parent, list):
+                current = parent[_array_index(parent, key, allow_end=False)]
+            elif isinstance(parent, dict) and key in parent:
+                current = parent[key]
+            else:
+                raise PatchError(f"Path '{op['path']}' does not exist")
+            if current != op.get("value"):
+                raise PatchError(f"Test failed at '{op['path']}'")
+        elif kind == "add":
+            value = copy.deepcopy(op["value"])
+            if isinstance(parent, list):
+                parent.insert(_array_index(parent, key, allow_end=True), value)
+            elif isinstance(parent, dict):
+                parent[key] = value
+            else:
+                raise PatchError(f"Cannot add at '{op['path']}'")
+        elif kind in ("remove", "replace"):
+            if isinstance(parent, list):
+                index = _array_index(parent, key, allow_end=False)
+            elif isinstance(parent, dict) and key in parent:
+                index = key
+            else:
+                raise PatchError(f"Path '{op['path']}' does not exist")
+            if kind == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(op["value"])
+        else:
+            raise PatchError(f"Unsupported patch operation '{kind}'")
+    return document
+
+
+def diff_patch(old: Any, new: Any, _path: tuple[Any, ...] = ()) -> list[dict[str, Any]]:  # noqa: ANN401
+    """Return a patch turning *old* into *new*.
+
+    Objects are diffed key by key and same-length arrays element by element;
+    an array that only grew at the end becomes ``add .../-`` operations.
+    Anything else that changed is replaced whole.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: list[dict[str, Any]] = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer((*_path, key))})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer((*_path, key)), "value": value})
+            elif old[key] != value:
+                ops.extend(diff_patch(old[key], value, (*_path, key)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list) and _path:
+        if len(new) == len(old):
+            return [
+                op
+                for index, (a, b) in enumerate(zip(old, new, strict=True))
+                if a != b
+                for op in diff_patch(a, b, (*_path, index))
+            ]
+        if len(new) > len(old) and new[: len(old)] == old:
+            end = _pointer((*_path, "-"))
+            return [{"op": "add", "path": end, "value": v} for v in new[len(old) :]]
+    if old == new:
+        return []
+    if not _path:
+        raise PatchError("Cannot replace the whole document")
+    return [{"op": "replace", "path": _pointer(_path), "value": new}]
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+
+def _renamed_to(ops: Iterable[Mapping[str, Any]]) -> str | None:
+    """Return the new name if the patch sets the top-level ``name`` key."""
+    name = None
+    for op in ops:
+        if op["path"] == "/name" and op["op"] in ("add", "replace"):
+            name = op["value"]
+    return name
+
+
+def _builds_on(prior_kind: str, prior: list[str], tokens: list[str]) -> bool:
+    """Whether an op at *tokens* depends on an earlier op at *prior*."""
+    parent = prior[:-1]
+    under_parent = tokens[: len(parent)] == parent and len(tokens) > len(parent)
+    if prior[-1] == "-":
+        # An append only moves the end of that one array
+        return under_parent and tokens[len(parent)].isdigit()
+    if tokens[: len(prior)] == prior:
+        return True
+    # Removing an array element shifts the indices after it
+    return prior_kind == "remove" and prior[-1].isdigit() and under_parent
+
+
+def _server_side(ops: list[Mapping[str, Any]]) -> bool:
+    """Whether every op maps onto a jsonb function without reading the row.
+
+    The path guards are checked against the stored sheet, so an op whose
+    path an earlier op in the patch creates, replaces or shifts must be
+    applied in Python instead.
+    """
+    earlier: list[tuple[str, list[str]]] = []
+    for op in ops:
+        if op.get("op") not in _SERVER_SIDE_OPS:
+            return False
+        tokens = parse_pointer(op["path"])
+        # Inserting at a numeric index shifts an array; jsonb_set would overwrite
+        if op["op"] == "add" and tokens[-1].isdigit():
+            return False
+        if any(_builds_on(kind, prior, tokens) for kind, prior in earlier):
+            return False
+        earlier.append((op["op"], tokens))
+    return True
+
+
+def _jsonb_patch_expression(ops: list[Mapping[str, Any]]) -> ColumnElement[Any]:
+    """Compile *ops* into nested jsonb_set/jsonb_insert/#- calls on ``data``."""
+    expr: ColumnElement[Any] = cast(Character.data, JSONB)
+    for op in ops:
+        tokens = parse_pointer(op["path"])
+        if op["op"] == "remove":
+            expr = expr.op("#-")(cast(array(tokens), ARRAY(Text)))
+            continue
+        value = cast(literal(json.dumps(op["value"], default=str)), JSONB)
+        if op["op"] == "add" and tokens[-1] == "-":
+            path = array([*tokens[:-1], _PG_LAST])
+            expr = func.jsonb_insert(expr, path, value, True)
+        else:
+            expr = func.jsonb_set(expr, array(tokens), value, op["op"] == "add")
+    return cast(expr, Character.data.type)
+
+
+def _jsonb_path_guards(ops: list[Mapping[str, Any]]) -> list[ColumnElement[bool]]:
+    """Conditions under which every op in *ops* applies to the stored sheet.
+
+    ``replace`` and ``remove`` need their target to exist, ``add`` its parent
+    (an array, when appending with ``-``).
+    """
+    data = cast(Character.data, JSONB)
+    guards: list[ColumnElement[bool]] = []
+    for op in ops:
+        tokens = parse_pointer(op["path"])
+        needed = tokens if op["op"] in ("replace", "remove") else tokens[:-1]
+        if not needed:
+            continue
+        value = data.op("#>")(cast(array(needed), ARRAY(Text)))
+        if op["op"] == "add" and tokens[-1] == "-":
+            guards.append(func.jsonb_typeof(value) == "array")
+        else:
+            guards.append(value.isnot(None))
+    return guards
+
+
+def _forget_loaded(db: Session, character_id: str) -> None:
+    """Expire a Character the session already holds so it reloads the write."""
+    loaded = db.identity_map.get(identity_key(Character, character_id))
+    if loaded is not None:
+        db.expire(loaded)
+
+
+def _current_version(db: Session, character_id: str) -> int | None:
+    return db.scalar(select(Character.version).where(Character.id == character_id))
+
+
+def patch_character(
+    db: Session,
+    character_id: str,
+    ops: list[Mapping[str, Any]],
+    expected_version: int | None = None,
+) -> int | None:
+    """Apply JSON Patch *ops* to a character's sheet. The caller commits.
+
+    Args:
+        db: Session to write through.
+        character_id: Character to patch.
+        ops: JSON Patch operations, applied in order.
+        expected_version: If given, only apply the patch when the row is
+            still at this version.
+
+    Returns:
+        The character's new version, or None if it does not exist.
+
+    Raises:
+        VersionConflictError: The row is not at ``expected_version``, or it
+            changed while a read-modify-write patch was being applied.
+        PatchError: An operation does not apply to the stored sheet (a
+            path it needs does not exist).
+    """
+    ops = list(ops)
+    if not ops:
+        return _current_version(db, character_id)
+
+    stmt = update(Character).where(Character.id == character_id)
+    values: dict[str, Any] = {"version": Character.version + 1}
+    name = _renamed_to(ops)
+    if name is not None:
+        values["name"] = name
+
+    if db.get_bind().dialect.name == "postgresql" and _server_side(ops):
+        values["data"] = _jsonb_patch_expression(ops)
+        if expected_version is not None:
+            stmt = stmt.where(Character.version == expected_version)
+        new_version = db.execute(
+            stmt.where(*_jsonb_path_guards(ops)).values(**values).returning(Character.version)
+        ).scalar()
+        if new_version is None:
+            current = _current_version(db, character_id)
+            if current is None:
+                return None
+            if expected_version is not None and current != expected_version:
+                raise VersionConflictError(character_id, expected_version)
+            raise PatchError(f"Patch does not apply to character {character_id}: a path does not exist")
+    else:
+        row = db.execute(
+            select(Character.data, Character.version).where(Character.id == character_id)
+        ).first()
+        if row is None:
+            return None
+        if expected_version is not None and row.version != expected_version:
+            raise VersionConflictError(character_id, expected_version)
+        values["data"] = apply_patch(copy.deepcopy(row.data), ops)
+        result = db.execute(
+            stmt.where(Character.version == row.version).values(**values)
+        )
+        if result.rowcount == 0:
+            raise VersionConflictError(character_id, row.version)
+        new_version = row.version + 1
+
+    _forget_loaded(db, character_id)
+    return new_version
+
+
+def modify_character[T](
+    db: Session,
+    character_id: str,
+    mutate: Callable[[dict[str, Any]], T],
+    expected_version: int | None = None,
+    attempts: int = 3,
+) -> tuple[T, dict[str, Any], int] | None:
+    """Read-decide-write a character sheet with optimistic retries.
+
+    ``mutate`` receives a private copy of the sheet, changes it in place and
+    returns whatever the caller wants back. The change is written as the
+    patch between the two versions of the sheet, guarded by the version
+    that was read; if another writer got in first the sheet is read again
+    and ``mutate`` runs again. The caller commits.
+
+    Args:
+        db: Session to read and write through.
+        character_id: Character to modify.
+        mutate: Callback applying the change; it should not mutate anything
+            when it decides not to write (its return value is still passed
+            back).
+        expected_version: If given, fail instead of retrying when the row is
+            not at this version.
+        attempts: How many times to try before giving up.
+
+    Returns:
+        ``(mutate's result, the new sheet, the new version)``, or None if
+        the character does not exist.
+
+    Raises:
+        VersionConflictError: Every attempt lost a race, or the row is not
+            at ``expected_version``.
+    """
+    for _ in range(attempts):
+        row = db.execute(
+            select(Character.data, Character.version).where(Character.id == character_id)
+        ).first()
+        if row is None:
+            return None
+        if expected_version is not None and row.version != expected_version:
+            raise VersionConflictError(character_id, expected_version)
+        sheet = copy.deepcopy(row.data)
+        outcome = mutate(sheet)
+        ops = diff_patch(row.data, sheet)
+        if not ops:
+            return outcome, sheet, row.version
+        try:
+            new_version = patch_character(db, character_id, ops, row.version)
+        except VersionConflictError:
+            if expected_version is not None:
+                raise
+            continue
+        return outcome, sheet, new_version if new_version is not None else row.version
+    raise VersionConflictError(character_id, expected_version)
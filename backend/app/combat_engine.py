@@ -0,0 +1,504 @@
+"""
+Combat Engine - live encounters held in memory between turns.
+
+A combat's durable record is its header row in ``combat_states`` plus the
+append-only ``combat_events`` log. Rather than rebuilding the header from
+JSON on every turn, the engine keeps each active combat as a
+:class:`LiveCombat`: a list of compact :class:`CombatantRecord` objects
+addressed by integer id, with the turn order held by an
+:class:`~app.initiative_tracker.InitiativeTracker` over those ids. Every
+logged event is applied in memory by :meth:`LiveCombat.apply`.
+
+The header is only written back as a checkpoint. That happens every
+``COMBAT_CHECKPOINT_INTERVAL`` actions, at each round end and when the
+combat ends. The write runs in a background task, so the turn does not
+wait for it. ``combat_states.checkpoint_seq`` names the last event folded
+into the header. After a restart, or on another worker, a combat is rebuilt
+from the header plus the events logged after that number. An engine that
+finds its copy behind the log catches up from the log before applying a new
+event, so several workers can serve the same combat.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import run_in_session
+from app.effect_scheduler import EffectKind, EffectScheduler
+from app.initiative_tracker import InitiativeTracker
+from app.models.db_models import CombatEvent, CombatState
+from app.rules_engine import ConditionSet
+
+logger = logging.getLogger(__name__)
+
+
+class CombatantRecord:
+    """One combatant in a live combat.
+
+    ``id`` is the combatant's index in :attr:`LiveCombat.combatants` and never
+    changes; ``key`` is the external id clients use (character or NPC id).
+    ``hp``, ``max_hp`` and ``ac`` are None when the combat was started
+    without them, in which case damage is logged but not tracked.
+    """
+
+    __slots__ = (
+        "id",
+        "key",
+        "name",
+        "kind",
+        "initiative",
+        "dex_modifier",
+        "hp",
+        "max_hp",
+        "ac",
+        "conditions",
+    )
+
+    def __init__(
+        self,
+        id: int,  # noqa: A002
+        key: str,
+        name: str,
+        kind: str = "npc",
+        initiative: int = 0,
+        dex_modifier: int = 0,
+        hp: int | None = None,
+        max_hp: int | None = None,
+        ac: int | None = None,
+        conditions: ConditionSet | None = None,
+    ) -> None:
+        self.id = id
+        self.key = key
+        self.name = name
+        self.kind = kind
+        self.initiative = initiative
+        self.dex_modifier = dex_modifier
+        self.hp = hp
+        self.max_hp = max_hp
+        self.ac = ac
+        self.conditions = conditions if conditions is not None else ConditionSet()
+
+    @classmethod
+    def from_entry(cls, id: int, entry: dict[str, Any]) -> CombatantRecord:  # noqa: A002
+        """Build a record from an ``initiative_order`` entry."""
+        hp = entry.get("hp")
+        return cls(
+            id=id,
+            key=str(entry.get("id", id)),
+            name=entry.get("name", ""),
+            kind=entry.get("type", "npc"),
+            initiative=int(entry.get("initiative", 0)),
+            dex_modifier=int(entry.get("dex_modifier", 0)),
+            hp=hp,
+            max_hp=entry.get("max_hp", hp),
+            ac=entry.get("ac"),
+            conditions=ConditionSet.from_list(entry.get("conditions", [])),
+        )
+
+    def to_entry(self) -> dict[str, Any]:
+        """The ``initiative_order`` entry for this record."""
+        entry: dict[str, Any] = {
+            "type": self.kind,
+            "id": self.key,
+            "name": self.name,
+            "initiative": self.initiative,
+            "dex_modifier": self.dex_modifier,
+        }
+        for field in ("hp", "max_hp", "ac"):
+            value = getattr(self, field)
+            if value is not None:
+                entry[field] = value
+        if self.conditions:
+            entry["conditions"] = self.conditions.to_list()
+        return entry
+
+
+class LiveCombat:
+    """In-memory state of one combat, advanced one logged event at a time.
+
+    Turn order is an :class:`~app.initiative_tracker.InitiativeTracker` over
+    the records' integer ids; timed conditions, concentration and map
+    effects are filed in an :class:`~app.effect_scheduler.EffectScheduler`
+    by the combat round they end in.
+    """
+
+    __slots__ = (
+        "combat_id",
+        "status",
+        "combatants",
+        "tracker",
+        "effects",
+        "expired",
+        "_ids",
+        "last_seq",
+        "checkpoint_seq",
+        "pending",
+        "lock",
+    )
+
+    def __init__(
+        self,
+        combat_id: str,
+        initiative_order: list[dict[str, Any]],
+        status: str = "active",
+        round: int = 1,  # noqa: A002
+        current_turn: int = 0,
+        checkpoint_seq: int = 0,
+        effects: list[dict[str, Any]] | None = None,
+    ) -> None:
+        self.combat_id = combat_id
+        self.status = status
+        self.combatants: list[CombatantRecord] = []
+        self._ids: dict[str, int] = {}
+        self.last_seq = checkpoint_seq
+        self.checkpoint_seq = checkpoint_seq
+        self.pending = 0  # events applied since the last checkpoint
+        self.lock = asyncio.Lock()
+        self.effects = EffectScheduler.restore(effects or [], round)
+        self.expired: list[dict[str, Any]] = []  # expiry events from the last apply()
+        in_order = [entry for entry in initiative_order if not entry.get("delayed")]
+        ids = [{"id": self._add(entry).id, **_turn_fields(entry)} for entry in in_order]
+        self.tracker = InitiativeTracker.from_entries(ids, current_turn, round)
+        for entry in initiative_order:
+            if entry.get("delayed"):
+                record = self._add(entry)
+                self.tracker.add(record.id, record.initiative, record.dex_modifier, delayed=True)
+        for entry in initiative_order:
+            if entry.get("readied") is not None:
+                self.tracker.readied[self._ids[str(entry["id"])]] = entry["readied"]
+
+    def _add(self, entry: dict[str, Any]) -> CombatantRecord:
+        record = CombatantRecord.from_entry(len(self.combatants), entry)
+        self.combatants.append(record)
+        self._ids[record.key] = record.id
+        return record
+
+    def get(self, key: str | None) -> CombatantRecord | None:
+        """The combatant with external id *key*, if it is in this combat."""
+        index = self._ids.get(str(key)) if key is not None else None
+        return self.combatants[index] if index is not None else None
+
+    @property
+    def round(self) -> int:
+        return self.tracker.round
+
+    @property
+    def current_turn(self) -> int:
+        return self.tracker.current_turn
+
+    @property
+    def active(self) -> CombatantRecord | None:
+        """The combatant whose turn it is."""
+        active = self.tracker.active
+        return self.combatants[active] if active is not None else None
+
+    def initiative_order(self) -> list[dict[str, Any]]:
+        """Entries in turn order, then delayed combatants marked ``delayed``."""
+        entries = [self.combatants[i].to_entry() for i in self.tracker]
+        entries += [{**self.combatants[i].to_entry(), "delayed": True} for i in self.tracker.delayed]
+        for entry in entries:
+            readied = self.tracker.readied.get(self._ids[entry["id"]])
+            if readied is not None:
+                entry["readied"] = readied
+        return entries
+
+    def header(self) -> dict[str, Any]:
+        """The ``combat_states`` fields this combat checkpoints."""
+        return {
+            "status": self.status,
+            "round": self.round,
+            "current_turn": self.current_turn,
+            "initiative_order": self.initiative_order(),
+            "effects": self.effects.snapshot(),
+            "checkpoint_seq": self.last_seq,
+        }
+
+    # -- event reducer ------------------------------------------------------
+
+    def apply(self, event_type: str, data: dict[str, Any], seq: int | None = None) -> bool:
+        """Apply one logged event.
+
+        Successful attacks and ``damage`` actions reduce the target's hit
+        points, ``heal`` restores them (up to ``max_hp``), ``join`` adds
+        ``data["combatant"]`` in initiative order, ``remove`` drops the
+        target from it, ``condition`` applies (or with ``remove`` set,
+        removes) ``data["condition"]`` on the target, and ``end_combat``
+        ends the combat. A ``condition`` with ``duration_rounds`` ends by
+        itself; ``concentration`` and ``map_effect`` start (or with
+        ``remove``, end) a timed spell on ``character_id`` or a timed
+        ``data["effect"]``. ``delay``,
+        ``resume``, ``ready`` and ``trigger`` act on ``character_id`` as the
+        :class:`~app.initiative_tracker.InitiativeTracker` methods of the
+        same names. Any action with ``end_turn`` set then passes the turn,
+        as :func:`app.rules_engine.advance_turn` does. Other events only
+        move :attr:`last_seq`. Effects that end as a new round starts are
+        left in :attr:`expired` as expiry events.
+
+        Returns:
+            True if the event started a new round.
+        """
+        target = self.get(data.get("target_id"))
+        if target is not None and target.hp is not None:
+            if data.get("success") and data.get("damage"):
+                target.hp = max(0, target.hp - int(data["damage"]))
+            if data.get("healing"):
+                healed = target.hp + int(data["healing"])
+                target.hp = healed if target.max_hp is None else min(target.max_hp, healed)
+
+        self.expired = []
+        round_advanced = False
+        actor = self.get(data.get("character_id"))
+        try:
+            if event_type == "join" and data.get("combatant"):
+                self._join(data["combatant"])
+            elif event_type == "remove" and target is not None:
+                self.tracker.remove(target.id)
+                self.effects.cancel_owner(target.key)
+            elif event_type == "end_combat":
+                self.status = "ended"
+            elif event_type == "condition" and target is not None and data.get("condition"):
+                self._condition(target, data["condition"], bool(data.get("remove")), data.get("duration_rounds"))
+            elif event_type == "concentration" and actor is not None:
+                if data.get("remove"):
+                    self.effects.cancel(EffectKind.CONCENTRATION, actor.key)
+                else:
+                    self.effects.schedule(
+                        EffectKind.CONCENTRATION,
+                        actor.key,
+                        int(data.get("duration_rounds") or 10),
+                        data={"spell": data.get("spell")},
+                    )
+            elif event_type == "map_effect" and data.get("effect"):
+                effect = data["effect"]
+                if data.get("remove"):
+                    self.effects.cancel(EffectKind.MAP_EFFECT, effect["id"])
+                elif effect.get("duration_rounds"):
+                    duration = int(effect["duration_rounds"])
+                    self.effects.schedule(EffectKind.MAP_EFFECT, effect["id"], duration, data=effect)
+            elif event_type == "delay" and actor is not None:
+                round_advanced = self.tracker.delay(actor.id)["round_advanced"]
+            elif event_type == "resume" and actor is not None:
+                self.tracker.resume(actor.id)
+                actor.initiative = self.tracker.initiative(actor.id)
+            elif event_type == "ready" and actor is not None:
+                self.tracker.ready(actor.id, data.get("readied", True))
+            elif event_type == "trigger" and actor is not None:
+                self.tracker.trigger(actor.id)
+        except (KeyError, ValueError) as exc:
+            # The event is already logged; replaying it must not fail either
+            logger.warning("Ignoring %s event for combat %s: %s", event_type, self.combat_id, exc)
+
+        if data.get("end_turn") and len(self.tracker) and self.status == "active":
+            round_advanced = self.tracker.advance()["round_advanced"] or round_advanced
+        if round_advanced:
+            self._expire()
+
+        if seq is not None:
+            self.last_seq = max(self.last_seq, seq)
+        self.pending += 1
+        return round_advanced
+
+    def _condition(self, record: CombatantRecord, condition: str, remove: bool, duration: int | None) -> None:
+        if remove:
+            record.conditions = record.conditions.without_condition(condition)
+            self.effects.cancel(EffectKind.CONDITION, record.key, condition)
+            return
+        record.conditions = record.conditions.with_condition(condition)
+        if duration:
+            self.effects.schedule(EffectKind.CONDITION, record.key, int(duration), name=condition)
+        else:
+            # Reapplied without a duration: it no longer ends by itself
+            self.effects.cancel(EffectKind.CONDITION, record.key, condition)
+
+    def _expire(self) -> None:
+        for effect in self.effects.advance_to(self.round):
+            if effect.kind == EffectKind.CONDITION:
+                record = self.get(effect.owner)
+                if record is not None:
+                    record.conditions = record.conditions.without_condition(effect.name)
+            self.expired.append(effect.expiry_event())
+
+    def _join(self, entry: dict[str, Any]) -> None:
+        if self.get(entry.get("id")) is not None:
+            return
+        record = self._add(entry)
+        self.tracker.add(record.id, record.initiative, record.dex_modifier, entry.get("tie_break", 0))
+
+
+def _turn_fields(entry: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "initiative": int(entry.get("initiative", 0)),
+        "dex_modifier": int(entry.get("dex_modifier", 0)),
+        "tie_break": entry.get("tie_break", 0),
+    }
+
+
+def _read_checkpoint(db: Session, combat_id: str) -> tuple[dict[str, Any], list[CombatEvent]] | None:
+    row = db.query(CombatState).filter(CombatState.id == combat_id).first()
+    if row is None:
+        return None
+    header = {
+        "status": row.status,
+        "round": row.round,
+        "current_turn": row.current_turn,
+        "initiative_order": list(row.initiative_order or []),
+        "effects": list(row.effects or []),
+        "checkpoint_seq": row.checkpoint_seq or 0,
+    }
+    return header, _read_events(db, combat_id, header["checkpoint_seq"])
+
+
+def _read_events(db: Session, combat_id: str, after_seq: int, upto_seq: int | None = None) -> list[CombatEvent]:
+    query = db.query(CombatEvent).filter(CombatEvent.combat_id == combat_id, CombatEvent.seq > after_seq)
+    if upto_seq is not None:
+        query = query.filter(CombatEvent.seq <= upto_seq)
+    return query.order_by(CombatEvent.seq).all()
+
+
+def _write_checkpoint(db: Session, combat_id: str, header: dict[str, Any]) -> bool:
+    row = db.query(CombatState).filter(CombatState.id == combat_id).first()
+    # A slower writer must not put back an older checkpoint
+    if row is None or (row.checkpoint_seq or 0) > header["checkpoint_seq"]:
+        return False
+    row.status = header["status"]
+    row.round = header["round"]
+    row.current_turn = header["current_turn"]
+    row.initiative_order = header["initiative_order"]
+    row.effects = header["effects"]
+    row.checkpoint_seq = header["checkpoint_seq"]
+    db.commit()
+    return True
+
+
+class CombatEngine:
+    """Registry of the live combats served by this process."""
+
+    def __init__(self, checkpoint_interval: int | None = None) -> None:
+        self._checkpoint_interval = checkpoint_interval
+        self._combats: dict[str, LiveCombat] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def checkpoint_interval(self) -> int:
+        if self._checkpoint_interval is not None:
+            return self._checkpoint_interval
+        return max(1, get_settings().combat_checkpoint_interval)
+
+    def start(self, combat_id: str, initiative_order: list[dict[str, Any]]) -> LiveCombat:
+        """Register a combat that was just persisted with a fresh header."""
+        combat = LiveCombat(combat_id, initiative_order)
+        self._combats[combat_id] = combat
+        return combat
+
+    def peek(self, combat_id: str) -> LiveCombat | None:
+        """The combat if it is live in this process, without touching the database."""
+        return self._combats.get(combat_id)
+
+    async def get(self, combat_id: str) -> LiveCombat | None:
+        """The live combat, recovering it from the database if needed.
+
+        Returns None if the combat does not exist.
+        """
+        combat = self._combats.get(combat_id)
+        if combat is None:
+            combat = await self.recover(combat_id)
+        return combat
+
+    async def recover(self, combat_id: str) -> LiveCombat | None:
+        """Rebuild a combat from its last checkpoint plus the later events."""
+        loaded = await run_in_session(_read_checkpoint, combat_id)
+        if loaded is None:
+            return None
+        header, events = loaded
+        combat = LiveCombat(
+            combat_id,
+            header["initiative_order"],
+            status=header["status"],
+            round=header["round"],
+            current_turn=header["current_turn"],
+            checkpoint_seq=header["checkpoint_seq"],
+            effects=header["effects"],
+        )
+        for event in events:
+            combat.apply(event.event_type, event.data or {}, event.seq)
+        if events:
+            logger.info("Recovered combat %s from seq %d", combat_id, header["checkpoint_seq"])
+        if combat.status == "active":
+            self._combats[combat_id] = combat
+        return combat
+
+    async def apply(
+        self, combat: LiveCombat, event_type: str, data: dict[str, Any], seq: int | None
+    ) -> bool:
+        """Apply an event that was just appended to the log as *seq*.
+
+        Call with ``combat.lock`` held. Events that another worker logged in
+        between are applied first. The combat is checkpointed when the
+        interval is reached, a round ends or the combat ends; an ended
+        combat leaves the registry.
+
+        Returns:
+            True if the event started a new round.
+        """
+        if seq is not None and seq > combat.last_seq + 1:
+            missed = await run_in_session(_read_events, combat.combat_id, combat.last_seq, seq - 1)
+            for event in missed:
+                combat.apply(event.event_type, event.data or {}, event.seq)
+        round_advanced = combat.apply(event_type, data, seq)
+        if round_advanced or combat.status != "active" or combat.pending >= self.checkpoint_interval:
+            self.checkpoint(combat)
+        if combat.status != "active":
+            self._combats.pop(combat.combat_id, None)
+        return round_advanced
+
+    def checkpoint(self, combat: LiveCombat) -> None:
+        """Write the combat's header back to ``combat_states`` in the background."""
+        header = combat.header()
+        combat.pending = 0
+        combat.checkpoint_seq = header["checkpoint_seq"]
+        task = asyncio.get_running_loop().create_task(self._write(combat.combat_id, header))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, combat_id: str, header: dict[str, Any]) -> None:
+        try:
+            await run_in_session(_write_checkpoint, combat_id, header)
+        except Exception as exc:
+            logger.warning("Failed to checkpoint combat %s: %s", combat_id, exc)
+
+    async def flush(self, checkpoint_pending: bool = False) -> None:
+        """Wait for checkpoint writes in flight (shutdown and tests).
+
+        With *checkpoint_pending*, combats holding events not yet
+        checkpointed are written first, so nothing in the coalescing window
+        is lost when the process stops.
+        """
+        if checkpoint_pending:
+            for combat in list(self._combats.values()):
+                if combat.pending:
+                    self.checkpoint(combat)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    def evict(self, combat_id: str) -> None:
+        """Drop a combat from memory; the next access recovers it."""
+        self._combats.pop(combat_id, None)
+
+    def clear(self) -> None:
+        self._combats.clear()
+
+
+_engine: CombatEngine | None = None
+
+
+def get_combat_engine() -> CombatEngine:
+    """Return the process-wide combat engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        _engine = CombatEngine()
+    return _engine
@@ -37,6 +37,34 @@ class Settings(BaseSettings):
 
     # Auto-save interval: persist game state every N player interactions.
     auto_save_interval: int = 5
+    # Auto-saves for one campaign within this window are coalesced into a
+    # single trailing write (see app/auto_save.py). 0 writes every save.
+    auto_save_debounce_seconds: float = 5.0
+
+    # Process-local character/campaign cache (see app/entity_cache.py).
+    # Set ENTITY_CACHE_MAX_ENTRIES=0 to disable caching.
+    entity_cache_max_entries: int = 1024
+    entity_cache_ttl_seconds: int = 300
+    # Inside a unit of work (a /game/input turn), hits checked against the
+    # row version less than this many seconds ago skip checking again.
+    entity_cache_revalidate_seconds: float = 30.0
+
+    # Per-campaign random streams (see app/rng.py). Each stream journals up
+    # to this many mechanics calls for replay; 0 disables recording.
+    rng_journal_max_entries: int = 10000
+    # Serve /game/campaign/{id}/rng (seed a stream, export its recording).
+    # Anyone holding the seed can predict later rolls, so leave this off
+    # unless the API is private.
+    rng_admin_endpoints: bool = False
+    # Worker processes for POST /game/encounter/generate-batch; 0 generates
+    # in the request's thread.
+    encounter_batch_workers: int = 0
+    # Live combats are written back to combat_states after this many actions
+    # (and at every round end); the event log covers the gap after a restart.
+    combat_checkpoint_interval: int = 10
+    # Deleting a save slot prunes orphaned save sections, except those
+    # created or reused within this window (a save may still be committing).
+    save_section_gc_grace_seconds: int = 300
 
     # Azure AI Content Safety
     content_safety_endpoint: str = ""
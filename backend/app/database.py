@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
-from collections.abc import Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Awaitable, Callable, Generator
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from typing import Annotated, Any
 
 from fastapi import Depends
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 Base = declarative_base()
@@ -16,6 +19,14 @@ Base = declarative_base()
 # Lazy singletons - created on first use (after .env is loaded)
 _engine = None
 _SessionLocal = None
+_async_engine = None
+_AsyncSessionLocal = None
+
+# Async driver substituted for each sync dialect when DATABASE_ASYNC is on
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
 
 
 def _resolve_database_url() -> str:
@@ -36,6 +47,23 @@ def _resolve_database_url() -> str:
     return "sqlite:///./app.db"
 
 
+def is_async_database() -> bool:
+    """Return True when the async engine is selected via ``DATABASE_ASYNC``."""
+    return os.getenv("DATABASE_ASYNC", "false").lower() in {"1", "true", "yes"}
+
+
+def _resolve_async_database_url() -> str:
+    """Translate the sync database URL into its async-driver equivalent."""
+    url = _resolve_database_url()
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database dialect '{dialect}'")
+    # asyncpg takes ``ssl`` rather than libpq's ``sslmode``
+    rest = rest.replace("sslmode=", "ssl=")
+    return f"{_ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
+
 def get_engine() -> Any:  # noqa: ANN401
     """Get or create the SQLAlchemy engine (lazy singleton)."""
     global _engine
@@ -43,9 +71,36 @@ def get_engine() -> Any:  # noqa: ANN401
         database_url = _resolve_database_url()
         connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
         _engine = create_engine(database_url, connect_args=connect_args)
+        if database_url.startswith("sqlite"):
+            configure_sqlite_engine(_engine)
     return _engine
 
 
+def configure_sqlite_engine(engine: Any) -> None:  # noqa: ANN401
+    """Make SQLite transactions behave for :class:`UnitOfWork`.
+
+    The stdlib driver only emits BEGIN before DML, so a SAVEPOINT issued
+    first opens (and its RELEASE commits) a transaction of its own. Taking
+    over BEGIN restores proper nesting. File databases also switch to WAL so
+    a turn-long transaction does not block other requests' readers.
+
+    Works for both the sync engine and ``AsyncEngine.sync_engine``.
+    """
+    memory = ":memory:" in str(engine.url) or engine.url.database in (None, "")
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:  # noqa: ANN401, ARG001
+        dbapi_connection.isolation_level = None
+        if not memory:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn: Any) -> None:  # noqa: ANN401
+        conn.exec_driver_sql("BEGIN")
+
+
 def get_session_local() -> Any:  # noqa: ANN401
     """Get or create the sessionmaker (lazy singleton)."""
     global _SessionLocal
@@ -54,6 +109,27 @@ def get_session_local() -> Any:  # noqa: ANN401
     return _SessionLocal
 
 
+def get_async_engine() -> Any:  # noqa: ANN401
+    """Get or create the async SQLAlchemy engine (lazy singleton)."""
+    global _async_engine
+    if _async_engine is None:
+        database_url = _resolve_async_database_url()
+        _async_engine = create_async_engine(database_url)
+        if database_url.startswith("sqlite"):
+            configure_sqlite_engine(_async_engine.sync_engine)
+    return _async_engine
+
+
+def get_async_session_local() -> Any:  # noqa: ANN401
+    """Get or create the async sessionmaker (lazy singleton)."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _AsyncSessionLocal
+
+
 # Backward-compatible module-level name used by init_db() and migrations
 # This is a property-like that defers to the lazy getter
 class _EngineProxy:
@@ -91,6 +167,230 @@ def get_session_context() -> Generator:
         db.close()
 
 
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an async database session. Use with FastAPI Depends()."""
+    async with get_async_session_local()() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_async_session_context() -> AsyncGenerator[AsyncSession, None]:
+    """Async context manager for database sessions in non-route code."""
+    async with get_async_session_local()() as db:
+        yield db
+
+
+def _run_with_sync_session[T](fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+    """Call ``fn`` with a fresh sync session (runs inside a worker thread)."""
+    with get_session_context() as db:
+        return fn(db, *args)
+
+
+async def run_in_session[T](fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+    """Run ``fn(session, *args)`` without blocking the event loop.
+
+    ``fn`` is ordinary synchronous ORM code. When ``DATABASE_ASYNC`` is on it
+    runs on an :class:`AsyncSession` via ``run_sync`` so all I/O goes through
+    the async driver; otherwise it runs with a sync session in a worker thread.
+    Either way the caller just awaits the result.
+
+    Inside :func:`unit_of_work` the call joins the request's shared session
+    instead of opening its own (see :class:`UnitOfWork`).
+    """
+    uow = _current_unit_of_work.get()
+    if uow is not None and not uow.closed:
+        return await uow.run(fn, *args)
+    if is_async_database():
+        async with get_async_session_context() as db:
+            return await db.run_sync(fn, *args)
+    return await asyncio.to_thread(_run_with_sync_session, fn, *args)
+
+
+def dialect_insert(db: Session) -> Callable[..., Any]:
+    """Return the ``insert`` construct for ``db``'s dialect.
+
+    Both supported dialects (PostgreSQL and SQLite) provide
+    ``on_conflict_do_nothing`` / ``on_conflict_do_update`` on it, which the
+    generic :func:`sqlalchemy.insert` does not.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+# ---------------------------------------------------------------------------
+# Request-scoped unit of work
+# ---------------------------------------------------------------------------
+
+_current_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar(
+    "_current_unit_of_work", default=None
+)
+
+
+class _SavepointSession:
+    """Session view handed to ``fn`` while it runs inside a unit of work.
+
+    Each ``run_in_session`` call gets its own SAVEPOINT. ``commit()`` releases
+    it and ``rollback()`` rolls back only this call's work, so existing code
+    that commits or retries keeps its semantics while the real COMMIT is left
+    to the unit of work. Anything left uncommitted when ``fn`` returns is
+    rolled back, exactly as closing a standalone session would.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+        self._savepoint = session.begin_nested()
+
+    def commit(self) -> None:
+        self._savepoint.commit()
+        self._savepoint = self._session.begin_nested()
+
+    def rollback(self) -> None:
+        self._savepoint.rollback()
+        self._savepoint = self._session.begin_nested()
+
+    def close(self) -> None:
+        """No-op: the unit of work owns the session's lifetime."""
+
+    def _discard(self) -> None:
+        # Also clears a savepoint deactivated by a failed flush
+        self._savepoint.rollback()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._session, name)
+
+
+def _run_in_savepoint[T](session: Session, fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+    """Call ``fn`` against ``session`` inside its own savepoint."""
+    scoped = _SavepointSession(session)
+    try:
+        return fn(scoped, *args)
+    finally:
+        scoped._discard()
+
+
+class UnitOfWork:
+    """One session and one transaction shared by everything in a request.
+
+    Created by :func:`unit_of_work`. While it is active every
+    :func:`run_in_session` call in the same task (and in tasks spawned from
+    it) reuses this session rather than checking out a connection of its own,
+    so the reads in a turn see one consistent snapshot and the writes land in
+    a single COMMIT at the end. Calls are serialised with a lock because a
+    session must not be used concurrently.
+
+    The session is opened lazily, so a request whose reads are all cache hits
+    never touches the pool.
+    """
+
+    def __init__(self) -> None:
+        self.closed = False
+        self._lock = asyncio.Lock()
+        self._stack = ExitStack()
+        self._session: Session | None = None
+        self._async_session: AsyncSession | None = None
+        self._deferred: list[Callable[[], Awaitable[Any]]] = []
+        self._after_commit: list[Callable[[], None]] = []
+        self._after_rollback: list[Callable[[], None]] = []
+
+    @property
+    def started(self) -> bool:
+        """True once a session has been opened for this unit of work."""
+        return self._session is not None or self._async_session is not None
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+        """Run ``fn(session, *args)`` on the shared session."""
+        async with self._lock:
+            if is_async_database():
+                if self._async_session is None:
+                    self._async_session = get_async_session_local()()
+                return await self._async_session.run_sync(_run_in_savepoint, fn, *args)
+            if self._session is None:
+                self._session = self._stack.enter_context(get_session_context())
+            return await asyncio.to_thread(_run_in_savepoint, self._session, fn, *args)
+
+    def defer(self, fn: Callable[[], Awaitable[Any]]) -> None:
+        """Run coroutine function ``fn`` just before the final commit."""
+        self._deferred.append(fn)
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the transaction has committed."""
+        self._after_commit.append(callback)
+
+    def after_rollback(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` if the transaction is rolled back."""
+        self._after_rollback.append(callback)
+
+    async def commit(self) -> None:
+        """Run deferred work, then commit and fire the after-commit hooks."""
+        while self._deferred:
+            await self._deferred.pop(0)()
+        async with self._lock:
+            if self._async_session is not None:
+                await self._async_session.commit()
+            elif self._session is not None:
+                await asyncio.to_thread(self._session.commit)
+        for callback in self._after_commit:
+            callback()
+
+    async def rollback(self) -> None:
+        """Discard everything written in this unit of work."""
+        self._deferred.clear()
+        async with self._lock:
+            if self._async_session is not None:
+                await self._async_session.rollback()
+            elif self._session is not None:
+                await asyncio.to_thread(self._session.rollback)
+        for callback in self._after_rollback:
+            callback()
+
+    async def close(self) -> None:
+        """Release the session; later ``run_in_session`` calls open their own."""
+        self.closed = True
+        if self._async_session is not None:
+            await self._async_session.close()
+        if self._session is not None:
+            await asyncio.to_thread(self._stack.close)
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    """Return the active unit of work for this task, if any."""
+    uow = _current_unit_of_work.get()
+    return uow if uow is not None and not uow.closed else None
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncGenerator[UnitOfWork, None]:
+    """Share one session and one transaction across a request.
+
+    Commits when the block exits normally and rolls back if it raises.
+    Nested use joins the outer unit of work.
+
+    Usage::
+
+        async with unit_of_work():
+            character = await get_scribe().get_character(character_id)
+            ...
+    """
+    existing = current_unit_of_work()
+    if existing is not None:
+        yield existing
+        return
+    uow = UnitOfWork()
+    token = _current_unit_of_work.set(uow)
+    try:
+        yield uow
+        await uow.commit()
+    except BaseException:
+        await uow.rollback()
+        raise
+    finally:
+        _current_unit_of_work.reset(token)
+        await uow.close()
+
+
 DbDep = Annotated[Session, Depends(get_session)]
 """FastAPI dependency for injecting a SQLAlchemy database session.
 
@@ -101,6 +401,15 @@ parameters::
         ...
 """
 
+AsyncDbDep = Annotated[AsyncSession, Depends(get_async_session)]
+"""FastAPI dependency for injecting an async SQLAlchemy session.
+
+Requires an async driver (``aiosqlite``/``asyncpg``) for the configured URL::
+
+    async def my_route(db: AsyncDbDep) -> ...:
+        result = await db.execute(select(Model))
+"""
+
 
 def init_db() -> None:
     """Create database tables if they do not exist."""
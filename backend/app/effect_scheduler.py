@@ -0,0 +1,171 @@
+"""
+Effect Scheduler - expire timed effects by absolute round number.
+
+Concentration spells, conditions with a duration and timed battle-map
+effects all end after a number of rounds. Rather than decrementing a
+counter on every effect every round, :class:`EffectScheduler` files each
+effect under the round it expires in, on a min-heap. Advancing a round
+pops only the effects due in it, so a round costs O(k log n) for k expiries
+instead of O(n).
+
+Cancelled or replaced effects stay on the heap and are skipped when they
+surface; the heap is rebuilt once such stale entries outnumber the live
+ones. Each expiry is reported as a :meth:`ScheduledEffect.expiry_event`
+dict, which :func:`app.api.websocket_routes.broadcast_effect_expiries`
+sends to a campaign's players.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+
+class EffectKind(StrEnum):
+    CONCENTRATION = "concentration"
+    CONDITION = "condition"
+    MAP_EFFECT = "map_effect"
+
+
+@dataclass(slots=True)
+class ScheduledEffect:
+    """One timed effect.
+
+    ``owner`` is the character or combatant the effect is on (the caster,
+    for concentration) or the map effect's id; ``name`` tells apart several
+    effects of one kind on the same owner, such as two conditions.
+    """
+
+    kind: EffectKind
+    owner: str
+    name: str
+    expires_round: int
+    data: dict[str, Any] = field(default_factory=dict)
+    active: bool = True
+
+    @property
+    def key(self) -> tuple[EffectKind, str, str]:
+        return (self.kind, self.owner, self.name)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind.value,
+            "owner": self.owner,
+            "name": self.name,
+            "expires_round": self.expires_round,
+            "data": self.data,
+        }
+
+    def expiry_event(self) -> dict[str, Any]:
+        """The message announcing that this effect ended."""
+        return {"type": "effect_expired", **self.as_dict()}
+
+
+class EffectScheduler:
+    """Timed effects filed by the round they expire in.
+
+    An effect scheduled for *n* rounds in round *r* expires when the
+    scheduler reaches round ``r + n`` (at least one round later).
+    """
+
+    # Rebuild the heap when it holds this many more entries than live effects
+    _COMPACT_SLACK = 64
+
+    def __init__(self, current_round: int = 0) -> None:
+        self.round = current_round
+        self._heap: list[tuple[int, int, ScheduledEffect]] = []
+        self._live: dict[tuple[EffectKind, str, str], ScheduledEffect] = {}
+        self._serial = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def schedule(
+        self,
+        kind: EffectKind,
+        owner: str,
+        duration_rounds: int,
+        name: str = "",
+        data: dict[str, Any] | None = None,
+    ) -> ScheduledEffect:
+        """Start an effect, replacing any live one with the same kind, owner and name."""
+        self.cancel(kind, owner, name)
+        effect = ScheduledEffect(kind, owner, name, self.round + max(1, duration_rounds), dict(data or {}))
+        self._live[effect.key] = effect
+        heapq.heappush(self._heap, (effect.expires_round, next(self._serial), effect))
+        return effect
+
+    def cancel(self, kind: EffectKind, owner: str, name: str = "") -> ScheduledEffect | None:
+        """End an effect early; returns it, or None if it was not live."""
+        effect = self._live.pop((kind, owner, name), None)
+        if effect is not None:
+            effect.active = False
+            self._maybe_compact()
+        return effect
+
+    def cancel_owner(self, owner: str) -> list[ScheduledEffect]:
+        """End every effect on *owner* (a combatant leaving the fight)."""
+        return [
+            self.cancel(*key)
+            for key in [key for key in self._live if key[1] == owner]
+        ]
+
+    def get(self, kind: EffectKind, owner: str, name: str = "") -> ScheduledEffect | None:
+        return self._live.get((kind, owner, name))
+
+    def remaining(self, effect: ScheduledEffect) -> int:
+        """Rounds left before *effect* expires."""
+        return max(0, effect.expires_round - self.round)
+
+    def advance(self, rounds: int = 1) -> list[ScheduledEffect]:
+        """Move *rounds* rounds on; see :meth:`advance_to`."""
+        return self.advance_to(self.round + rounds)
+
+    def advance_to(self, current_round: int) -> list[ScheduledEffect]:
+        """Move on to *current_round* and expire every effect due by then.
+
+        Returns:
+            The expired effects, earliest first.
+        """
+        self.round = max(self.round, current_round)
+        expired: list[ScheduledEffect] = []
+        while self._heap and self._heap[0][0] <= self.round:
+            _, _, effect = heapq.heappop(self._heap)
+            if effect.active:
+                effect.active = False
+                del self._live[effect.key]
+                expired.append(effect)
+        return expired
+
+    def effects(self, kind: EffectKind | None = None) -> list[ScheduledEffect]:
+        """Live effects (of one kind, if given), soonest to expire first."""
+        live = [e for e in self._live.values() if kind is None or e.kind == kind]
+        return sorted(live, key=lambda e: e.expires_round)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Live effects as plain dicts, for checkpoints."""
+        return [effect.as_dict() for effect in self.effects()]
+
+    @classmethod
+    def restore(cls, entries: list[dict[str, Any]], current_round: int) -> EffectScheduler:
+        """Rebuild a scheduler from :meth:`snapshot` output."""
+        scheduler = cls(current_round)
+        for entry in entries:
+            effect = ScheduledEffect(
+                EffectKind(entry["kind"]),
+                entry["owner"],
+                entry.get("name", ""),
+                int(entry["expires_round"]),
+                dict(entry.get("data") or {}),
+            )
+            scheduler._live[effect.key] = effect
+            heapq.heappush(scheduler._heap, (effect.expires_round, next(scheduler._serial), effect))
+        return scheduler
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * len(self._live) + self._COMPACT_SLACK:
+            self._heap = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
@@ -7,10 +7,18 @@ and encounter generation to ensure parties face appropriately challenging foes.
 
 from __future__ import annotations
 
+import functools
 import logging
+import math
 import random
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from typing import Any
 
+from app.rng import RollStream, active_stream, record_call, recorded, use_stream
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -274,17 +282,202 @@ def calculate_xp_award(
 # ---------------------------------------------------------------------------
 
 
+# Default cap on monsters in a generated encounter
+DEFAULT_MAX_MONSTERS = 10
+
+# Simulation refinement: the party win rate each difficulty aims for, how
+# many equally budgeted mixes to compare, and fights simulated for each
+SIMULATED_WIN_TARGETS = {"easy": 0.99, "medium": 0.95, "hard": 0.85, "deadly": 0.65}
+REFINE_CANDIDATES = 4
+DEFAULT_SIMULATION_TRIALS = 500
+
+
+@dataclass(frozen=True, slots=True)
+class _Bucket:
+    """Monsters sharing an XP value and CR: interchangeable for the XP budget."""
+
+    xp: int
+    cr: float | None
+    monsters: tuple[dict[str, Any], ...]
+
+
+class MonsterPool:
+    """A monster list grouped into XP/CR buckets for repeated encounter builds.
+
+    Building the pool is one pass over the monsters; every build after that
+    works on the handful of buckets (one per CR in the SRD), not the monsters.
+    """
+
+    __slots__ = ("monsters", "buckets")
+
+    def __init__(self, monsters: list[dict[str, Any]]) -> None:
+        self.monsters = monsters
+        groups: dict[tuple[int, float | None], list[dict[str, Any]]] = {}
+        for monster in monsters:
+            cr = str(monster.get("cr", "0"))
+            xp = monster.get("xp") or cr_to_xp(cr)
+            if xp > 0:
+                groups.setdefault((xp, _cr_as_float(cr)), []).append(monster)
+        self.buckets = [
+            _Bucket(xp, cr, tuple(group)) for (xp, cr), group in sorted(groups.items(), key=lambda g: -g[0][0])
+        ]
+
+    def candidates(self, avg_party_level: float) -> list[_Bucket]:
+        """Buckets whose CR suits the party (see :func:`_is_cr_appropriate`)."""
+        lower, upper = _cr_bounds(avg_party_level)
+        return [b for b in self.buckets if b.cr is None or lower <= b.cr <= upper]
+
+
+@functools.lru_cache(maxsize=32)
+def _srd_pool(location: str) -> MonsterPool:
+    from app.srd_data import get_all_monsters
+
+    monsters = list(get_all_monsters())
+    return MonsterPool(_filter_monsters_for_location(monsters, location))
+
+
+def _binary_split(limit: int) -> list[int]:
+    """Split up to *limit* copies into pieces 1, 2, 4, ... that sum to any count."""
+    pieces, size = [], 1
+    while limit > 0:
+        pieces.append(min(size, limit))
+        limit -= size
+        size *= 2
+    return pieces
+
+
+def _nearest_bits(bits: int, target: int) -> list[int]:
+    """The set bits of *bits* closest to *target* from below and from above."""
+    found = []
+    below = bits & ((1 << (target + 1)) - 1)
+    if below:
+        found.append(below.bit_length() - 1)
+    above = bits >> target
+    if above:
+        found.append(target + (above & -above).bit_length() - 1)
+    return found
+
+
+def build_encounter(
+    pool: MonsterPool,
+    xp_budget: int,
+    party_size: int,
+    avg_party_level: float,
+    max_monsters: int = DEFAULT_MAX_MONSTERS,
+    max_copies: int | None = None,
+    max_per_cr: int | None = None,
+) -> list[dict[str, Any]]:
+    """Pick the monsters whose adjusted XP lands closest to *xp_budget*.
+
+    A bounded knapsack over the pool's CR buckets. ``reach[k]`` is a bitset
+    of the raw XP totals (in units of the buckets' common divisor) that
+    exactly ``k`` monsters can reach, so the encounter multiplier is applied
+    once per monster count instead of re-summing tentative lists. Copies of
+    a bucket are added in binary-split pieces, and the bitsets before each
+    piece are kept to walk the chosen total back to bucket counts.
+
+    Args:
+        pool: Monsters to draw from.
+        xp_budget: Target adjusted XP.
+        party_size: Number of characters (affects the multiplier).
+        avg_party_level: Average party level, for the CR range.
+        max_monsters: At most this many monsters.
+        max_copies: At most this many copies of one stat block.
+        max_per_cr: At most this many monsters of one CR.
+
+    Returns:
+        Selected monsters, strongest first; empty when no monster fits.
+    """
+    buckets = pool.candidates(avg_party_level)
+    if not buckets or xp_budget <= 0 or max_monsters < 1:
+        return []
+    rng = active_stream() or random
+    buckets = list(buckets)
+    rng.shuffle(buckets)  # which of several equally good mixes gets found
+
+    unit = math.gcd(*(b.xp for b in buckets))
+    mask = (1 << ((2 * xp_budget + max(b.xp for b in buckets)) // unit + 1)) - 1
+    reach = [1] + [0] * max_monsters
+    pieces: list[tuple[int, int, list[int]]] = []
+    for index, bucket in enumerate(buckets):
+        limit = max_monsters
+        if max_copies is not None:
+            limit = min(limit, max_copies * len(bucket.monsters))
+        if max_per_cr is not None:
+            limit = min(limit, max_per_cr)
+        step = bucket.xp // unit
+        for copies in _binary_split(limit):
+            pieces.append((index, copies, reach))
+            grown = reach.copy()
+            for k in range(max_monsters - copies + 1):
+                if reach[k]:
+                    grown[k + copies] |= (reach[k] << (copies * step)) & mask
+            reach = grown
+
+    best: list[tuple[int, int]] = []
+    best_error = math.inf
+    for k in range(1, max_monsters + 1):
+        if not reach[k]:
+            continue
+        multiplier = get_encounter_multiplier(k, party_size)
+        for total in _nearest_bits(reach[k], round(xp_budget / (multiplier * unit))):
+            error = abs(int(total * unit * multiplier) - xp_budget)
+            if error < best_error:
+                best, best_error = [(k, total)], error
+            elif error == best_error:
+                best.append((k, total))
+    if not best:
+        return []
+
+    k, total = rng.choice(best)
+    counts = [0] * len(buckets)
+    for index, copies, before in reversed(pieces):
+        if (before[k] >> total) & 1:
+            continue
+        counts[index] += copies
+        k -= copies
+        total -= copies * (buckets[index].xp // unit)
+
+    selected: list[dict[str, Any]] = []
+    for bucket, count in sorted(zip(buckets, counts, strict=True), key=lambda bc: -bc[0].xp):
+        if not count:
+            continue
+        per_monster = count if max_copies is None else max_copies
+        for monster in _sample(rng, bucket.monsters, -(-count // per_monster)):
+            take = min(count, per_monster)
+            selected.extend([monster] * take)
+            count -= take
+    return selected
+
+
+def _sample(rng: Any, monsters: tuple[dict[str, Any], ...], n: int) -> list[dict[str, Any]]:  # noqa: ANN401
+    """*n* distinct monsters drawn without shuffling the whole bucket."""
+    chosen: dict[int, dict[str, Any]] = {}
+    while len(chosen) < n:
+        index = rng.randint(0, len(monsters) - 1)
+        chosen.setdefault(index, monsters[index])
+    return list(chosen.values())
+
+
+@recorded("encounters.generate_balanced_encounter")
 def generate_balanced_encounter(
     party_levels: list[int],
     difficulty: str = "medium",
     location: str = "dungeon",
     available_monsters: list[dict[str, Any]] | None = None,
+    max_monsters: int = DEFAULT_MAX_MONSTERS,
+    max_copies: int | None = None,
+    max_per_cr: int | None = None,
+    party: list[dict[str, Any]] | None = None,
+    simulation_trials: int = DEFAULT_SIMULATION_TRIALS,
 ) -> dict[str, Any]:
     """Generate a balanced encounter for a party.
 
-    Selects monsters from ``available_monsters`` (or loads the SRD monsters if
-    not provided) until the adjusted XP reaches (but does not greatly exceed)
-    the requested difficulty budget.
+    Selects monsters from ``available_monsters`` (or the SRD monsters if not
+    provided) whose adjusted XP comes closest to the requested difficulty
+    budget; see :func:`build_encounter`. Given the *party* itself, several
+    such mixes are played out with :mod:`app.encounter_simulator` and the
+    one whose simulated win rate best matches the difficulty is kept.
 
     Args:
         party_levels: List of character levels.
@@ -293,6 +486,13 @@ def generate_balanced_encounter(
         location: Location hint for thematic monster selection.
         available_monsters: Optional list of monster dicts to draw from.  If
             omitted the SRD monster list is loaded automatically.
+        max_monsters: At most this many monsters.
+        max_copies: At most this many copies of one stat block.
+        max_per_cr: At most this many monsters of one CR.
+        party: Optional game contexts of the characters (as built by
+            :func:`app.services.game_context_service.build_game_context`)
+            to refine the choice by simulation.
+        simulation_trials: Fights simulated per candidate encounter.
 
     Returns:
         Dict with keys:
@@ -303,22 +503,51 @@ def generate_balanced_encounter(
             - ``raw_xp``: Total raw (award) XP.
             - ``xp_per_character``: XP each character earns.
             - ``party_size``: Party size.
+            - ``simulation``: Simulated outcome of the chosen monsters (only
+              when *party* is given).
     """
+    pool = _location_pool(available_monsters, location)
+    return _generate(
+        pool,
+        party_levels,
+        difficulty,
+        max_monsters,
+        max_copies,
+        max_per_cr,
+        party,
+        simulation_trials,
+    )
+
+
+def _location_pool(
+    available_monsters: list[dict[str, Any]] | None, location: str
+) -> MonsterPool:
+    """The pool for *location*: cached for the SRD, built for a custom list."""
+    if available_monsters is not None:
+        return MonsterPool(_filter_monsters_for_location(available_monsters, location))
+    try:
+        return _srd_pool(location.lower())
+    except Exception:
+        return MonsterPool([])
+
+
+def _generate(
+    pool: MonsterPool,
+    party_levels: list[int],
+    difficulty: str,
+    max_monsters: int = DEFAULT_MAX_MONSTERS,
+    max_copies: int | None = None,
+    max_per_cr: int | None = None,
+    party: list[dict[str, Any]] | None = None,
+    simulation_trials: int = DEFAULT_SIMULATION_TRIALS,
+) -> dict[str, Any]:
+    """:func:`generate_balanced_encounter` on an already built pool."""
     if not party_levels:
         party_levels = [1]
 
     difficulty = difficulty.lower()
     party_size = len(party_levels)
-
-    # Load monster pool
-    if available_monsters is None:
-        try:
-            from app.srd_data import load_monsters
-
-            available_monsters = load_monsters()
-        except Exception:
-            available_monsters = []
-
+    available_monsters = pool.monsters
     if not available_monsters:
         return {
             "monsters": [],
@@ -330,62 +559,30 @@ def generate_balanced_encounter(
             "party_size": party_size,
         }
 
-    # Determine target XP budget
     xp_budget = get_party_xp_budget(party_levels, difficulty)
-
-    # Filter monsters to those thematically appropriate for the location
-    location_pool = _filter_monsters_for_location(available_monsters, location)
-    if not location_pool:
-        location_pool = available_monsters
-
-    # Build encounter iteratively
-    selected: list[dict[str, Any]] = []
-    remaining_budget = xp_budget
-
     avg_level = sum(party_levels) / len(party_levels)
-
-    # Sort by CR closeness to party level so better-matched monsters are
-    # selected first, then shuffle within equal-distance groups for variety.
-    pool = list(location_pool)
-    random.shuffle(pool)  # noqa: S311  # game randomness — no crypto requirement
-    pool.sort(
-        key=lambda m: abs((_cr_as_float(str(m.get("cr", "0"))) or 0) - avg_level)
+    selected = build_encounter(
+        pool, xp_budget, party_size, avg_level, max_monsters, max_copies, max_per_cr
     )
-
-    for monster in pool:
-        monster_xp = monster.get("xp") or cr_to_xp(str(monster.get("cr", "0")))
-        if monster_xp <= 0:
-            continue
-
-        # Rough CR appropriateness check: avoid monsters far out of level range
-        if not _is_cr_appropriate(monster.get("cr", "0"), avg_level):
-            continue
-
-        # Tentatively add this monster and check the adjusted budget
-        tentative = selected + [monster]
-        info = calculate_encounter_xp(tentative, party_size)
-        # Allow up to 50% over target budget when building the encounter
-        if info["adjusted_xp"] <= xp_budget * 1.5:
-            selected.append(monster)
-            remaining_budget -= monster_xp
-            if info["adjusted_xp"] >= xp_budget * 0.8:
-                # Good enough — stop adding
-                break
+    simulation = None
+    if selected and party:
+        alternatives = [
+            build_encounter(pool, xp_budget, party_size, avg_level, max_monsters, max_copies, max_per_cr)
+            for _ in range(REFINE_CANDIDATES - 1)
+        ]
+        selected, simulation = _refine([selected, *alternatives], party, difficulty, simulation_trials)
 
     if not selected:
         # Last resort: pick the single weakest monster from the full pool
-        sorted_pool = sorted(
-            available_monsters,
-            key=lambda m: m.get("xp") or cr_to_xp(str(m.get("cr", "0"))),
-        )
-        if sorted_pool:
-            selected = [sorted_pool[0]]
+        selected = [
+            min(available_monsters, key=lambda m: m.get("xp") or cr_to_xp(str(m.get("cr", "0"))))
+        ]
 
     actual_difficulty = get_encounter_difficulty(party_levels, selected)
     xp_info = calculate_encounter_xp(selected, party_size)
     award_info = calculate_xp_award(selected, party_size)
 
-    return {
+    result = {
         "monsters": selected,
         "difficulty": actual_difficulty,
         "xp_budget": xp_budget,
@@ -394,6 +591,142 @@ def generate_balanced_encounter(
         "xp_per_character": award_info["xp_per_character"],
         "party_size": party_size,
     }
+    if simulation is not None:
+        result["simulation"] = simulation
+    return result
+
+
+def _refine(
+    candidates: list[list[dict[str, Any]]],
+    party: list[dict[str, Any]],
+    difficulty: str,
+    trials: int,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """The candidate whose simulated win rate is nearest the difficulty's target."""
+    from app.encounter_simulator import Combatant, simulate_encounter
+
+    characters = [Combatant.from_context(member) for member in party]
+    target = SIMULATED_WIN_TARGETS.get(difficulty, SIMULATED_WIN_TARGETS["medium"])
+    unique = {tuple(m.get("id") or m.get("name") for m in c): c for c in candidates}
+    best: tuple[float, list[dict[str, Any]], dict[str, Any]] | None = None
+    for monsters in unique.values():
+        outcome = simulate_encounter(characters, [Combatant.from_monster(m) for m in monsters], trials)
+        miss = abs(outcome.win_probability - target)
+        if best is None or miss < best[0]:
+            best = (miss, monsters, outcome.as_dict())
+    return best[1], best[2]
+
+
+# ---------------------------------------------------------------------------
+# Batch generation
+# ---------------------------------------------------------------------------
+
+# Specs per batch call
+MAX_BATCH_SPECS = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class EncounterSpec:
+    """One party to generate an encounter for in :func:`generate_encounters`."""
+
+    party_levels: tuple[int, ...]
+    difficulty: str = "medium"
+    location: str = "dungeon"
+    max_monsters: int = DEFAULT_MAX_MONSTERS
+    max_copies: int | None = None
+    max_per_cr: int | None = None
+
+
+def _generate_chunk(
+    specs: list[EncounterSpec],
+    available_monsters: list[dict[str, Any]] | None,
+    seed: int | None = None,
+) -> list[dict[str, Any]]:
+    """Generate *specs* in order, building each location's pool once."""
+    pools: dict[str, MonsterPool] = {}
+    results = []
+    with use_stream(RollStream(seed) if seed is not None else active_stream()):
+        for spec in specs:
+            started = time.perf_counter()
+            location = spec.location.lower()
+            pool = pools.get(location)
+            if pool is None:
+                pool = pools[location] = _location_pool(available_monsters, location)
+            args = (
+                list(spec.party_levels),
+                spec.difficulty,
+                spec.location,
+                available_monsters,
+                spec.max_monsters,
+                spec.max_copies,
+                spec.max_per_cr,
+            )
+            # Journaled as the single-encounter call it is equivalent to
+            result = record_call(
+                "encounters.generate_balanced_encounter",
+                args,
+                {},
+                lambda spec=spec, pool=pool: _generate(
+                    pool,
+                    list(spec.party_levels),
+                    spec.difficulty,
+                    spec.max_monsters,
+                    spec.max_copies,
+                    spec.max_per_cr,
+                ),
+            )
+            result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+            results.append(result)
+    return results
+
+
+def generate_encounters(
+    specs: Sequence[EncounterSpec | dict[str, Any]],
+    available_monsters: list[dict[str, Any]] | None = None,
+    workers: int = 0,
+) -> list[dict[str, Any]]:
+    """Generate encounters for many parties in one call.
+
+    Specs that share a location share one :class:`MonsterPool` (location
+    filter and CR buckets built once), so a batch costs one pool build per
+    location plus one knapsack per spec.
+
+    Args:
+        specs: Parties to generate for (:class:`EncounterSpec` or its fields
+            as a dict).
+        available_monsters: Monsters to draw from; the SRD by default.
+        workers: Split the specs across this many worker processes; 0 or 1
+            generates in this process. Each worker gets a seed drawn from
+            the active stream, so campaign batches stay reproducible for a
+            given worker count.
+
+    Returns:
+        One :func:`generate_balanced_encounter` result per spec, in input
+        order, each with ``elapsed_ms`` added.
+
+    Raises:
+        ValueError: More than :data:`MAX_BATCH_SPECS` specs.
+    """
+    if len(specs) > MAX_BATCH_SPECS:
+        raise ValueError(f"At most {MAX_BATCH_SPECS} encounters per batch")
+    normalized = [
+        s if isinstance(s, EncounterSpec) else EncounterSpec(**{**s, "party_levels": tuple(s["party_levels"])})
+        for s in specs
+    ]
+    if workers <= 1 or len(normalized) < 2:
+        return _generate_chunk(normalized, available_monsters)
+
+    workers = min(workers, len(normalized))
+    size = -(-len(normalized) // workers)
+    chunks = [normalized[i : i + size] for i in range(0, len(normalized), size)]
+    rng = active_stream() or random
+    seeds = [rng.randint(0, 2**63 - 1) for _ in chunks]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [
+            executor.submit(_generate_chunk, chunk, available_monsters, seed)
+            for chunk, seed in zip(chunks, seeds, strict=True)
+        ]
+        return [result for future in futures for result in future.result()]
 
 
 # ---------------------------------------------------------------------------
@@ -473,8 +806,13 @@ def _is_cr_appropriate(cr: str, avg_party_level: float) -> bool:
     if cr_float is None:
         return True  # Unknown CR — don't exclude
 
+    lower, upper = _cr_bounds(avg_party_level)
+    return lower <= cr_float <= upper
+
+
+def _cr_bounds(avg_party_level: float) -> tuple[float, float]:
+    """The (lowest, highest) CR suitable for a party of the given average level."""
     upper = avg_party_level + 3
     # Lower bound: at least 1/4 of the average party level (minimum 0)
     lower = max(0.0, avg_party_level / 4)
-
-    return lower <= cr_float <= upper
+    return lower, upper
@@ -0,0 +1,393 @@
+"""
+Process-local read-through cache for character and campaign rows.
+
+A single ``/game/input`` turn reads the same character and campaign several
+times (the scribe lookup, game-context building, auto-save).  This module
+keeps recently used rows in memory so repeated reads within a turn, and
+across consecutive turns, skip the database.
+
+Entries are evicted least-recently-used once the cache is full and expire
+after a TTL.  Every write path in this process calls
+:meth:`EntityCache.invalidate`, which also bumps a per-key generation number:
+a load that started before the write sees the bump and does not store its
+now-stale result.  Writes from other workers or direct SQL never reach those
+hooks, so a hit may be checked against the row's version stamp
+(``characters.version`` / ``campaigns.updated_at``) with a one-column query
+before it is served.  Inside a unit of work (a ``/game/input`` turn) that
+probe is skipped for entries loaded or checked less than
+``revalidate_seconds`` ago, or already loaded or checked in the same unit of
+work; the invalidation hooks cover this process's writes and the short
+window bounds how long another worker's write can go unseen.  Outside a unit
+of work every hit is checked.
+"""
+
+from __future__ import annotations
+
+import copy
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from threading import Lock
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import UnitOfWork, current_unit_of_work, run_in_session
+from app.models.db_models import Campaign, Character
+
+
+class EntityCache:
+    """Thread-safe LRU cache with TTL expiry and hit/miss counters.
+
+    With *copy_values* (the default) values are deep-copied on the way in and
+    out so callers can mutate what they get back (as the inventory routes do)
+    without corrupting the cache.  Without it the cached object itself is
+    returned and callers must treat it as read-only.
+
+    Args:
+        name: Label used in logs and stats.
+        max_entries: Maximum number of cached entities; 0 disables caching.
+        ttl_seconds: Seconds an entry stays valid; 0 means no expiry.
+        revalidate_seconds: Inside a unit of work, hits on entries loaded or
+            checked more recently than this skip the version probe.
+        copy_values: Deep-copy values on the way in and out.
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        revalidate_seconds: float = 30.0,
+        copy_values: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.revalidate_seconds = revalidate_seconds
+        self.copy_values = copy_values
+        self._clock = clock
+        # key -> (expires_at, version, value, checked_at)
+        self._entries: OrderedDict[str, tuple[float, Any, Any, float]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        # Keys loaded or checked in each active unit of work
+        self._checked: WeakKeyDictionary[UnitOfWork, set[str]] = WeakKeyDictionary()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Any:  # noqa: ANN401
+        """Return a copy of the cached value for *key*, or None on a miss."""
+        entry = self._lookup(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry[1]
+
+    def put(
+        self,
+        key: str,
+        value: Any,  # noqa: ANN401
+        version: Any = None,  # noqa: ANN401
+        generation: int | None = None,
+    ) -> bool:
+        """Store *value* for *key*.
+
+        Args:
+            key: Entity id.
+            value: Value to cache (a copy is stored).
+            version: Version stamp of the loaded row (e.g. ``updated_at``);
+                :meth:`get_or_load` compares it with the current one on a hit.
+            generation: Result of :meth:`generation` taken before the value
+                was loaded. If the key has been invalidated since, the value
+                is stale and is not stored.
+
+        Returns:
+            True if the value was stored.
+        """
+        if self.max_entries <= 0:
+            return False
+        with self._lock:
+            if generation is not None and self._generations.get(key, 0) != generation:
+                return False
+            now = self._clock()
+            expires_at = now + self.ttl_seconds if self.ttl_seconds > 0 else float("inf")
+            self._entries[key] = (expires_at, version, self._copy(value), now)
+            self._entries.move_to_end(key)
+            self._mark_checked(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return True
+
+    def generation(self, key: str) -> int:
+        """Return the invalidation generation for *key*."""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def invalidate(self, key: str) -> None:
+        """Drop *key* and mark any in-flight load of it as stale."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.stale = 0
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[tuple[Any, Any] | None]],
+        version_loader: Callable[[], Awaitable[Any]] | None = None,
+    ) -> Any:  # noqa: ANN401
+        """Return the cached value for *key*, loading it on a miss.
+
+        Args:
+            key: Entity id.
+            loader: Coroutine function returning ``(value, version)`` or None
+                when the entity does not exist. Missing entities are not
+                cached.
+            version_loader: Optional coroutine function returning the row's
+                current version stamp (None if the row is gone). A hit whose
+                stored version differs is dropped and reloaded; inside a unit
+                of work recently checked entries skip it (see the module
+                docstring).
+        """
+        generation = self.generation(key)
+        entry = self._lookup(key)
+        if entry is not None and version_loader is not None and not self._trusted(key, entry):
+            if await version_loader() == entry[0]:
+                self._touch(key, entry[0])
+            else:
+                self._discard_stale(key, entry[0])
+                entry = None
+        with self._lock:
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        loaded = await loader()
+        if loaded is None:
+            return None
+        value, version = loaded
+        self.put(key, value, version=version, generation=generation)
+        return value
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stale": self.stale,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _copy(self, value: Any) -> Any:  # noqa: ANN401
+        return copy.deepcopy(value) if self.copy_values else value
+
+    def _lookup(self, key: str) -> tuple[Any, Any, float] | None:
+        """Return ``(version, value, checked_at)`` for a live entry, without counting."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], self._copy(entry[2]), entry[3]
+
+    def _trusted(self, key: str, entry: tuple[Any, Any, float]) -> bool:
+        """Return True if a hit on *entry* may skip the version probe."""
+        uow = current_unit_of_work()
+        if uow is None:
+            return False
+        with self._lock:
+            if key in self._checked.get(uow, ()):
+                return True
+        return self._clock() - entry[2] < self.revalidate_seconds
+
+    def _touch(self, key: str, version: Any) -> None:  # noqa: ANN401
+        """Record that *key* still holds *version* as of now."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == version:
+                self._entries[key] = (entry[0], entry[1], entry[2], self._clock())
+            self._mark_checked(key)
+
+    def _mark_checked(self, key: str) -> None:
+        """Trust *key* for the rest of the active unit of work (lock held)."""
+        uow = current_unit_of_work()
+        if uow is not None:
+            self._checked.setdefault(uow, set()).add(key)
+
+    def _discard_stale(self, key: str, version: Any) -> None:  # noqa: ANN401
+        """Drop *key* if it still holds *version* (a newer put may have landed)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == version:
+                del self._entries[key]
+            self.stale += 1
+
+    def _is_expired(self, entry: tuple[float, Any, Any, float]) -> bool:
+        """Return True if *entry* has outlived its TTL (lock held)."""
+        return self._clock() >= entry[0]
+
+
+# ---------------------------------------------------------------------------
+# Singletons – sized from config on first use
+# ---------------------------------------------------------------------------
+_character_cache: EntityCache | None = None
+_campaign_cache: EntityCache | None = None
+
+
+def _new_cache(name: str, copy_values: bool = True) -> EntityCache:
+    from app.config import get_settings
+
+    cfg = get_settings()
+    return EntityCache(
+        name,
+        max_entries=cfg.entity_cache_max_entries,
+        ttl_seconds=cfg.entity_cache_ttl_seconds,
+        revalidate_seconds=cfg.entity_cache_revalidate_seconds,
+        copy_values=copy_values,
+    )
+
+
+def get_character_cache() -> EntityCache:
+    """Return the singleton character cache, creating it on first call."""
+    global _character_cache
+    if _character_cache is None:
+        _character_cache = _new_cache("characters")
+    return _character_cache
+
+
+def get_campaign_cache() -> EntityCache:
+    """Return the singleton campaign cache, creating it on first call.
+
+    Campaigns are cached as validated models and handed out without a copy:
+    deep-copying one with a long session log costs more than loading it.
+    """
+    global _campaign_cache
+    if _campaign_cache is None:
+        _campaign_cache = _new_cache("campaigns", copy_values=False)
+    return _campaign_cache
+
+
+def _invalidate(cache: EntityCache, key: str) -> None:
+    """Invalidate *key* now and again when the active unit of work ends.
+
+    Inside a unit of work the write is not visible to other sessions until
+    the final commit, so a concurrent load can still cache the old row; and
+    a read later in the same unit of work can cache a write that is then
+    rolled back. Invalidating once more at the end covers both.
+    """
+    cache.invalidate(key)
+    uow = current_unit_of_work()
+    if uow is not None:
+        uow.after_commit(lambda: cache.invalidate(key))
+        uow.after_rollback(lambda: cache.invalidate(key))
+
+
+def invalidate_character(character_id: str) -> None:
+    """Invalidation hook for every write to a character row."""
+    _invalidate(get_character_cache(), character_id)
+
+
+def invalidate_campaign(campaign_id: str) -> None:
+    """Invalidation hook for every write to a campaign row."""
+    _invalidate(get_campaign_cache(), campaign_id)
+
+
+def clear_entity_caches() -> None:
+    """Empty both caches (used by tests and after bulk restores)."""
+    get_character_cache().clear()
+    get_campaign_cache().clear()
+
+
+def get_entity_cache_stats() -> dict[str, dict[str, Any]]:
+    """Return stats for both caches, keyed by cache name."""
+    return {
+        "characters": get_character_cache().stats(),
+        "campaigns": get_campaign_cache().stats(),
+    }
+
+
+def _character_version(db: Session, character_id: str) -> int | None:
+    """Return the current ``characters.version`` for *character_id*."""
+    return db.execute(
+        select(Character.version).where(Character.id == character_id)
+    ).scalar_one_or_none()
+
+
+def _campaign_version(db: Session, campaign_id: str) -> datetime | None:
+    """Return the current ``campaigns.updated_at`` for *campaign_id*."""
+    return db.execute(
+        select(Campaign.updated_at).where(Campaign.id == campaign_id)
+    ).scalar_one_or_none()
+
+
+async def load_character_data(character_id: str) -> dict[str, Any] | None:
+    """Return a character's sheet through the cache, or None if not found."""
+
+    def _load(db: Session) -> tuple[dict[str, Any], int] | None:
+        row = db.get(Character, character_id)
+        if row is None or row.data is None:
+            return None
+        data = dict(row.data)
+        data.setdefault("id", row.id)
+        data.setdefault("name", row.name)
+        return data, row.version
+
+    return await get_character_cache().get_or_load(
+        character_id,
+        lambda: run_in_session(_load),
+        version_loader=lambda: run_in_session(_character_version, character_id),
+    )
+
+
+async def load_campaign(
+    campaign_id: str, loader: Callable[[Session], tuple[Any, datetime] | None]
+) -> Any:  # noqa: ANN401
+    """Return a campaign through the cache, or None if not found.
+
+    Args:
+        campaign_id: Campaign id.
+        loader: Sync function ``loader(db)`` returning ``(value, updated_at)``
+            for the row, or None when it does not exist.
+    """
+    return await get_campaign_cache().get_or_load(
+        campaign_id,
+        lambda: run_in_session(loader),
+        version_loader=lambda: run_in_session(_campaign_version, campaign_id),
+    )
@@ -0,0 +1,281 @@
+"""
+Initiative Tracker - turn order for large, changing fights.
+
+:func:`app.rules_engine.roll_initiative` sorts a list once and
+:func:`app.rules_engine.remove_combatant` rebuilds it, which is fine for a
+party against a handful of monsters. :class:`InitiativeTracker` keeps the
+order in a sorted container keyed by ``(initiative, dex_modifier,
+tie_break)``, so summons and reinforcements join and the fallen leave in
+O(log n) without re-sorting anyone.
+
+The active combatant is tracked by its sort key rather than its index, so
+the turn stays with the same combatant whatever is added or removed around
+it. :meth:`InitiativeTracker.advance` wraps rounds exactly like
+:func:`app.rules_engine.advance_turn`, and removals follow the index rules
+of :func:`app.rules_engine.remove_combatant`.
+
+Two variant actions are supported. A delayed combatant steps out of the
+order (:meth:`~InitiativeTracker.delay`) and later acts immediately before
+whoever is active, taking that initiative from then on
+(:meth:`~InitiativeTracker.resume`). A readied action
+(:meth:`~InitiativeTracker.ready`) keeps its owner's place and lapses when
+the owner's next turn starts.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Hashable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from sortedcontainers import SortedList
+
+# (-initiative, -dex_modifier, -tie_break, serial): ascending order is turn order
+_SortKey = tuple[int, int, float, float]
+
+
+@dataclass(slots=True)
+class _Slot:
+    initiative: int
+    dex_modifier: int
+    tie_break: float
+    sort_key: _SortKey
+
+
+class InitiativeTracker:
+    """Turn order over hashable combatant ids, highest initiative first.
+
+    Ties in initiative go to the higher DEX modifier, then to the higher
+    ``tie_break`` (a roll-off or DEX score, if the table uses one), then to
+    whoever joined first.
+    """
+
+    def __init__(self, current_round: int = 1) -> None:
+        self.round = current_round
+        self._order = SortedList()
+        self._slots: dict[Hashable, _Slot] = {}
+        self._ids: dict[_SortKey, Hashable] = {}
+        self._serial = itertools.count()
+        self._active: _SortKey | None = None
+        self.delayed: dict[Hashable, _Slot] = {}
+        self.readied: dict[Hashable, Any] = {}
+
+    @classmethod
+    def from_entries(
+        cls,
+        entries: Iterable[dict[str, Any]],
+        current_turn: int = 0,
+        current_round: int = 1,
+        id_field: str = "id",
+    ) -> InitiativeTracker:
+        """Build a tracker from an ``initiative_order`` list.
+
+        The combatant at index *current_turn* of *entries* is made active,
+        even if ties sort the entries differently.
+        """
+        tracker = cls(current_round)
+        entries = list(entries)
+        for entry in entries:
+            tracker.add(
+                entry[id_field],
+                int(entry.get("initiative", 0)),
+                int(entry.get("dex_modifier", 0)),
+                entry.get("tie_break", 0),
+            )
+        if 0 <= current_turn < len(entries):
+            tracker._active = tracker._slots[entries[current_turn][id_field]].sort_key
+        return tracker
+
+    # -- queries ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, combatant_id: Hashable) -> bool:
+        return combatant_id in self._slots
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return (self._ids[key] for key in self._order)
+
+    def order(self) -> list[Hashable]:
+        """Combatant ids in turn order."""
+        return list(self)
+
+    @property
+    def active(self) -> Hashable | None:
+        """The combatant whose turn it is, or None if the order is empty."""
+        return self._ids[self._active] if self._active is not None else None
+
+    @property
+    def current_turn(self) -> int:
+        """Index of the active combatant in :meth:`order` (0 when empty)."""
+        return self._order.index(self._active) if self._active is not None else 0
+
+    def initiative(self, combatant_id: Hashable) -> int:
+        """The combatant's current initiative (changed by :meth:`resume`)."""
+        slot = self._slots.get(combatant_id) or self.delayed[combatant_id]
+        return slot.initiative
+
+    # -- mutations ----------------------------------------------------------
+
+    def add(
+        self,
+        combatant_id: Hashable,
+        initiative: int,
+        dex_modifier: int = 0,
+        tie_break: float = 0,
+        delayed: bool = False,
+    ) -> None:
+        """Insert a combatant in initiative order.
+
+        The first combatant added becomes active; later arrivals never take
+        the turn from the active combatant. With *delayed* set the combatant
+        goes straight to the delayed list (restoring a saved combat).
+
+        Raises:
+            ValueError: The combatant is already in the order or delayed.
+        """
+        if combatant_id in self._slots or combatant_id in self.delayed:
+            raise ValueError(f"{combatant_id!r} is already tracked")
+        key = (-initiative, -dex_modifier, -tie_break, next(self._serial))
+        slot = _Slot(initiative, dex_modifier, tie_break, key)
+        if delayed:
+            self.delayed[combatant_id] = slot
+        else:
+            self._insert(combatant_id, slot)
+
+    def remove(self, combatant_id: Hashable) -> bool:
+        """Take a combatant out of the order (or off the delayed list).
+
+        If it was their turn, the next combatant becomes active, wrapping to
+        the top of the order without starting a new round, as
+        :func:`app.rules_engine.remove_combatant` does.
+
+        Returns:
+            False if the combatant was not tracked.
+        """
+        self.readied.pop(combatant_id, None)
+        if self.delayed.pop(combatant_id, None) is not None:
+            return True
+        slot = self._slots.pop(combatant_id, None)
+        if slot is None:
+            return False
+        if slot.sort_key == self._active:
+            self._active, _ = self._successor(slot.sort_key)
+        self._order.remove(slot.sort_key)
+        del self._ids[slot.sort_key]
+        if self._active == slot.sort_key:
+            self._active = self._order[0] if self._order else None
+        return True
+
+    def advance(self) -> dict[str, Any]:
+        """Pass the turn to the next combatant.
+
+        Returns:
+            ``current_turn``, ``current_round`` and ``round_advanced`` as from
+            :func:`app.rules_engine.advance_turn`, plus ``active``.
+
+        Raises:
+            ValueError: The order is empty.
+        """
+        if self._active is None:
+            raise ValueError("turn_order must not be empty")
+        following, round_advanced = self._successor(self._active)
+        if round_advanced:
+            self.round += 1
+        self._active = following
+        active = self._ids[following]
+        # A readied action lapses when its owner's next turn starts
+        self.readied.pop(active, None)
+        return {
+            "current_turn": self.current_turn,
+            "current_round": self.round,
+            "round_advanced": round_advanced,
+            "active": active,
+        }
+
+    def delay(self, combatant_id: Hashable | None = None) -> dict[str, Any]:
+        """Hold the active combatant's turn and pass to the next combatant.
+
+        Args:
+            combatant_id: Must be the active combatant if given.
+
+        Returns:
+            As :meth:`advance`.
+
+        Raises:
+            ValueError: The order is empty or it is not *combatant_id*'s turn.
+        """
+        active = self.active
+        if active is None or (combatant_id is not None and combatant_id != active):
+            raise ValueError(f"Only the active combatant can delay (active: {active!r})")
+        slot = self._slots[active]
+        result = self.advance() if len(self._order) > 1 else None
+        self._slots.pop(active)
+        self._order.remove(slot.sort_key)
+        del self._ids[slot.sort_key]
+        self.delayed[active] = slot
+        if result is None:
+            self._active = None
+            return {"current_turn": 0, "current_round": self.round, "round_advanced": False, "active": None}
+        result["current_turn"] = self.current_turn
+        return result
+
+    def resume(self, combatant_id: Hashable) -> None:
+        """Bring a delayed combatant back to act now.
+
+        They slot in immediately before the active combatant, take that
+        initiative and become active; advancing afterwards returns the turn
+        to whoever they interrupted.
+
+        Raises:
+            KeyError: The combatant is not delayed.
+        """
+        slot = self.delayed.pop(combatant_id)
+        if self._active is None:
+            self._insert(combatant_id, slot)
+            return
+        interrupted = self._slots[self._ids[self._active]]
+        position = self._order.index(self._active)
+        serial = self._active[3] - 1
+        if position:
+            previous = self._order[position - 1]
+            if previous[:3] == self._active[:3]:
+                serial = (previous[3] + self._active[3]) / 2
+        slot.initiative = interrupted.initiative
+        slot.dex_modifier = interrupted.dex_modifier
+        slot.tie_break = interrupted.tie_break
+        slot.sort_key = (*self._active[:3], serial)
+        self._insert(combatant_id, slot)
+        self._active = slot.sort_key
+
+    def ready(self, combatant_id: Hashable, action: Any = True) -> None:  # noqa: ANN401
+        """Record a readied action; it lapses at the combatant's next turn.
+
+        Raises:
+            KeyError: The combatant is not in the order.
+        """
+        if combatant_id not in self._slots:
+            raise KeyError(combatant_id)
+        self.readied[combatant_id] = action
+
+    def trigger(self, combatant_id: Hashable) -> Any:  # noqa: ANN401
+        """Use a readied action, returning it (None if nothing was readied)."""
+        return self.readied.pop(combatant_id, None)
+
+    # -- internals ----------------------------------------------------------
+
+    def _insert(self, combatant_id: Hashable, slot: _Slot) -> None:
+        self._slots[combatant_id] = slot
+        self._ids[slot.sort_key] = combatant_id
+        self._order.add(slot.sort_key)
+        if self._active is None:
+            self._active = slot.sort_key
+
+    def _successor(self, key: _SortKey) -> tuple[_SortKey, bool]:
+        """The key after *key* in turn order, and whether that wrapped to the top."""
+        index = self._order.bisect_right(key)
+        if index < len(self._order):
+            return self._order[index], False
+        return self._order[0], True
@@ -2,6 +2,7 @@
 Main FastAPI application to serve the AI Dungeon Master backend.
 """
 
+import gc
 import logging
 import os
 import sys
@@ -29,6 +30,8 @@ from app.api.routes.realtime import router as realtime_router
 from app.config import init_settings
 from app.middleware.prompt_shield_middleware import PromptShieldMiddleware
 from app.services.campaign_service import campaign_service
+from app.srd_data import warm_srd_data
+from app.srd_search import get_srd_search_index
 
 # Load environment variables
 load_dotenv()
@@ -53,6 +56,14 @@ configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# Load the SRD tables and search index at import time so a server that imports the app before
+# forking workers (e.g. gunicorn --preload) shares them copy-on-write, and
+# move them out of the collector's reach so GC passes in the workers do not
+# touch (and copy) those pages.
+warm_srd_data()
+get_srd_search_index()
+gc.freeze()
+
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Add security headers to all responses.
@@ -89,13 +100,28 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     run_migrations()
 
     logger.info("Creating default campaign templates...")
-    campaign_service.create_template_campaigns()
+    await campaign_service.create_template_campaigns()
+
+    logger.info("SRD data ready (%s)", warm_srd_data())
+    logger.info("SRD search index ready (%d records)", len(get_srd_search_index()))
 
     logger.info("Application startup complete.")
 
     yield
 
-    # Shutdown — clean up SDK agents created during this process
+    # Shutdown — write coalesced auto-saves still waiting for their window
+    logger.info("Flushing pending auto-saves...")
+    from app.auto_save import flush_pending_auto_saves
+
+    await flush_pending_auto_saves()
+
+    # ...and live combat events not yet checkpointed to combat_states
+    logger.info("Checkpointing live combats...")
+    from app.combat_engine import get_combat_engine
+
+    await get_combat_engine().flush(checkpoint_pending=True)
+
+    # Clean up SDK agents created during this process
     logger.info("Cleaning up SDK agents...")
     from app.agent_client_setup import agent_client_manager
 
@@ -185,15 +211,10 @@ async def health_dependencies(request: Request) -> dict[str, str]:  # noqa: ARG0
     try:
         from sqlalchemy import text
 
-        from app.database import get_session_local
+        from app.database import run_in_session
 
-        session_factory = get_session_local()
-        db = session_factory()
-        try:
-            db.execute(text("SELECT 1"))
-            db_status = "healthy"
-        finally:
-            db.close()
+        await run_in_session(lambda db: db.execute(text("SELECT 1")))
+        db_status = "healthy"
     except Exception:
         db_status = "unavailable"
 
@@ -10,10 +10,13 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
+    literal_column,
 )
 
 from app.database import Base
@@ -31,6 +34,14 @@ class Character(Base):
     id = Column(String, primary_key=True, index=True)
     name = Column(String, nullable=False)
     data = Column(JSON, nullable=False)
+    # Bumped on every write; guards partial updates (see app/character_store.py)
+    version = Column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        onupdate=literal_column("version + 1"),
+    )
 
 
 class Campaign(Base):
@@ -55,6 +66,11 @@ class Campaign(Base):
     )
     data = Column(JSON, nullable=False)  # Full campaign data
 
+    # Keyset pagination for the campaign list walks (created_at, id)
+    __table_args__ = (
+        Index("ix_campaigns_created_at_id", "created_at", "id"),
+    )
+
 
 class NPC(Base):
     """NPC table for storing non-player character data."""
@@ -113,7 +129,51 @@ class SaveSlot(Base):
     interaction_count = Column(Integer, nullable=False, default=0)
     character_level = Column(Integer, nullable=False, default=1)
     current_location = Column(String, nullable=False, default="")
-    save_data = Column(JSON, nullable=False, default=dict)  # full state blob
+    save_data = Column(JSON, nullable=False, default=dict)  # legacy inline state blob
+    section_refs = Column(JSON, nullable=True)  # section name -> SaveSection.hash
+    summary = Column(JSON, nullable=True)  # precomputed get_save_summary output
+
+
+class SaveSection(Base):
+    """Compressed, content-addressed section of a save-slot state blob.
+
+    Identical sections shared by several save slots are stored once.
+    """
+
+    __tablename__ = "save_sections"
+
+    hash = Column(String(64), primary_key=True)  # sha256 of the canonical JSON
+    codec = Column(String, nullable=False, default="zlib")
+    raw_size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=_utcnow)
+    # Bumped by every save that reuses the section; pruning skips recent ones
+    referenced_at = Column(DateTime, nullable=False, default=_utcnow)
+
+
+class AutoSaveSnapshot(Base):
+    """Periodic auto-save snapshot of a campaign, newest rows kept per campaign."""
+
+    __tablename__ = "auto_save_snapshots"
+    __table_args__ = (
+        Index("ix_auto_save_snapshots_campaign_id_id", "campaign_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    campaign_id = Column(String, nullable=False)
+    interaction_count = Column(Integer, nullable=False)
+    data = Column(JSON, nullable=False)  # history, character stats, metadata
+    created_at = Column(DateTime, nullable=False, default=_utcnow)
+
+
+class InteractionCounter(Base):
+    """Per-campaign player interaction count driving the auto-save interval."""
+
+    __tablename__ = "interaction_counters"
+
+    campaign_id = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=_utcnow, onupdate=_utcnow)
 
 
 class Spell(Base):
@@ -216,11 +276,34 @@ class CombatState(Base):
     initiative_order = Column(JSON, nullable=False, default=list)
     participants = Column(JSON, nullable=False, default=list)
     environment = Column(String, nullable=False, default="standard")
+    # Legacy inline log; new actions are appended to ``combat_events`` instead
     combat_log = Column(JSON, nullable=False, default=list)
+    # Last combat_events.seq reflected in this header (see app/combat_engine.py)
+    checkpoint_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    # Timed effects pending at the checkpoint (see app/effect_scheduler.py)
+    effects = Column(JSON, nullable=False, default=list, server_default="[]")
     created_at = Column(DateTime, nullable=False, default=_utcnow)
     updated_at = Column(DateTime, nullable=False, default=_utcnow, onupdate=_utcnow)
 
 
+class CombatEvent(Base):
+    """Append-only combat log entry, one row per action."""
+
+    __tablename__ = "combat_events"
+    __table_args__ = (
+        UniqueConstraint("combat_id", "seq", name="uq_combat_event_seq"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    combat_id = Column(
+        String, ForeignKey("combat_states.id"), nullable=False, index=True
+    )
+    seq = Column(Integer, nullable=False)  # 1-based position within the combat
+    event_type = Column(String, nullable=False, default="action")
+    data = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=_utcnow)
+
+
 class ConversationThread(Base):
     """Persistent conversation thread for agent interactions."""
 
@@ -233,8 +316,28 @@ class ConversationThread(Base):
     session_id = Column(String, nullable=False, index=True)
     campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=True, index=True)
     agent_name = Column(String, nullable=False, default="DM")
+    # Legacy inline history; messages are now stored in ``conversation_messages``
     messages = Column(JSON, nullable=False, default=list)
+    message_count = Column(Integer, nullable=False, default=0)
     sdk_thread_id = Column(String, nullable=True)
     created_at = Column(DateTime, nullable=False, default=_utcnow)
     updated_at = Column(DateTime, nullable=False, default=_utcnow, onupdate=_utcnow)
 
+
+class ConversationMessage(Base):
+    """Single message in a conversation thread, appended in sequence order."""
+
+    __tablename__ = "conversation_messages"
+    __table_args__ = (
+        UniqueConstraint("thread_id", "seq", name="uq_conversation_message_seq"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    thread_id = Column(
+        String, ForeignKey("conversation_threads.id"), nullable=False, index=True
+    )
+    seq = Column(Integer, nullable=False)  # 1-based position within the thread
+    role = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=_utcnow)
+
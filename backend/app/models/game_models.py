@@ -445,9 +445,32 @@ class CloneCampaignRequest(BaseModel):
     new_name: str | None = None
 
 
+class CampaignSummary(BaseModel):
+    """Column-only projection of a campaign for list views."""
+
+    id: str
+    name: str
+    description: str | None = None
+    setting: str
+    tone: str = "heroic"
+    is_template: bool = False
+    is_custom: bool = True
+    template_id: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
 class CampaignListResponse(BaseModel):
-    campaigns: list[Campaign]
-    templates: list[Campaign]
+    campaigns: list[CampaignSummary]
+    templates: list[CampaignSummary]
+    next_cursor: str | None = None
+
+
+class CampaignSummaryPage(BaseModel):
+    """One keyset page of campaign summaries, newest first."""
+
+    campaigns: list[CampaignSummary]
+    next_cursor: str | None = None
 
 
 class AIAssistanceRequest(BaseModel):
@@ -564,6 +587,9 @@ class DiceRollRequest(BaseModel):
     notation: str = Field(
         default="1d20", description="D&D dice notation (e.g., '1d20', '2d6+3')"
     )
+    campaign_id: str | None = Field(
+        default=None, max_length=100, description="Roll from this campaign's stream"
+    )
 
 
 class ManualDiceRollRequest(BaseModel):
@@ -579,6 +605,175 @@ class ManualDiceRollRequest(BaseModel):
     )
 
 
+class DiceBatchItem(BaseModel):
+    """One expression in a batch roll, rolled ``count`` times."""
+
+    model_config = ConfigDict(extra="forbid")
+    notation: str = Field(description="D&D dice notation (e.g., '1d20+4', '40d6')")
+    count: int = Field(default=1, ge=1, le=1000, description="How many times to roll it")
+    label: str | None = Field(default=None, description="Caller's tag, echoed back")
+
+
+class DiceBatchRequest(BaseModel):
+    """Request model for rolling many dice expressions in one call."""
+
+    model_config = ConfigDict(extra="forbid")
+    rolls: list[DiceBatchItem] = Field(min_length=1, max_length=500)
+    include_rolls: bool = Field(
+        default=False, description="Also return every die rolled per repetition"
+    )
+    seed: int | None = Field(
+        default=None, ge=0, description="Seed for a reproducible batch"
+    )
+    campaign_id: str | None = Field(
+        default=None, max_length=100, description="Seed from this campaign's stream"
+    )
+
+
+class EncounterBatchSpec(BaseModel):
+    """One party in a batch encounter request."""
+
+    model_config = ConfigDict(extra="forbid")
+    party_levels: list[int] = Field(min_length=1, max_length=20)
+    difficulty: Literal["easy", "medium", "hard", "deadly"] = "medium"
+    location: str = Field(default="dungeon", max_length=50)
+    max_monsters: int = Field(default=10, ge=1, le=50)
+    max_copies: int | None = Field(default=None, ge=1, le=50)
+    max_per_cr: int | None = Field(default=None, ge=1, le=50)
+
+
+class EncounterBatchRequest(BaseModel):
+    """Request model for generating encounters for many parties at once."""
+
+    model_config = ConfigDict(extra="forbid")
+    encounters: list[EncounterBatchSpec] = Field(min_length=1, max_length=1000)
+    campaign_id: str | None = Field(
+        default=None, max_length=100, description="Draw from this campaign's stream"
+    )
+
+
+class EncounterBatchResponse(BaseModel):
+    encounters: list[dict[str, Any]]
+    elapsed_ms: float
+
+
+class SimulationCombatant(BaseModel):
+    """A fighter for the encounter simulator, given by its combat stats."""
+
+    model_config = ConfigDict(extra="forbid")
+    name: str = Field(max_length=100)
+    hp: int = Field(ge=1, le=10000)
+    ac: int = Field(ge=0, le=40)
+    attack_bonus: int = Field(ge=-10, le=30)
+    damage_dice: str = Field(max_length=50, description="e.g. '1d8+3'")
+    attacks: int = Field(default=1, ge=1, le=10)
+    initiative_bonus: int = Field(default=0, ge=-10, le=20)
+
+
+class EncounterSimulationRequest(BaseModel):
+    """Request model for simulating an encounter many times."""
+
+    model_config = ConfigDict(extra="forbid")
+    character_ids: list[str] = Field(default_factory=list, max_length=10)
+    party: list[SimulationCombatant] = Field(default_factory=list, max_length=10)
+    monster_ids: list[str] = Field(default_factory=list, max_length=30)
+    monsters: list[SimulationCombatant] = Field(default_factory=list, max_length=30)
+    trials: int = Field(default=2000, ge=1, le=20000)
+    seed: int | None = Field(default=None, ge=0)
+
+
+class SimulatedCharacterOutcome(BaseModel):
+    name: str
+    expected_hp_loss: float
+    down_probability: float
+
+
+class EncounterSimulationResponse(BaseModel):
+    trials: int
+    win_probability: float
+    loss_probability: float
+    expected_rounds: float
+    characters: list[SimulatedCharacterOutcome]
+
+
+class DiceBatchResult(BaseModel):
+    notation: str
+    label: str | None = None
+    totals: list[int]
+    rolls: list[list[int]] | None = None
+
+
+class DiceBatchResponse(BaseModel):
+    results: list[DiceBatchResult]
+    total_rolls: int
+
+
+class RNGSeedRequest(BaseModel):
+    """Request model for reseeding a campaign's random stream."""
+
+    model_config = ConfigDict(extra="forbid")
+    seed: int = Field(ge=0, lt=2**63)
+
+
+class RNGStreamState(BaseModel):
+    stream: str
+    seed: int
+    position: int
+
+
+class DiceStatsRequest(BaseModel):
+    """Request model for the exact distribution of a dice expression."""
+
+    model_config = ConfigDict(extra="forbid")
+    notation: str = Field(description="D&D dice notation (e.g., '2d20kh1+5', '4d6dl1')")
+    target: int | None = Field(
+        default=None, description="Also report P(total >= target), e.g. a DC or AC"
+    )
+    percentiles: list[float] = Field(
+        default=[5, 25, 50, 75, 95], max_length=20, description="Percentiles (0-100) to report"
+    )
+    include_distribution: bool = Field(
+        default=False, description="Also return the probability of every total"
+    )
+
+
+class DiceOutcome(BaseModel):
+    total: int
+    probability: float
+
+
+class DiceStatsResponse(BaseModel):
+    notation: str
+    min: int
+    max: int
+    mean: float
+    variance: float
+    std_dev: float
+    percentiles: dict[str, int]
+    target: int | None = None
+    probability_at_least: float | None = None
+    distribution: list[DiceOutcome] | None = None
+
+
+class AttackOddsRequest(BaseModel):
+    """Request model for the exact odds of an attack roll."""
+
+    model_config = ConfigDict(extra="forbid")
+    attack_bonus: int
+    target_ac: int
+    advantage: bool = False
+    disadvantage: bool = False
+    damage_dice: str | None = Field(
+        default=None, description="Damage notation, to include expected damage"
+    )
+
+
+class AttackOddsResponse(BaseModel):
+    hit_probability: float
+    critical_probability: float
+    expected_damage: float | None = None
+
+
 # Spell-related request and response models
 class ManageSpellsRequest(BaseModel):
     action: Literal["learn", "forget", "prepare", "unprepare"]
@@ -617,6 +812,20 @@ class SpellListResponse(BaseModel):
     total_count: int
 
 
+class SRDSearchHit(BaseModel):
+    kind: str  # "spell", "monster", "weapon" or "armor"
+    id: str
+    name: str
+    score: float
+    record: dict[str, Any]
+
+
+class SRDSearchResponse(BaseModel):
+    query: str
+    results: list[SRDSearchHit]
+    total_count: int
+
+
 class SpellCastingResponse(BaseModel):
     success: bool
     message: str
@@ -868,6 +1077,9 @@ class RestRequest(BaseModel):
     character_id: str
     rest_type: RestType
     hit_dice_to_spend: int = 0
+    campaign_id: str | None = Field(
+        default=None, max_length=100, description="Roll hit dice from this campaign's stream"
+    )
 
 
 class RestResponse(BaseModel):
@@ -65,6 +65,9 @@ class MapEffect(BaseModel):
     direction: int | None = Field(default=None, ge=0, lt=360)  # degrees for cones
     colour: str = "red"
     label: str = ""
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    # Rounds until the effect ends (see app.effect_scheduler); None lasts until removed
+    duration_rounds: int | None = Field(default=None, ge=1)
 
 
 class BattleMapData(BaseModel):
@@ -4,15 +4,38 @@ This plugin provides D&D 5e SRD ruleset functionality to the agents.
 """
 
 import logging
-import random
 from datetime import datetime
 from typing import Any
 
+from app.effect_scheduler import EffectKind, EffectScheduler
+from app.models.map_models import MapEffect
+from app.rng import active_stream
+from app.utils.dice import DiceRoller
+from app.utils.dice_engine import DiceNotationError, PoolRoll, compile_dice
+from app.utils.dice_stats import attack_odds
+
 # Note: Converted from Agent plugin to direct function calls
 
 logger = logging.getLogger(__name__)
 
 
+def _pool_dict(pool: PoolRoll) -> dict[str, Any]:
+    """Legacy result shape of one dice pool (``rolls``, ``dropped``, ``rerolls``)."""
+    result: dict[str, Any] = {
+        "notation": pool.notation,
+        "rolls": pool.rolls,
+        "modifier": 0,
+        "total": pool.total,
+    }
+    if pool.dropped:
+        result["dropped"] = pool.dropped
+    if pool.rerolls:
+        result["rerolls"] = pool.rerolls
+    if pool.exploded:
+        result["exploded"] = pool.exploded
+    return result
+
+
 # D&D 5e spell slot progression tables by class and level
 SPELL_SLOTS_BY_CLASS_LEVEL = {
     "wizard": {
@@ -268,7 +291,9 @@ class RulesEnginePlugin:
 
         # Concentration tracking for ongoing spells
         # Maps character_id to spell information for concentration spells
-        self.concentration_spells = {}  # {character_id: {"spell": spell_dict, "duration_remaining": int, "started_at": timestamp}}
+        self.concentration_spells = {}  # {character_id: {"spell": spell_dict, "started_at": timestamp}}
+        # Expiry of concentration, timed conditions and map effects, by round
+        self.effects = EffectScheduler()
 
         # Spell slot tracking by character level and class
         self.spell_slots_by_class_level = SPELL_SLOTS_BY_CLASS_LEVEL
@@ -583,240 +608,68 @@ class RulesEnginePlugin:
 
             return result
 
-        except Exception as e:
+        except DiceNotationError as e:
             logger.error("Error rolling dice: %s", str(e))
-            return {
-                "notation": dice_notation,
-                "error": f"Invalid dice notation: {str(e)}",
-            }
+            return {"notation": dice_notation, "error": str(e)}
 
     def _parse_and_roll_dice(self, dice_notation: str) -> dict[str, Any]:
-        """Parse and execute dice roll notation."""
-        original_notation = dice_notation
-        dice_notation = dice_notation.lower().replace(" ", "")
-
-        # Check if this is actually multiple pools (more than one 'd')
-        d_count = dice_notation.count("d")
-
-        # If only one 'd', treat as single pool even with modifiers
-        if d_count <= 1:
-            return self._roll_single_pool(original_notation, dice_notation)
+        """Roll *dice_notation* through the shared dice engine.
 
-        # Multiple dice pools (e.g., "2d6+1d4+3")
-        if "+" in dice_notation or "-" in dice_notation:
-            return self._handle_multiple_pools(original_notation, dice_notation)
-
-        # Single dice pool with potential advanced notation
-        return self._roll_single_pool(original_notation, dice_notation)
-
-    def _handle_multiple_pools(
-        self, original_notation: str, dice_notation: str
-    ) -> dict[str, Any]:
-        """Handle multiple dice pools in one expression."""
-        import re
-
-        # Split by + and - while preserving the operators
-        parts = re.split(r"(\+|\-)", dice_notation)
-        pools = []
-        total = 0
-        overall_modifier = 0
-
-        current_sign = 1
-        for part in parts:
-            if part == "+":
-                current_sign = 1
-            elif part == "-":
-                current_sign = -1
-            elif part.strip():
-                if "d" in part:
-                    # It's a dice pool
-                    pool_result = self._roll_single_pool(part, part)
-                    pool_result["modifier"] = current_sign
-                    pools.append(pool_result)
-                    total += pool_result["total"] * current_sign
-                else:
-                    # It's a static modifier
-                    value = int(part) * current_sign
-                    overall_modifier += value
-                    pools.append(
-                        {
-                            "type": "modifier",
-                            "value": value,
-                            "notation": f"{'+' if current_sign > 0 else ''}{value}",
-                        }
-                    )
-                    total += value
-
-        return {
-            "notation": original_notation,
-            "pools": pools,
-            "modifier": overall_modifier,
-            "total": total,
-        }
+        A single pool with flat modifiers ("4d6dl1", "1d20+5") reports its
+        rolls at the top level; expressions with several pools or
+        arithmetic list each top-level term under ``pools``.
+        """
+        result = compile_dice(dice_notation).roll()
+        pool_terms = [t for t in result.terms if not t.is_constant]
 
-    def _roll_single_pool(
-        self, original_notation: str, dice_notation: str
-    ) -> dict[str, Any]:
-        """Roll a single dice pool with potential advanced notation."""
-        # Parse basic dice notation (XdY)
-        if "d" not in dice_notation:
-            # Just a number
+        if not pool_terms:
             return {
-                "notation": original_notation,
-                "total": int(dice_notation),
+                "notation": dice_notation,
+                "total": result.total,
                 "rolls": [],
-                "modifier": int(dice_notation),
+                "modifier": result.total,
             }
 
-        # Extract modifiers first
-        modifier = 0
-        base_notation = dice_notation
-
-        # Handle simple +/- modifiers (for single pools only)
-        if "+" in dice_notation and not any(
-            x in dice_notation for x in ["dl", "dh", "kh", "kl", "r"]
-        ):
-            base_notation, mod_str = dice_notation.split("+", 1)
-            modifier = int(mod_str)
-        elif "-" in dice_notation and not any(
-            x in dice_notation for x in ["dl", "dh", "kh", "kl", "r"]
-        ):
-            base_notation, mod_str = dice_notation.split("-", 1)
-            modifier = -int(mod_str)
-
-        # Extract advanced notation modifiers
-        modifiers = self._extract_advanced_modifiers(base_notation)
-        base_dice = modifiers["base_dice"]
-
-        # Parse basic XdY
-        num_dice, dice_type = base_dice.split("d")
-        num_dice = int(num_dice) if num_dice else 1
-        dice_type = int(dice_type)
-
-        # Roll initial dice
-        rolls = [random.randint(1, dice_type) for _ in range(num_dice)]  # noqa: S311
-
-        # Apply advanced modifiers
-        result = {
-            "notation": original_notation,
-            "rolls": rolls.copy(),
-            "modifier": modifier,
-            "total": 0,
-        }
+        if len(pool_terms) == 1 and pool_terms[0].sign > 0 and len(pool_terms[0].pools) == 1:
+            pool = pool_terms[0].pools[0]
+            if pool.total == pool_terms[0].value:
+                single = _pool_dict(pool)
+                single.update(
+                    notation=dice_notation,
+                    modifier=result.modifier,
+                    total=result.total,
+                )
+                return single
 
-        # Handle rerolls
-        if modifiers["reroll"]:
-            reroll_value = modifiers["reroll"]
-            rerolls = []
-
-            # Keep rerolling until no more reroll values
-            for i, roll in enumerate(rolls):
-                while roll == reroll_value:
-                    new_roll = random.randint(1, dice_type)  # noqa: S311
-                    rerolls.append({"original": roll, "new": new_roll, "index": i})
-                    roll = new_roll
-                    rolls[i] = roll  # Update the roll
-
-            if rerolls:
-                result["rerolls"] = rerolls
-                # Update the rolls in the result
-                result["rolls"] = rolls.copy()
-
-        # Handle drop/keep modifiers
-        final_rolls = rolls.copy()
-        dropped = []
-
-        if modifiers["drop_lowest"]:
-            count = modifiers["drop_lowest"]
-            sorted_indices = sorted(range(len(rolls)), key=lambda i: rolls[i])
-            for i in range(min(count, len(rolls))):
-                idx = sorted_indices[i]
-                dropped.append(rolls[idx])
-                final_rolls[idx] = 0  # Mark as dropped
-            result["dropped"] = dropped
-
-        elif modifiers["drop_highest"]:
-            count = modifiers["drop_highest"]
-            sorted_indices = sorted(
-                range(len(rolls)), key=lambda i: rolls[i], reverse=True
-            )
-            for i in range(min(count, len(rolls))):
-                idx = sorted_indices[i]
-                dropped.append(rolls[idx])
-                final_rolls[idx] = 0  # Mark as dropped
-            result["dropped"] = dropped
-
-        elif modifiers["keep_highest"]:
-            count = modifiers["keep_highest"]
-            sorted_indices = sorted(
-                range(len(rolls)), key=lambda i: rolls[i], reverse=True
-            )
-            for i in range(count, len(rolls)):
-                idx = sorted_indices[i]
-                dropped.append(rolls[idx])
-                final_rolls[idx] = 0  # Mark as dropped
-            result["dropped"] = dropped
-
-        elif modifiers["keep_lowest"]:
-            count = modifiers["keep_lowest"]
-            sorted_indices = sorted(range(len(rolls)), key=lambda i: rolls[i])
-            for i in range(count, len(rolls)):
-                idx = sorted_indices[i]
-                dropped.append(rolls[idx])
-                final_rolls[idx] = 0  # Mark as dropped
-            result["dropped"] = dropped
-
-        # Calculate total from non-dropped rolls plus modifier
-        dice_total = sum(roll for roll in final_rolls if roll > 0)
-        result["total"] = dice_total + modifier
-
-        return result
-
-    def _extract_advanced_modifiers(self, dice_notation: str) -> dict[str, Any]:
-        """Extract advanced notation modifiers from dice string."""
-        import re
-
-        modifiers = {
-            "base_dice": dice_notation,
-            "drop_lowest": None,
-            "drop_highest": None,
-            "keep_highest": None,
-            "keep_lowest": None,
-            "reroll": None,
+        pools = []
+        for term in result.terms:
+            if term.is_constant:
+                value = term.sign * term.value
+                pools.append(
+                    {
+                        "type": "modifier",
+                        "value": value,
+                        "notation": f"{'+' if value > 0 else ''}{value}",
+                    }
+                )
+            elif len(term.pools) == 1 and term.pools[0].total == term.value:
+                pools.append({**_pool_dict(term.pools[0]), "modifier": term.sign})
+            else:
+                pools.append(
+                    {
+                        "notation": term.notation,
+                        "rolls": [r for p in term.pools for r in p.rolls],
+                        "total": term.value,
+                        "modifier": term.sign,
+                    }
+                )
+        return {
+            "notation": dice_notation,
+            "pools": pools,
+            "modifier": result.modifier,
+            "total": result.total,
         }
 
-        # Extract drop lowest (dl)
-        dl_match = re.search(r"dl(\d+)", dice_notation)
-        if dl_match:
-            modifiers["drop_lowest"] = int(dl_match.group(1))
-            modifiers["base_dice"] = dice_notation.replace(dl_match.group(0), "")
-
-        # Extract drop highest (dh)
-        dh_match = re.search(r"dh(\d+)", dice_notation)
-        if dh_match:
-            modifiers["drop_highest"] = int(dh_match.group(1))
-            modifiers["base_dice"] = dice_notation.replace(dh_match.group(0), "")
-
-        # Extract keep highest (kh)
-        kh_match = re.search(r"kh(\d+)", dice_notation)
-        if kh_match:
-            modifiers["keep_highest"] = int(kh_match.group(1))
-            modifiers["base_dice"] = dice_notation.replace(kh_match.group(0), "")
-
-        # Extract keep lowest (kl)
-        kl_match = re.search(r"kl(\d+)", dice_notation)
-        if kl_match:
-            modifiers["keep_lowest"] = int(kl_match.group(1))
-            modifiers["base_dice"] = dice_notation.replace(kl_match.group(0), "")
-
-        # Extract reroll (r)
-        r_match = re.search(r"r(\d+)", dice_notation)
-        if r_match:
-            modifiers["reroll"] = int(r_match.group(1))
-            modifiers["base_dice"] = dice_notation.replace(r_match.group(0), "")
-
-        return modifiers
-
     def skill_check(
         self,
         ability_score: int,
@@ -847,26 +700,10 @@ class RulesEnginePlugin:
             if proficient:
                 total_modifier += proficiency_bonus
 
-            # Roll the dice based on advantage/disadvantage
-            if advantage and not disadvantage:
-                # Roll with advantage (take the higher of two d20 rolls)
-                roll1 = random.randint(1, 20)  # noqa: S311
-                roll2 = random.randint(1, 20)  # noqa: S311
-                roll = max(roll1, roll2)
-                rolls = [roll1, roll2]
-                advantage_type = "advantage"
-            elif disadvantage and not advantage:
-                # Roll with disadvantage (take the lower of two d20 rolls)
-                roll1 = random.randint(1, 20)  # noqa: S311
-                roll2 = random.randint(1, 20)  # noqa: S311
-                roll = min(roll1, roll2)
-                rolls = [roll1, roll2]
-                advantage_type = "disadvantage"
-            else:
-                # Normal roll
-                roll = random.randint(1, 20)  # noqa: S311
-                rolls = [roll]
-                advantage_type = "normal"
+            d20 = DiceRoller.roll_d20(advantage=advantage, disadvantage=disadvantage)
+            rolls = d20["rolls"]
+            roll = d20["natural"]
+            advantage_type = d20["advantage_type"]
 
             # Calculate total
             total = roll + total_modifier
@@ -900,29 +737,14 @@ class RulesEnginePlugin:
             disadvantage: Whether the attack has disadvantage
 
         Returns:
-            Dict[str, Any]: The result of the attack roll
+            Dict[str, Any]: The result of the attack roll, with the exact
+            hit_probability the attack had before it was rolled
         """
         try:
-            # Roll the dice based on advantage/disadvantage
-            if advantage and not disadvantage:
-                # Roll with advantage (take the higher of two d20 rolls)
-                roll1 = random.randint(1, 20)  # noqa: S311
-                roll2 = random.randint(1, 20)  # noqa: S311
-                roll = max(roll1, roll2)
-                rolls = [roll1, roll2]
-                advantage_type = "advantage"
-            elif disadvantage and not advantage:
-                # Roll with disadvantage (take the lower of two d20 rolls)
-                roll1 = random.randint(1, 20)  # noqa: S311
-                roll2 = random.randint(1, 20)  # noqa: S311
-                roll = min(roll1, roll2)
-                rolls = [roll1, roll2]
-                advantage_type = "disadvantage"
-            else:
-                # Normal roll
-                roll = random.randint(1, 20)  # noqa: S311
-                rolls = [roll]
-                advantage_type = "normal"
+            d20 = DiceRoller.roll_d20(advantage=advantage, disadvantage=disadvantage)
+            rolls = d20["rolls"]
+            roll = d20["natural"]
+            advantage_type = d20["advantage_type"]
 
             # Check for critical hit or miss
             is_critical_hit = roll == 20
@@ -943,6 +765,9 @@ class RulesEnginePlugin:
                 "is_hit": is_hit,
                 "is_critical_hit": is_critical_hit,
                 "is_critical_miss": is_critical_miss,
+                "hit_probability": attack_odds(
+                    attack_bonus, target_ac, advantage, disadvantage
+                )["hit_probability"],
             }
         except Exception as e:
             logger.error("Error resolving attack: %s", str(e))
@@ -965,30 +790,13 @@ class RulesEnginePlugin:
             # Use the roll_dice function to parse and roll the dice
             damage_roll = self.roll_dice(damage_dice)
 
-            # If critical hit, add extra damage dice
-            if is_critical:
-                # Parse the dice notation to get the number of dice and type
-                parts = damage_dice.lower().replace(" ", "")
-
-                # Handle modifiers (for critical hit calculation, we ignore modifiers for extra dice)
-                if "+" in parts:
-                    parts, _ = parts.split("+", 1)
-                elif "-" in parts:
-                    parts, _ = parts.split("-", 1)
-
-                # Handle dice rolls
-                if "d" in parts:
-                    num_dice, dice_type = parts.split("d", 1)
-                    num_dice = int(num_dice) if num_dice else 1
-                    dice_type = int(dice_type)
-
-                    # Roll the extra dice for critical hit
-                    extra_rolls = [
-                        random.randint(1, dice_type)  # noqa: S311
-                        for _ in range(num_dice)
-                    ]
-                    damage_roll["critical_rolls"] = extra_rolls
-                    damage_roll["total"] += sum(extra_rolls)
+            # A critical hit rolls the damage dice again, without the modifiers
+            if is_critical and "error" not in damage_roll:
+                extra = compile_dice(damage_dice).critical_dice()
+                if extra is not None:
+                    critical = extra.roll()
+                    damage_roll["critical_rolls"] = critical.rolls
+                    damage_roll["total"] += critical.total
 
             return damage_roll
         except Exception as e:
@@ -1236,6 +1044,11 @@ class RulesEnginePlugin:
 
         roll_result["timestamp"] = datetime.datetime.now().isoformat()
 
+        # Where the campaign's random stream stood, so the roll can be replayed
+        stream = active_stream()
+        if stream is not None:
+            roll_result["rng"] = stream.state()
+
         # Add to history
         self.roll_history.append(roll_result)
 
@@ -1276,9 +1089,14 @@ class RulesEnginePlugin:
             # Start new concentration
             self.concentration_spells[character_id] = {
                 "spell": spell_data,
-                "duration_remaining": duration_rounds,
                 "started_at": datetime.now().isoformat(),
             }
+            self.effects.schedule(
+                EffectKind.CONCENTRATION,
+                character_id,
+                duration_rounds,
+                data={"spell": spell_data.get("name", "Unknown")},
+            )
 
             return {
                 "success": True,
@@ -1318,6 +1136,7 @@ class RulesEnginePlugin:
 
             # Remove concentration
             del self.concentration_spells[character_id]
+            self.effects.cancel(EffectKind.CONCENTRATION, character_id)
 
             return {
                 "success": True,
@@ -1355,7 +1174,7 @@ class RulesEnginePlugin:
                 "is_concentrating": True,
                 "character_id": character_id,
                 "spell": concentration_data["spell"],
-                "duration_remaining": concentration_data["duration_remaining"],
+                "duration_remaining": self._concentration_remaining(character_id),
                 "started_at": concentration_data["started_at"],
             }
 
@@ -1414,6 +1233,7 @@ class RulesEnginePlugin:
             if not success:
                 # Concentration is lost
                 del self.concentration_spells[character_id]
+                self.effects.cancel(EffectKind.CONCENTRATION, character_id)
                 result["message"] = (
                     f"Concentration lost on {spell_name}! (Rolled {total} vs DC {dc})"
                 )
@@ -1431,47 +1251,96 @@ class RulesEnginePlugin:
                 "error": f"Error with concentration saving throw: {str(e)}",
             }
 
+    def _concentration_remaining(self, character_id: str) -> int:
+        effect = self.effects.get(EffectKind.CONCENTRATION, character_id)
+        return self.effects.remaining(effect) if effect is not None else 0
+
+    def apply_timed_condition(
+        self, character_id: str, condition: str, duration_rounds: int
+    ) -> dict[str, Any]:
+        """
+        Schedule a condition on a character to end after a number of rounds.
+
+        The caller applies the condition itself; its end is reported in the
+        ``expired_effects`` of :meth:`advance_concentration_round`.
+
+        Args:
+            character_id: The character's unique identifier
+            condition: The condition applied (e.g. "poisoned")
+            duration_rounds: Rounds until the condition ends
+
+        Returns:
+            Dict[str, Any]: The scheduled expiry
+        """
+        effect = self.effects.schedule(EffectKind.CONDITION, character_id, duration_rounds, name=condition)
+        return {"success": True, **effect.as_dict()}
+
+    def add_map_effect(self, effect: MapEffect) -> dict[str, Any]:
+        """
+        Schedule a battle-map effect with a ``duration_rounds`` to expire.
+
+        Args:
+            effect: The map effect placed on the battle map
+
+        Returns:
+            Dict[str, Any]: The scheduled expiry, or an error if the effect
+            has no duration
+        """
+        if not effect.duration_rounds:
+            return {"success": False, "error": "Map effect has no duration", "effect_id": effect.id}
+        scheduled = self.effects.schedule(
+            EffectKind.MAP_EFFECT, effect.id, effect.duration_rounds, data=effect.model_dump()
+        )
+        return {"success": True, **scheduled.as_dict()}
+
+    def list_concentration(self) -> list[dict[str, Any]]:
+        """
+        List every spell still being concentrated on, one entry per caster.
+
+        Built on demand so that advancing a round stays proportional to the
+        effects expiring in it.
+
+        Returns:
+            List[Dict[str, Any]]: Caster, spell name and rounds remaining
+        """
+        return [
+            {
+                "character_id": character_id,
+                "spell": concentration_data["spell"].get("name", "Unknown"),
+                "duration_remaining": self._concentration_remaining(character_id),
+            }
+            for character_id, concentration_data in self.concentration_spells.items()
+        ]
+
     def advance_concentration_round(self) -> dict[str, Any]:
         """
-        Reduce spell duration for all concentrating characters by one round.
-        Should be called at the end of each combat round.
+        Advance timed effects by one round. Should be called at the end of
+        each combat round.
+
+        Only the effects expiring this round are touched: concentration
+        spells, timed conditions and map effects are filed by the round they
+        end in (see :class:`app.effect_scheduler.EffectScheduler`).  Spells
+        still running are listed by :meth:`list_concentration`.
 
         Returns:
-            Dict[str, Any]: Summary of concentration changes
+            Dict[str, Any]: Summary of concentration changes, plus
+            ``expired_effects`` with one event per expired effect of any kind
         """
         try:
+            expired = self.effects.advance()
             expired_spells = []
-            continuing_spells = []
-
-            for character_id, concentration_data in list(
-                self.concentration_spells.items()
-            ):
-                concentration_data["duration_remaining"] -= 1
-
-                if concentration_data["duration_remaining"] <= 0:
-                    # Spell duration expired
-                    spell_name = concentration_data["spell"].get("name", "Unknown")
+            for effect in expired:
+                if effect.kind == EffectKind.CONCENTRATION:
+                    self.concentration_spells.pop(effect.owner, None)
                     expired_spells.append(
-                        {"character_id": character_id, "spell": spell_name}
-                    )
-                    del self.concentration_spells[character_id]
-                else:
-                    # Spell continues
-                    continuing_spells.append(
-                        {
-                            "character_id": character_id,
-                            "spell": concentration_data["spell"].get("name", "Unknown"),
-                            "duration_remaining": concentration_data[
-                                "duration_remaining"
-                            ],
-                        }
+                        {"character_id": effect.owner, "spell": effect.data.get("spell", "Unknown")}
                     )
 
             return {
                 "success": True,
                 "expired_spells": expired_spells,
-                "continuing_spells": continuing_spells,
                 "total_concentrating": len(self.concentration_spells),
+                "expired_effects": [effect.expiry_event() for effect in expired],
             }
 
         except Exception as e:
@@ -0,0 +1,361 @@
+"""
+Reproducible random streams for game mechanics.
+
+Every campaign gets its own :class:`RollStream`, a counter-based generator:
+draw ``n`` of a stream is a pure function of its seed and ``n``
+(SplitMix64), so a stream's whole state is ``(seed, position)`` and it can
+be rewound or fast-forwarded to any draw for free. While a stream is active
+(:func:`use_stream` / :func:`campaign_rng`, held in a context variable like
+the request's unit of work) the dice engine, the rules engine, concentration
+checks and the encounter balancer all draw from it; outside one they fall
+back to the global :mod:`random` module as before.
+
+An active stream also keeps a journal of the mechanics calls made on it
+(operation, arguments, first and last draw, result). :func:`replay`
+re-executes a journal from its recorded draw positions and checks every
+result, which makes a recorded production session both a regression test
+and an offline throughput benchmark::
+
+    python -m app.rng replay session.json --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import functools
+import importlib
+import json
+import logging
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, MutableSequence, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MASK = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+
+# Streams kept in memory, least recently used evicted first
+MAX_STREAMS = 1024
+
+# Modules whose recorded operations replay() must be able to call
+_OPERATION_MODULES = (
+    "app.utils.dice_engine",
+    "app.rules_engine",
+    "app.utils.spells",
+    "app.encounter_balancer",
+)
+
+
+def _mix(z: int) -> int:
+    """SplitMix64 finaliser."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class JournalEntry:
+    """One recorded mechanics call and the draws it consumed."""
+
+    op: str
+    args: list[Any]
+    kwargs: dict[str, Any]
+    start: int
+    end: int
+    result: Any
+
+
+class RollStream:
+    """Seeded, counter-based random source with the :mod:`random` API games use.
+
+    A stream may be shared by the event loop and worker threads (batch
+    encounter generation runs in one), so draws and recorded calls hold the
+    stream's lock: a recorded call's draws are always contiguous.
+    """
+
+    __slots__ = ("key", "seed", "position", "journal", "max_journal", "_base", "_depth", "_lock")
+
+    def __init__(
+        self, seed: int, key: str = "", position: int = 0, max_journal: int = 0
+    ) -> None:
+        self.key = key
+        self.seed = seed
+        self.position = position
+        self.max_journal = max_journal
+        self.journal: list[JournalEntry] | None = [] if max_journal > 0 else None
+        self._base = _mix((seed * _GAMMA) & _MASK)
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"RollStream(key={self.key!r}, seed={self.seed}, position={self.position})"
+
+    def _next(self) -> int:
+        with self._lock:
+            self.position += 1
+            position = self.position
+        return _mix((self._base + position * _GAMMA) & _MASK)
+
+    def randint(self, a: int, b: int) -> int:
+        """Uniform integer in ``[a, b]``."""
+        span = b - a + 1
+        if span <= 0:
+            raise ValueError(f"empty range for randint({a}, {b})")
+        limit = (1 << 64) - (1 << 64) % span  # reject the biased tail
+        while True:
+            value = self._next()
+            if value < limit:
+                return a + value % span
+
+    def random(self) -> float:
+        """Uniform float in ``[0, 1)``."""
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def choice[T](self, seq: Sequence[T]) -> T:
+        if not seq:
+            raise IndexError("cannot choose from an empty sequence")
+        return seq[self.randint(0, len(seq) - 1)]
+
+    def shuffle(self, seq: MutableSequence[Any]) -> None:
+        """Fisher-Yates shuffle in place."""
+        for i in range(len(seq) - 1, 0, -1):
+            j = self.randint(0, i)
+            seq[i], seq[j] = seq[j], seq[i]
+
+    def state(self) -> dict[str, Any]:
+        """Where the stream is: enough to record next to a roll."""
+        return {"stream": self.key, "seed": self.seed, "position": self.position}
+
+    def recording(self) -> dict[str, Any]:
+        """The stream's seed and journal as plain JSON-ready data."""
+        with self._lock:
+            return {
+                "stream": self.key,
+                "seed": self.seed,
+                "position": self.position,
+                "entries": [dataclasses.asdict(e) for e in self.journal or ()],
+            }
+
+
+# ---------------------------------------------------------------------------
+# Active stream
+# ---------------------------------------------------------------------------
+
+_active_stream: ContextVar[RollStream | None] = ContextVar("_active_stream", default=None)
+
+
+def active_stream() -> RollStream | None:
+    """The stream mechanics draw from in this context, if any."""
+    return _active_stream.get()
+
+
+@contextmanager
+def use_stream(stream: RollStream | None) -> Iterator[RollStream | None]:
+    """Make *stream* the active stream for the block (None clears it)."""
+    token = _active_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _active_stream.reset(token)
+
+
+_streams: OrderedDict[str, RollStream] = OrderedDict()
+
+
+def _journal_limit() -> int:
+    from app.config import get_settings
+
+    return get_settings().rng_journal_max_entries
+
+
+def get_stream(key: str) -> RollStream:
+    """The stream for campaign/session *key*, created with a fresh seed on first use."""
+    stream = _streams.get(key)
+    if stream is None:
+        return seed_stream(key, secrets.randbits(63))
+    _streams.move_to_end(key)
+    return stream
+
+
+def seed_stream(key: str, seed: int) -> RollStream:
+    """Start campaign/session *key* over on a new stream seeded with *seed*."""
+    stream = RollStream(seed, key, max_journal=_journal_limit())
+    _streams[key] = stream
+    _streams.move_to_end(key)
+    while len(_streams) > MAX_STREAMS:
+        _streams.popitem(last=False)
+    return stream
+
+
+def clear_streams() -> None:
+    """Forget every stream (tests)."""
+    _streams.clear()
+
+
+@contextmanager
+def campaign_rng(key: str | None) -> Iterator[RollStream | None]:
+    """Draw from campaign/session *key*'s stream for the block.
+
+    A falsy key leaves the global :mod:`random` module in use.
+    """
+    with use_stream(get_stream(key) if key else None) as stream:
+        yield stream
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+_operations: dict[str, Callable[..., Any]] = {}
+
+
+def _plain(value: Any) -> Any:  # noqa: ANN401
+    """*value* as JSON-shaped data (dataclasses and tuples included)."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _plain(dataclasses.asdict(value))
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [_plain(v) for v in value]
+    return value
+
+
+def register_operation(op: str, fn: Callable[..., Any]) -> None:
+    """Let :func:`replay` re-execute journal entries named *op* with *fn*."""
+    _operations[op] = fn
+
+
+def record_call[T](op: str, args: Sequence[Any], kwargs: dict[str, Any], fn: Callable[[], T]) -> T:
+    """Run *fn* and journal it as *op* on the active stream.
+
+    Only the outermost recorded call is journaled: a recorded attack that
+    rolls recorded dice replays as one attack. The call holds the stream's
+    lock, so other threads cannot draw in the middle of it.
+    """
+    stream = _active_stream.get()
+    if stream is None or stream.journal is None:
+        return fn()
+    with stream._lock:
+        start = stream.position
+        stream._depth += 1
+        try:
+            result = fn()
+        finally:
+            stream._depth -= 1
+        if stream._depth == 0:
+            if len(stream.journal) < stream.max_journal:
+                stream.journal.append(
+                    JournalEntry(op, _plain(args), _plain(kwargs), start, stream.position, _plain(result))
+                )
+            elif len(stream.journal) == stream.max_journal:
+                logger.warning("Journal for stream %s is full; no longer recording", stream.key)
+                stream.journal.append(JournalEntry("journal.full", [], {}, start, start, None))
+    return result
+
+
+def recorded[T](op: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator: journal calls to a mechanics function and make it replayable."""
+
+    def decorate(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+            return record_call(op, args, kwargs, lambda: fn(*args, **kwargs))
+
+        register_operation(op, fn)
+        return wrapper
+
+    return decorate
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+
+@dataclasses.dataclass(slots=True)
+class ReplayReport:
+    """Outcome of replaying a recording."""
+
+    operations: int = 0
+    draws: int = 0
+    seconds: float = 0.0
+    mismatches: list[int] = dataclasses.field(default_factory=list)
+
+    @property
+    def operations_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds else 0.0
+
+
+def replay(recording: dict[str, Any], verify: bool = True, repeat: int = 1) -> ReplayReport:
+    """Re-execute a recording's mechanics deterministically.
+
+    Each entry runs on a stream rewound to its recorded start position,
+    so entries replay identically in any order and independently of calls
+    that were not recorded.
+
+    Args:
+        recording: Output of :meth:`RollStream.recording`.
+        verify: Compare every result (and draw count) with the recording;
+            indices of entries that differ go into ``mismatches``.
+        repeat: Run the whole recording this many times (for benchmarks).
+
+    Raises:
+        KeyError: The recording uses an operation this build does not have.
+    """
+    for module in _OPERATION_MODULES:
+        importlib.import_module(module)
+    seed = recording["seed"]
+    entries = [JournalEntry(**e) for e in recording["entries"] if e["op"] != "journal.full"]
+    calls = [(_operations[e.op], e) for e in entries]
+
+    report = ReplayReport()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for index, (fn, entry) in enumerate(calls):
+            stream = RollStream(seed, recording.get("stream", ""), position=entry.start)
+            with use_stream(stream):
+                result = fn(*entry.args, **entry.kwargs)
+            report.operations += 1
+            report.draws += stream.position - entry.start
+            if verify and (stream.position != entry.end or _plain(result) != entry.result):
+                report.mismatches.append(index)
+        verify = False  # repeats only measure
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command line: ``python -m app.rng replay <recording.json> [--repeat N]``."""
+    parser = argparse.ArgumentParser(prog="python -m app.rng")
+    commands = parser.add_subparsers(dest="command", required=True)
+    replay_cmd = commands.add_parser("replay", help="re-execute a recorded session")
+    replay_cmd.add_argument("recording", help="JSON from /game/campaign/{id}/rng/recording")
+    replay_cmd.add_argument("--repeat", type=int, default=1, help="run it this many times")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.recording) as f:
+        recording = json.load(f)
+    report = replay(recording, repeat=args.repeat)
+    logger.info(
+        "Replayed %d operations (%d draws) in %.3fs: %.0f ops/s",
+        report.operations,
+        report.draws,
+        report.seconds,
+        report.operations_per_second,
+    )
+    if report.mismatches:
+        logger.error("%d entries replayed differently: %s", len(report.mismatches), report.mismatches[:20])
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,13 @@ get_proficiency_bonus, and is_asi_level.
 
 import random
 import re
-from enum import StrEnum
-from typing import TypedDict
+from collections.abc import Iterable, Iterator
+from enum import IntFlag, StrEnum
+from typing import NamedTuple, TypedDict
 
+from app.rng import active_stream, recorded
 from app.srd_data import CLASS_HIT_DICE, XP_THRESHOLDS, get_features_at_level
+from app.utils.dice_engine import RandomSource
 
 
 class AttackResult(TypedDict):
@@ -25,10 +28,16 @@ class DamageResult(TypedDict):
     total: int
 
 
+def _rng() -> RandomSource:
+    """The active campaign stream, or the global generator outside one."""
+    return active_stream() or random
+
+
 def _roll_d20() -> int:
-    return random.randint(1, 20)  # noqa: S311
+    return _rng().randint(1, 20)
 
 
+@recorded("rules.resolve_attack")
 def resolve_attack(
     attack_bonus: int,
     target_ac: int,
@@ -76,6 +85,7 @@ def resolve_attack(
     }
 
 
+@recorded("rules.calculate_damage")
 def calculate_damage(
     damage_dice: str, modifier: int = 0, critical: bool = False
 ) -> DamageResult:
@@ -96,7 +106,7 @@ def calculate_damage(
     if critical:
         num_dice *= 2
 
-    rolls = [random.randint(1, sides) for _ in range(num_dice)]  # noqa: S311
+    rolls = [_rng().randint(1, sides) for _ in range(num_dice)]
     total = sum(rolls) + modifier
 
     return {
@@ -153,6 +163,7 @@ def apply_healing(current_hp: int, max_hp: int, healing: int) -> dict:
 # ---------------------------------------------------------------------------
 
 
+@recorded("rules.death_saving_throw")
 def death_saving_throw() -> dict:
     """Roll a d20 death saving throw (DC 10).
 
@@ -162,7 +173,7 @@ def death_saving_throw() -> dict:
         critical_success (bool): True on natural 20 (regain 1 HP)
         critical_fail (bool): True on natural 1 (counts as 2 failures)
     """
-    roll = random.randint(1, 20)  # noqa: S311
+    roll = _rng().randint(1, 20)
     critical_success = roll == 20
     critical_fail = roll == 1
     success = roll >= 10
@@ -180,6 +191,7 @@ def death_saving_throw() -> dict:
 # ---------------------------------------------------------------------------
 
 
+@recorded("rules.roll_initiative")
 def roll_initiative(combatants: list[dict]) -> list[dict]:
     """Roll initiative for each combatant (d20 + DEX modifier).
 
@@ -193,7 +205,7 @@ def roll_initiative(combatants: list[dict]) -> list[dict]:
     results = []
     for combatant in combatants:
         dex_mod = combatant.get("dex_modifier", 0)
-        roll = random.randint(1, 20)  # noqa: S311
+        roll = _rng().randint(1, 20)
         initiative = roll + dex_mod
         entry = dict(combatant)
         entry["initiative_roll"] = roll
@@ -458,9 +470,131 @@ def remove_condition(
     return [c for c in combatant_conditions if c != value]
 
 
+# One bit per Condition, in declaration order
+ConditionFlag = IntFlag("ConditionFlag", [c.name for c in Condition], module=__name__)
+
+_CONDITION_BITS: dict[str, int] = {c.value: ConditionFlag[c.name].value for c in Condition}
+
+
+class AttackModifiers(NamedTuple):
+    advantage: bool
+    disadvantage: bool
+    auto_crit: bool  # a hit is a critical hit (melee attacks on the paralyzed or unconscious)
+
+
+def _effect_mask(effect: str) -> int:
+    """Bits of every condition whose CONDITION_EFFECTS entry sets *effect*."""
+    mask = 0
+    for condition, effects in CONDITION_EFFECTS.items():
+        if effects.get(effect):
+            mask |= _CONDITION_BITS[condition]
+    return mask
+
+
+# Lookup tables derived from CONDITION_EFFECTS. Target-side masks are
+# indexed by ranged (0 = melee, 1 = ranged).
+_OWN_ADVANTAGE = _effect_mask("attack_advantage")
+_OWN_DISADVANTAGE = _effect_mask("attack_disadvantage")
+_TARGET_ADVANTAGE = (
+    _effect_mask("attacker_advantage") | _effect_mask("melee_attacker_advantage"),
+    _effect_mask("attacker_advantage"),
+)
+_TARGET_DISADVANTAGE = (
+    _effect_mask("attacker_disadvantage"),
+    _effect_mask("attacker_disadvantage") | _effect_mask("ranged_attacker_disadvantage"),
+)
+_TARGET_AUTO_CRIT = (_effect_mask("auto_crit_melee"), 0)
+# Indexed by advantage | disadvantage << 1 | auto_crit << 2; advantage and
+# disadvantage cancel regardless of how many sources exist
+_RESOLVED = tuple(
+    AttackModifiers(
+        advantage=code & 3 == 1,
+        disadvantage=code & 3 == 2,
+        auto_crit=bool(code & 4),
+    )
+    for code in range(8)
+)
+
+
+class ConditionSet:
+    """An immutable set of conditions stored as a :class:`ConditionFlag` mask.
+
+    Characters keep their conditions as a list of strings
+    (``Character.data["conditions"]``); :meth:`from_list` and :meth:`to_list`
+    convert without losing anything. Strings that are not a
+    :class:`Condition` (homebrew effects, exhaustion levels) are carried
+    along unchanged. Known conditions come back in declaration order.
+    """
+
+    __slots__ = ("mask", "extra")
+
+    def __init__(self, mask: int = 0, extra: tuple[str, ...] = ()) -> None:
+        self.mask = int(mask)
+        self.extra = extra
+
+    @classmethod
+    def from_list(cls, conditions: Iterable[str]) -> "ConditionSet":
+        mask = 0
+        extra: list[str] = []
+        for condition in conditions:
+            bit = _CONDITION_BITS.get(condition)
+            if bit is not None:
+                mask |= bit
+            elif condition not in extra:
+                extra.append(condition)
+        return cls(mask, tuple(extra))
+
+    def to_list(self) -> list[str]:
+        return [c.value for c in self] + list(self.extra)
+
+    def with_condition(self, condition: Condition | str) -> "ConditionSet":
+        bit = _CONDITION_BITS.get(condition)
+        if bit is not None:
+            return ConditionSet(self.mask | bit, self.extra)
+        extra = self.extra if condition in self.extra else (*self.extra, condition)
+        return ConditionSet(self.mask, extra)
+
+    def without_condition(self, condition: Condition | str) -> "ConditionSet":
+        bit = _CONDITION_BITS.get(condition)
+        if bit is not None:
+            return ConditionSet(self.mask & ~bit, self.extra)
+        return ConditionSet(self.mask, tuple(c for c in self.extra if c != condition))
+
+    def attack_modifiers(self, target: "ConditionSet", *, ranged: bool = False) -> AttackModifiers:
+        """Resolve an attack by a combatant with these conditions against *target*."""
+        r = int(ranged)
+        code = (
+            bool(self.mask & _OWN_ADVANTAGE or target.mask & _TARGET_ADVANTAGE[r])
+            | bool(self.mask & _OWN_DISADVANTAGE or target.mask & _TARGET_DISADVANTAGE[r]) << 1
+            | bool(target.mask & _TARGET_AUTO_CRIT[r]) << 2
+        )
+        return _RESOLVED[code]
+
+    def __contains__(self, condition: object) -> bool:
+        bit = _CONDITION_BITS.get(condition) if isinstance(condition, str) else None
+        return bool(self.mask & bit) if bit is not None else condition in self.extra
+
+    def __iter__(self) -> Iterator[Condition]:
+        return (c for c in Condition if self.mask & _CONDITION_BITS[c])
+
+    def __len__(self) -> int:
+        return self.mask.bit_count() + len(self.extra)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ConditionSet):
+            return NotImplemented
+        return self.mask == other.mask and set(self.extra) == set(other.extra)
+
+    def __hash__(self) -> int:
+        return hash((self.mask, frozenset(self.extra)))
+
+    def __repr__(self) -> str:
+        return f"ConditionSet({self.to_list()!r})"
+
+
 def get_attack_modifiers(
-    attacker_conditions: list[str],
-    target_conditions: list[str],
+    attacker_conditions: list[str] | ConditionSet,
+    target_conditions: list[str] | ConditionSet,
     *,
     ranged: bool = False,
 ) -> dict[str, bool]:
@@ -469,59 +603,23 @@ def get_attack_modifiers(
     Aggregates all condition effects for the attacker and target and resolves
     the final advantage/disadvantage state per 5e rules (advantage and
     disadvantage cancel each other out regardless of how many sources exist).
+    Passing :class:`ConditionSet` objects skips the string conversion, which
+    is what batch callers should do.
 
     Args:
-        attacker_conditions: Condition strings active on the attacker.
-        target_conditions: Condition strings active on the target.
+        attacker_conditions: Conditions active on the attacker.
+        target_conditions: Conditions active on the target.
         ranged: Whether the attack is a ranged attack (affects prone, etc.).
 
     Returns:
         A dict with keys ``advantage`` and ``disadvantage`` (both ``bool``).
     """
-    has_advantage = False
-    has_disadvantage = False
-
-    # --- Effects from attacker's own conditions ---
-    for cond_str in attacker_conditions:
-        try:
-            cond = Condition(cond_str)
-        except ValueError:
-            continue
-        effects = CONDITION_EFFECTS.get(cond, {})
-
-        if effects.get("attack_disadvantage"):
-            has_disadvantage = True
-        if effects.get("attack_advantage"):
-            has_advantage = True
-
-    # --- Effects from target's conditions on the attacker ---
-    for cond_str in target_conditions:
-        try:
-            cond = Condition(cond_str)
-        except ValueError:
-            continue
-        effects = CONDITION_EFFECTS.get(cond, {})
-
-        # Generic "all attacks have advantage against this target"
-        if effects.get("attacker_advantage"):
-            has_advantage = True
-
-        # Generic "all attacks have disadvantage against this target"
-        if effects.get("attacker_disadvantage"):
-            has_disadvantage = True
-
-        # Prone: melee → advantage, ranged → disadvantage
-        if cond == Condition.PRONE:
-            if ranged:
-                has_disadvantage = True
-            else:
-                has_advantage = True
-
-    # Per 5e rules: advantage and disadvantage cancel regardless of count
-    if has_advantage and has_disadvantage:
-        return {"advantage": False, "disadvantage": False}
-
-    return {"advantage": has_advantage, "disadvantage": has_disadvantage}
+    if not isinstance(attacker_conditions, ConditionSet):
+        attacker_conditions = ConditionSet.from_list(attacker_conditions)
+    if not isinstance(target_conditions, ConditionSet):
+        target_conditions = ConditionSet.from_list(target_conditions)
+    resolved = attacker_conditions.attack_modifiers(target_conditions, ranged=ranged)
+    return {"advantage": resolved.advantage, "disadvantage": resolved.disadvantage}
 
 
 # ---------------------------------------------------------------------------
@@ -537,6 +635,7 @@ def check_level_up(current_xp: int, current_level: int) -> bool:
     return current_xp >= XP_THRESHOLDS.get(next_level, float("inf"))
 
 
+@recorded("rules.calculate_level_up_hp")
 def calculate_level_up_hp(
     char_class: str, constitution_modifier: int, use_average: bool = True
 ) -> int:
@@ -544,7 +643,16 @@ def calculate_level_up_hp(
     hit_die = CLASS_HIT_DICE.get(char_class, 8)
     if use_average:
         return (hit_die // 2 + 1) + constitution_modifier
-    return max(1, random.randint(1, hit_die) + constitution_modifier)  # noqa: S311
+    return max(1, _rng().randint(1, hit_die) + constitution_modifier)
+
+
+@recorded("rules.spend_hit_dice")
+def spend_hit_dice(hit_die: int, dice: int, constitution_modifier: int) -> int:
+    """HP regained by spending *dice* hit dice; each die heals at least 1."""
+    rng = _rng()
+    return sum(
+        max(1, rng.randint(1, hit_die) + constitution_modifier) for _ in range(dice)
+    )
 
 
 def get_proficiency_bonus(level: int) -> int:
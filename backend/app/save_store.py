@@ -0,0 +1,258 @@
+"""
+Compressed, content-deduplicated storage for save-slot state blobs.
+
+``GameStateService.capture_state`` returns the whole campaign: its data
+blob, every character, NPC, profile and relationship, and recent
+conversation history. Most of that is identical between consecutive saves,
+so instead of storing the blob inline on each slot it is split into
+sections (one per top-level key, with the campaign's session log split out
+of ``campaign_data`` since it is the part that changes every turn). Each
+section is hashed over its canonical JSON and stored once, zlib-compressed,
+in ``save_sections``; a slot keeps only a ``{section name: hash}`` map.
+
+Reads are lazy: :class:`LazySaveState` fetches and inflates a section the
+first time it is accessed, so code that only needs a couple of keys never
+decompresses the rest.
+
+Unreferenced sections are garbage-collected by
+:func:`prune_unreferenced_sections`. A save that reuses a section stamps its
+``referenced_at`` (row-locking it on Postgres) before the slot pointing at
+it commits, and pruning skips sections stamped within a grace period, so a
+section is never deleted out from under a save that is still in flight.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import dialect_insert
+from app.models.db_models import SaveSection, SaveSlot
+
+CODEC = "zlib"
+_COMPRESS_LEVEL = 6
+
+# Nested keys stored as sections of their own: parent key -> child keys
+_SPLIT_KEYS: dict[str, tuple[str, ...]] = {"campaign_data": ("session_log",)}
+_SEP = "."
+
+
+# ---------------------------------------------------------------------------
+# Section encoding
+# ---------------------------------------------------------------------------
+
+
+def encode_section(value: Any) -> bytes:  # noqa: ANN401
+    """Serialise a section to canonical JSON bytes (stable key order)."""
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), default=str
+    ).encode()
+
+
+def section_hash(payload: bytes) -> str:
+    """Return the content address of an encoded section."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def split_sections(state: Mapping[str, Any]) -> dict[str, Any]:
+    """Split a state blob into named sections."""
+    sections: dict[str, Any] = {}
+    for key, value in state.items():
+        children = _SPLIT_KEYS.get(key, ())
+        if children and isinstance(value, dict):
+            value = dict(value)
+            for child in children:
+                if child in value:
+                    sections[f"{key}{_SEP}{child}"] = value.pop(child)
+        sections[key] = value
+    return sections
+
+
+def _top_level_key(section_name: str) -> str:
+    parent, sep, child = section_name.partition(_SEP)
+    if sep and child in _SPLIT_KEYS.get(parent, ()):
+        return parent
+    return section_name
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+
+def _insert_ignore(db: Session, rows: list[dict[str, Any]]) -> None:
+    """Insert section rows, skipping hashes a concurrent save already stored."""
+    insert = dialect_insert(db)
+    db.execute(
+        insert(SaveSection).values(rows).on_conflict_do_nothing(index_elements=["hash"])
+    )
+
+
+def store_state(db: Session, state: Mapping[str, Any]) -> dict[str, str]:
+    """Store *state* as deduplicated sections and return the slot's refs.
+
+    Sections whose hash already exists are neither compressed nor written;
+    their ``referenced_at`` is bumped so a concurrent prune leaves them be.
+    The caller commits.
+
+    Returns:
+        Mapping of section name to section hash, for ``SaveSlot.section_refs``.
+    """
+    payloads = {
+        name: encode_section(value) for name, value in split_sections(state).items()
+    }
+    refs = {name: section_hash(payload) for name, payload in payloads.items()}
+    if not refs:
+        return refs
+
+    digests = set(refs.values())
+    # Touch reused sections first: on Postgres the UPDATE waits out a prune
+    # already deleting them (they are then re-inserted below) or blocks a
+    # later one until this save commits with a fresh stamp.
+    db.query(SaveSection).filter(SaveSection.hash.in_(digests)).update(
+        {SaveSection.referenced_at: datetime.now(UTC)}, synchronize_session=False
+    )
+    existing = {
+        row.hash
+        for row in db.query(SaveSection.hash).filter(SaveSection.hash.in_(digests))
+    }
+    new_rows: dict[str, dict[str, Any]] = {}
+    for name, digest in refs.items():
+        if digest in existing or digest in new_rows:
+            continue
+        payload = payloads[name]
+        new_rows[digest] = {
+            "hash": digest,
+            "codec": CODEC,
+            "raw_size": len(payload),
+            "data": zlib.compress(payload, _COMPRESS_LEVEL),
+        }
+    if new_rows:
+        _insert_ignore(db, list(new_rows.values()))
+    return refs
+
+
+def prune_unreferenced_sections(db: Session, grace_seconds: float | None = None) -> int:
+    """Delete sections no save slot refers to any more. The caller commits.
+
+    Args:
+        db: Session to delete with.
+        grace_seconds: Skip sections created or reused within this many
+            seconds, which an uncommitted save may be about to reference.
+            Defaults to ``save_section_gc_grace_seconds`` from settings.
+
+    Returns:
+        Number of sections deleted.
+    """
+    if grace_seconds is None:
+        grace_seconds = get_settings().save_section_gc_grace_seconds
+    cutoff = datetime.now(UTC) - timedelta(seconds=grace_seconds)
+    referenced: set[str] = set()
+    for (refs,) in db.query(SaveSlot.section_refs).filter(
+        SaveSlot.section_refs.isnot(None)
+    ):
+        referenced.update((refs or {}).values())
+    query = db.query(SaveSection).filter(SaveSection.referenced_at <= cutoff)
+    if referenced:
+        query = query.filter(SaveSection.hash.notin_(referenced))
+    return query.delete(synchronize_session=False)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+def _decode_row(row: SaveSection) -> Any:  # noqa: ANN401
+    if row.codec != CODEC:
+        raise ValueError(f"Unsupported save section codec '{row.codec}'")
+    return json.loads(zlib.decompress(row.data))
+
+
+def load_sections(db: Session, hashes: Iterable[str]) -> dict[str, Any]:
+    """Fetch and inflate the given sections in one query, keyed by hash."""
+    wanted = set(hashes)
+    if not wanted:
+        return {}
+    rows = db.query(SaveSection).filter(SaveSection.hash.in_(wanted)).all()
+    found = {row.hash: _decode_row(row) for row in rows}
+    missing = wanted - found.keys()
+    if missing:
+        raise LookupError(f"Save sections missing: {sorted(missing)}")
+    return found
+
+
+class LazySaveState(Mapping[str, Any]):
+    """Read-only view of a stored state that inflates sections on access.
+
+    Args:
+        db: Session used to fetch sections; must stay open while the view
+            is in use.
+        refs: The slot's ``section_refs``.
+    """
+
+    def __init__(self, db: Session, refs: Mapping[str, str]) -> None:
+        self._db = db
+        self._refs = dict(refs)
+        self._keys: dict[str, list[str]] = {}
+        for name in self._refs:
+            self._keys.setdefault(_top_level_key(name), []).append(name)
+        self._loaded: dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        if key not in self._keys:
+            raise KeyError(key)
+        if key not in self._loaded:
+            self._load([key])
+        return self._loaded[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def loaded_keys(self) -> set[str]:
+        """Top-level keys inflated so far."""
+        return set(self._loaded)
+
+    def materialize(self) -> dict[str, Any]:
+        """Inflate every section (one query) and return a plain dict."""
+        self._load([k for k in self._keys if k not in self._loaded])
+        return {key: self._loaded[key] for key in self._keys}
+
+    def _load(self, keys: list[str]) -> None:
+        names = [name for key in keys for name in self._keys[key]]
+        sections = load_sections(self._db, (self._refs[n] for n in names))
+        for key in keys:
+            value = sections[self._refs[key]] if key in self._refs else {}
+            children = [name for name in self._keys[key] if name != key]
+            if children:
+                # Copy: identical sections decode to one shared object
+                value = dict(value)
+                for name in children:
+                    value[name.partition(_SEP)[2]] = sections[self._refs[name]]
+            self._loaded[key] = value
+
+
+def slot_state(db: Session, slot: SaveSlot) -> Mapping[str, Any]:
+    """Return a slot's state: lazily from sections, or its legacy inline blob."""
+    if slot.section_refs:
+        return LazySaveState(db, slot.section_refs)
+    return slot.save_data or {}
+
+
+def slot_state_dict(db: Session, slot: SaveSlot) -> dict[str, Any]:
+    """Return a slot's full state as a plain dict."""
+    state = slot_state(db, slot)
+    if isinstance(state, LazySaveState):
+        return state.materialize()
+    return dict(state)
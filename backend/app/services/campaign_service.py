@@ -1,14 +1,24 @@
 """Campaign service for managing campaign operations."""
 
+import base64
+import binascii
+import json
 import uuid
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 from typing import Any
 
-from sqlalchemy import or_
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
 
-from app.database import get_session_context
+from app.database import run_in_session
+from app.entity_cache import invalidate_campaign, load_campaign
 from app.models.db_models import Campaign as CampaignDB
-from app.models.game_models import Campaign, CreateCampaignRequest
+from app.models.game_models import (
+    Campaign,
+    CampaignSummary,
+    CreateCampaignRequest,
+)
 
 
 def campaign_to_dict(campaign: Campaign) -> dict[str, Any]:
@@ -31,6 +41,44 @@ def dict_to_campaign(data: dict[str, Any]) -> Campaign:
     return Campaign.model_validate(data)
 
 
+# Columns read by the summary projection -- never the ``data`` blob
+_SUMMARY_COLUMNS = (
+    CampaignDB.id,
+    CampaignDB.name,
+    CampaignDB.description,
+    CampaignDB.setting,
+    CampaignDB.tone,
+    CampaignDB.is_template,
+    CampaignDB.is_custom,
+    CampaignDB.template_id,
+    CampaignDB.created_at,
+    CampaignDB.updated_at,
+)
+
+# Rows fetched per round trip when streaming summaries
+STREAM_BATCH_SIZE = 200
+
+
+def encode_campaign_cursor(created_at: datetime, campaign_id: str) -> str:
+    """Encode the ``(created_at, id)`` keyset position as an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), campaign_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_campaign_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor from :func:`encode_campaign_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, campaign_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(campaign_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid campaign cursor: {cursor!r}") from e
+
+
 class CampaignService:
     """Service for campaign management operations."""
 
@@ -38,7 +86,7 @@ class CampaignService:
         """Initialize the campaign service."""
         pass
 
-    def create_campaign(
+    async def create_campaign(
         self, campaign_data: CreateCampaignRequest, is_custom: bool = True
     ) -> Campaign:
         """Create a new campaign and persist it to database."""
@@ -55,7 +103,7 @@ class CampaignService:
         )
 
         # Save to database
-        with get_session_context() as db:
+        def _insert(db: Session) -> None:
             db_campaign = CampaignDB(
                 id=campaign_id,
                 name=campaign_data.name,
@@ -69,25 +117,33 @@ class CampaignService:
             )
             db.add(db_campaign)
             db.commit()
-            db.refresh(db_campaign)
 
+        await run_in_session(_insert)
         return campaign
 
-    def get_campaign(self, campaign_id: str) -> Campaign | None:
-        """Retrieve a campaign by ID."""
-        with get_session_context() as db:
+    async def get_campaign(self, campaign_id: str) -> Campaign | None:
+        """Retrieve a campaign by ID (served from the entity cache when warm).
+
+        The returned model is shared with the cache: treat it as read-only
+        and ``model_copy(deep=True)`` it before changing anything.
+        """
+
+        def _load(db: Session) -> tuple[Campaign, Any] | None:
             db_campaign = (
                 db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
             )
             if db_campaign:
-                return dict_to_campaign(db_campaign.data)
+                return dict_to_campaign(db_campaign.data), db_campaign.updated_at
             return None
 
-    def list_campaigns(
+        return await load_campaign(campaign_id, _load)
+
+    async def list_campaigns(
         self, include_templates: bool = True, include_custom: bool = True
     ) -> list[Campaign]:
         """List campaigns based on filters."""
-        with get_session_context() as db:
+
+        def _load(db: Session) -> list[Campaign]:
             query = db.query(CampaignDB)
 
             conditions = []
@@ -108,9 +164,89 @@ class CampaignService:
 
             return campaigns
 
-    def get_templates(self) -> list[Campaign]:
+        return await run_in_session(_load)
+
+    async def list_campaign_summaries(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+        is_template: bool | None = None,
+    ) -> tuple[list[CampaignSummary], str | None]:
+        """Return one page of campaign summaries, newest first.
+
+        Only the indexed scalar columns are selected, so the cost per row is
+        independent of how large the campaign's ``data`` blob (session log,
+        NPCs, quests) has grown. Pages are walked by keyset on
+        ``(created_at, id)`` rather than OFFSET, so deep pages are as cheap
+        as the first.
+
+        Args:
+            limit: Maximum number of summaries to return.
+            cursor: ``next_cursor`` from the previous page, or None to start.
+            is_template: Restrict to templates (True) or to non-template
+                campaigns (False); None returns both.
+
+        Returns:
+            ``(summaries, next_cursor)`` where ``next_cursor`` is None on the
+            last page.
+
+        Raises:
+            ValueError: If ``cursor`` is malformed.
+        """
+        after = decode_campaign_cursor(cursor) if cursor else None
+
+        def _load(db: Session) -> list[CampaignSummary]:
+            query = db.query(*_SUMMARY_COLUMNS)
+            if is_template is not None:
+                query = query.filter(CampaignDB.is_template.is_(is_template))
+            if after is not None:
+                created_at, campaign_id = after
+                query = query.filter(
+                    or_(
+                        CampaignDB.created_at < created_at,
+                        and_(
+                            CampaignDB.created_at == created_at,
+                            CampaignDB.id < campaign_id,
+                        ),
+                    )
+                )
+            rows = (
+                query.order_by(CampaignDB.created_at.desc(), CampaignDB.id.desc())
+                .limit(limit + 1)
+                .all()
+            )
+            return [CampaignSummary.model_validate(row._asdict()) for row in rows]
+
+        summaries = await run_in_session(_load)
+        if len(summaries) <= limit:
+            return summaries, None
+        summaries = summaries[:limit]
+        last = summaries[-1]
+        return summaries, encode_campaign_cursor(last.created_at, last.id)
+
+    async def iter_campaign_summaries(
+        self,
+        is_template: bool | None = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[CampaignSummary]:
+        """Yield every campaign summary, newest first, one keyset page at a time.
+
+        Memory stays bounded by ``batch_size`` however many campaigns exist.
+        """
+        cursor: str | None = None
+        while True:
+            page, cursor = await self.list_campaign_summaries(
+                limit=batch_size, cursor=cursor, is_template=is_template
+            )
+            for summary in page:
+                yield summary
+            if cursor is None:
+                return
+
+    async def get_templates(self) -> list[Campaign]:
         """Get pre-built campaign templates."""
-        with get_session_context() as db:
+
+        def _load(db: Session) -> list[Campaign]:
             db_campaigns = db.query(CampaignDB).filter(CampaignDB.is_template).all()
 
             campaigns = []
@@ -120,11 +256,13 @@ class CampaignService:
 
             return campaigns
 
-    def clone_campaign(
+        return await run_in_session(_load)
+
+    async def clone_campaign(
         self, template_id: str, new_name: str | None = None
     ) -> Campaign | None:
         """Clone a template campaign for customization."""
-        template = self.get_campaign(template_id)
+        template = await self.get_campaign(template_id)
         if not template:
             return None
 
@@ -146,7 +284,7 @@ class CampaignService:
         )
 
         # Save to database
-        with get_session_context() as db:
+        def _insert(db: Session) -> None:
             db_campaign = CampaignDB(
                 id=cloned_campaign.id,
                 name=cloned_campaign.name,
@@ -163,15 +301,16 @@ class CampaignService:
             )
             db.add(db_campaign)
             db.commit()
-            db.refresh(db_campaign)
 
+        await run_in_session(_insert)
         return cloned_campaign
 
-    def update_campaign(
+    async def update_campaign(
         self, campaign_id: str, updates: dict[str, Any]
     ) -> Campaign | None:
         """Update an existing campaign."""
-        with get_session_context() as db:
+
+        def _apply(db: Session) -> Campaign | None:
             db_campaign = (
                 db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
             )
@@ -217,9 +356,14 @@ class CampaignService:
 
             return dict_to_campaign(db_campaign.data)
 
-    def delete_campaign(self, campaign_id: str) -> bool:
+        updated = await run_in_session(_apply)
+        invalidate_campaign(campaign_id)
+        return updated
+
+    async def delete_campaign(self, campaign_id: str) -> bool:
         """Delete a campaign (only custom campaigns, not templates)."""
-        with get_session_context() as db:
+
+        def _delete(db: Session) -> bool:
             db_campaign = (
                 db.query(CampaignDB)
                 .filter(
@@ -235,7 +379,11 @@ class CampaignService:
                 return True
             return False
 
-    def create_template_campaigns(self) -> None:
+        deleted = await run_in_session(_delete)
+        invalidate_campaign(campaign_id)
+        return deleted
+
+    async def create_template_campaigns(self) -> None:
         """Create default template campaigns if they don't exist."""
         templates = [
             {
@@ -369,7 +517,7 @@ class CampaignService:
             },
         ]
 
-        with get_session_context() as db:
+        def _insert_missing(db: Session) -> None:
             for template_data in templates:
                 # Check if template already exists
                 existing = (
@@ -413,6 +561,8 @@ class CampaignService:
 
             db.commit()
 
+        await run_in_session(_insert_missing)
+
 
 # Global service instance
 campaign_service = CampaignService()
@@ -9,8 +9,7 @@ engine systems during live gameplay.
 import logging
 from typing import Any
 
-from app.database import get_session_context
-from app.models.db_models import Character as CharacterDB
+from app.entity_cache import load_character_data
 from app.rules_engine import (
     calculate_ac,
     get_proficiency_bonus,
@@ -26,44 +25,35 @@ def _ability_modifier(score: int) -> int:
     return (score - 10) // 2
 
 
-def load_character_state(character_id: str) -> dict[str, Any]:
-    """Load full character state from the database.
+async def load_character_state(character_id: str) -> dict[str, Any]:
+    """Load full character state through the entity cache.
 
     Returns a dict with stats, equipment, spell slots, conditions,
     and combat-relevant derived values.
     """
     try:
-        with get_session_context() as db:
-            char_row = (
-                db.query(CharacterDB)
-                .filter(CharacterDB.id == character_id)
-                .first()
-            )
-            if not char_row or not char_row.data:
-                return {}
-
-            data: dict[str, Any] = dict(char_row.data)
-            data.setdefault("id", char_row.id)
-            data.setdefault("name", char_row.name)
-
-            # Derive combat-relevant values
-            abilities = data.get("abilities", {})
-            level = data.get("level", 1)
-            proficiency_bonus = get_proficiency_bonus(level)
-            data["proficiency_bonus"] = proficiency_bonus
-
-            # Determine equipped weapon stats
-            equipped_weapon = _get_equipped_weapon(data)
-            if equipped_weapon:
-                data["equipped_weapon"] = equipped_weapon
-
-            # Calculate AC from equipment
-            equipped_armor = _get_equipped_armor_name(data)
-            shield_equipped = _has_shield(data)
-            dex_mod = _ability_modifier(abilities.get("dexterity", 10))
-            data["computed_ac"] = calculate_ac(equipped_armor, shield_equipped, dex_mod)
-
-            return data
+        data = await load_character_data(character_id)
+        if not data:
+            return {}
+
+        # Derive combat-relevant values
+        abilities = data.get("abilities", {})
+        level = data.get("level", 1)
+        proficiency_bonus = get_proficiency_bonus(level)
+        data["proficiency_bonus"] = proficiency_bonus
+
+        # Determine equipped weapon stats
+        equipped_weapon = _get_equipped_weapon(data)
+        if equipped_weapon:
+            data["equipped_weapon"] = equipped_weapon
+
+        # Calculate AC from equipment
+        equipped_armor = _get_equipped_armor_name(data)
+        shield_equipped = _has_shield(data)
+        dex_mod = _ability_modifier(abilities.get("dexterity", 10))
+        data["computed_ac"] = calculate_ac(equipped_armor, shield_equipped, dex_mod)
+
+        return data
     except Exception as e:
         logger.warning("Failed to load character state for %s: %s", character_id, e)
         return {}
@@ -167,14 +157,14 @@ def _has_shield(char_data: dict[str, Any]) -> bool:
     return False
 
 
-def load_campaign_state(campaign_id: str) -> dict[str, Any]:
+async def load_campaign_state(campaign_id: str) -> dict[str, Any]:
     """Load campaign state for context enrichment.
 
     Returns a dict with campaign metadata, current location, and any
     active combat state.
     """
     try:
-        campaign = campaign_service.get_campaign(campaign_id)
+        campaign = await campaign_service.get_campaign(campaign_id)
         if campaign is None:
             return {}
 
@@ -191,7 +181,7 @@ def load_campaign_state(campaign_id: str) -> dict[str, Any]:
         return {}
 
 
-def build_game_context(
+async def build_game_context(
     character_id: str,
     campaign_id: str,
     character_data: dict[str, Any] | None = None,
@@ -213,7 +203,7 @@ def build_game_context(
     if character_data and isinstance(character_data, dict) and character_data.get("level"):
         char_state = dict(character_data)
     else:
-        char_state = load_character_state(character_id)
+        char_state = await load_character_state(character_id)
 
     # Derive equipment-based values if not already present.
     # load_character_state() populates these, but when caller supplies
@@ -236,7 +226,7 @@ def build_game_context(
         )
 
     # Load campaign state
-    campaign_state = load_campaign_state(campaign_id) if campaign_id else {}
+    campaign_state = await load_campaign_state(campaign_id) if campaign_id else {}
 
     # Extract ability scores for convenience
     abilities = char_state.get("abilities", {})
@@ -1,12 +1,17 @@
 """Service for capturing and restoring full campaign game state."""
 
 import logging
+import time
 import uuid as _uuid
+from collections.abc import Mapping
 from datetime import UTC, datetime
 from typing import Any
 
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
+from app.database import dialect_insert
+from app.entity_cache import invalidate_campaign, invalidate_character
 from app.models.db_models import (
     NPC as NPCDB,
 )
@@ -26,6 +31,96 @@ logger = logging.getLogger(__name__)
 # Cap conversation history entries to avoid unbounded save sizes
 _MAX_CONVERSATION_ENTRIES = 50
 
+# Rows per INSERT ... ON CONFLICT statement in bulk restores
+_BULK_BATCH_SIZE = 500
+
+
+class _Stopwatch:
+    """Records elapsed milliseconds between successive laps."""
+
+    def __init__(self) -> None:
+        self.laps: dict[str, float] = {}
+        self._start = self._mark = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.laps[name] = round((now - self._mark) * 1000, 3)
+        self._mark = now
+
+    def total(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+
+class RestoreConflictError(Exception):
+    """A saved row's id already belongs to a different campaign."""
+
+    def __init__(self, table: str, ids: list[str]) -> None:
+        super().__init__(
+            f"Cannot restore {table} rows {ids}: the ids belong to another campaign"
+        )
+        self.table = table
+        self.ids = ids
+
+
+def _bulk_upsert(
+    db: Session,
+    model: Any,  # noqa: ANN401
+    rows: list[dict[str, Any]],
+    campaign_id: str | None = None,
+) -> int:
+    """Upsert *rows* into *model*'s table by primary key, in batches.
+
+    Existing rows have every supplied column except ``id`` and
+    ``created_at`` overwritten, and their ``version`` (if the table has
+    one) bumped.
+
+    Args:
+        db: Session to write with; the caller commits.
+        model: ORM model of the target table.
+        rows: Column dicts, each with an ``id``.
+        campaign_id: For campaign-scoped tables, only rows already owned by
+            this campaign are updated. An id held by another campaign is a
+            conflict, as it is on the ORM path, and raises
+            :class:`RestoreConflictError`.
+
+    Returns:
+        Number of rows written.
+    """
+    # A batch may not touch the same key twice (Postgres rejects it)
+    rows = list({row["id"]: row for row in rows}.values())
+    if not rows:
+        return 0
+    table = model.__table__
+    stmt = dialect_insert(db)(model)
+    updates = {
+        column: stmt.excluded[column]
+        for column in rows[0]
+        if column not in ("id", "created_at")
+    }
+    if "version" in table.c:
+        updates["version"] = table.c.version + 1
+    scoped = campaign_id is not None and "campaign_id" in table.c
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_=updates,
+        where=(table.c.campaign_id == campaign_id) if scoped else None,
+    )
+    # executemany form: compiled once, sent as multi-row VALUES batches
+    for start in range(0, len(rows), _BULK_BATCH_SIZE):
+        batch = rows[start : start + _BULK_BATCH_SIZE]
+        db.execute(stmt, batch)
+        if scoped:
+            # Rows the WHERE guard left alone still belong to someone else
+            foreign = db.scalars(
+                select(table.c.id).where(
+                    table.c.id.in_([row["id"] for row in batch]),
+                    table.c.campaign_id != campaign_id,
+                )
+            ).all()
+            if foreign:
+                raise RestoreConflictError(table.name, sorted(foreign))
+    return len(rows)
+
 
 class GameStateService:
     """Serialise and restore full campaign game state."""
@@ -134,25 +229,41 @@ class GameStateService:
         }
 
     def restore_state(
-        self, campaign_id: str, state_data: dict[str, Any], db: Session
+        self,
+        campaign_id: str,
+        state_data: Mapping[str, Any],
+        db: Session,
+        bulk: bool = False,
     ) -> dict[str, Any]:
         """Restore a previously captured game state.
 
         Overwrites the campaign's data blob and recreates characters, NPCs,
-        profiles and relationships from the saved state.
-
-        Returns a summary of what was restored.
+        profiles and relationships from the saved state, in one transaction.
+
+        Args:
+            campaign_id: Campaign to restore into.
+            state_data: Output of :meth:`capture_state`.
+            db: Session to restore with; committed on success.
+            bulk: Write rows with batched ``INSERT ... ON CONFLICT`` upserts
+                (one statement per ``_BULK_BATCH_SIZE`` rows) instead of
+                merging them one at a time through the ORM.
+
+        Returns a summary of what was restored: per-table row counts, the
+        mode used and per-table timings in milliseconds.
         """
         campaign = db.query(CampaignDB).filter(CampaignDB.id == campaign_id).first()
         if campaign is None:
             raise ValueError(f"Campaign {campaign_id} not found")
 
+        stopwatch = _Stopwatch()
         restored: dict[str, Any] = {
             "campaign": False,
             "characters_restored": 0,
             "npcs_restored": 0,
             "npc_profiles_restored": 0,
             "npc_relationships_restored": 0,
+            "mode": "bulk" if bulk else "orm",
+            "timings_ms": stopwatch.laps,
         }
 
         # --- Campaign data ---
@@ -168,7 +279,39 @@ class GameStateService:
             )
             campaign.updated_at = datetime.now(UTC)
             restored["campaign"] = True
+        stopwatch.lap("campaign")
 
+        saved_characters: list[dict[str, Any]] = state_data.get("characters", [])
+        if bulk:
+            self._bulk_restore_rows(campaign_id, state_data, db, restored, stopwatch)
+        else:
+            self._orm_restore_rows(campaign_id, state_data, db, restored, stopwatch)
+
+        db.commit()
+        stopwatch.lap("commit")
+        stopwatch.laps["total"] = stopwatch.total()
+
+        invalidate_campaign(campaign_id)
+        for char_data in saved_characters:
+            if char_data.get("id"):
+                invalidate_character(char_data["id"])
+
+        logger.info(
+            "Restored game state for campaign %s: %s",
+            campaign_id,
+            restored,
+        )
+        return restored
+
+    def _orm_restore_rows(
+        self,
+        campaign_id: str,
+        state_data: Mapping[str, Any],
+        db: Session,
+        restored: dict[str, Any],
+        stopwatch: _Stopwatch,
+    ) -> None:
+        """Merge entity rows one at a time through the ORM."""
         # --- Characters ---
         saved_characters: list[dict[str, Any]] = state_data.get("characters", [])
         for char_data in saved_characters:
@@ -188,6 +331,7 @@ class GameStateService:
                     )
                 )
             restored["characters_restored"] += 1
+        stopwatch.lap("characters")
 
         # --- Legacy NPCs ---
         # Remove existing NPCs for the campaign, then re-insert from state
@@ -210,6 +354,7 @@ class GameStateService:
                 )
             )
             restored["npcs_restored"] += 1
+        stopwatch.lap("npcs")
 
         # --- NPC profiles ---
         db.query(NPCProfileDB).filter(
@@ -232,6 +377,7 @@ class GameStateService:
                 )
             )
             restored["npc_profiles_restored"] += 1
+        stopwatch.lap("npc_profiles")
 
         # --- NPC relationships ---
         db.query(NPCRelationshipDB).filter(
@@ -252,17 +398,102 @@ class GameStateService:
                 )
             )
             restored["npc_relationships_restored"] += 1
+        stopwatch.lap("npc_relationships")
+
+    def _bulk_restore_rows(
+        self,
+        campaign_id: str,
+        state_data: Mapping[str, Any],
+        db: Session,
+        restored: dict[str, Any],
+        stopwatch: _Stopwatch,
+    ) -> None:
+        """Write entity rows with batched dialect-aware upserts.
+
+        Per table this issues one DELETE for the campaign's stale rows and
+        one ``INSERT ... ON CONFLICT (id) DO UPDATE`` per batch, instead of
+        a SELECT or INSERT per row. NPC, profile and relationship ids still
+        held by another campaign raise :class:`RestoreConflictError` rather
+        than being taken over.
+        """
+        now = datetime.now(UTC)
 
-        db.commit()
+        character_rows = [
+            {
+                "id": c["id"],
+                "name": c.get("name", "Unknown"),
+                "data": c.get("data", {}),
+            }
+            for c in state_data.get("characters", [])
+            if c.get("id")
+        ]
+        restored["characters_restored"] = _bulk_upsert(db, CharacterDB, character_rows)
+        stopwatch.lap("characters")
 
-        logger.info(
-            "Restored game state for campaign %s: %s",
-            campaign_id,
-            restored,
+        # Children first so foreign keys hold on databases that enforce them
+        for model in (NPCRelationshipDB, NPCProfileDB, NPCDB):
+            db.execute(delete(model).where(model.campaign_id == campaign_id))
+
+        npc_rows = [
+            {
+                "id": n.get("id") or str(_uuid.uuid4()),
+                "name": n.get("name", "Unknown"),
+                "race": n.get("race"),
+                "occupation": n.get("occupation"),
+                "location": n.get("location"),
+                "campaign_id": campaign_id,
+                "personality": n.get("personality", {}),
+                "stats": n.get("stats"),
+                "relationships": n.get("relationships", []),
+                "data": n.get("data", {}),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for n in state_data.get("npcs", [])
+        ]
+        restored["npcs_restored"] = _bulk_upsert(db, NPCDB, npc_rows, campaign_id)
+        stopwatch.lap("npcs")
+
+        profile_rows = [
+            {
+                "id": p.get("id") or str(_uuid.uuid4()),
+                "campaign_id": campaign_id,
+                "name": p.get("name", "Unknown"),
+                "description": p.get("description"),
+                "personality_traits": p.get("personality_traits", []),
+                "disposition": p.get("disposition", "neutral"),
+                "location": p.get("location"),
+                "is_alive": p.get("is_alive", True),
+                "conversation_notes": p.get("conversation_notes", []),
+                "conversation_history": [],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for p in state_data.get("npc_profiles", [])
+        ]
+        restored["npc_profiles_restored"] = _bulk_upsert(db, NPCProfileDB, profile_rows, campaign_id)
+        stopwatch.lap("npc_profiles")
+
+        relationship_rows = [
+            {
+                "id": r.get("id") or str(_uuid.uuid4()),
+                "npc_id": r.get("npc_id", ""),
+                "campaign_id": campaign_id,
+                "disposition_score": r.get("disposition_score", 0),
+                "interactions_count": r.get("interactions_count", 0),
+                "key_events": r.get("key_events", []),
+                "last_interaction": r.get("last_interaction"),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for r in state_data.get("npc_relationships", [])
+        ]
+        restored["npc_relationships_restored"] = _bulk_upsert(
+            db, NPCRelationshipDB, relationship_rows, campaign_id
         )
-        return restored
+        stopwatch.lap("npc_relationships")
 
-    def get_save_summary(self, state_data: dict[str, Any]) -> dict[str, Any]:
+    def get_save_summary(self, state_data: Mapping[str, Any]) -> dict[str, Any]:
         """Generate a human-readable summary of a save state (for UI display)."""
         campaign_data = state_data.get("campaign_data", {})
         characters = state_data.get("characters", [])
@@ -7,21 +7,27 @@ import uuid
 
 from sqlalchemy.orm import Session
 
-from app.database import get_session_context
+from app.database import run_in_session
 from app.models.db_models import GameSession, SessionParticipant
 
 logger = logging.getLogger(__name__)
 
 
 class SessionManager:
-    """Manages multiplayer game sessions: creation, joining, turns, and teardown."""
+    """Manages multiplayer game sessions: creation, joining, turns, and teardown.
 
-    def create_session(self, campaign_id: str) -> dict:
+    Every method is a coroutine whose queries run through
+    :func:`~app.database.run_in_session`, so callers on the event loop never
+    block on the database.
+    """
+
+    async def create_session(self, campaign_id: str) -> dict:
         """Create a new game session for a campaign.
 
         Any existing active session for the campaign is ended first.
         """
-        with get_session_context() as db:
+
+        def _run(db: Session) -> dict:
             # End any existing active session for this campaign
             existing = self._get_active_session(db, campaign_id)
             if existing:
@@ -40,7 +46,9 @@ class SessionManager:
             db.refresh(session)
             return self._session_to_dict(session)
 
-    def join_session(
+        return await run_in_session(_run)
+
+    async def join_session(
         self,
         session_id: str,
         character_id: str,
@@ -48,7 +56,8 @@ class SessionManager:
         is_dm: bool = False,
     ) -> dict:
         """Add a participant to an existing session."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> dict:
             session = db.query(GameSession).filter(GameSession.id == session_id).first()
             if not session:
                 raise ValueError(f"Session {session_id} not found")
@@ -85,9 +94,12 @@ class SessionManager:
             db.refresh(participant)
             return self._participant_to_dict(participant)
 
-    def leave_session(self, session_id: str, participant_id: str) -> None:
+        return await run_in_session(_run)
+
+    async def leave_session(self, session_id: str, participant_id: str) -> None:
         """Mark a participant as disconnected."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> None:
             participant = (
                 db.query(SessionParticipant)
                 .filter(
@@ -100,9 +112,12 @@ class SessionManager:
                 participant.is_connected = False
                 db.commit()
 
-    def get_session(self, session_id: str) -> dict | None:
+        await run_in_session(_run)
+
+    async def get_session(self, session_id: str) -> dict | None:
         """Get session details including participants."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> dict | None:
             session = db.query(GameSession).filter(GameSession.id == session_id).first()
             if not session:
                 return None
@@ -117,9 +132,12 @@ class SessionManager:
             ]
             return result
 
-    def get_active_session(self, campaign_id: str) -> dict | None:
+        return await run_in_session(_run)
+
+    async def get_active_session(self, campaign_id: str) -> dict | None:
         """Get the active session for a campaign, if any."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> dict | None:
             session = self._get_active_session(db, campaign_id)
             if not session:
                 return None
@@ -134,9 +152,12 @@ class SessionManager:
             ]
             return result
 
-    def get_participants(self, session_id: str) -> list[dict]:
+        return await run_in_session(_run)
+
+    async def get_participants(self, session_id: str) -> list[dict]:
         """List all participants in a session."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> list[dict]:
             participants = (
                 db.query(SessionParticipant)
                 .filter(SessionParticipant.session_id == session_id)
@@ -144,9 +165,12 @@ class SessionManager:
             )
             return [self._participant_to_dict(p) for p in participants]
 
-    def set_turn_order(self, session_id: str, character_ids: list[str]) -> dict:
+        return await run_in_session(_run)
+
+    async def set_turn_order(self, session_id: str, character_ids: list[str]) -> dict:
         """Set the turn order for a session."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> dict:
             session = db.query(GameSession).filter(GameSession.id == session_id).first()
             if not session:
                 raise ValueError(f"Session {session_id} not found")
@@ -156,9 +180,12 @@ class SessionManager:
             db.refresh(session)
             return self._session_to_dict(session)
 
-    def advance_turn(self, session_id: str) -> str:
+        return await run_in_session(_run)
+
+    async def advance_turn(self, session_id: str) -> str:
         """Advance to the next turn and return the next character_id."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> str:
             session = db.query(GameSession).filter(GameSession.id == session_id).first()
             if not session:
                 raise ValueError(f"Session {session_id} not found")
@@ -170,9 +197,12 @@ class SessionManager:
             db.commit()
             return session.turn_order[next_index]
 
-    def end_session(self, session_id: str) -> dict:
+        return await run_in_session(_run)
+
+    async def end_session(self, session_id: str) -> dict:
         """End a game session."""
-        with get_session_context() as db:
+
+        def _run(db: Session) -> dict:
             session = db.query(GameSession).filter(GameSession.id == session_id).first()
             if not session:
                 raise ValueError(f"Session {session_id} not found")
@@ -185,6 +215,8 @@ class SessionManager:
             db.refresh(session)
             return self._session_to_dict(session)
 
+        return await run_in_session(_run)
+
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
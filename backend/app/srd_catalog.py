@@ -0,0 +1,264 @@
+"""
+Indexed, read-only view of the SRD reference data.
+
+The SRD tables (spells, monsters, weapons, armor) never change while the
+server runs, yet the combat and encounter code looks entries up many times
+per turn. :class:`SRDCatalog` is built once from the raw JSON and answers
+every lookup from a dictionary: records are indexed by id and by lowercase
+name, and grouped by the fields callers filter on (class, level and school
+for spells; CR and type for monsters; category and property for weapons;
+category for armor).
+
+Because one catalog is shared by every request, records are frozen: each
+entry is a :class:`FrozenRecord` (a ``dict`` that refuses mutation, so it
+still serialises like one) with nested lists turned into tuples, and every
+multi-record query returns a tuple. ``copy.deepcopy`` and ``.copy()`` on a
+record return ordinary mutable dicts and lists for callers that need to
+edit their own copy.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from typing import Any, NoReturn
+
+Records = tuple["FrozenRecord", ...]
+
+
+class FrozenRecord(dict):
+    """A ``dict`` that raises ``TypeError`` on any in-place change."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> NoReturn:  # noqa: ANN401
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def copy(self) -> dict[str, Any]:  # type: ignore[override]
+        """Return a mutable deep copy."""
+        return thaw(self)
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return thaw(self)
+
+    def __reduce__(self) -> tuple[type[FrozenRecord], tuple[dict[str, Any]]]:
+        # dict's default pickling would rebuild the record via __setitem__
+        return type(self), (dict(self),)
+
+
+def freeze(value: Any) -> Any:  # noqa: ANN401
+    """Recursively turn dicts into :class:`FrozenRecord` and lists into tuples."""
+    if isinstance(value, FrozenRecord):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenRecord((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list | tuple):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:  # noqa: ANN401
+    """Inverse of :func:`freeze`: plain, mutable dicts and lists."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Index builders
+# ---------------------------------------------------------------------------
+
+
+def _unique(
+    records: Iterable[FrozenRecord], key: Callable[[FrozenRecord], Hashable]
+) -> dict[Hashable, FrozenRecord]:
+    """Map each key to the first record carrying it (a linear scan's answer)."""
+    index: dict[Hashable, FrozenRecord] = {}
+    for record in records:
+        index.setdefault(key(record), record)
+    return index
+
+
+def _grouped(pairs: Iterable[tuple[Hashable, FrozenRecord]]) -> dict[Hashable, Records]:
+    """Group records by key, keeping source order and dropping repeats."""
+    groups: dict[Hashable, dict[int, FrozenRecord]] = {}
+    for key, record in pairs:
+        groups.setdefault(key, {}).setdefault(id(record), record)
+    return {key: tuple(group.values()) for key, group in groups.items()}
+
+
+def _name(record: FrozenRecord) -> str:
+    return str(record.get("name", "")).lower()
+
+
+def _flatten(by_category: Mapping[str, Iterable[Any]]) -> list[tuple[str, FrozenRecord]]:
+    return [
+        (category, freeze(entry))
+        for category, entries in by_category.items()
+        for entry in entries
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Catalog
+# ---------------------------------------------------------------------------
+
+
+class SRDCatalog:
+    """Frozen SRD tables with hash indexes over the fields callers query.
+
+    The constructor takes the parsed SRD JSON files: ``spells.json`` and
+    ``monsters.json`` as lists, ``weapons.json`` and ``armor.json`` as lists
+    keyed by category. Lookups accept the same loosely formatted keys the old
+    list scans did (any case for names, classes, types, categories and
+    properties; spaces for underscores in monster ids) and return ``None`` or
+    an empty tuple on a miss.
+    """
+
+    __slots__ = (
+        "spells",
+        "monsters",
+        "weapons",
+        "armor",
+        "_spell_by_id",
+        "_spell_by_name",
+        "_spells_by_class",
+        "_spells_by_level",
+        "_spells_by_school",
+        "_monster_by_id",
+        "_monster_by_name",
+        "_monsters_by_cr",
+        "_monsters_by_type",
+        "_weapon_by_id",
+        "_weapon_by_name",
+        "_weapons_by_category",
+        "_weapons_by_property",
+        "_armor_by_id",
+        "_armor_by_name",
+        "_armor_by_category",
+    )
+
+    def __init__(
+        self,
+        spells: Iterable[Mapping[str, Any]] = (),
+        monsters: Iterable[Mapping[str, Any]] = (),
+        weapons: Mapping[str, Iterable[Mapping[str, Any]]] | None = None,
+        armor: Mapping[str, Iterable[Mapping[str, Any]]] | None = None,
+    ) -> None:
+        self.spells: Records = tuple(freeze(s) for s in spells)
+        self._spell_by_id = _unique(self.spells, lambda s: s.get("id"))
+        self._spell_by_name = _unique(self.spells, _name)
+        self._spells_by_class = _grouped(
+            (cls, s) for s in self.spells for cls in s.get("available_classes", ())
+        )
+        self._spells_by_level = _grouped((s.get("level"), s) for s in self.spells)
+        self._spells_by_school = _grouped(
+            (str(s.get("school", "")).lower(), s) for s in self.spells
+        )
+
+        self.monsters: Records = tuple(freeze(m) for m in monsters)
+        self._monster_by_id = _unique(self.monsters, lambda m: m.get("id"))
+        self._monster_by_name = _unique(self.monsters, _name)
+        self._monsters_by_cr = _grouped((str(m.get("cr")), m) for m in self.monsters)
+        self._monsters_by_type = _grouped(
+            (str(m.get("type", "")).lower(), m) for m in self.monsters
+        )
+
+        weapon_entries = _flatten(weapons or {})
+        self.weapons: Records = tuple(w for _, w in weapon_entries)
+        self._weapon_by_id = _unique(self.weapons, lambda w: w.get("id"))
+        self._weapon_by_name = _unique(self.weapons, _name)
+        self._weapons_by_category = _grouped(weapon_entries)
+        self._weapons_by_property = _grouped(
+            (prop, w) for w in self.weapons for prop in w.get("properties", ())
+        )
+
+        armor_entries = _flatten(armor or {})
+        self.armor: Records = tuple(a for _, a in armor_entries)
+        self._armor_by_id = _unique(self.armor, lambda a: a.get("id"))
+        self._armor_by_name = _unique(self.armor, _name)
+        self._armor_by_category = _grouped(armor_entries)
+
+    # -- spells -------------------------------------------------------------
+
+    def spell_by_id(self, spell_id: str) -> FrozenRecord | None:
+        """Return the spell with this exact id."""
+        return self._spell_by_id.get(spell_id)
+
+    def spell_by_name(self, name: str) -> FrozenRecord | None:
+        """Return the spell with this name (case-insensitive)."""
+        return self._spell_by_name.get(name.lower())
+
+    def spells_by_class(self, character_class: str) -> Records:
+        """Return the spells on a class's list."""
+        return self._spells_by_class.get(character_class.lower(), ())
+
+    def spells_by_level(self, spell_level: int) -> Records:
+        """Return the spells of one level (0 for cantrips)."""
+        return self._spells_by_level.get(spell_level, ())
+
+    def spells_by_school(self, school: str) -> Records:
+        """Return the spells of one school of magic."""
+        return self._spells_by_school.get(school.lower(), ())
+
+    # -- monsters -----------------------------------------------------------
+
+    def monster_by_id(self, monster_id: str) -> FrozenRecord | None:
+        """Return a stat block by id; ``"Giant Rat"`` finds ``giant_rat``."""
+        return self._monster_by_id.get(monster_id.lower().replace(" ", "_"))
+
+    def monster_by_name(self, name: str) -> FrozenRecord | None:
+        """Return a stat block by name (case-insensitive)."""
+        return self._monster_by_name.get(name.lower())
+
+    def monsters_by_cr(self, cr: str) -> Records:
+        """Return the monsters of one challenge rating (``"1/4"``, ``"2"``)."""
+        return self._monsters_by_cr.get(str(cr), ())
+
+    def monsters_by_type(self, monster_type: str) -> Records:
+        """Return the monsters of one creature type (``"undead"``)."""
+        return self._monsters_by_type.get(monster_type.lower(), ())
+
+    # -- weapons ------------------------------------------------------------
+
+    def weapon_by_id(self, weapon_id: str) -> FrozenRecord | None:
+        """Return a weapon by id (case-insensitive)."""
+        return self._weapon_by_id.get(weapon_id.lower())
+
+    def weapon_by_name(self, name: str) -> FrozenRecord | None:
+        """Return a weapon by name (case-insensitive)."""
+        return self._weapon_by_name.get(name.lower())
+
+    def weapons_by_category(self, category: str) -> Records:
+        """Return the weapons in a category (``"martial_melee"``)."""
+        return self._weapons_by_category.get(category.lower(), ())
+
+    @property
+    def weapon_categories(self) -> tuple[str, ...]:
+        """The weapon category names, in file order."""
+        return tuple(self._weapons_by_category)
+
+    def weapons_with_property(self, prop: str) -> Records:
+        """Return the weapons with a property (``"finesse"``)."""
+        return self._weapons_by_property.get(prop.lower(), ())
+
+    # -- armor --------------------------------------------------------------
+
+    def armor_by_id(self, armor_id: str) -> FrozenRecord | None:
+        """Return an armor entry by id (case-insensitive)."""
+        return self._armor_by_id.get(armor_id.lower())
+
+    def armor_by_name(self, name: str) -> FrozenRecord | None:
+        """Return an armor entry by name (case-insensitive)."""
+        return self._armor_by_name.get(name.lower())
+
+    def armor_by_category(self, category: str) -> Records:
+        """Return the armor in a category (``"light"`` … ``"shield"``)."""
+        return self._armor_by_category.get(category.lower(), ())
@@ -1,5 +1,14 @@
 """
 Utility module for loading and accessing D&D 5e SRD data.
+
+The ``load_*`` functions return the parsed JSON files. Spell, monster,
+weapon and armor lookups go through the shared :class:`SRDCatalog` from
+:func:`get_srd_catalog`, which indexes those tables once and hands out
+read-only records.
+
+Every table is parsed lazily on first use unless :func:`warm_srd_data` ran
+first; it fills them all at once, from the prebuilt snapshot when one
+matches the JSON (see :mod:`app.srd_snapshot`).
 """
 
 import json
@@ -7,6 +16,9 @@ import logging
 from pathlib import Path
 from typing import Any
 
+from app.srd_catalog import FrozenRecord, Records, SRDCatalog
+from app.srd_snapshot import build_catalog, load_snapshot, read_tables, validate_tables
+
 logger = logging.getLogger(__name__)
 
 # Path to data directory
@@ -20,6 +32,7 @@ _spells_data: list[dict[str, Any]] | None = None
 _monsters_data: list[dict[str, Any]] | None = None
 _weapons_data: dict[str, Any] | None = None
 _armor_data: dict[str, Any] | None = None
+_catalog: SRDCatalog | None = None
 
 # XP required to reach each character level (D&D 5e SRD)
 XP_THRESHOLDS: dict[int, int] = {
@@ -171,26 +184,76 @@ def get_background_info(background: str) -> dict[str, Any]:
     return backgrounds.get(background.lower(), {})
 
 
-def get_spells_by_class(character_class: str) -> list[dict[str, Any]]:
+def warm_srd_data() -> str:
+    """Load every SRD table and build the catalog now instead of on first use.
+
+    Reads the prebuilt snapshot when it matches the JSON on disk and parses
+    the JSON otherwise. Safe to call repeatedly. If the JSON cannot be read
+    or validated the error is logged and the tables are left to the lazy
+    loaders.
+
+    Returns:
+        Where the data came from: ``"snapshot"``, ``"json"``, ``"warm"``
+        (already loaded) or ``"unavailable"``.
+    """
+    global _class_features_data, _racial_traits_data, _backgrounds_data
+    global _spells_data, _monsters_data, _weapons_data, _armor_data, _catalog
+    if _catalog is not None:
+        return "warm"
+
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        tables, catalog, source = snapshot.tables, snapshot.catalog, "snapshot"
+    else:
+        try:
+            tables = read_tables()
+            validate_tables(tables)
+        except (OSError, ValueError) as e:
+            logger.error("Failed to warm SRD data: %s", e)
+            return "unavailable"
+        catalog, source = build_catalog(tables), "json"
+    _class_features_data = tables["class_features"]
+    _racial_traits_data = tables["racial_traits"]
+    _backgrounds_data = tables["backgrounds"]
+    _spells_data = tables["spells"]
+    _monsters_data = tables["monsters"]
+    _weapons_data = tables["weapons"]
+    _armor_data = tables["armor"]
+    _catalog = catalog
+    return source
+
+
+def get_srd_catalog() -> SRDCatalog:
+    """Return the indexed SRD catalog, building it on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = SRDCatalog(
+            spells=load_spells(),
+            monsters=load_monsters(),
+            weapons=load_weapons(),
+            armor=load_armor(),
+        )
+    return _catalog
+
+
+def get_spells_by_class(character_class: str) -> Records:
     """Get all spells available to a specific class."""
-    spells = load_spells()
-    return [
-        spell
-        for spell in spells
-        if character_class.lower() in spell.get("available_classes", [])
-    ]
+    return get_srd_catalog().spells_by_class(character_class)
 
 
-def get_spells_by_level(spell_level: int) -> list[dict[str, Any]]:
+def get_spells_by_level(spell_level: int) -> Records:
     """Get all spells of a specific level."""
-    spells = load_spells()
-    return [spell for spell in spells if spell.get("level") == spell_level]
+    return get_srd_catalog().spells_by_level(spell_level)
+
 
+def get_spells_by_school(school: str) -> Records:
+    """Get all spells of a specific school (e.g. 'evocation')."""
+    return get_srd_catalog().spells_by_school(school)
 
-def get_spell_by_id(spell_id: str) -> dict[str, Any] | None:
+
+def get_spell_by_id(spell_id: str) -> FrozenRecord | None:
     """Get a specific spell by ID."""
-    spells = load_spells()
-    return next((spell for spell in spells if spell.get("id") == spell_id), None)
+    return get_srd_catalog().spell_by_id(spell_id)
 
 
 def apply_racial_ability_bonuses(
@@ -260,38 +323,29 @@ def load_monsters() -> list[dict[str, Any]]:
     return _monsters_data
 
 
-def get_monster_by_id(monster_id: str) -> dict[str, Any] | None:
+def get_all_monsters() -> Records:
+    """Return every monster stat block."""
+    return get_srd_catalog().monsters
+
+
+def get_monster_by_id(monster_id: str) -> FrozenRecord | None:
     """Get a monster stat block by its ID."""
-    monsters = load_monsters()
-    return next(
-        (m for m in monsters if m.get("id") == monster_id.lower().replace(" ", "_")),
-        None,
-    )
+    return get_srd_catalog().monster_by_id(monster_id)
 
 
-def get_monster_by_name(name: str) -> dict[str, Any] | None:
+def get_monster_by_name(name: str) -> FrozenRecord | None:
     """Get a monster stat block by its name (case-insensitive)."""
-    monsters = load_monsters()
-    return next(
-        (m for m in monsters if m.get("name", "").lower() == name.lower()),
-        None,
-    )
+    return get_srd_catalog().monster_by_name(name)
 
 
-def get_monsters_by_cr(cr: str) -> list[dict[str, Any]]:
+def get_monsters_by_cr(cr: str) -> Records:
     """Get all monsters with a specific challenge rating."""
-    monsters = load_monsters()
-    return [m for m in monsters if str(m.get("cr")) == str(cr)]
+    return get_srd_catalog().monsters_by_cr(cr)
 
 
-def get_monsters_by_type(monster_type: str) -> list[dict[str, Any]]:
+def get_monsters_by_type(monster_type: str) -> Records:
     """Get all monsters of a specific type (e.g. 'humanoid', 'undead')."""
-    monsters = load_monsters()
-    return [
-        m
-        for m in monsters
-        if m.get("type", "").lower() == monster_type.lower()
-    ]
+    return get_srd_catalog().monsters_by_type(monster_type)
 
 
 # ---------------------------------------------------------------------------
@@ -312,34 +366,24 @@ def load_weapons() -> dict[str, Any]:
     return _weapons_data
 
 
-def get_all_weapons() -> list[dict[str, Any]]:
-    """Return a flat list of all weapons across all categories."""
-    weapons_by_category = load_weapons()
-    all_weapons: list[dict[str, Any]] = []
-    for category_weapons in weapons_by_category.values():
-        all_weapons.extend(category_weapons)
-    return all_weapons
+def get_all_weapons() -> Records:
+    """Return all weapons across all categories, in category order."""
+    return get_srd_catalog().weapons
 
 
-def get_weapon_by_id(weapon_id: str) -> dict[str, Any] | None:
+def get_weapon_by_id(weapon_id: str) -> FrozenRecord | None:
     """Get a weapon by its ID."""
-    return next(
-        (w for w in get_all_weapons() if w.get("id") == weapon_id.lower()),
-        None,
-    )
+    return get_srd_catalog().weapon_by_id(weapon_id)
 
 
-def get_weapons_by_category(category: str) -> list[dict[str, Any]]:
+def get_weapons_by_category(category: str) -> Records:
     """Get all weapons in a category (e.g. 'simple_melee', 'martial_ranged')."""
-    weapons_by_category = load_weapons()
-    return weapons_by_category.get(category.lower(), [])
+    return get_srd_catalog().weapons_by_category(category)
 
 
-def get_weapons_with_property(prop: str) -> list[dict[str, Any]]:
+def get_weapons_with_property(prop: str) -> Records:
     """Get all weapons that have a specific property (e.g. 'finesse', 'heavy')."""
-    return [
-        w for w in get_all_weapons() if prop.lower() in w.get("properties", [])
-    ]
+    return get_srd_catalog().weapons_with_property(prop)
 
 
 # ---------------------------------------------------------------------------
@@ -360,27 +404,19 @@ def load_armor() -> dict[str, Any]:
     return _armor_data
 
 
-def get_all_armor() -> list[dict[str, Any]]:
-    """Return a flat list of all armor pieces across all categories."""
-    armor_by_category = load_armor()
-    all_armor: list[dict[str, Any]] = []
-    for category_armor in armor_by_category.values():
-        all_armor.extend(category_armor)
-    return all_armor
+def get_all_armor() -> Records:
+    """Return all armor pieces across all categories, in category order."""
+    return get_srd_catalog().armor
 
 
-def get_armor_by_id(armor_id: str) -> dict[str, Any] | None:
+def get_armor_by_id(armor_id: str) -> FrozenRecord | None:
     """Get an armor entry by its ID."""
-    return next(
-        (a for a in get_all_armor() if a.get("id") == armor_id.lower()),
-        None,
-    )
+    return get_srd_catalog().armor_by_id(armor_id)
 
 
-def get_armor_by_category(category: str) -> list[dict[str, Any]]:
+def get_armor_by_category(category: str) -> Records:
     """Get all armor in a category (e.g. 'light', 'medium', 'heavy', 'shield')."""
-    armor_by_category = load_armor()
-    return armor_by_category.get(category.lower(), [])
+    return get_srd_catalog().armor_by_category(category)
 
 
 def calculate_armor_class(
@@ -0,0 +1,225 @@
+"""
+Full-text search over the SRD catalog.
+
+:class:`SRDSearchIndex` is an in-memory inverted index over spells,
+monsters, weapons and armor, ranked with BM25. Each record is flattened
+into weighted fields (its name counts most, then short tags such as school,
+creature type, damage type and weapon properties, then free text such as
+descriptions), so a query term found in a name outranks the same term in
+a description. Since the catalog never changes, every posting stores its
+finished BM25 contribution and a query only adds numbers up.
+
+Query terms also match as prefixes (``"fireb"`` finds ``fireball``) at a
+discount, which serves autocomplete and loose references like "that fire
+spell" without an exact name.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.srd_catalog import FrozenRecord, SRDCatalog
+
+# BM25 parameters (the usual defaults)
+_K1 = 1.2
+_B = 0.75
+
+# Weight of a term reached only through prefix expansion
+_PREFIX_WEIGHT = 0.5
+
+# Shortest query term that is expanded as a prefix
+_MIN_PREFIX = 2
+
+# Field weights per record kind: name, then tags, then free text
+_NAME_WEIGHT = 3.0
+_TAG_WEIGHT = 1.5
+_TEXT_WEIGHT = 1.0
+
+_TAG_FIELDS: dict[str, tuple[str, ...]] = {
+    "spell": (
+        "school",
+        "damage_type",
+        "healing_type",
+        "save_type",
+        "condition",
+        "available_classes",
+    ),
+    "monster": (
+        "type",
+        "size",
+        "damage_type",
+        "attack_name",
+        "damage_immunities",
+        "condition_immunities",
+        "damage_vulnerabilities",
+    ),
+    "weapon": ("damage_type", "properties"),
+    "armor": ("category",),
+}
+_TEXT_FIELDS: dict[str, tuple[str, ...]] = {
+    "spell": ("description", "casting_time", "range", "duration"),
+    "monster": ("senses", "languages", "skills"),
+    "weapon": (),
+    "armor": ("note",),
+}
+
+KINDS = tuple(_TAG_FIELDS)
+
+_STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "any", "for", "in", "is", "it", "of", "on",
+        "or", "some", "that", "the", "this", "those", "to", "what", "which", "with",
+    }
+)
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase *text* and split it into alphanumeric terms, minus stopwords."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _field_text(value: object) -> str:
+    if isinstance(value, tuple | list):
+        return " ".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """One ranked search result."""
+
+    kind: str
+    record: FrozenRecord
+    score: float
+
+    @property
+    def id(self) -> str:
+        return self.record.get("id", "")
+
+    @property
+    def name(self) -> str:
+        return self.record.get("name", "")
+
+
+class SRDSearchIndex:
+    """BM25-ranked inverted index over the SRD catalog's records."""
+
+    __slots__ = ("_docs", "_postings", "_vocabulary")
+
+    def __init__(self, catalog: SRDCatalog) -> None:
+        self._docs: list[tuple[str, FrozenRecord]] = [
+            *(("spell", r) for r in catalog.spells),
+            *(("monster", r) for r in catalog.monsters),
+            *(("weapon", r) for r in catalog.weapons),
+            *(("armor", r) for r in catalog.armor),
+        ]
+        # The weapon category is the key a record was filed under, not a field
+        weapon_category = {
+            id(w): category.replace("_", " ")
+            for category in catalog.weapon_categories
+            for w in catalog.weapons_by_category(category)
+        }
+        # Weighted term frequencies and lengths per document
+        weighted: list[Counter[str]] = []
+        for kind, record in self._docs:
+            tf: Counter[str] = Counter()
+            for weight, fields in (
+                (_NAME_WEIGHT, ("name",)),
+                (_TAG_WEIGHT, _TAG_FIELDS[kind]),
+                (_TEXT_WEIGHT, _TEXT_FIELDS[kind]),
+            ):
+                for field in fields:
+                    for term in tokenize(_field_text(record.get(field))):
+                        tf[term] += weight
+            for term in tokenize(weapon_category.get(id(record), "")):
+                tf[term] += _TAG_WEIGHT
+            tf[kind] += _TAG_WEIGHT
+            weighted.append(tf)
+
+        lengths = [sum(tf.values()) for tf in weighted]
+        avg_length = sum(lengths) / len(lengths) if lengths else 1.0
+        doc_freq: Counter[str] = Counter(t for tf in weighted for t in tf)
+        n_docs = len(self._docs)
+
+        grouped: dict[str, list[tuple[int, float]]] = {}
+        for doc, tf in enumerate(weighted):
+            norm = _K1 * (1 - _B + _B * lengths[doc] / avg_length)
+            for term, freq in tf.items():
+                df = doc_freq[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                grouped.setdefault(term, []).append(
+                    (doc, idf * freq * (_K1 + 1) / (freq + norm))
+                )
+        self._postings: dict[str, tuple[tuple[int, float], ...]] = {
+            t: tuple(p) for t, p in grouped.items()
+        }
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _expand(self, term: str) -> Iterable[tuple[str, float]]:
+        """Yield the index terms *term* matches and the weight of each match."""
+        if term in self._postings:
+            yield term, 1.0
+        if len(term) < _MIN_PREFIX:
+            return
+        start = bisect_left(self._vocabulary, term)
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            if candidate != term:
+                yield candidate, _PREFIX_WEIGHT
+
+    def search(
+        self, query: str, kinds: Iterable[str] | None = None, limit: int = 10
+    ) -> list[SearchHit]:
+        """Return up to *limit* records matching *query*, best first.
+
+        Args:
+            query: Free text; every term also matches as a prefix.
+            kinds: Restrict results to these kinds (``"spell"``,
+                ``"monster"``, ``"weapon"``, ``"armor"``).
+            limit: Maximum number of hits.
+        """
+        allowed = None if kinds is None else frozenset(kinds)
+        scores: dict[int, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            best: dict[int, float] = {}
+            for match, weight in self._expand(term):
+                for doc, impact in self._postings[match]:
+                    score = impact * weight
+                    if score > best.get(doc, 0.0):
+                        best[doc] = score
+            for doc, score in best.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        hits = []
+        for doc, score in ranked:
+            kind, record = self._docs[doc]
+            if allowed is not None and kind not in allowed:
+                continue
+            hits.append(SearchHit(kind, record, round(score, 4)))
+            if len(hits) >= limit:
+                break
+        return hits
+
+
+_index: SRDSearchIndex | None = None
+
+
+def get_srd_search_index() -> SRDSearchIndex:
+    """Return the shared search index, building it from the SRD catalog once."""
+    global _index
+    if _index is None:
+        from app.srd_data import get_srd_catalog
+
+        _index = SRDSearchIndex(get_srd_catalog())
+    return _index
@@ -0,0 +1,219 @@
+"""
+Prebuilt binary snapshot of the SRD JSON files.
+
+Parsing the seven files under ``app/data`` and indexing them is cheap but
+not free, and every worker process used to pay for it on its first SRD
+request. ``python -m app.srd_snapshot`` (run by the Docker build) validates
+the files, builds the :class:`~app.srd_catalog.SRDCatalog` and pickles the
+parsed tables together with the catalog into ``srd.snapshot``, which
+:func:`load_snapshot` reads back in one go.
+
+The file starts with a fixed header::
+
+    b"SRDSNAP1" | sha256 of the JSON sources (hex) | sha256 of the payload (hex)
+
+A snapshot whose source hash no longer matches the JSON on disk (someone
+edited the data without rebuilding) or whose payload fails its checksum is
+ignored, and callers fall back to parsing the JSON. The pickle is only ever
+produced by this module from files shipped with the app, so it is trusted
+like the code next to it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.srd_catalog import SRDCatalog
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent / "data"
+SNAPSHOT_PATH = DATA_DIR / "srd.snapshot"
+
+_MAGIC = b"SRDSNAP1"
+_DIGEST_LEN = 64  # hex sha256
+_HEADER_LEN = len(_MAGIC) + 2 * _DIGEST_LEN
+
+# Table name -> shape of its JSON file
+SRD_TABLES: dict[str, type] = {
+    "class_features": dict,
+    "racial_traits": dict,
+    "backgrounds": dict,
+    "spells": list,
+    "monsters": list,
+    "weapons": dict,
+    "armor": dict,
+}
+
+
+class SnapshotError(ValueError):
+    """The SRD JSON files are malformed and cannot be compiled."""
+
+
+@dataclass(frozen=True)
+class SRDSnapshot:
+    """Parsed SRD tables plus the catalog indexed from them."""
+
+    source_hash: str
+    tables: dict[str, Any]
+    catalog: SRDCatalog
+
+
+def source_hash(data_dir: Path = DATA_DIR) -> str:
+    """Hash the names and bytes of every SRD JSON file in *data_dir*."""
+    digest = hashlib.sha256()
+    for name in sorted(SRD_TABLES):
+        digest.update(name.encode())
+        digest.update(b"\0")
+        digest.update((data_dir / f"{name}.json").read_bytes())
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+
+def _check_records(table: str, records: Any) -> None:  # noqa: ANN401
+    if not isinstance(records, list):
+        raise SnapshotError(f"{table}: expected a list of records")
+    seen: set[str] = set()
+    for record in records:
+        if not isinstance(record, dict) or not isinstance(record.get("id"), str):
+            raise SnapshotError(f"{table}: every record needs a string 'id'")
+        if record["id"] in seen:
+            raise SnapshotError(f"{table}: duplicate id '{record['id']}'")
+        seen.add(record["id"])
+
+
+def validate_tables(tables: dict[str, Any]) -> None:
+    """Check the parsed SRD tables have the shapes the catalog relies on.
+
+    Raises:
+        SnapshotError: A table is missing, has the wrong type, or holds
+            records without a unique string ``id``.
+    """
+    for table, shape in SRD_TABLES.items():
+        if not isinstance(tables.get(table), shape):
+            raise SnapshotError(f"{table}: expected a JSON {shape.__name__}")
+    _check_records("spells", tables["spells"])
+    _check_records("monsters", tables["monsters"])
+    for table in ("weapons", "armor"):
+        for category, records in tables[table].items():
+            _check_records(f"{table}.{category}", records)
+
+
+def read_tables(data_dir: Path = DATA_DIR) -> dict[str, Any]:
+    """Parse every SRD JSON file in *data_dir*."""
+    tables = {}
+    for table in SRD_TABLES:
+        with open(data_dir / f"{table}.json") as f:
+            tables[table] = json.load(f)
+    return tables
+
+
+def build_catalog(tables: dict[str, Any]) -> SRDCatalog:
+    """Index the spell, monster, weapon and armor tables."""
+    return SRDCatalog(
+        spells=tables["spells"],
+        monsters=tables["monsters"],
+        weapons=tables["weapons"],
+        armor=tables["armor"],
+    )
+
+
+def build_snapshot(data_dir: Path = DATA_DIR, path: Path = SNAPSHOT_PATH) -> SRDSnapshot:
+    """Validate the JSON in *data_dir* and write its snapshot to *path*.
+
+    The file is written to a temporary name and renamed into place, so a
+    concurrent reader sees either the old snapshot or the new one.
+
+    Raises:
+        SnapshotError: The JSON files do not validate.
+    """
+    digest = source_hash(data_dir)
+    tables = read_tables(data_dir)
+    validate_tables(tables)
+    snapshot = SRDSnapshot(digest, tables, build_catalog(tables))
+
+    payload = pickle.dumps(
+        {"tables": snapshot.tables, "catalog": snapshot.catalog},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    header = _MAGIC + digest.encode() + hashlib.sha256(payload).hexdigest().encode()
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header + payload)
+        os.chmod(tmp, 0o644)  # mkstemp creates it owner-only
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return snapshot
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+def load_snapshot(
+    path: Path = SNAPSHOT_PATH, data_dir: Path = DATA_DIR
+) -> SRDSnapshot | None:
+    """Read the snapshot at *path* if it matches the JSON in *data_dir*.
+
+    Returns:
+        The snapshot, or None if it is missing, stale or corrupt.
+    """
+    try:
+        blob = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    header, payload = blob[:_HEADER_LEN], blob[_HEADER_LEN:]
+    if not header.startswith(_MAGIC):
+        logger.warning("SRD snapshot %s has an unknown format; ignoring it", path)
+        return None
+    stored_source = header[len(_MAGIC) : len(_MAGIC) + _DIGEST_LEN].decode(errors="replace")
+    stored_payload = header[len(_MAGIC) + _DIGEST_LEN :].decode(errors="replace")
+    try:
+        current_source = source_hash(data_dir)
+    except OSError:
+        current_source = None
+    if stored_source != current_source:
+        logger.warning("SRD snapshot %s is stale; rebuild it with the build step", path)
+        return None
+    if hashlib.sha256(payload).hexdigest() != stored_payload:
+        logger.warning("SRD snapshot %s failed its checksum; ignoring it", path)
+        return None
+    contents = pickle.loads(payload)  # noqa: S301  # written by build_snapshot
+    return SRDSnapshot(stored_source, contents["tables"], contents["catalog"])
+
+
+def main() -> None:
+    """Build the snapshot from the command line: ``python -m app.srd_snapshot``."""
+    logging.basicConfig(level=logging.INFO)
+    try:
+        snapshot = build_snapshot()
+    except (OSError, SnapshotError) as e:
+        logger.error("Could not build SRD snapshot: %s", e)
+        sys.exit(1)
+    logger.info(
+        "Wrote %s (%d bytes, source %s)",
+        SNAPSHOT_PATH,
+        SNAPSHOT_PATH.stat().st_size,
+        snapshot.source_hash[:12],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,17 +5,31 @@ This module consolidates dice rolling logic to eliminate duplication
 between DungeonMasterAgent and CombatMCAgent.
 """
 
-import random
-import re
 from typing import Any
 
+from app.utils.dice_engine import DICE_IN_TEXT, RandomSource, compile_dice, normalize
+
+_D20 = {
+    "normal": "1d20",
+    "advantage": "2d20kh1",
+    "disadvantage": "2d20kl1",
+}
+
 
 class DiceRoller:
-    """Utility class for rolling dice using standard D&D notation."""
+    """Utility class for rolling dice using standard D&D notation.
+
+    Parsing and rolling go through :mod:`app.utils.dice_engine`, so every
+    method understands the full notation (keep/drop, rerolls, exploding
+    dice, several pools) and accepts any ``randint`` source as ``rng``.
+    """
 
     @staticmethod
     def roll_d20(
-        modifier: int = 0, advantage: bool = False, disadvantage: bool = False
+        modifier: int = 0,
+        advantage: bool = False,
+        disadvantage: bool = False,
+        rng: RandomSource | None = None,
     ) -> dict[str, Any]:
         """
         Roll a d20 with optional advantage/disadvantage and modifier.
@@ -24,75 +38,59 @@ class DiceRoller:
             modifier: Modifier to add to the roll
             advantage: Roll with advantage (take higher of two rolls)
             disadvantage: Roll with disadvantage (take lower of two rolls)
+            rng: Random source to draw from (defaults to the random module)
 
         Returns:
-            Dict containing rolls, modifier, total, and advantage type
+            Dict containing rolls, the natural (kept) roll, modifier, total,
+            and advantage type
         """
         if advantage and not disadvantage:
-            roll1 = random.randint(1, 20)  # noqa: S311
-            roll2 = random.randint(1, 20)  # noqa: S311
-            roll = max(roll1, roll2)
-            rolls = [roll1, roll2]
             advantage_type = "advantage"
         elif disadvantage and not advantage:
-            roll1 = random.randint(1, 20)  # noqa: S311
-            roll2 = random.randint(1, 20)  # noqa: S311
-            roll = min(roll1, roll2)
-            rolls = [roll1, roll2]
             advantage_type = "disadvantage"
         else:
-            roll = random.randint(1, 20)  # noqa: S311
-            rolls = [roll]
             advantage_type = "normal"
 
-        total = roll + modifier
+        result = compile_dice(_D20[advantage_type]).roll(rng)
+        natural = result.total
 
         return {
-            "rolls": rolls,
+            "rolls": result.rolls,
+            "natural": natural,
             "modifier": modifier,
-            "total": total,
+            "total": natural + modifier,
             "advantage_type": advantage_type,
         }
 
     @staticmethod
-    def roll_dice(notation: str) -> dict[str, Any]:
+    def roll_dice(notation: str, rng: RandomSource | None = None) -> dict[str, Any]:
         """
-        Roll dice based on standard notation like '2d6+3' or '1d20-1'.
+        Roll dice based on notation like '2d6+3', '1d20-1' or '4d6kh3'.
 
         Args:
-            notation: Dice notation string (e.g., '2d6', '1d20+5', '3d8-2')
+            notation: Dice notation string (e.g., '2d6', '1d20+5', '2d6+1d4+2')
+            rng: Random source to draw from (defaults to the random module)
 
         Returns:
-            Dict containing notation, rolls, modifier, and total
+            Dict containing notation, rolls (every die rolled), modifier
+            (the flat part), and total (minimum 1)
 
         Raises:
             ValueError: If notation is invalid
         """
-        # Parse dice notation: NdM+X or NdM-X or NdM
-        match = re.match(r"(\d+)d(\d+)([+-]\d+)?", notation.lower().strip())
-        if not match:
-            raise ValueError(f"Invalid dice notation: {notation}")
-
-        num_dice = int(match.group(1))
-        dice_type = int(match.group(2))
-        modifier_str = match.group(3) or "+0"
-
-        # Parse modifier
-        modifier = int(modifier_str)
-
-        # Roll the dice
-        rolls = [random.randint(1, dice_type) for _ in range(num_dice)]  # noqa: S311
-        total = sum(rolls) + modifier
+        result = compile_dice(notation).roll(rng)
 
         return {
             "notation": notation,
-            "rolls": rolls,
-            "modifier": modifier,
-            "total": max(total, 1),  # Minimum 1 for damage rolls
+            "rolls": result.rolls,
+            "modifier": result.modifier,
+            "total": max(result.total, 1),  # Minimum 1 for damage rolls
         }
 
     @staticmethod
-    def roll_damage(dice_notation: str) -> dict[str, Any]:
+    def roll_damage(
+        dice_notation: str, rng: RandomSource | None = None
+    ) -> dict[str, Any]:
         """
         Roll damage dice based on notation.
 
@@ -100,11 +98,12 @@ class DiceRoller:
 
         Args:
             dice_notation: Damage dice notation (e.g., '1d8+3')
+            rng: Random source to draw from (defaults to the random module)
 
         Returns:
             Dict containing notation, rolls, modifier, and total (minimum 1)
         """
-        result = DiceRoller.roll_dice(dice_notation)
+        result = DiceRoller.roll_dice(dice_notation, rng)
         # Ensure minimum 1 damage
         result["total"] = max(result["total"], 1)
         return result
@@ -120,12 +119,11 @@ class DiceRoller:
         Returns:
             Roll result dict if valid notation found, None otherwise
         """
-        # Look for dice notation in text, handling both "2d6" and "d20" patterns
-        match = re.search(r"(\d*d\d+(?:[+-]\d+)?)", text.lower())
+        match = DICE_IN_TEXT.search(text.lower())
         if not match:
             return None
 
-        notation = match.group(1)
+        notation = normalize(match.group(0))
         # Handle "d20" -> "1d20" conversion
         if notation.startswith("d"):
             notation = "1" + notation
@@ -0,0 +1,478 @@
+"""
+Dice expression compiler and evaluator.
+
+Every roller in the app goes through this module. Notation is parsed once
+into a small AST, and the compiled expression is kept in a bounded LRU
+keyed by its normalised text, so hot expressions like ``1d20`` or a
+monster's ``2d6+3`` are never re-parsed. Evaluation draws from a pluggable
+random source (anything with ``randint(a, b)``); by default the active
+campaign stream from :mod:`app.rng`, or the :mod:`random` module.
+
+Supported notation (case and whitespace are ignored)::
+
+    2d6+3, d20, 1d%            pools (count defaults to 1, % is 100)
+    4d6dl1, 4d6kh3, 2d20kh1    drop/keep lowest/highest (k alone = kh)
+    2d20kl1, 4d6dh1
+    1d6r1, 2d6r<2              reroll while 1 / while at most 2
+    1d20ro1                    reroll once
+    1d6!, 1d10!>9              explode on max / on at least 9
+    2d6+1d4+3, (1d6+2)*2, 8d6/2   arithmetic (+ - * /, integer division
+                               rounds down) and parentheses
+
+Conditions take ``N`` (equal), ``<N`` (at most) or ``>N`` (at least).
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Protocol
+
+from app.rng import active_stream, record_call, register_operation
+
+# Limits that keep a single expression cheap to evaluate
+MAX_NOTATION_LENGTH = 200
+MAX_DICE = 1000
+MAX_SIDES = 1000
+MAX_EXPLOSIONS = 100  # extra dice per pool
+MAX_REROLLS = 100  # per die
+
+_COMPILE_CACHE_SIZE = 1024
+
+
+class RandomSource(Protocol):
+    """Anything dice can draw from, e.g. the :mod:`random` module or a ``random.Random``."""
+
+    def randint(self, a: int, b: int) -> int: ...
+
+
+class DiceNotationError(ValueError):
+    """The notation cannot be parsed or is outside the supported limits."""
+
+
+# ---------------------------------------------------------------------------
+# AST
+# ---------------------------------------------------------------------------
+
+# (op, value): "=" equal, "<" at most, ">" at least
+Condition = tuple[str, int]
+
+
+def _matches(condition: Condition, value: int) -> bool:
+    op, target = condition
+    if op == "<":
+        return value <= target
+    if op == ">":
+        return value >= target
+    return value == target
+
+
+def _condition_text(condition: Condition) -> str:
+    op, target = condition
+    return f"{'' if op == '=' else op}{target}"
+
+
+@dataclass(frozen=True, slots=True)
+class Const:
+    """An integer literal."""
+
+    value: int
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+@dataclass(frozen=True, slots=True)
+class DicePool:
+    """``NdM`` with optional keep/drop, reroll and explode modifiers."""
+
+    count: int
+    sides: int
+    keep: tuple[str, int] | None = None  # ("kh" | "kl" | "dh" | "dl", n)
+    reroll: Condition | None = None
+    reroll_once: bool = False
+    explode: Condition | None = None
+
+    def __str__(self) -> str:
+        text = f"{self.count}d{self.sides}"
+        if self.reroll is not None:
+            text += ("ro" if self.reroll_once else "r") + _condition_text(self.reroll)
+        if self.explode is not None:
+            text += "!" + ("" if self.explode == (">", self.sides) else _condition_text(self.explode))
+        if self.keep is not None:
+            text += f"{self.keep[0]}{self.keep[1]}"
+        return text
+
+
+@dataclass(frozen=True, slots=True)
+class BinOp:
+    """``left op right`` for ``+ - * /``."""
+
+    op: str
+    left: Node
+    right: Node
+
+    def __str__(self) -> str:
+        return f"({self.left}{self.op}{self.right})"
+
+
+@dataclass(frozen=True, slots=True)
+class Neg:
+    """Unary minus."""
+
+    operand: Node
+
+    def __str__(self) -> str:
+        return f"-{self.operand}"
+
+
+Node = Const | DicePool | BinOp | Neg
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+_DICE = re.compile(r"(\d*)d(\d+|%)((?:kh|kl|k|dh|dl|ro|r|!)[<>]?\d*)*")
+_MODIFIER = re.compile(r"(kh|kl|k|dh|dl|ro|r|!)([<>]?)(\d*)")
+_NUMBER = re.compile(r"\d+")
+
+
+def _parse_pool(text: str, count_text: str, sides_text: str, modifiers: str) -> DicePool:
+    count = int(count_text) if count_text else 1
+    sides = 100 if sides_text == "%" else int(sides_text)
+    if count > MAX_DICE:
+        raise DiceNotationError(f"At most {MAX_DICE} dice per pool: {text}")
+    if not 1 <= sides <= MAX_SIDES:
+        raise DiceNotationError(f"Dice need 1 to {MAX_SIDES} sides: {text}")
+
+    keep: tuple[str, int] | None = None
+    reroll: Condition | None = None
+    reroll_once = False
+    explode: Condition | None = None
+    for match in _MODIFIER.finditer(modifiers):
+        kind, op, number = match.groups()
+        if kind in ("kh", "kl", "k", "dh", "dl"):
+            if keep is not None or op:
+                raise DiceNotationError(f"Invalid keep/drop in {text}")
+            keep = ("kh" if kind == "k" else kind, int(number) if number else 1)
+        elif kind in ("r", "ro"):
+            if reroll is not None or not number:
+                raise DiceNotationError(f"Invalid reroll in {text}")
+            reroll, reroll_once = (op or "=", int(number)), kind == "ro"
+        else:
+            if explode is not None:
+                raise DiceNotationError(f"Invalid explode in {text}")
+            explode = (op or "=", int(number)) if number else (">", sides)
+    for condition in (reroll, explode):
+        if condition is not None and all(_matches(condition, v) for v in range(1, sides + 1)):
+            raise DiceNotationError(f"Condition matches every face in {text}")
+    return DicePool(count, sides, keep, reroll, reroll_once, explode)
+
+
+class _Parser:
+    """Recursive-descent parser: expr := term (+|- term)*, term := unary (*|/ unary)*."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.pos = 0
+
+    def parse(self) -> Node:
+        node = self.expr()
+        if self.pos != len(self.text):
+            raise DiceNotationError(f"Unexpected '{self.text[self.pos:]}' in {self.text}")
+        return node
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def expr(self) -> Node:
+        node = self.term()
+        while self.peek() in ("+", "-"):
+            op = self.text[self.pos]
+            self.pos += 1
+            node = BinOp(op, node, self.term())
+        return node
+
+    def term(self) -> Node:
+        node = self.unary()
+        while self.peek() in ("*", "/"):
+            op = self.text[self.pos]
+            self.pos += 1
+            node = BinOp(op, node, self.unary())
+        return node
+
+    def unary(self) -> Node:
+        if self.peek() == "-":
+            self.pos += 1
+            return Neg(self.unary())
+        if self.peek() == "+":
+            self.pos += 1
+            return self.unary()
+        return self.atom()
+
+    def atom(self) -> Node:
+        if self.peek() == "(":
+            self.pos += 1
+            node = self.expr()
+            if self.peek() != ")":
+                raise DiceNotationError(f"Missing ')' in {self.text}")
+            self.pos += 1
+            return node
+        dice = _DICE.match(self.text, self.pos)
+        if dice:
+            self.pos = dice.end()
+            count, sides = dice.group(1), dice.group(2)
+            modifiers = self.text[dice.start() + len(count) + 1 + len(sides) : dice.end()]
+            return _parse_pool(dice.group(0), count, sides, modifiers)
+        number = _NUMBER.match(self.text, self.pos)
+        if number:
+            self.pos = number.end()
+            return Const(int(number.group(0)))
+        raise DiceNotationError(f"Invalid dice notation: {self.text}")
+
+
+def _count_dice(node: Node) -> int:
+    if isinstance(node, DicePool):
+        return node.count
+    if isinstance(node, BinOp):
+        return _count_dice(node.left) + _count_dice(node.right)
+    if isinstance(node, Neg):
+        return _count_dice(node.operand)
+    return 0
+
+
+def _additive_terms(node: Node, sign: int = 1) -> list[tuple[int, Node]]:
+    """Flatten the top-level ``+``/``-`` chain into signed terms."""
+    if isinstance(node, BinOp) and node.op in ("+", "-"):
+        right_sign = sign if node.op == "+" else -sign
+        return _additive_terms(node.left, sign) + _additive_terms(node.right, right_sign)
+    if isinstance(node, Neg):
+        return _additive_terms(node.operand, -sign)
+    return [(sign, node)]
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class PoolRoll:
+    """What one dice pool rolled.
+
+    ``rolls`` are the final face values after rerolls, explosions included;
+    ``kept`` and ``dropped`` split them by the keep/drop modifier.
+    """
+
+    notation: str
+    rolls: list[int]
+    kept: list[int]
+    dropped: list[int] = field(default_factory=list)
+    rerolls: list[dict[str, int]] = field(default_factory=list)
+    exploded: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(self.kept)
+
+
+@dataclass(slots=True)
+class Term:
+    """One signed term of the top-level ``+``/``-`` chain."""
+
+    sign: int
+    notation: str
+    value: int  # unsigned
+    pools: list[PoolRoll]
+    is_constant: bool
+
+
+@dataclass(slots=True)
+class RollResult:
+    """The outcome of evaluating a compiled expression once."""
+
+    notation: str
+    total: int
+    terms: list[Term]
+
+    @property
+    def pools(self) -> list[PoolRoll]:
+        return [pool for term in self.terms for pool in term.pools]
+
+    @property
+    def rolls(self) -> list[int]:
+        """Every die rolled, in order."""
+        return [roll for pool in self.pools for roll in pool.rolls]
+
+    @property
+    def modifier(self) -> int:
+        """Sum of the constant terms (the ``+3`` in ``2d6+3``)."""
+        return sum(t.sign * t.value for t in self.terms if t.is_constant)
+
+
+def _roll_die(pool: DicePool, rng: RandomSource, index: int, record: PoolRoll) -> int:
+    value = rng.randint(1, pool.sides)
+    if pool.reroll is not None:
+        attempts = 0
+        while _matches(pool.reroll, value) and attempts < MAX_REROLLS:
+            new = rng.randint(1, pool.sides)
+            record.rerolls.append({"original": value, "new": new, "index": index})
+            value = new
+            attempts += 1
+            if pool.reroll_once:
+                break
+    return value
+
+
+def _roll_pool(pool: DicePool, rng: RandomSource) -> PoolRoll:
+    record = PoolRoll(str(pool), [], [])
+    rolls = record.rolls
+    for index in range(pool.count):
+        rolls.append(_roll_die(pool, rng, index, record))
+    if pool.explode is not None:
+        pending = sum(1 for v in rolls if _matches(pool.explode, v))
+        while pending and record.exploded < MAX_EXPLOSIONS:
+            value = _roll_die(pool, rng, len(rolls), record)
+            rolls.append(value)
+            record.exploded += 1
+            pending += -1 + _matches(pool.explode, value)
+
+    kept = list(rolls)
+    if pool.keep is not None:
+        mode, n = pool.keep
+        by_value = sorted(range(len(rolls)), key=rolls.__getitem__)
+        if mode == "kh":
+            drop = by_value[: max(len(rolls) - n, 0)]
+        elif mode == "kl":
+            drop = by_value[min(n, len(rolls)) :]
+        elif mode == "dh":
+            drop = by_value[len(rolls) - min(n, len(rolls)) :]
+        else:  # dl
+            drop = by_value[:n]
+        dropped = set(drop)
+        kept = [v for i, v in enumerate(rolls) if i not in dropped]
+        record.dropped = [rolls[i] for i in sorted(dropped, key=drop.index)]
+    record.kept = kept
+    return record
+
+
+def _evaluate(node: Node, rng: RandomSource, pools: list[PoolRoll]) -> int:
+    if isinstance(node, Const):
+        return node.value
+    if isinstance(node, DicePool):
+        record = _roll_pool(node, rng)
+        pools.append(record)
+        return record.total
+    if isinstance(node, Neg):
+        return -_evaluate(node.operand, rng, pools)
+    left = _evaluate(node.left, rng, pools)
+    right = _evaluate(node.right, rng, pools)
+    if node.op == "+":
+        return left + right
+    if node.op == "-":
+        return left - right
+    if node.op == "*":
+        return left * right
+    if right == 0:
+        raise DiceNotationError("Division by zero")
+    return left // right
+
+
+class CompiledDice:
+    """A parsed dice expression, ready to be rolled any number of times."""
+
+    __slots__ = ("notation", "ast", "terms", "dice_count")
+
+    def __init__(self, notation: str, ast: Node) -> None:
+        self.notation = notation
+        self.ast = ast
+        self.terms = tuple(_additive_terms(ast))
+        self.dice_count = _count_dice(ast)
+
+    def __repr__(self) -> str:
+        return f"CompiledDice({self.notation!r})"
+
+    def roll(self, rng: RandomSource | None = None) -> RollResult:
+        """Evaluate the expression once, drawing from *rng*.
+
+        Without *rng* the roll draws from the active campaign stream (and is
+        journaled on it), or from :mod:`random` outside one.
+        """
+        if rng is None:
+            return record_call("dice.roll", (self.notation,), {}, lambda: self._roll(active_stream() or random))
+        return self._roll(rng)
+
+    def _roll(self, source: RandomSource) -> RollResult:
+        terms = []
+        total = 0
+        for sign, node in self.terms:
+            pools: list[PoolRoll] = []
+            value = _evaluate(node, source, pools)
+            terms.append(Term(sign, str(node), value, pools, isinstance(node, Const)))
+            total += sign * value
+        return RollResult(self.notation, total, terms)
+
+    def critical_dice(self) -> CompiledDice | None:
+        """The expression's additive dice terms alone, for critical-hit extra dice.
+
+        Returns None when the expression has no dice at the top level.
+        """
+        dice = [(sign, node) for sign, node in self.terms if _count_dice(node)]
+        if not dice:
+            return None
+        node: Node = dice[0][1] if dice[0][0] > 0 else Neg(dice[0][1])
+        text = str(node)
+        for sign, term in dice[1:]:
+            op = "+" if sign > 0 else "-"
+            node = BinOp(op, node, term)
+            text += f"{op}{term}"
+        return CompiledDice(text, node)
+
+
+def normalize(notation: str) -> str:
+    """Lowercase *notation* and drop whitespace."""
+    return "".join(notation.lower().split())
+
+
+@lru_cache(maxsize=_COMPILE_CACHE_SIZE)
+def _compile(text: str) -> CompiledDice:
+    if not text:
+        raise DiceNotationError("Dice notation is empty")
+    if len(text) > MAX_NOTATION_LENGTH:
+        raise DiceNotationError(f"Dice notation longer than {MAX_NOTATION_LENGTH} characters")
+    ast = _Parser(text).parse()
+    if _count_dice(ast) > MAX_DICE:
+        raise DiceNotationError(f"At most {MAX_DICE} dice per expression")
+    return CompiledDice(text, ast)
+
+
+def compile_dice(notation: str) -> CompiledDice:
+    """Parse *notation*, or return the cached compiled expression.
+
+    Raises:
+        DiceNotationError: The notation is invalid or exceeds the limits.
+    """
+    return _compile(normalize(notation))
+
+
+def roll(notation: str, rng: RandomSource | None = None) -> RollResult:
+    """Compile (cached) and roll *notation* once."""
+    return compile_dice(notation).roll(rng)
+
+
+register_operation("dice.roll", lambda notation: compile_dice(notation).roll())
+
+
+def compile_cache_info() -> object:
+    """Hit/miss statistics of the compiled-expression LRU."""
+    return _compile.cache_info()
+
+
+# A dice expression inside free text ("I roll 4d6kh3 + 2 for it")
+DICE_IN_TEXT = re.compile(
+    r"\d*d(?:\d+|%)(?:(?:kh|kl|k|dh|dl|ro|r|!)[<>]?\d*)*"
+    r"(?:\s*[+-]\s*(?:\d*d(?:\d+|%)(?:(?:kh|kl|k|dh|dl|ro|r|!)[<>]?\d*)*|\d+(?!\s*d)))*"
+)
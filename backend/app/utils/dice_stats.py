@@ -0,0 +1,366 @@
+"""
+Exact probability distributions of dice expressions.
+
+:func:`dice_distribution` turns a compiled expression into its probability
+mass function without sampling:
+
+* a die's face distribution accounts for rerolls (rerolling forever is
+  uniform over the remaining faces; rerolling once mixes in a fresh roll)
+  and for exploding dice (a compound sum, truncated once the chance of
+  exploding again is negligible);
+* a plain pool is that face distribution convolved with itself;
+* keep/drop pools (``4d6kh3``, ``2d20kl1``) use a dynamic program over the
+  order statistics, walking faces from best to worst and assigning how
+  many dice show each one;
+* ``+`` and ``-`` convolve; ``*`` and ``/`` combine every pair of values.
+
+Distributions are memoized per normalised expression, so asking for the
+odds of ``2d20kh1`` or a monster's ``2d6+3`` again costs a dictionary
+lookup. :func:`attack_odds` and :func:`check_odds` answer "what is my
+chance to hit AC 15 with advantage" from the d20 distributions, applying
+the natural 1 / natural 20 rules for attacks.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+from functools import lru_cache
+
+import numpy as np
+
+from app.utils.dice_engine import (
+    MAX_EXPLOSIONS,
+    CompiledDice,
+    Const,
+    DiceNotationError,
+    DicePool,
+    Neg,
+    Node,
+    _matches,
+    compile_dice,
+    normalize,
+)
+
+# Largest number of distinct totals a distribution may have
+MAX_SUPPORT = 100_000
+
+# Largest pool the keep/drop dynamic program accepts
+MAX_KEEP_DICE = 100
+
+# Stop expanding an exploding die once continuing is this unlikely
+_EXPLODE_EPSILON = 1e-12
+
+_CACHE_SIZE = 512
+
+
+class Distribution:
+    """Probability mass function over consecutive integer totals.
+
+    ``probs[i]`` is the probability of the total ``offset + i``.
+    """
+
+    __slots__ = ("offset", "probs")
+
+    def __init__(self, offset: int, probs: Iterable[float]) -> None:
+        probs = list(probs)
+        # Trim impossible totals from both ends
+        start = next((i for i, p in enumerate(probs) if p > 0), 0)
+        end = len(probs) - next((i for i, p in enumerate(reversed(probs)) if p > 0), 0)
+        self.offset = offset + start
+        self.probs = tuple(probs[start:end]) or (1.0,)
+
+    @classmethod
+    def from_mapping(cls, pmf: dict[int, float]) -> Distribution:
+        low, high = min(pmf), max(pmf)
+        _check_support(high - low + 1)
+        probs = [0.0] * (high - low + 1)
+        for value, p in pmf.items():
+            probs[value - low] += p
+        return cls(low, probs)
+
+    def __repr__(self) -> str:
+        return f"Distribution(min={self.min}, max={self.max}, mean={self.mean:.3f})"
+
+    def items(self) -> list[tuple[int, float]]:
+        """``(total, probability)`` pairs for every possible total."""
+        return [(self.offset + i, p) for i, p in enumerate(self.probs) if p > 0]
+
+    @property
+    def min(self) -> int:
+        return self.offset
+
+    @property
+    def max(self) -> int:
+        return self.offset + len(self.probs) - 1
+
+    @property
+    def mean(self) -> float:
+        return sum((self.offset + i) * p for i, p in enumerate(self.probs))
+
+    @property
+    def variance(self) -> float:
+        mean = self.mean
+        return sum((self.offset + i - mean) ** 2 * p for i, p in enumerate(self.probs))
+
+    @property
+    def std_dev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def prob_at_least(self, value: int) -> float:
+        """P(total >= *value*)."""
+        start = max(value - self.offset, 0)
+        return min(sum(self.probs[start:]), 1.0)
+
+    def prob_at_most(self, value: int) -> float:
+        """P(total <= *value*)."""
+        end = max(value - self.offset + 1, 0)
+        return min(sum(self.probs[:end]), 1.0)
+
+    def prob_equal(self, value: int) -> float:
+        index = value - self.offset
+        return self.probs[index] if 0 <= index < len(self.probs) else 0.0
+
+    def percentile(self, q: float) -> int:
+        """Smallest total whose cumulative probability reaches *q* percent."""
+        target = q / 100 - 1e-12
+        cumulative = 0.0
+        for i, p in enumerate(self.probs):
+            cumulative += p
+            if cumulative >= target:
+                return self.offset + i
+        return self.max
+
+
+def _check_support(size: int) -> None:
+    if size > MAX_SUPPORT:
+        raise DiceNotationError(
+            f"Expression has too many possible totals for an exact distribution (over {MAX_SUPPORT})"
+        )
+
+
+def _convolve(a: tuple[float, ...], b: tuple[float, ...]) -> list[float]:
+    _check_support(len(a) + len(b) - 1)
+    return np.convolve(a, b).tolist()
+
+
+def _add(a: Distribution, b: Distribution) -> Distribution:
+    return Distribution(a.offset + b.offset, _convolve(a.probs, b.probs))
+
+
+def _negate(a: Distribution) -> Distribution:
+    return Distribution(-a.max, reversed(a.probs))
+
+
+def _sum_of(dist: Distribution, count: int) -> Distribution:
+    """Distribution of the sum of *count* independent copies of *dist*."""
+    result = Distribution(0, [1.0])
+    power = dist
+    while count:
+        if count & 1:
+            result = _add(result, power)
+        count >>= 1
+        if count:
+            power = _add(power, power)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Pools
+# ---------------------------------------------------------------------------
+
+
+def _face_probs(pool: DicePool) -> list[float]:
+    """P(face) for one die after rerolls; index 0 is face 1."""
+    sides = pool.sides
+    if pool.reroll is None:
+        return [1 / sides] * sides
+    rerolled = [_matches(pool.reroll, v) for v in range(1, sides + 1)]
+    if not pool.reroll_once:
+        keep = sides - sum(rerolled)
+        return [0.0 if r else 1 / keep for r in rerolled]
+    chance = sum(rerolled) / sides
+    return [(0.0 if r else 1 / sides) + chance / sides for r in rerolled]
+
+
+def _exploding_die(pool: DicePool, faces: list[float]) -> Distribution:
+    """Total of one die that keeps adding a new roll while it explodes."""
+    result: dict[int, float] = {}
+    frontier = {0: 1.0}
+    for _ in range(MAX_EXPLOSIONS + 1):
+        following: dict[int, float] = {}
+        for base, p in frontier.items():
+            for face, q in enumerate(faces, start=1):
+                if not q:
+                    continue
+                target = following if _matches(pool.explode, face) else result
+                target[base + face] = target.get(base + face, 0.0) + p * q
+        frontier = following
+        if sum(frontier.values()) < _EXPLODE_EPSILON:
+            break
+    # Whatever is left stops here
+    for value, p in frontier.items():
+        result[value] = result.get(value, 0.0) + p
+    return Distribution.from_mapping(result)
+
+
+def _keep_extreme(faces: list[float], count: int, keep: int, highest: bool = True) -> Distribution:
+    """Sum of the highest *keep* of *count* dice (the lowest when not *highest*).
+
+    Faces are visited best first. Given that the dice not yet placed all
+    show this face or worse, each shows exactly this face with probability
+    ``P(face) / P(face or worse)``, so the number showing it is binomial.
+    """
+    keep = max(min(keep, count), 0)
+    if keep == 0:
+        return Distribution(0, [1.0])
+    order = list(range(len(faces), 0, -1) if highest else range(1, len(faces) + 1))
+    remaining_mass = 1.0
+    states: dict[tuple[int, int], float] = {(count, 0): 1.0}
+    for face in order:
+        p_face = faces[face - 1]
+        # The last face takes every die left
+        last = face == order[-1] or remaining_mass <= 0
+        share = 1.0 if last else min(p_face / remaining_mass, 1.0)
+        remaining_mass -= p_face
+        following: dict[tuple[int, int], float] = {}
+        for (left, total), p in states.items():
+            if left == 0 or share == 0:
+                following[(left, total)] = following.get((left, total), 0.0) + p
+                continue
+            slots = max(keep - (count - left), 0)
+            for k in range(left + 1):
+                q = p * math.comb(left, k) * share**k * (1 - share) ** (left - k)
+                if q == 0:
+                    continue
+                key = (left - k, total + min(k, slots) * face)
+                following[key] = following.get(key, 0.0) + q
+        states = following
+    totals: dict[int, float] = {}
+    for (_, total), p in states.items():
+        totals[total] = totals.get(total, 0.0) + p
+    return Distribution.from_mapping(totals)
+
+
+def _pool_distribution(pool: DicePool) -> Distribution:
+    faces = _face_probs(pool)
+    if pool.explode is not None:
+        if pool.keep is not None:
+            raise DiceNotationError("Exact distributions do not support exploding dice with keep/drop")
+        return _sum_of(_exploding_die(pool, faces), pool.count)
+    if pool.keep is None:
+        return _sum_of(Distribution(1, faces), pool.count)
+    if pool.count > MAX_KEEP_DICE:
+        raise DiceNotationError(f"Exact keep/drop distributions support at most {MAX_KEEP_DICE} dice")
+    mode, n = pool.keep
+    if mode == "kh":
+        return _keep_extreme(faces, pool.count, n)
+    if mode == "kl":
+        return _keep_extreme(faces, pool.count, n, highest=False)
+    if mode == "dl":
+        return _keep_extreme(faces, pool.count, pool.count - n)
+    return _keep_extreme(faces, pool.count, pool.count - n, highest=False)
+
+
+# ---------------------------------------------------------------------------
+# Expressions
+# ---------------------------------------------------------------------------
+
+
+def _combine(op: str, a: Distribution, b: Distribution) -> Distribution:
+    """``a * b`` or ``a // b`` over every pair of totals."""
+    if len(a.probs) * len(b.probs) > MAX_SUPPORT:
+        _check_support(len(a.probs) * len(b.probs))
+    pmf: dict[int, float] = {}
+    for x, p in a.items():
+        for y, q in b.items():
+            if op == "/":
+                if y == 0:
+                    raise DiceNotationError("Division by zero")
+                value = x // y
+            else:
+                value = x * y
+            pmf[value] = pmf.get(value, 0.0) + p * q
+    return Distribution.from_mapping(pmf)
+
+
+def _node_distribution(node: Node) -> Distribution:
+    if isinstance(node, Const):
+        return Distribution(node.value, [1.0])
+    if isinstance(node, DicePool):
+        return _pool_distribution(node)
+    if isinstance(node, Neg):
+        return _negate(_node_distribution(node.operand))
+    left = _node_distribution(node.left)
+    right = _node_distribution(node.right)
+    if node.op == "+":
+        return _add(left, right)
+    if node.op == "-":
+        return _add(left, _negate(right))
+    return _combine(node.op, left, right)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _distribution(text: str) -> Distribution:
+    return _node_distribution(compile_dice(text).ast)
+
+
+def dice_distribution(expression: str | CompiledDice) -> Distribution:
+    """Exact distribution of an expression's total (memoized).
+
+    Raises:
+        DiceNotationError: The notation is invalid, or the expression is
+            too large or of a kind the exact calculation does not support.
+    """
+    text = expression.notation if isinstance(expression, CompiledDice) else normalize(expression)
+    return _distribution(text)
+
+
+# ---------------------------------------------------------------------------
+# d20 helpers
+# ---------------------------------------------------------------------------
+
+
+def _d20(advantage: bool, disadvantage: bool) -> Distribution:
+    if advantage and not disadvantage:
+        return dice_distribution("2d20kh1")
+    if disadvantage and not advantage:
+        return dice_distribution("2d20kl1")
+    return dice_distribution("1d20")
+
+
+def check_odds(
+    modifier: int, dc: int, advantage: bool = False, disadvantage: bool = False
+) -> float:
+    """P(d20 + *modifier* >= *dc*) for an ability check or saving throw."""
+    return _d20(advantage, disadvantage).prob_at_least(dc - modifier)
+
+
+def attack_odds(
+    attack_bonus: int,
+    target_ac: int,
+    advantage: bool = False,
+    disadvantage: bool = False,
+    damage_dice: str | None = None,
+) -> dict[str, float]:
+    """Chance an attack hits and crits, and its expected damage.
+
+    A natural 20 always hits (and crits), a natural 1 always misses.
+
+    Returns:
+        Dict with ``hit_probability`` and ``critical_probability``, plus
+        ``expected_damage`` when *damage_dice* is given (critical hits
+        roll the damage dice twice; misses deal nothing).
+    """
+    d20 = _d20(advantage, disadvantage)
+    crit = d20.prob_equal(20)
+    needed = min(max(target_ac - attack_bonus, 2), 20)
+    hit = d20.prob_at_least(needed) - d20.prob_at_least(20) + crit
+    odds = {"hit_probability": hit, "critical_probability": crit}
+    if damage_dice is not None:
+        compiled = compile_dice(damage_dice)
+        base = max(dice_distribution(compiled).mean, 0.0)
+        extra_dice = compiled.critical_dice()
+        extra = dice_distribution(extra_dice).mean if extra_dice is not None else 0.0
+        odds["expected_damage"] = hit * base + crit * extra
+    return odds
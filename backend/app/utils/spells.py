@@ -8,6 +8,8 @@ import random
 
 from pydantic import BaseModel
 
+from app.rng import active_stream, recorded
+
 SPELLCASTING_ABILITY: dict[str, str] = {
     "wizard": "intelligence",
     "cleric": "wisdom",
@@ -43,6 +45,7 @@ def start_concentration(
     return ConcentrationState(active_spell=spell_name, caster_id=caster_id)
 
 
+@recorded("spells.check_concentration")
 def check_concentration(constitution_modifier: int, damage_taken: int) -> dict:
     """Roll a Constitution saving throw to maintain concentration after taking damage.
 
@@ -56,7 +59,7 @@ def check_concentration(constitution_modifier: int, damage_taken: int) -> dict:
         dict with keys ``dc`` (int), ``roll`` (int), and ``maintained`` (bool).
     """
     dc = max(10, damage_taken // 2)
-    roll = random.randint(1, 20)  # noqa: S311
+    roll = (active_stream() or random).randint(1, 20)
     total = roll + constitution_modifier
     return {"dc": dc, "roll": roll, "maintained": total >= dc}
 
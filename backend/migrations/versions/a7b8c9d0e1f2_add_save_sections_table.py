@@ -0,0 +1,84 @@
+"""add save_sections table and section refs on save_slots
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+
+import json
+import zlib
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: str | Sequence[str] | None = "f6a7b8c9d0e1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Section the app stores campaign_data["session_log"] under
+_SESSION_LOG_SECTION = "campaign_data.session_log"
+
+
+def upgrade() -> None:
+    """Create the content-addressed section store.
+
+    Existing slots keep their inline ``save_data`` and are read from it.
+    """
+    op.create_table(
+        "save_sections",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("codec", sa.String(), nullable=False),
+        sa.Column("raw_size", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    with op.batch_alter_table("save_slots") as batch_op:
+        batch_op.add_column(sa.Column("section_refs", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("summary", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Inline section-stored states back into save_data, then drop the store."""
+    bind = op.get_bind()
+    slots = sa.table(
+        "save_slots",
+        sa.column("id", sa.String()),
+        sa.column("save_data", sa.JSON()),
+        sa.column("section_refs", sa.JSON()),
+    )
+    sections = sa.table(
+        "save_sections",
+        sa.column("hash", sa.String()),
+        sa.column("data", sa.LargeBinary()),
+    )
+    for slot_id, refs in bind.execute(
+        sa.select(slots.c.id, slots.c.section_refs).where(
+            slots.c.section_refs.isnot(None)
+        )
+    ):
+        if not refs:
+            continue
+        blobs = {
+            row.hash: json.loads(zlib.decompress(row.data))
+            for row in bind.execute(
+                sa.select(sections.c.hash, sections.c.data).where(
+                    sections.c.hash.in_(set(refs.values()))
+                )
+            )
+        }
+        state = {n: blobs[h] for n, h in refs.items() if n != _SESSION_LOG_SECTION}
+        if _SESSION_LOG_SECTION in refs and isinstance(state.get("campaign_data"), dict):
+            state["campaign_data"]["session_log"] = blobs[refs[_SESSION_LOG_SECTION]]
+        bind.execute(
+            slots.update().where(slots.c.id == slot_id).values(save_data=state)
+        )
+
+    with op.batch_alter_table("save_slots") as batch_op:
+        batch_op.drop_column("summary")
+        batch_op.drop_column("section_refs")
+    op.drop_table("save_sections")
@@ -0,0 +1,113 @@
+"""add auto_save_snapshots and interaction_counters tables
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: str | Sequence[str] | None = "a7b8c9d0e1f2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_campaigns = sa.table(
+    "campaigns",
+    sa.column("id", sa.String()),
+    sa.column("data", sa.JSON()),
+)
+_snapshots = sa.table(
+    "auto_save_snapshots",
+    sa.column("id", sa.Integer()),
+    sa.column("campaign_id", sa.String()),
+    sa.column("interaction_count", sa.Integer()),
+    sa.column("data", sa.JSON()),
+    sa.column("created_at", sa.DateTime()),
+)
+
+
+def _is_auto_save(entry: object) -> bool:
+    return isinstance(entry, dict) and entry.get("type") == "auto_save"
+
+
+def upgrade() -> None:
+    """Create the auto-save tables and move snapshots out of session_log."""
+    op.create_table(
+        "auto_save_snapshots",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("campaign_id", sa.String(), nullable=False),
+        sa.Column("interaction_count", sa.Integer(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_auto_save_snapshots_campaign_id_id",
+        "auto_save_snapshots",
+        ["campaign_id", "id"],
+        unique=False,
+    )
+    op.create_table(
+        "interaction_counters",
+        sa.Column("campaign_id", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("campaign_id"),
+    )
+
+    bind = op.get_bind()
+    now = datetime.now(UTC)
+    for campaign_id, data in bind.execute(sa.select(_campaigns.c.id, _campaigns.c.data)):
+        log = (data or {}).get("session_log") or []
+        saves = [entry for entry in log if _is_auto_save(entry)]
+        if not saves:
+            continue
+        bind.execute(
+            _snapshots.insert(),
+            [
+                {
+                    "campaign_id": campaign_id,
+                    "interaction_count": entry.get("interaction_count") or 0,
+                    "data": entry,
+                    "created_at": now,
+                }
+                for entry in saves
+            ],
+        )
+        data["session_log"] = [entry for entry in log if not _is_auto_save(entry)]
+        bind.execute(
+            _campaigns.update().where(_campaigns.c.id == campaign_id).values(data=data)
+        )
+
+
+def downgrade() -> None:
+    """Append stored snapshots back onto session_log, then drop the tables."""
+    bind = op.get_bind()
+    by_campaign: dict[str, list[dict]] = {}
+    for campaign_id, data in bind.execute(
+        sa.select(_snapshots.c.campaign_id, _snapshots.c.data).order_by(_snapshots.c.id)
+    ):
+        by_campaign.setdefault(campaign_id, []).append(data)
+    for campaign_id, saves in by_campaign.items():
+        data = bind.execute(
+            sa.select(_campaigns.c.data).where(_campaigns.c.id == campaign_id)
+        ).scalar()
+        if data is None:
+            continue
+        data["session_log"] = list(data.get("session_log") or []) + saves
+        bind.execute(
+            _campaigns.update().where(_campaigns.c.id == campaign_id).values(data=data)
+        )
+
+    op.drop_table("interaction_counters")
+    op.drop_index(
+        "ix_auto_save_snapshots_campaign_id_id", table_name="auto_save_snapshots"
+    )
+    op.drop_table("auto_save_snapshots")
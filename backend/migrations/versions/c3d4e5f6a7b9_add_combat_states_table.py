@@ -1,6 +1,6 @@
 """add combat_states table
 
-Revision ID: c3d4e5f6a7b8
+Revision ID: c3d4e5f6a7b9
 Revises: b2c3d4e5f6a7
 Create Date: 2026-03-28 10:00:00.000000
 
@@ -12,14 +12,21 @@ import sqlalchemy as sa
 from alembic import op
 
 # revision identifiers, used by Alembic.
-revision: str = "c3d4e5f6a7b8"
+revision: str = "c3d4e5f6a7b9"
 down_revision: str | Sequence[str] | None = "b2c3d4e5f6a7"
 branch_labels: str | Sequence[str] | None = None
 depends_on: str | Sequence[str] | None = None
 
 
 def upgrade() -> None:
-    """Create combat_states table for persistent combat encounters."""
+    """Create combat_states table for persistent combat encounters.
+
+    This revision previously shared its ID with the save-slot constraint
+    migration, so databases stamped at that ID may already have the table
+    (created by ``init_db``) or may be missing it.
+    """
+    if "combat_states" in sa.inspect(op.get_bind()).get_table_names():
+        return
     op.create_table(
         "combat_states",
         sa.Column("id", sa.String(), nullable=False),
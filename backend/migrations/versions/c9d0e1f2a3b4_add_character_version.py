@@ -0,0 +1,32 @@
+"""add version column to characters for optimistic concurrency
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c9d0e1f2a3b4"
+down_revision: str | Sequence[str] | None = "b8c9d0e1f2a3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add characters.version, starting existing rows at 1."""
+    with op.batch_alter_table("characters") as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), server_default="1", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Drop characters.version."""
+    with op.batch_alter_table("characters") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,32 @@
+"""add checkpoint_seq column to combat_states
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d0e1f2a3b4c5"
+down_revision: str | Sequence[str] | None = "c9d0e1f2a3b4"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add combat_states.checkpoint_seq; existing headers have folded in no events."""
+    with op.batch_alter_table("combat_states") as batch_op:
+        batch_op.add_column(
+            sa.Column("checkpoint_seq", sa.Integer(), server_default="0", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Drop combat_states.checkpoint_seq."""
+    with op.batch_alter_table("combat_states") as batch_op:
+        batch_op.drop_column("checkpoint_seq")
@@ -0,0 +1,111 @@
+"""add combat_events table
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8, c3d4e5f6a7b9
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e5f6a7b8c9"
+down_revision: str | Sequence[str] | None = ("c3d4e5f6a7b8", "c3d4e5f6a7b9")
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create combat_events and move existing inline combat logs into it."""
+    op.create_table(
+        "combat_events",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("combat_id", sa.String(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(), nullable=False, server_default="action"),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["combat_id"], ["combat_states.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("combat_id", "seq", name="uq_combat_event_seq"),
+    )
+    op.create_index(
+        op.f("ix_combat_events_combat_id"),
+        "combat_events",
+        ["combat_id"],
+        unique=False,
+    )
+
+    # Backfill: one row per entry of each legacy combat_log array
+    bind = op.get_bind()
+    combat_states = sa.table(
+        "combat_states",
+        sa.column("id", sa.String()),
+        sa.column("combat_log", sa.JSON()),
+    )
+    combat_events = sa.table(
+        "combat_events",
+        sa.column("combat_id", sa.String()),
+        sa.column("seq", sa.Integer()),
+        sa.column("event_type", sa.String()),
+        sa.column("data", sa.JSON()),
+        sa.column("created_at", sa.DateTime()),
+    )
+    now = datetime.now(UTC)
+    for combat_id, log in bind.execute(
+        sa.select(combat_states.c.id, combat_states.c.combat_log)
+    ):
+        if not log:
+            continue
+        op.bulk_insert(
+            combat_events,
+            [
+                {
+                    "combat_id": combat_id,
+                    "seq": seq,
+                    "event_type": entry.get("action", "action")
+                    if isinstance(entry, dict)
+                    else "action",
+                    "data": entry,
+                    "created_at": now,
+                }
+                for seq, entry in enumerate(log, start=1)
+            ],
+        )
+    bind.execute(sa.update(combat_states).values(combat_log=[]))
+
+
+def downgrade() -> None:
+    """Fold combat_events back into combat_log and drop the table."""
+    bind = op.get_bind()
+    combat_states = sa.table(
+        "combat_states",
+        sa.column("id", sa.String()),
+        sa.column("combat_log", sa.JSON()),
+    )
+    combat_events = sa.table(
+        "combat_events",
+        sa.column("combat_id", sa.String()),
+        sa.column("seq", sa.Integer()),
+        sa.column("data", sa.JSON()),
+    )
+    logs: dict[str, list] = {}
+    for combat_id, data in bind.execute(
+        sa.select(combat_events.c.combat_id, combat_events.c.data).order_by(
+            combat_events.c.combat_id, combat_events.c.seq
+        )
+    ):
+        logs.setdefault(combat_id, []).append(data)
+    for combat_id, log in logs.items():
+        bind.execute(
+            sa.update(combat_states)
+            .where(combat_states.c.id == combat_id)
+            .values(combat_log=log)
+        )
+
+    op.drop_index(op.f("ix_combat_events_combat_id"), table_name="combat_events")
+    op.drop_table("combat_events")
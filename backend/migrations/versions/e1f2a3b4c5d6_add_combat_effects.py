@@ -0,0 +1,32 @@
+"""add effects column to combat_states
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e1f2a3b4c5d6"
+down_revision: str | Sequence[str] | None = "d0e1f2a3b4c5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add combat_states.effects, the timed effects pending at the checkpoint."""
+    with op.batch_alter_table("combat_states") as batch_op:
+        batch_op.add_column(
+            sa.Column("effects", sa.JSON(), server_default="[]", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Drop combat_states.effects."""
+    with op.batch_alter_table("combat_states") as batch_op:
+        batch_op.drop_column("effects")
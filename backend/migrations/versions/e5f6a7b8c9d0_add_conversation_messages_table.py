@@ -0,0 +1,119 @@
+"""add conversation_messages table
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f6a7b8c9d0"
+down_revision: str | Sequence[str] | None = "d4e5f6a7b8c9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create conversation_messages and move inline thread histories into it."""
+    op.create_table(
+        "conversation_messages",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("thread_id", sa.String(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["thread_id"], ["conversation_threads.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("thread_id", "seq", name="uq_conversation_message_seq"),
+    )
+    op.create_index(
+        op.f("ix_conversation_messages_thread_id"),
+        "conversation_messages",
+        ["thread_id"],
+        unique=False,
+    )
+    with op.batch_alter_table("conversation_threads") as batch_op:
+        batch_op.add_column(
+            sa.Column("message_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    # Backfill: one row per entry of each legacy messages array
+    bind = op.get_bind()
+    threads = sa.table(
+        "conversation_threads",
+        sa.column("id", sa.String()),
+        sa.column("messages", sa.JSON()),
+        sa.column("message_count", sa.Integer()),
+    )
+    messages = sa.table(
+        "conversation_messages",
+        sa.column("thread_id", sa.String()),
+        sa.column("seq", sa.Integer()),
+        sa.column("role", sa.String()),
+        sa.column("content", sa.Text()),
+        sa.column("created_at", sa.DateTime()),
+    )
+    now = datetime.now(UTC)
+    for thread_id, history in bind.execute(sa.select(threads.c.id, threads.c.messages)):
+        if not history:
+            continue
+        op.bulk_insert(
+            messages,
+            [
+                {
+                    "thread_id": thread_id,
+                    "seq": seq,
+                    "role": msg.get("role", "user"),
+                    "content": msg.get("content", ""),
+                    "created_at": now,
+                }
+                for seq, msg in enumerate(history, start=1)
+            ],
+        )
+        bind.execute(
+            sa.update(threads)
+            .where(threads.c.id == thread_id)
+            .values(messages=[], message_count=len(history))
+        )
+
+
+def downgrade() -> None:
+    """Fold conversation_messages back into the inline messages column."""
+    bind = op.get_bind()
+    threads = sa.table(
+        "conversation_threads",
+        sa.column("id", sa.String()),
+        sa.column("messages", sa.JSON()),
+    )
+    messages = sa.table(
+        "conversation_messages",
+        sa.column("thread_id", sa.String()),
+        sa.column("seq", sa.Integer()),
+        sa.column("role", sa.String()),
+        sa.column("content", sa.Text()),
+    )
+    histories: dict[str, list] = {}
+    for thread_id, role, content in bind.execute(
+        sa.select(messages.c.thread_id, messages.c.role, messages.c.content).order_by(
+            messages.c.thread_id, messages.c.seq
+        )
+    ):
+        histories.setdefault(thread_id, []).append({"role": role, "content": content})
+    for thread_id, history in histories.items():
+        bind.execute(
+            sa.update(threads).where(threads.c.id == thread_id).values(messages=history)
+        )
+
+    with op.batch_alter_table("conversation_threads") as batch_op:
+        batch_op.drop_column("message_count")
+    op.drop_index(
+        op.f("ix_conversation_messages_thread_id"), table_name="conversation_messages"
+    )
+    op.drop_table("conversation_messages")
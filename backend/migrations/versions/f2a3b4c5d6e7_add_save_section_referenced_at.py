@@ -0,0 +1,33 @@
+"""add referenced_at column to save_sections
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a3b4c5d6e7"
+down_revision: str | Sequence[str] | None = "e1f2a3b4c5d6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add save_sections.referenced_at, backfilled from created_at."""
+    with op.batch_alter_table("save_sections") as batch_op:
+        batch_op.add_column(sa.Column("referenced_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE save_sections SET referenced_at = created_at")
+    with op.batch_alter_table("save_sections") as batch_op:
+        batch_op.alter_column("referenced_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Drop save_sections.referenced_at."""
+    with op.batch_alter_table("save_sections") as batch_op:
+        batch_op.drop_column("referenced_at")
@@ -0,0 +1,32 @@
+"""add (created_at, id) index on campaigns for keyset pagination
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f6a7b8c9d0e1"
+down_revision: str | Sequence[str] | None = "e5f6a7b8c9d0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Index the campaign list's sort key."""
+    op.create_index(
+        "ix_campaigns_created_at_id",
+        "campaigns",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop the campaign list index."""
+    op.drop_index("ix_campaigns_created_at_id", table_name="campaigns")
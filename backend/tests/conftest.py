@@ -5,6 +5,7 @@ Test configuration and utilities for improved configuration handling.
 import pytest
 from app.api.routes._shared import limiter
 from app.config import Settings, get_config
+from app.entity_cache import clear_entity_caches
 from app.main import app
 from fastapi.testclient import TestClient
 
@@ -12,6 +13,18 @@ from fastapi.testclient import TestClient
 # exercise business logic without being blocked by per-IP rate limits.
 limiter.enabled = False
 
+
+@pytest.fixture(autouse=True)
+def _clear_entity_caches():
+    """Start every test with empty character/campaign caches.
+
+    Tests swap in fresh databases that reuse the same ids, so cached rows
+    from a previous test must not leak into the next one.
+    """
+    clear_entity_caches()
+    yield
+    clear_entity_caches()
+
 # Import factories for use in tests (gracefully handle missing dependencies)
 try:
     from .factories import (
@@ -190,7 +190,7 @@ class TestADRCompliance:
 
         with open(scribe_path) as f:
             content = f.read()
-            assert "get_session" in content, "ScribeAgent should use database sessions"
+            assert "run_in_session" in content, "ScribeAgent should use database sessions"
             assert "Character" in content, "ScribeAgent should use Character model"
             assert "db.add" in content or "db.query" in content, (
                 "ScribeAgent should perform database operations"
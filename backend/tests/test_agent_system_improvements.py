@@ -78,6 +78,25 @@ class TestAgentSystemImprovements:
         assert all(1 <= roll <= 6 for roll in result["rolls"])
         assert result["total"] == sum(result["rolls"])
 
+    def test_fallback_dice_draw_from_campaign_stream(self, dm_agent_mock) -> None:
+        """Fallback rolls use the dice engine and the active campaign stream."""
+        from app.rng import campaign_rng, clear_streams, seed_stream
+
+        dm_agent_mock._initialize_fallback_components()
+        try:
+            seed_stream("fallback", 11)
+            with campaign_rng("fallback"):
+                first = dm_agent_mock._fallback_dice_roll("4d6kh3+1")
+                d20 = dm_agent_mock._fallback_dice["d20"]()
+            seed_stream("fallback", 11)
+            with campaign_rng("fallback"):
+                assert dm_agent_mock._fallback_dice_roll("4d6kh3+1") == first
+                assert dm_agent_mock._fallback_dice["d20"]() == d20
+        finally:
+            clear_streams()
+        assert len(first["rolls"]) == 4
+        assert first["modifier"] == 1
+
     def test_fallback_invalid_dice_notation(self, dm_agent_mock) -> None:
         """Test fallback handling of invalid dice notation."""
         dm_agent_mock._initialize_fallback_components()
@@ -0,0 +1,150 @@
+"""Tests for the async database layer (run_in_session, async engine, URL mapping)."""
+
+import asyncio
+import threading
+import uuid
+
+import pytest
+from app import database
+from app.database import Base, run_in_session
+from app.models.db_models import Campaign as CampaignDB
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def sqlite_file(tmp_path, monkeypatch):
+    """Point DATABASE_URL at a fresh SQLite file with all tables created."""
+    url = f"sqlite:///{tmp_path / 'async_test.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    monkeypatch.delenv("DATABASE_HOST", raising=False)
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "_SessionLocal", None)
+    monkeypatch.setattr(database, "_async_engine", None)
+    monkeypatch.setattr(database, "_AsyncSessionLocal", None)
+    yield url
+    if database._engine is not None:
+        database._engine.dispose()
+
+
+def _insert_campaign(db: Session, name: str) -> str:
+    campaign = CampaignDB(
+        id=str(uuid.uuid4()),
+        name=name,
+        setting="fantasy",
+        tone="heroic",
+        data={},
+    )
+    db.add(campaign)
+    db.commit()
+    return campaign.id
+
+
+def _campaign_name(db: Session, campaign_id: str) -> str | None:
+    row = db.get(CampaignDB, campaign_id)
+    return row.name if row else None
+
+
+# ---------------------------------------------------------------------------
+# URL translation
+# ---------------------------------------------------------------------------
+
+
+class TestAsyncDatabaseUrl:
+    """Tests for mapping the sync URL onto an async driver."""
+
+    def test_sqlite_url_uses_aiosqlite(self, monkeypatch):
+        monkeypatch.delenv("DATABASE_HOST", raising=False)
+        monkeypatch.setenv("DATABASE_URL", "sqlite:///./game.db")
+        assert database._resolve_async_database_url() == "sqlite+aiosqlite:///./game.db"
+
+    def test_postgres_host_uses_asyncpg_with_ssl(self, monkeypatch):
+        monkeypatch.setenv("DATABASE_HOST", "db.example.com")
+        monkeypatch.setenv("DATABASE_USER", "user")
+        monkeypatch.setenv("DATABASE_PASSWORD", "pw")
+        url = database._resolve_async_database_url()
+        assert url.startswith("postgresql+asyncpg://user:pw@db.example.com/")
+        assert url.endswith("?ssl=require")
+
+    def test_explicit_sync_driver_is_replaced(self, monkeypatch):
+        monkeypatch.delenv("DATABASE_HOST", raising=False)
+        monkeypatch.setenv("DATABASE_URL", "postgresql+psycopg2://u:p@h/db")
+        assert database._resolve_async_database_url() == "postgresql+asyncpg://u:p@h/db"
+
+    def test_unknown_dialect_raises(self, monkeypatch):
+        monkeypatch.delenv("DATABASE_HOST", raising=False)
+        monkeypatch.setenv("DATABASE_URL", "mysql://u:p@h/db")
+        with pytest.raises(ValueError, match="mysql"):
+            database._resolve_async_database_url()
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [("true", True), ("1", True), ("YES", True), ("false", False), ("", False)],
+    )
+    def test_is_async_database_flag(self, monkeypatch, value, expected):
+        monkeypatch.setenv("DATABASE_ASYNC", value)
+        assert database.is_async_database() is expected
+
+
+# ---------------------------------------------------------------------------
+# run_in_session
+# ---------------------------------------------------------------------------
+
+
+class TestRunInSession:
+    """run_in_session works in both sync-thread and async-driver modes."""
+
+    async def test_thread_mode_round_trip(self, sqlite_file, monkeypatch):
+        monkeypatch.setenv("DATABASE_ASYNC", "false")
+        campaign_id = await run_in_session(_insert_campaign, "Threaded")
+        assert await run_in_session(_campaign_name, campaign_id) == "Threaded"
+
+    async def test_thread_mode_runs_off_event_loop(self, sqlite_file, monkeypatch):
+        monkeypatch.setenv("DATABASE_ASYNC", "false")
+        loop_thread = threading.get_ident()
+        worker_thread = await run_in_session(lambda db: threading.get_ident())
+        assert worker_thread != loop_thread
+
+    async def test_async_mode_round_trip(self, sqlite_file, monkeypatch):
+        monkeypatch.setenv("DATABASE_ASYNC", "true")
+        campaign_id = await run_in_session(_insert_campaign, "Async")
+        assert await run_in_session(_campaign_name, campaign_id) == "Async"
+        assert "aiosqlite" in str(database.get_async_engine().url)
+        await database.get_async_engine().dispose()
+
+    async def test_async_session_context_executes(self, sqlite_file, monkeypatch):
+        monkeypatch.setenv("DATABASE_ASYNC", "true")
+        async with database.get_async_session_context() as db:
+            result = await db.execute(text("SELECT 1"))
+            assert result.scalar() == 1
+        await database.get_async_engine().dispose()
+
+    async def test_concurrent_calls_do_not_interfere(self, sqlite_file, monkeypatch):
+        monkeypatch.setenv("DATABASE_ASYNC", "false")
+        ids = await asyncio.gather(
+            *(run_in_session(_insert_campaign, f"C{i}") for i in range(5))
+        )
+        names = await asyncio.gather(*(run_in_session(_campaign_name, i) for i in ids))
+        assert sorted(names) == [f"C{i}" for i in range(5)]
+
+    async def test_async_mode_unit_of_work(self, sqlite_file, monkeypatch):
+        monkeypatch.setenv("DATABASE_ASYNC", "true")
+        async with database.unit_of_work():
+            campaign_id = await run_in_session(_insert_campaign, "Joined")
+            assert await run_in_session(_campaign_name, campaign_id) == "Joined"
+        assert await run_in_session(_campaign_name, campaign_id) == "Joined"
+
+        with pytest.raises(RuntimeError):
+            async with database.unit_of_work():
+                discarded = await run_in_session(_insert_campaign, "Discarded")
+                raise RuntimeError("boom")
+        assert await run_in_session(_campaign_name, discarded) is None
+        await database.get_async_engine().dispose()
@@ -0,0 +1,226 @@
+"""
+Tests and benchmark for the bulk (INSERT ... ON CONFLICT) restore path.
+
+The 500-NPC fixture is restored through both the row-by-row ORM path and
+the bulk path; both must leave the database in the same state, and the
+bulk path must be faster without issuing more statements. (SQLAlchemy
+already batches the ORM path's INSERTs, so the win is skipping per-row
+SELECTs and unit-of-work bookkeeping rather than fewer round trips.)
+"""
+
+import time
+import uuid
+
+import pytest
+from app.database import Base
+from app.models.db_models import NPC as NPCDB
+from app.models.db_models import Campaign as CampaignDB
+from app.models.db_models import Character as CharacterDB
+from app.models.db_models import NPCProfileDB, NPCRelationshipDB
+from app.services.game_state_service import GameStateService, RestoreConflictError
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+NPC_COUNT = 500
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'restore.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _large_state(campaign_id: str) -> dict:
+    """A captured state with 500 NPCs, 500 profiles and 500 relationships."""
+    npcs = [
+        {
+            "id": f"npc-{n}",
+            "name": f"Villager {n}",
+            "race": "human",
+            "occupation": "farmer",
+            "location": "village",
+            "personality": {"mood": "calm"},
+            "stats": {"hp": 4},
+            "relationships": [],
+            "data": {"notes": "x" * 50},
+        }
+        for n in range(NPC_COUNT)
+    ]
+    profiles = [
+        {
+            "id": f"prof-{n}",
+            "name": f"Villager {n}",
+            "description": "A villager",
+            "personality_traits": ["calm"],
+            "disposition": "neutral",
+            "location": "village",
+            "is_alive": True,
+            "conversation_notes": [],
+        }
+        for n in range(NPC_COUNT)
+    ]
+    relationships = [
+        {
+            "id": f"rel-{n}",
+            "npc_id": f"prof-{n}",
+            "campaign_id": campaign_id,
+            "disposition_score": n % 10,
+            "interactions_count": 1,
+            "key_events": ["met"],
+            "last_interaction": None,
+        }
+        for n in range(NPC_COUNT)
+    ]
+    return {
+        "version": 1,
+        "campaign_data": {"name": "Big Village", "setting": "plains"},
+        "characters": [
+            {"id": f"char-{n}", "name": f"Hero {n}", "data": {"level": n + 1}}
+            for n in range(4)
+        ],
+        "npcs": npcs,
+        "npc_profiles": profiles,
+        "npc_relationships": relationships,
+    }
+
+
+def _seed_campaign(session_factory) -> str:
+    campaign_id = str(uuid.uuid4())
+    db = session_factory()
+    db.add(CampaignDB(id=campaign_id, name="Old", setting="plains", data={}))
+    # Stale rows that the restore must replace
+    db.add(NPCDB(id=f"stale-{campaign_id}", name="Stale", campaign_id=campaign_id, data={}))
+    db.merge(CharacterDB(id="char-0", name="Old Hero", data={"level": 0}))
+    db.commit()
+    db.close()
+    return campaign_id
+
+
+def _snapshot(session_factory, campaign_id: str) -> dict:
+    db = session_factory()
+    try:
+        return {
+            "npcs": sorted(
+                (n.id, n.name, n.data["notes"])
+                for n in db.query(NPCDB).filter(NPCDB.campaign_id == campaign_id)
+            ),
+            "profiles": sorted(
+                (p.id, p.disposition)
+                for p in db.query(NPCProfileDB).filter(
+                    NPCProfileDB.campaign_id == campaign_id
+                )
+            ),
+            "relationships": sorted(
+                (r.id, r.npc_id, r.disposition_score)
+                for r in db.query(NPCRelationshipDB).filter(
+                    NPCRelationshipDB.campaign_id == campaign_id
+                )
+            ),
+            "characters": sorted(
+                (c.id, c.name, c.data["level"]) for c in db.query(CharacterDB)
+            ),
+            "campaign": db.get(CampaignDB, campaign_id).name,
+        }
+    finally:
+        db.close()
+
+
+def _restore(engine, session_factory, bulk: bool) -> tuple[dict, dict, int, float]:
+    campaign_id = _seed_campaign(session_factory)
+    statements = {"count": 0}
+
+    def _count(*args):
+        statements["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    db = session_factory()
+    started = time.perf_counter()
+    try:
+        restored = GameStateService().restore_state(
+            campaign_id, _large_state(campaign_id), db, bulk=bulk
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        db.close()
+        event.remove(engine, "before_cursor_execute", _count)
+    return restored, _snapshot(session_factory, campaign_id), statements["count"], elapsed
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+class TestBulkRestore:
+    """The bulk path matches the ORM path and reports counts and timings."""
+
+    def test_bulk_and_orm_paths_produce_same_state(self, engine, session_factory):
+        orm_summary, orm_state, _, _ = _restore(engine, session_factory, bulk=False)
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        bulk_summary, bulk_state, _, _ = _restore(engine, session_factory, bulk=True)
+
+        assert bulk_state == orm_state
+        assert len(bulk_state["npcs"]) == NPC_COUNT  # stale NPC removed
+        assert ("char-0", "Hero 0", 1) in bulk_state["characters"]
+        for key in (
+            "characters_restored",
+            "npcs_restored",
+            "npc_profiles_restored",
+            "npc_relationships_restored",
+        ):
+            assert bulk_summary[key] == orm_summary[key]
+
+    def test_summary_reports_mode_counts_and_timings(self, engine, session_factory):
+        summary, _, _, _ = _restore(engine, session_factory, bulk=True)
+        assert summary["mode"] == "bulk"
+        assert summary["npcs_restored"] == NPC_COUNT
+        assert set(summary["timings_ms"]) == {
+            "campaign", "characters", "npcs", "npc_profiles",
+            "npc_relationships", "commit", "total",
+        }
+
+    @pytest.mark.parametrize("bulk", [True, False])
+    def test_ids_owned_by_other_campaigns_conflict(self, session_factory, bulk):
+        campaign_id = _seed_campaign(session_factory)
+        other = _seed_campaign(session_factory)
+        db = session_factory()
+        db.add(NPCDB(id="npc-0", name="Elsewhere", campaign_id=other, data={}))
+        db.commit()
+
+        with pytest.raises((RestoreConflictError, IntegrityError)) as excinfo:
+            GameStateService().restore_state(
+                campaign_id, _large_state(campaign_id), db, bulk=bulk
+            )
+        if bulk:
+            assert excinfo.value.ids == ["npc-0"]
+        db.rollback()
+        npc = db.get(NPCDB, "npc-0")
+        assert (npc.campaign_id, npc.name) == (other, "Elsewhere")
+        db.close()
+
+    @pytest.mark.slow
+    def test_benchmark_500_npcs(self, engine, session_factory):
+        _, _, orm_statements, orm_seconds = _restore(engine, session_factory, bulk=False)
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        _, _, bulk_statements, bulk_seconds = _restore(engine, session_factory, bulk=True)
+
+        assert bulk_statements <= orm_statements
+        assert bulk_seconds < orm_seconds
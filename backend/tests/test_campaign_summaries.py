@@ -0,0 +1,207 @@
+"""Tests for the campaign summary projection and keyset pagination."""
+
+import json
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from app.database import Base
+from app.main import app
+from app.models.db_models import Campaign as CampaignDB
+from app.services.campaign_service import (
+    campaign_service,
+    decode_campaign_cursor,
+    encode_campaign_cursor,
+)
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+_BASE_TIME = datetime(2026, 1, 1, tzinfo=UTC)
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    """File-backed SQLite database with 25 campaigns, five sharing a timestamp."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'campaigns.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    @contextmanager
+    def _ctx():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    session = factory()
+    for n in range(25):
+        # Campaigns 20-24 share a created_at so the id tie-breaker matters
+        created_at = _BASE_TIME + timedelta(minutes=min(n, 20))
+        session.add(
+            CampaignDB(
+                id=f"camp-{n:02d}",
+                name=f"Campaign {n}",
+                setting="Coast",
+                tone="heroic",
+                is_template=n % 5 == 0,
+                is_custom=n % 5 != 0,
+                created_at=created_at,
+                updated_at=created_at,
+                data={"session_log": [{"entry": "x" * 100}] * 50},
+            )
+        )
+    session.commit()
+    session.close()
+
+    with patch("app.database.get_session_context", _ctx):
+        yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def client(engine):
+    return TestClient(app)
+
+
+def _expected_order() -> list[str]:
+    return sorted(
+        (f"camp-{n:02d}" for n in range(25)),
+        key=lambda cid: (min(int(cid[-2:]), 20), cid),
+        reverse=True,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+
+class TestCampaignSummaries:
+    """Projection and keyset pagination in CampaignService."""
+
+    async def test_pages_cover_every_campaign_once_in_order(self, engine):
+        seen: list[str] = []
+        cursor = None
+        while True:
+            page, cursor = await campaign_service.list_campaign_summaries(
+                limit=4, cursor=cursor
+            )
+            seen.extend(s.id for s in page)
+            if cursor is None:
+                break
+        assert seen == _expected_order()
+
+    async def test_projection_never_reads_data_column(self, engine):
+        statements: list[str] = []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        await campaign_service.list_campaign_summaries(limit=10)
+        assert statements
+        assert all("campaigns.data" not in s for s in statements)
+
+    async def test_template_filter(self, engine):
+        page, cursor = await campaign_service.list_campaign_summaries(
+            limit=50, is_template=True
+        )
+        assert cursor is None
+        assert {s.id for s in page} == {f"camp-{n:02d}" for n in range(0, 25, 5)}
+        assert all(s.is_template for s in page)
+
+    async def test_iter_streams_in_batches(self, engine):
+        ids = [
+            s.id async for s in campaign_service.iter_campaign_summaries(batch_size=7)
+        ]
+        assert ids == _expected_order()
+
+    def test_cursor_round_trip(self):
+        when = datetime(2026, 3, 4, 5, 6, 7, 890000)
+        assert decode_campaign_cursor(encode_campaign_cursor(when, "c-1")) == (when, "c-1")
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", "bm9wZQ", "WzFd"])
+    def test_malformed_cursor_raises(self, cursor):
+        with pytest.raises(ValueError, match="Invalid campaign cursor"):
+            decode_campaign_cursor(cursor)
+
+
+# ---------------------------------------------------------------------------
+# /game/campaigns
+# ---------------------------------------------------------------------------
+
+
+class TestCampaignListEndpoint:
+    """GET /game/campaigns and its paginated and streaming summary endpoints."""
+
+    def test_limit_returns_summary_page(self, client):
+        body = client.get("/game/campaigns/summaries?limit=10").json()
+        assert len(body["campaigns"]) == 10
+        assert set(body["campaigns"][0]) == {
+            "id", "name", "description", "setting", "tone", "is_template",
+            "is_custom", "template_id", "created_at", "updated_at",
+        }
+
+        rest = client.get(f"/game/campaigns/summaries?limit=100&cursor={body['next_cursor']}").json()
+        assert rest["next_cursor"] is None
+        ids = [c["id"] for c in body["campaigns"] + rest["campaigns"]]
+        assert ids == _expected_order()
+
+    def test_stream_returns_ndjson(self, client):
+        response = client.get("/game/campaigns/summaries/stream?is_template=false")
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 20
+        assert not any(r["is_template"] for r in rows)
+
+    def test_bad_cursor_is_400(self, client):
+        assert client.get("/game/campaigns/summaries?cursor=garbage").status_code == 400
+
+    def test_limit_out_of_range_is_422(self, client):
+        assert client.get("/game/campaigns/summaries?limit=0").status_code == 422
+
+    def test_default_listing_returns_every_summary(self, client, engine):
+        statements: list[str] = []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        body = client.get("/game/campaigns").json()
+        assert [c["id"] for c in body["campaigns"]] == _expected_order()
+        assert [c["id"] for c in body["templates"]] == [f"camp-{n:02d}" for n in (20, 15, 10, 5, 0)]
+        assert body["next_cursor"] is None
+        assert all("campaigns.data" not in s for s in statements)
+
+    def test_default_listing_pages_and_filters_in_sql(self, client, engine):
+        statements: list[str] = []
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+        first = client.get("/game/campaigns?limit=3&is_template=false").json()
+        assert [c["id"] for c in first["campaigns"]] == ["camp-24", "camp-23", "camp-22"]
+        assert (first["templates"], len(statements)) == ([], 1)
+        assert "is_template" in statements[0]
+
+        rest = client.get(f"/game/campaigns?limit=100&cursor={first['next_cursor']}&is_template=false").json()
+        assert rest["next_cursor"] is None
+        assert len(first["campaigns"] + rest["campaigns"]) == 20
+        assert client.get("/game/campaigns?cursor=garbage").status_code == 400
+
+    def test_openapi_declares_each_response(self, client):
+        paths = client.get("/openapi.json").json()["paths"]
+        schema = paths["/game/campaigns/summaries"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema["$ref"].endswith("/CampaignSummaryPage")
+        assert {"limit", "cursor"} <= {p["name"] for p in paths["/game/campaigns"]["get"]["parameters"]}
@@ -0,0 +1,388 @@
+"""Tests for JSON-patch partial character updates with optimistic concurrency."""
+
+import copy
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.character_store import (
+    PatchError,
+    VersionConflictError,
+    _jsonb_patch_expression,
+    _server_side,
+    apply_patch,
+    diff_patch,
+    modify_character,
+    patch_character,
+)
+from app.database import Base
+from app.models.db_models import Character as CharacterDB
+from sqlalchemy import create_engine, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+SHEET = {
+    "id": "char-1",
+    "name": "Ada",
+    "hit_points": {"current": 10, "maximum": 20},
+    "inventory": [{"id": "rope", "name": "Rope", "quantity": 1}],
+    "equipment": {},
+    "a/b": {"~c": 1},
+}
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def factory(tmp_path):
+    """File-backed SQLite database holding one character."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'characters.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session = factory()
+    session.add(CharacterDB(id="char-1", name="Ada", data=copy.deepcopy(SHEET)))
+    session.commit()
+    session.close()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture()
+def scribe(factory):
+    """The real ScribeAgent, writing to the test database."""
+    from app.agents.scribe_agent import get_scribe
+    from app.entity_cache import clear_entity_caches
+
+    @contextmanager
+    def _ctx():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    clear_entity_caches()
+    with patch("app.database.get_session_context", _ctx):
+        yield get_scribe()
+    clear_entity_caches()
+
+
+def _row(factory) -> CharacterDB:
+    session = factory()
+    try:
+        return session.get(CharacterDB, "char-1")
+    finally:
+        session.close()
+
+
+# ---------------------------------------------------------------------------
+# apply_patch / diff_patch
+# ---------------------------------------------------------------------------
+
+
+class TestJsonPatch:
+    """RFC 6902 subset applied to plain dicts."""
+
+    def test_add_replace_remove_and_test(self):
+        doc = copy.deepcopy(SHEET)
+        apply_patch(
+            doc,
+            [
+                {"op": "test", "path": "/hit_points/current", "value": 10},
+                {"op": "replace", "path": "/hit_points/current", "value": 15},
+                {"op": "add", "path": "/inventory/-", "value": {"id": "torch"}},
+                {"op": "add", "path": "/inventory/0", "value": {"id": "map"}},
+                {"op": "add", "path": "/equipment/main_hand", "value": {"id": "sword"}},
+                {"op": "remove", "path": "/a~1b/~0c"},
+            ],
+        )
+        assert doc["hit_points"]["current"] == 15
+        assert [i["id"] for i in doc["inventory"]] == ["map", "rope", "torch"]
+        assert doc["equipment"] == {"main_hand": {"id": "sword"}}
+        assert doc["a/b"] == {}
+
+    @pytest.mark.parametrize(
+        "op",
+        [
+            {"op": "test", "path": "/name", "value": "Bea"},
+            {"op": "replace", "path": "/missing", "value": 1},
+            {"op": "remove", "path": "/inventory/5"},
+            {"op": "add", "path": "/nope/deeper", "value": 1},
+            {"op": "move", "path": "/name", "from": "/id"},
+            {"op": "add", "path": "name", "value": 1},
+        ],
+    )
+    def test_invalid_operations_raise(self, op):
+        with pytest.raises(PatchError):
+            apply_patch(copy.deepcopy(SHEET), [op])
+
+    def test_diff_round_trips(self):
+        new = copy.deepcopy(SHEET)
+        new["hit_points"]["current"] = 3
+        new["inventory"].append({"id": "torch"})
+        new["equipment"]["head"] = {"id": "helm"}
+        del new["a/b"]
+        ops = diff_patch(SHEET, new)
+        assert apply_patch(copy.deepcopy(SHEET), ops) == new
+        assert {"op": "replace", "path": "/hit_points/current", "value": 3} in ops
+        assert {"op": "add", "path": "/inventory/-", "value": {"id": "torch"}} in ops
+
+    def test_diff_of_equal_documents_is_empty(self):
+        assert diff_patch(SHEET, copy.deepcopy(SHEET)) == []
+
+
+# ---------------------------------------------------------------------------
+# patch_character / modify_character
+# ---------------------------------------------------------------------------
+
+
+class TestPatchCharacter:
+    """Versioned writes against SQLite (read-modify-write path)."""
+
+    def test_patch_bumps_version_and_syncs_name(self, factory):
+        session = factory()
+        version = patch_character(
+            session,
+            "char-1",
+            [
+                {"op": "replace", "path": "/name", "value": "Bea"},
+                {"op": "replace", "path": "/hit_points/current", "value": 1},
+            ],
+        )
+        session.commit()
+        session.close()
+        row = _row(factory)
+        assert version == row.version == 2
+        assert row.name == "Bea"
+        assert row.data["hit_points"]["current"] == 1
+        assert row.data["inventory"] == SHEET["inventory"]
+
+    def test_stale_expected_version_conflicts(self, factory):
+        session = factory()
+        with pytest.raises(VersionConflictError):
+            patch_character(
+                session,
+                "char-1",
+                [{"op": "replace", "path": "/name", "value": "Bea"}],
+                expected_version=7,
+            )
+        session.close()
+        assert _row(factory).name == "Ada"
+
+    def test_missing_character_returns_none(self, factory):
+        session = factory()
+        assert patch_character(session, "ghost", [{"op": "remove", "path": "/x"}]) is None
+        assert modify_character(session, "ghost", lambda sheet: None) is None
+        session.close()
+
+    def test_orm_writes_bump_version_too(self, factory):
+        session = factory()
+        session.get(CharacterDB, "char-1").name = "Cy"
+        session.commit()
+        session.close()
+        assert _row(factory).version == 2
+
+    def test_modify_retries_after_a_concurrent_write(self, factory):
+        calls = []
+
+        def _gain_torch(sheet):
+            calls.append(sheet["hit_points"]["current"])
+            if len(calls) == 1:
+                # Combat lands a hit between our read and our write
+                other = factory()
+                patch_character(
+                    other, "char-1",
+                    [{"op": "replace", "path": "/hit_points/current", "value": 4}],
+                )
+                other.commit()
+                other.close()
+            sheet["inventory"].append({"id": "torch"})
+            return "done"
+
+        session = factory()
+        outcome, sheet, version = modify_character(session, "char-1", _gain_torch)
+        session.commit()
+        session.close()
+
+        assert outcome == "done"
+        assert calls == [10, 4]  # second attempt saw the concurrent write
+        row = _row(factory)
+        assert row.version == version == 3
+        assert row.data["hit_points"]["current"] == 4
+        assert [i["id"] for i in row.data["inventory"]] == ["rope", "torch"]
+        assert sheet == row.data
+
+    def test_modify_with_expected_version_does_not_retry(self, factory):
+        session = factory()
+        session.execute(
+            update(CharacterDB).where(CharacterDB.id == "char-1").values(version=5)
+        )
+        with pytest.raises(VersionConflictError):
+            modify_character(
+                session, "char-1", lambda sheet: sheet.update(name="X"), expected_version=1
+            )
+        session.close()
+
+
+class TestPostgresPath:
+    """On PostgreSQL eligible patches compile to one jsonb UPDATE."""
+
+    OPS = [
+        {"op": "replace", "path": "/hit_points/current", "value": 3},
+        {"op": "add", "path": "/inventory/-", "value": {"id": "torch"}},
+        {"op": "remove", "path": "/equipment/main_hand"},
+    ]
+
+    def test_expression_uses_jsonb_functions(self):
+        sql = str(
+            update(CharacterDB)
+            .values(data=_jsonb_patch_expression(self.OPS))
+            .compile(dialect=postgresql.dialect())
+        )
+        assert "jsonb_set" in sql
+        assert "jsonb_insert" in sql
+        assert "#-" in sql
+
+    def test_patch_is_a_single_guarded_update(self):
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.execute.return_value.scalar.return_value = 4
+        db.identity_map.get.return_value = None
+
+        assert patch_character(db, "char-1", self.OPS, expected_version=3) == 4
+        db.execute.assert_called_once()
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE characters SET")
+        assert "AND characters.version = " in sql
+        assert "RETURNING characters.version" in sql
+        # replace/remove need their target, the append an array to append to
+        assert sql.count("#>") == 3
+        assert sql.count("IS NOT NULL") == 2
+        assert "jsonb_typeof" in sql
+
+    def test_missing_path_raises_instead_of_a_silent_no_op(self):
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.execute.return_value.scalar.return_value = None  # guards matched no row
+        db.scalar.return_value = 3  # the row exists, at the expected version
+        ops = [{"op": "replace", "path": "/hit_points/temporary", "value": 5}]
+        with pytest.raises(PatchError, match="path does not exist"):
+            patch_character(db, "char-1", ops, expected_version=3)
+
+        db.scalar.return_value = 4
+        with pytest.raises(VersionConflictError):
+            patch_character(db, "char-1", ops, expected_version=3)
+
+    @pytest.mark.parametrize(
+        ("ops", "server_side"),
+        [
+            (
+                [
+                    {"op": "add", "path": "/inventory/-", "value": 1},
+                    {"op": "add", "path": "/inventory/-", "value": 2},
+                    {"op": "replace", "path": "/inventory/0", "value": 0},
+                ],
+                False,
+            ),
+            (
+                [
+                    {"op": "add", "path": "/inventory/-", "value": 1},
+                    {"op": "add", "path": "/inventory/-", "value": 2},
+                ],
+                True,
+            ),
+            (
+                [
+                    {"op": "add", "path": "/feats", "value": {}},
+                    {"op": "add", "path": "/feats/lucky", "value": True},
+                ],
+                False,
+            ),
+            (
+                [
+                    {"op": "remove", "path": "/inventory/0"},
+                    {"op": "replace", "path": "/inventory/1/qty", "value": 2},
+                ],
+                False,
+            ),
+            (
+                [
+                    {"op": "remove", "path": "/equipment/main_hand"},
+                    {"op": "replace", "path": "/equipment/off_hand", "value": None},
+                ],
+                True,
+            ),
+        ],
+    )
+    def test_ops_building_on_earlier_ops_are_applied_in_python(self, ops, server_side):
+        assert _server_side(ops) is server_side
+
+    def test_test_ops_fall_back_to_read_modify_write(self):
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.execute.return_value.first.return_value = None
+        ops = [{"op": "test", "path": "/name", "value": "Ada"}]
+        assert patch_character(db, "char-1", ops) is None
+        sql = str(db.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("SELECT")
+
+
+# ---------------------------------------------------------------------------
+# ScribeAgent
+# ---------------------------------------------------------------------------
+
+
+class TestScribePartialUpdates:
+    """Scribe write paths go through the patch API."""
+
+    async def test_add_to_inventory_stacks_without_touching_other_fields(
+        self, scribe, factory
+    ):
+        result = await scribe.add_to_inventory("char-1", {"name": "Rope", "type": "misc"})
+        assert "error" not in result
+        row = _row(factory)
+        assert row.version == 2
+        assert len(row.data["inventory"]) == 2  # stored rope lacks "type"
+
+        await scribe.add_to_inventory("char-1", {"name": "Rope", "type": "misc"})
+        assert _row(factory).data["inventory"][1]["quantity"] == 2
+
+    async def test_equip_item(self, scribe, factory):
+        await scribe.add_to_inventory(
+            "char-1", {"id": "sword", "name": "Sword", "type": "weapon"}
+        )
+        result = await scribe.equip_item("char-1", "sword", "main_hand")
+        assert result["equipped_item"]["id"] == "sword"
+        data = _row(factory).data
+        assert data["equipment"]["main_hand"]["id"] == "sword"
+        assert [i["id"] for i in data["inventory"]] == ["rope"]
+
+    async def test_update_character_with_stale_version_reports_conflict(
+        self, scribe, factory
+    ):
+        result = await scribe.update_character("char-1", {"name": "Bea"}, expected_version=9)
+        assert result["conflict"] is True
+        assert _row(factory).name == "Ada"
+
+        updated = await scribe.update_character(
+            "char-1", {"name": "Bea", "unknown": 1}, expected_version=1
+        )
+        assert updated["name"] == "Bea"
+        assert "unknown" not in updated
+
+    async def test_patch_character(self, scribe, factory):
+        result = await scribe.patch_character(
+            "char-1", [{"op": "add", "path": "/conditions", "value": ["prone"]}]
+        )
+        assert result == {"character_id": "char-1", "version": 2}
+        assert _row(factory).data["conditions"] == ["prone"]
+
+        bad = await scribe.patch_character(
+            "char-1", [{"op": "replace", "path": "/missing", "value": 1}]
+        )
+        assert bad["error"].startswith("Invalid patch")
@@ -0,0 +1,351 @@
+"""Tests for the in-memory combat engine and its checkpoints."""
+
+import json
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from app import combat_engine
+from app.combat_engine import CombatEngine, LiveCombat
+from app.database import Base
+from app.main import app
+from app.models.db_models import CombatEvent, CombatState
+from app.rules_engine import advance_turn, remove_combatant
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+ORDER = [
+    {"type": "npc", "id": "a", "name": "A", "initiative": 18, "dex_modifier": 2, "hp": 20, "ac": 14},
+    {"type": "npc", "id": "b", "name": "B", "initiative": 12, "dex_modifier": 1, "hp": 9, "ac": 12},
+    {"type": "player", "id": "c", "name": "C", "initiative": 7},
+]
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'combat.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    @contextmanager
+    def _ctx():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    with patch("app.database.get_session_context", _ctx):
+        yield factory
+    engine.dispose()
+
+
+@pytest.fixture()
+def engine():
+    fresh = CombatEngine(checkpoint_interval=3)
+    with patch.object(combat_engine, "_engine", fresh):
+        yield fresh
+
+
+def _store(factory, combat_id="cmb", events=(), **header):
+    db = factory()
+    db.add(
+        CombatState(
+            id=combat_id,
+            session_id="s1",
+            initiative_order=header.pop("initiative_order", ORDER),
+            participants=[],
+            **header,
+        )
+    )
+    for seq, (event_type, data) in enumerate(events, start=1):
+        db.add(CombatEvent(combat_id=combat_id, seq=seq, event_type=event_type, data=data))
+    db.commit()
+    db.close()
+
+
+def _header(factory, combat_id="cmb"):
+    db = factory()
+    try:
+        return db.query(CombatState).filter(CombatState.id == combat_id).one()
+    finally:
+        db.close()
+
+
+class TestLiveCombat:
+    def test_damage_and_healing(self):
+        combat = LiveCombat("cmb", ORDER)
+        combat.apply("attack", {"target_id": "b", "success": True, "damage": 5}, 1)
+        combat.apply("attack", {"target_id": "b", "success": False, "damage": 0}, 2)
+        assert combat.get("b").hp == 4
+        combat.apply("damage", {"target_id": "b", "success": True, "damage": 50}, 3)
+        assert combat.get("b").hp == 0
+        combat.apply("heal", {"target_id": "b", "success": True, "healing": 30}, 4)
+        assert combat.get("b").hp == 9
+        # Untracked hit points stay untracked
+        combat.apply("attack", {"target_id": "c", "success": True, "damage": 3}, 5)
+        assert combat.get("c").hp is None
+        assert combat.last_seq == 5
+
+    def test_end_turn_matches_advance_turn(self):
+        combat = LiveCombat("cmb", ORDER)
+        turn, round_number = 0, 1
+        for _ in range(7):
+            expected = advance_turn(ORDER, turn, round_number)
+            advanced = combat.apply("move", {"end_turn": True})
+            assert (combat.current_turn, combat.round, advanced) == (
+                expected["current_turn"],
+                expected["current_round"],
+                expected["round_advanced"],
+            )
+            turn, round_number = expected["current_turn"], expected["current_round"]
+
+    @pytest.mark.parametrize(("current", "removed"), [(0, "b"), (1, "a"), (2, "c"), (1, "b")])
+    def test_remove_matches_rules_engine(self, current, removed):
+        combat = LiveCombat("cmb", ORDER, current_turn=current)
+        combat.apply("remove", {"target_id": removed})
+        expected = remove_combatant(ORDER, current, removed)
+        assert [e["id"] for e in combat.initiative_order()] == [e["id"] for e in expected["turn_order"]]
+        assert combat.current_turn == expected["current_turn"]
+
+    def test_join_keeps_the_active_combatant(self):
+        combat = LiveCombat("cmb", ORDER, current_turn=1)
+        combat.apply("join", {"combatant": {"id": "d", "name": "D", "initiative": 15}})
+        combat.apply("join", {"combatant": {"id": "e", "name": "E", "initiative": 12, "dex_modifier": 0}})
+        assert [e["id"] for e in combat.initiative_order()] == ["a", "d", "b", "e", "c"]
+        assert combat.active.key == "b"
+        assert combat.get("d").id == 3
+
+    def test_entries_round_trip(self):
+        combat = LiveCombat("cmb", ORDER)
+        again = LiveCombat("cmb", combat.initiative_order())
+        assert again.initiative_order() == combat.initiative_order()
+        assert combat.initiative_order()[2] == {**ORDER[2], "dex_modifier": 0}
+
+    def test_timed_effects_expire_as_rounds_start(self):
+        combat = LiveCombat("cmb", ORDER)
+        combat.apply("condition", {"target_id": "b", "condition": "stunned", "duration_rounds": 1})
+        combat.apply("condition", {"target_id": "a", "condition": "prone", "duration_rounds": 1})
+        combat.apply("condition", {"target_id": "a", "condition": "prone"})
+        combat.apply("concentration", {"character_id": "c", "spell": "Bless", "duration_rounds": 2})
+        combat.apply("map_effect", {"effect": {"id": "fog", "duration_rounds": 1}})
+        combat.apply("map_effect", {"effect": {"id": "fog"}, "remove": True})
+        for _ in range(2):
+            combat.apply("move", {"end_turn": True})
+            assert combat.expired == []
+        combat.apply("move", {"end_turn": True})
+        assert [(e["kind"], e["owner"], e["name"]) for e in combat.expired] == [("condition", "b", "stunned")]
+        assert "stunned" not in combat.get("b").conditions
+        # Reapplied without a duration, prone no longer ends by itself
+        assert "prone" in combat.get("a").conditions
+
+        again = LiveCombat("cmb", combat.initiative_order(), round=combat.round, effects=combat.header()["effects"])
+        combat.apply("remove", {"target_id": "c"})
+        for _ in range(3):
+            again.apply("move", {"end_turn": True})
+        assert [(e["owner"], e["data"]) for e in again.expired] == [("c", {"spell": "Bless"})]
+        assert combat.effects.snapshot() == []
+
+
+class TestRecovery:
+    async def test_recovers_from_checkpoint_and_tail(self, session_factory):
+        # Header checkpointed after event 1; events 2-3 are only in the log
+        checkpointed = [{**ORDER[0]}, {**ORDER[1], "hp": 4}, {**ORDER[2]}]
+        events = [
+            ("attack", {"target_id": "b", "success": True, "damage": 5}),
+            ("attack", {"target_id": "a", "success": True, "damage": 6, "end_turn": True}),
+            ("move", {"end_turn": True}),
+        ]
+        _store(session_factory, events=events, initiative_order=checkpointed, checkpoint_seq=1)
+        combat = await CombatEngine().get("cmb")
+        assert combat.last_seq == 3
+        assert (combat.get("a").hp, combat.get("b").hp) == (14, 4)
+        assert combat.current_turn == 2
+
+    async def test_unknown_combat(self, session_factory):
+        assert await CombatEngine().get("missing") is None
+
+    async def test_catches_up_with_events_logged_elsewhere(self, session_factory):
+        _store(session_factory)
+        engine = CombatEngine()
+        combat = await engine.get("cmb")
+        db = session_factory()
+        hit = {"target_id": "a", "success": True, "damage": 2}
+        db.add(CombatEvent(combat_id="cmb", seq=1, event_type="damage", data=hit))
+        db.commit()
+        db.close()
+        await engine.apply(combat, "damage", {"target_id": "a", "success": True, "damage": 3}, 2)
+        assert combat.get("a").hp == 15
+
+    async def test_checkpoints_on_interval_and_round_end(self, session_factory):
+        _store(session_factory)
+        engine = CombatEngine(checkpoint_interval=3)
+        combat = await engine.get("cmb")
+        await engine.apply(combat, "damage", {"target_id": "a", "success": True, "damage": 1}, 1)
+        await engine.apply(combat, "damage", {"target_id": "a", "success": True, "damage": 1}, 2)
+        await engine.flush()
+        assert _header(session_factory).checkpoint_seq == 0
+
+        await engine.apply(combat, "damage", {"target_id": "a", "success": True, "damage": 1}, 3)
+        await engine.flush()
+        header = _header(session_factory)
+        assert (header.checkpoint_seq, header.initiative_order[0]["hp"]) == (3, 17)
+
+        for seq in (4, 5, 6):
+            await engine.apply(combat, "move", {"end_turn": True}, seq)
+        await engine.flush()
+        header = _header(session_factory)
+        assert (header.checkpoint_seq, header.round, header.current_turn) == (6, 2, 0)
+
+    async def test_stale_checkpoint_does_not_overwrite(self, session_factory):
+        _store(session_factory, checkpoint_seq=5)
+        stale = {"status": "active", "round": 1, "current_turn": 2, "initiative_order": [], "checkpoint_seq": 4}
+        assert not await combat_engine.run_in_session(combat_engine._write_checkpoint, "cmb", stale)
+        assert _header(session_factory).current_turn == 0
+
+
+class TestRoutes:
+    @pytest.fixture()
+    def client(self, session_factory, engine):
+        with TestClient(app) as c:
+            yield c
+
+    def _start(self, client):
+        participants = [
+            {"type": "npc", "id": "orc", "name": "Orc", "dex_modifier": 1, "hp": 15, "ac": 13},
+            {"type": "npc", "id": "elf", "name": "Elf", "dex_modifier": 3, "hp": 12, "ac": 15},
+        ]
+        response = client.post("/game/combat/initialize", json={"session_id": "s1", "participants": participants})
+        assert response.status_code == 200
+        return response.json()
+
+    def test_turns_apply_in_memory_and_checkpoint(self, client, engine, session_factory):
+        combat = self._start(client)
+        combat_id = combat["combat_id"]
+        assert {e["id"]: e["ac"] for e in combat["initiative_order"]} == {"orc": 13, "elf": 15}
+
+        # A natural 14 + 0 hits AC 13 but misses the default AC 15
+        attack = {"action": "attack", "target_id": "orc", "dice_result": {"total": 14}, "damage_dice": "4"}
+        result = client.post(f"/game/combat/{combat_id}/turn", json={**attack, "end_turn": True}).json()
+        assert (result["success"], result["target_hp"], result["current_turn"]) == (True, 11, 1)
+        live = client.get(f"/game/combat/{combat_id}").json()
+        assert live["initiative_order"][[e["id"] for e in live["initiative_order"]].index("orc")]["hp"] == 11
+        # Not checkpointed yet: the database header is one action behind
+        assert _header(session_factory, combat_id).checkpoint_seq == 0
+
+        result = client.post(f"/game/combat/{combat_id}/turn", json={"action": "move", "end_turn": True}).json()
+        assert (result["round"], result["current_turn"]) == (2, 0)
+        client.portal.call(engine.flush)
+        header = _header(session_factory, combat_id)
+        assert (header.checkpoint_seq, header.round) == (2, 2)
+
+        # A restart recovers the same state from checkpoint + tail
+        client.post(f"/game/combat/{combat_id}/turn", json={"action": "damage", "target_id": "elf", "amount": 5})
+        before = engine.peek(combat_id).header()
+        engine.clear()
+        assert client.get(f"/game/combat/{combat_id}").json()["initiative_order"] != before["initiative_order"]
+        client.post(f"/game/combat/{combat_id}/turn", json={"action": "move"})
+        assert engine.peek(combat_id).header() == {**before, "checkpoint_seq": 4}
+
+    def test_shutdown_checkpoints_pending_events(self, session_factory, engine):
+        with TestClient(app) as client:
+            combat_id = self._start(client)["combat_id"]
+            client.post(
+                f"/game/combat/{combat_id}/turn",
+                json={"action": "damage", "target_id": "elf", "amount": 5},
+            )
+            # One event, inside the coalescing window
+            assert _header(session_factory, combat_id).checkpoint_seq == 0
+        header = _header(session_factory, combat_id)
+        assert header.checkpoint_seq == 1
+        elf = next(e for e in header.initiative_order if e["id"] == "elf")
+        assert elf["hp"] == 7
+
+    def test_join_remove_and_end(self, client, engine, session_factory):
+        combat_id = self._start(client)["combat_id"]
+        join = {"action": "join", "combatant": {"id": "wolf", "name": "Wolf", "initiative": 30}}
+        assert client.post(f"/game/combat/{combat_id}/turn", json=join).json()["active_combatant"] != "wolf"
+        order = client.get(f"/game/combat/{combat_id}").json()["initiative_order"]
+        assert order[0]["id"] == "wolf"
+
+        client.post(f"/game/combat/{combat_id}/turn", json={"action": "remove", "target_id": "orc"})
+        ended = client.post(f"/game/combat/{combat_id}/turn", json={"action": "end_combat"}).json()
+        assert ended["status"] == "ended"
+        assert engine.peek(combat_id) is None
+        client.portal.call(engine.flush)
+        header = _header(session_factory, combat_id)
+        assert header.status == "ended"
+        assert [e["id"] for e in header.initiative_order] == ["wolf", "elf"]
+
+    def test_unknown_combat_is_not_tracked(self, client, engine):
+        response = client.post("/game/combat/nope/turn", json={"action": "move", "end_turn": True})
+        assert response.status_code == 200
+        assert "seq" not in response.json()
+        assert engine.peek("nope") is None
+
+    def test_delay_and_ready(self, client, engine):
+        combat_id = self._start(client)["combat_id"]
+        first, second = (e["id"] for e in client.get(f"/game/combat/{combat_id}").json()["initiative_order"])
+        url = f"/game/combat/{combat_id}/turn"
+        assert client.post(url, json={"action": "delay", "character_id": second}).status_code == 409
+        assert client.post(url, json={"action": "trigger", "character_id": first}).status_code == 409
+
+        delayed = client.post(url, json={"action": "delay", "character_id": first}).json()
+        assert delayed["active_combatant"] == second
+        order = client.get(f"/game/combat/{combat_id}").json()["initiative_order"]
+        assert [(e["id"], e.get("delayed")) for e in order] == [(second, None), (first, True)]
+
+        client.post(url, json={"action": "ready", "character_id": second, "readied": "attack"})
+        resumed = client.post(url, json={"action": "resume", "character_id": first}).json()
+        assert resumed["active_combatant"] == first
+        # Survives a restart, readied action included
+        engine.clear()
+        client.post(url, json={"action": "move"})
+        live = engine.peek(combat_id)
+        assert live.active.key == first
+        assert live.tracker.readied == {live.get(second).id: "attack"}
+
+    def test_timed_condition_expiry_is_broadcast(self, client, engine, session_factory):
+        combat_id = self._start(client)["combat_id"]
+        url = f"/game/combat/{combat_id}/turn"
+        poison = {"action": "condition", "target_id": "orc", "condition": "poisoned", "duration_rounds": 1}
+        client.post(url, json=poison)
+        client.post(url, json={"action": "move", "end_turn": True})
+        client.post(url, json={"action": "move"})  # third event: checkpoint
+        client.portal.call(engine.flush)
+        assert _header(session_factory, combat_id).effects[0]["name"] == "poisoned"
+
+        # The expiry survives a restart: the scheduler is rebuilt from the checkpoint
+        engine.clear()
+        with patch("app.api.websocket_routes.manager.send_campaign_message") as send:
+            result = client.post(url, json={"action": "move", "end_turn": True, "campaign_id": "camp"}).json()
+        assert result["round"] == 2
+        assert [e["name"] for e in result["expired_effects"]] == ["poisoned"]
+        assert engine.peek(combat_id).get("orc").conditions.to_list() == []
+        message, campaign_id = send.call_args.args
+        assert campaign_id == "camp"
+        assert json.loads(message)["type"] == "effects_expired"
+
+        fog = {"type": "aoe_circle", "origin_x": 2, "origin_y": 2, "radius": 3, "duration_rounds": 2}
+        result = client.post(url, json={"action": "map_effect", "effect": fog}).json()
+        assert client.get(f"/game/combat/{combat_id}").json()["effects"][0]["owner"] == result["effect"]["id"]
+        bad = client.post(url, json={"action": "map_effect", "effect": {"type": "aoe_circle"}})
+        assert bad.status_code == 422
+
+    def test_conditions_drive_attacks(self, client, engine):
+        combat_id = self._start(client)["combat_id"]
+        url = f"/game/combat/{combat_id}/turn"
+        client.post(url, json={"action": "condition", "target_id": "orc", "condition": "paralyzed"})
+        attack = {"character_id": "elf", "target_id": "orc", "dice_result": {"total": 20}, "damage_dice": "2d1"}
+        result = client.post(url, json=attack).json()
+        assert (result["advantage"], result["critical"], result["damage"]) == (True, True, 4)
+        assert result["target_hp"] == 11
+
+        client.post(url, json={"action": "condition", "target_id": "orc", "condition": "paralyzed", "remove": True})
+        result = client.post(url, json={**attack, "ranged": True}).json()
+        assert (result["advantage"], "critical" in result, result["damage"]) == (False, False, 2)
+        assert engine.peek(combat_id).get("orc").conditions.to_list() == []
@@ -0,0 +1,167 @@
+"""Tests for the append-only combat event log."""
+
+import asyncio
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from app.api.routes import combat_routes
+from app.database import Base
+from app.main import app
+from app.models.db_models import CombatEvent, CombatState
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    """File-backed SQLite database so worker threads get their own connections."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'combat.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    @contextmanager
+    def _ctx():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    with patch("app.database.get_session_context", _ctx):
+        yield factory
+    engine.dispose()
+
+
+@pytest.fixture()
+def client(session_factory):
+    with TestClient(app) as c:
+        yield c
+
+
+def _create_combat(session_factory, combat_id: str, combat_log=None) -> None:
+    db = session_factory()
+    db.add(
+        CombatState(
+            id=combat_id,
+            session_id="s1",
+            initiative_order=[],
+            participants=[],
+            combat_log=combat_log or [],
+        )
+    )
+    db.commit()
+    db.close()
+
+
+def _take_turn(client, combat_id: str, n: int) -> dict:
+    response = client.post(
+        f"/game/combat/{combat_id}/turn",
+        json={
+            "action": "attack",
+            "character_id": f"c{n}",
+            "dice_result": {"total": 1},
+            "target_ac": 30,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+# ---------------------------------------------------------------------------
+# Appending
+# ---------------------------------------------------------------------------
+
+
+class TestAppendCombatEvent:
+    """Each turn writes one row instead of rewriting the header."""
+
+    def test_turns_create_sequential_event_rows(self, client, session_factory):
+        _create_combat(session_factory, "cmb-1")
+        seqs = [_take_turn(client, "cmb-1", n)["seq"] for n in range(3)]
+        assert seqs == [1, 2, 3]
+
+        db = session_factory()
+        rows = db.query(CombatEvent).order_by(CombatEvent.seq).all()
+        assert [r.data["character_id"] for r in rows] == ["c0", "c1", "c2"]
+        assert db.get(CombatState, "cmb-1").combat_log == []
+        db.close()
+
+    def test_turn_for_unknown_combat_is_not_logged(self, client, session_factory):
+        result = _take_turn(client, "missing", 0)
+        assert "seq" not in result
+        db = session_factory()
+        assert db.query(CombatEvent).count() == 0
+        db.close()
+
+    def test_legacy_inline_log_is_folded_into_events(self, session_factory):
+        _create_combat(session_factory, "legacy", combat_log=[{"n": 1}, {"n": 2}])
+        seq = asyncio.run(combat_routes._append_combat_event("legacy", {"n": 3}))
+        assert seq == 3
+
+        log = asyncio.run(combat_routes._load_combat("legacy", include_log=True))
+        assert log["combat_log"] == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+    async def test_concurrent_appends_get_unique_sequences(self, session_factory):
+        _create_combat(session_factory, "race")
+        seqs = await asyncio.gather(
+            *(combat_routes._append_combat_event("race", {"n": n}) for n in range(8))
+        )
+        assert sorted(seqs) == list(range(1, 9))
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+
+class TestReadCombatEvents:
+    """Paginated and tail reads of the event log."""
+
+    @pytest.fixture()
+    def combat_with_events(self, client, session_factory):
+        _create_combat(session_factory, "cmb-r")
+        for n in range(5):
+            _take_turn(client, "cmb-r", n)
+        return "cmb-r"
+
+    def test_forward_pagination(self, client, combat_with_events):
+        first = client.get(f"/game/combat/{combat_with_events}/events?limit=2").json()
+        assert [e["seq"] for e in first["events"]] == [1, 2]
+        assert first["has_more"] is True
+
+        rest = client.get(
+            f"/game/combat/{combat_with_events}/events"
+            f"?after_seq={first['next_after_seq']}&limit=10"
+        ).json()
+        assert [e["seq"] for e in rest["events"]] == [3, 4, 5]
+        assert rest["has_more"] is False
+
+    def test_tail_returns_latest_in_order(self, client, combat_with_events):
+        body = client.get(f"/game/combat/{combat_with_events}/events?tail=2").json()
+        assert [e["seq"] for e in body["events"]] == [4, 5]
+
+    def test_header_omits_log_unless_requested(self, client, combat_with_events):
+        header = client.get(f"/game/combat/{combat_with_events}").json()
+        assert "combat_log" not in header
+
+        full = client.get(f"/game/combat/{combat_with_events}?include_log=true").json()
+        assert [e["character_id"] for e in full["combat_log"]] == [
+            "c0", "c1", "c2", "c3", "c4",
+        ]
+
+    def test_unknown_combat_returns_404(self, client):
+        assert client.get("/game/combat/nope/events").status_code == 404
+        assert client.get("/game/combat/nope").status_code == 404
+
+    def test_invalid_limit_rejected(self, client, combat_with_events):
+        response = client.get(f"/game/combat/{combat_with_events}/events?limit=0")
+        assert response.status_code == 422
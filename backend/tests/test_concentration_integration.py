@@ -12,11 +12,6 @@ from app.models.game_models import CastSpellRequest
 class TestConcentrationSpellIntegration:
     """Test concentration spell integration in combat spell casting."""
 
-    @pytest.fixture
-    def mock_db(self):
-        """A mock database session (not used when _get_spell_data is patched)."""
-        return Mock()
-
     @pytest.fixture
     def concentration_spell_data(self):
         """Sample concentration spell data."""
@@ -57,7 +52,7 @@ class TestConcentrationSpellIntegration:
 
     @pytest.mark.asyncio
     async def test_concentration_spell_starts_concentration(
-        self, concentration_spell_data, cast_spell_request, mock_db
+        self, concentration_spell_data, cast_spell_request
     ) -> None:
         """Test that casting a concentration spell starts concentration."""
         with (
@@ -85,7 +80,7 @@ class TestConcentrationSpellIntegration:
             }
 
             # Call the function
-            response = await cast_spell_in_combat("test_combat_123", cast_spell_request, mock_db)
+            response = await cast_spell_in_combat("test_combat_123", cast_spell_request)
 
             # Verify concentration was started
             mock_engine_instance.start_concentration.assert_called_once()
@@ -99,7 +94,7 @@ class TestConcentrationSpellIntegration:
 
     @pytest.mark.asyncio
     async def test_non_concentration_spell_no_concentration_started(
-        self, non_concentration_spell_data, cast_spell_request, mock_db
+        self, non_concentration_spell_data, cast_spell_request
     ) -> None:
         """Test that casting a non-concentration spell doesn't start concentration."""
         cast_spell_request.spell_id = "magic_missile"
@@ -123,7 +118,7 @@ class TestConcentrationSpellIntegration:
             mock_rules_engine.return_value = mock_engine_instance
 
             # Call the function
-            response = await cast_spell_in_combat("test_combat_123", cast_spell_request, mock_db)
+            response = await cast_spell_in_combat("test_combat_123", cast_spell_request)
 
             # Verify concentration was NOT started
             mock_engine_instance.start_concentration.assert_not_called()
@@ -134,7 +129,7 @@ class TestConcentrationSpellIntegration:
 
     @pytest.mark.asyncio
     async def test_concentration_spell_breaks_existing_concentration(
-        self, concentration_spell_data, cast_spell_request, mock_db
+        self, concentration_spell_data, cast_spell_request
     ) -> None:
         """Test that casting a concentration spell when already concentrating breaks the old concentration."""
         with (
@@ -162,7 +157,7 @@ class TestConcentrationSpellIntegration:
             }
 
             # Call the function
-            response = await cast_spell_in_combat("test_combat_123", cast_spell_request, mock_db)
+            response = await cast_spell_in_combat("test_combat_123", cast_spell_request)
 
             # Verify concentration was started (which will automatically break existing concentration)
             mock_engine_instance.start_concentration.assert_called_once()
@@ -175,7 +170,7 @@ class TestConcentrationSpellIntegration:
 
     @pytest.mark.asyncio
     async def test_concentration_spell_failure_doesnt_break_cast(
-        self, concentration_spell_data, cast_spell_request, mock_db
+        self, concentration_spell_data, cast_spell_request
     ) -> None:
         """Test that concentration failure doesn't prevent spell from being cast."""
         with (
@@ -203,7 +198,7 @@ class TestConcentrationSpellIntegration:
             }
 
             # Call the function
-            response = await cast_spell_in_combat("test_combat_123", cast_spell_request, mock_db)
+            response = await cast_spell_in_combat("test_combat_123", cast_spell_request)
 
             # Verify concentration was attempted
             mock_engine_instance.start_concentration.assert_called_once()
@@ -2,13 +2,17 @@
 Tests for the conditions system in rules_engine.py.
 
 Covers Condition enum, CONDITION_EFFECTS, apply_condition,
-remove_condition, and get_attack_modifiers.
+remove_condition, get_attack_modifiers and ConditionSet.
 """
 
+import itertools
+
 import pytest
 from app.rules_engine import (
     CONDITION_EFFECTS,
     Condition,
+    ConditionFlag,
+    ConditionSet,
     apply_condition,
     get_attack_modifiers,
     remove_condition,
@@ -289,3 +293,73 @@ class TestGetAttackModifiers:
             target_conditions=["burning"],
         )
         assert result == {"advantage": False, "disadvantage": False}
+
+
+def _scan_modifiers(attacker: list[str], target: list[str], ranged: bool) -> tuple[bool, bool, bool]:
+    """Reference resolution walking both condition lists."""
+    advantage = disadvantage = auto_crit = False
+    for cond in attacker:
+        effects = CONDITION_EFFECTS.get(cond, {})
+        advantage |= bool(effects.get("attack_advantage"))
+        disadvantage |= bool(effects.get("attack_disadvantage"))
+    for cond in target:
+        effects = CONDITION_EFFECTS.get(cond, {})
+        advantage |= bool(effects.get("attacker_advantage"))
+        disadvantage |= bool(effects.get("attacker_disadvantage"))
+        if cond == Condition.PRONE:
+            disadvantage |= ranged
+            advantage |= not ranged
+        auto_crit |= bool(effects.get("auto_crit_melee")) and not ranged
+    if advantage and disadvantage:
+        advantage = disadvantage = False
+    return advantage, disadvantage, auto_crit
+
+
+class TestConditionSet:
+    """Bitmask condition sets and table-driven attack resolution."""
+
+    @pytest.mark.unit
+    def test_one_flag_per_condition(self) -> None:
+        assert [flag.name for flag in ConditionFlag] == [c.name for c in Condition]
+        assert len({flag.value for flag in ConditionFlag}) == len(Condition)
+
+    @pytest.mark.unit
+    def test_list_round_trip(self) -> None:
+        stored = ["poisoned", "exhaustion_2", "prone", "poisoned", "hexed"]
+        conditions = ConditionSet.from_list(stored)
+        assert conditions.to_list() == ["prone", "poisoned", "exhaustion_2", "hexed"]
+        assert ConditionSet.from_list(conditions.to_list()) == conditions
+        assert len(conditions) == 4
+        assert "prone" in conditions and Condition.POISONED in conditions and "hexed" in conditions
+        assert "stunned" not in conditions
+        assert ConditionSet.from_list([]).to_list() == []
+
+    @pytest.mark.unit
+    def test_with_and_without(self) -> None:
+        conditions = ConditionSet().with_condition(Condition.PRONE).with_condition("hexed")
+        assert conditions.with_condition(Condition.PRONE) == conditions
+        assert conditions.without_condition(Condition.PRONE).to_list() == ["hexed"]
+        assert conditions.without_condition("hexed").to_list() == ["prone"]
+        assert conditions.to_list() == ["prone", "hexed"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("ranged", [False, True])
+    def test_matches_list_scan_for_all_pairs(self, ranged: bool) -> None:
+        names = [c.value for c in Condition] + ["flying"]
+        combos = [[]] + [[n] for n in names] + [list(p) for p in itertools.combinations(names, 2)]
+        for attacker, target in itertools.product(combos, combos):
+            expected = _scan_modifiers(attacker, target, ranged)
+            resolved = ConditionSet.from_list(attacker).attack_modifiers(
+                ConditionSet.from_list(target), ranged=ranged
+            )
+            assert tuple(resolved) == expected, (attacker, target)
+            assert get_attack_modifiers(attacker, target, ranged=ranged) == {
+                "advantage": expected[0],
+                "disadvantage": expected[1],
+            }
+
+    @pytest.mark.unit
+    def test_auto_crit_only_in_melee(self) -> None:
+        paralyzed = ConditionSet.from_list(["paralyzed"])
+        assert ConditionSet().attack_modifiers(paralyzed).auto_crit is True
+        assert ConditionSet().attack_modifiers(paralyzed, ranged=True).auto_crit is False
@@ -7,6 +7,7 @@ Verifies that:
 - Session summary is generated when history exceeds the limit
 - Different session IDs get different threads
 - Threads persist to and restore from the database
+- Only new messages are written per exchange and the cache is bounded
 """
 
 from __future__ import annotations
@@ -16,12 +17,14 @@ from contextlib import contextmanager
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import app.agents.dungeon_master_agent as dm_module
 import pytest
 from app.agents.dungeon_master_agent import DungeonMasterAgent
 from app.database import Base
-from app.models.db_models import ConversationThread
+from app.models.db_models import ConversationMessage, ConversationThread
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 
 @pytest.fixture
@@ -52,7 +55,7 @@ def dm_agent(
     dm_mod._dungeon_master = None
     # Patch get_session_context for the agent's entire lifetime so that
     # _get_or_create_thread and _persist_thread never touch a real database.
-    with patch("app.agents.dungeon_master_agent.get_session_context"):
+    with patch("app.database.get_session_context"):
         agent = dm_mod.DungeonMasterAgent()
         agent._fallback_mode = False
         agent.azure_client = mock_azure
@@ -62,24 +65,27 @@ def dm_agent(
 class TestThreadPersistence:
     """Verify _get_or_create_thread returns the same thread per session."""
 
-    def test_same_session_returns_same_thread(
+    @pytest.mark.asyncio
+    async def test_same_session_returns_same_thread(
         self, dm_agent: DungeonMasterAgent
     ) -> None:
-        thread_a = dm_agent._get_or_create_thread("session-1")
-        thread_b = dm_agent._get_or_create_thread("session-1")
+        thread_a = await dm_agent._get_or_create_thread("session-1")
+        thread_b = await dm_agent._get_or_create_thread("session-1")
         assert thread_a is thread_b
 
-    def test_different_sessions_return_different_threads(
+    @pytest.mark.asyncio
+    async def test_different_sessions_return_different_threads(
         self, dm_agent: DungeonMasterAgent
     ) -> None:
-        thread_a = dm_agent._get_or_create_thread("session-1")
-        thread_b = dm_agent._get_or_create_thread("session-2")
+        thread_a = await dm_agent._get_or_create_thread("session-1")
+        thread_b = await dm_agent._get_or_create_thread("session-2")
         assert thread_a is not thread_b
 
-    def test_thread_has_messages_list(
+    @pytest.mark.asyncio
+    async def test_thread_has_messages_list(
         self, dm_agent: DungeonMasterAgent
     ) -> None:
-        thread = dm_agent._get_or_create_thread("session-1")
+        thread = await dm_agent._get_or_create_thread("session-1")
         assert isinstance(thread, list)
 
 
@@ -94,7 +100,7 @@ class TestMessageAccumulation:
         await dm_agent.process_input("I open the door", context)
         await dm_agent.process_input("I look around the room", context)
 
-        thread = dm_agent._get_or_create_thread("test-session")
+        thread = await dm_agent._get_or_create_thread("test-session")
         # Each call adds user + assistant = 2 per call
         assert len(thread) == 4
         assert thread[0]["role"] == "user"
@@ -110,7 +116,7 @@ class TestMessageAccumulation:
         await dm_agent.process_input("Hello", {})
         await dm_agent.process_input("World", {})
 
-        thread = dm_agent._get_or_create_thread("default")
+        thread = await dm_agent._get_or_create_thread("default")
         assert len(thread) == 4
 
     @pytest.mark.asyncio
@@ -120,7 +126,7 @@ class TestMessageAccumulation:
         context = {"session_id": "content-test"}
         await dm_agent.process_input("I cast fireball", context)
 
-        thread = dm_agent._get_or_create_thread("content-test")
+        thread = await dm_agent._get_or_create_thread("content-test")
         assert "fireball" in thread[0]["content"].lower()
 
 
@@ -135,7 +141,7 @@ class TestSlidingWindow:
         context = {"session_id": "window-test"}
 
         # Fill thread with more than MAX_HISTORY_MESSAGES=20
-        thread = dm_agent._get_or_create_thread("window-test")
+        thread = await dm_agent._get_or_create_thread("window-test")
         for i in range(30):
             thread.append({"role": "user", "content": f"Message {i}"})
             thread.append(
@@ -223,7 +229,7 @@ class TestSessionSummary:
     ) -> None:
         """When the sliding window kicks in, a summary is prepended."""
         context = {"session_id": "summary-test"}
-        thread = dm_agent._get_or_create_thread("summary-test")
+        thread = await dm_agent._get_or_create_thread("summary-test")
 
         for i in range(25):
             thread.append(
@@ -261,7 +267,7 @@ class TestFallbackModeHistory:
         await dm_agent.process_input("I explore the cave", context)
         await dm_agent.process_input("I search for treasure", context)
 
-        thread = dm_agent._get_or_create_thread("fallback-test")
+        thread = await dm_agent._get_or_create_thread("fallback-test")
         assert len(thread) == 4
 
 
@@ -273,7 +279,11 @@ class TestFallbackModeHistory:
 @pytest.fixture
 def _in_memory_db() -> Generator[sessionmaker, None, None]:
     """Create an in-memory SQLite database with all tables."""
-    engine = create_engine("sqlite:///:memory:")
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
     Base.metadata.create_all(bind=engine)
     session_factory = sessionmaker(bind=engine)
     yield session_factory
@@ -295,7 +305,7 @@ def _patch_db_session(
             session.close()
 
     with patch(
-        "app.agents.dungeon_master_agent.get_session_context",
+        "app.database.get_session_context",
         _fake_session_context,
     ):
         yield
@@ -317,16 +327,33 @@ def dm_agent_with_db(
     return agent
 
 
+def _message_rows(
+    session_factory: sessionmaker, session_id: str
+) -> list[ConversationMessage]:
+    """Return the persisted message rows for a session's DM thread."""
+    session = session_factory()
+    rows = (
+        session.query(ConversationMessage)
+        .join(ConversationThread, ConversationThread.id == ConversationMessage.thread_id)
+        .filter(ConversationThread.session_id == session_id)
+        .order_by(ConversationMessage.seq)
+        .all()
+    )
+    session.close()
+    return rows
+
+
 class TestDatabaseThreadPersistence:
     """Test that conversation threads persist to the database."""
 
-    def test_get_or_create_thread_creates_db_record(
+    @pytest.mark.asyncio
+    async def test_get_or_create_thread_creates_db_record(
         self,
         dm_agent_with_db: DungeonMasterAgent,
         _in_memory_db: sessionmaker,
     ) -> None:
         """Creating a thread should insert a row in conversation_threads."""
-        dm_agent_with_db._get_or_create_thread("db-session-1")
+        await dm_agent_with_db._get_or_create_thread("db-session-1")
 
         session = _in_memory_db()
         row = (
@@ -337,7 +364,7 @@ class TestDatabaseThreadPersistence:
         session.close()
         assert row is not None
         assert row.agent_name == "DM"
-        assert row.messages == []
+        assert row.message_count == 0
 
     @pytest.mark.asyncio
     async def test_persist_thread_writes_messages_to_db(
@@ -349,18 +376,9 @@ class TestDatabaseThreadPersistence:
         context = {"session_id": "persist-test"}
         await dm_agent_with_db.process_input("Hello DM", context)
 
-        session = _in_memory_db()
-        row = (
-            session.query(ConversationThread)
-            .filter(ConversationThread.session_id == "persist-test")
-            .first()
-        )
-        session.close()
-
-        assert row is not None
-        assert len(row.messages) == 2
-        assert row.messages[0]["role"] == "user"
-        assert row.messages[1]["role"] == "assistant"
+        rows = _message_rows(_in_memory_db, "persist-test")
+        assert [r.role for r in rows] == ["user", "assistant"]
+        assert [r.seq for r in rows] == [1, 2]
 
     @pytest.mark.asyncio
     async def test_thread_survives_agent_re_instantiation(
@@ -392,17 +410,18 @@ class TestDatabaseThreadPersistence:
         agent2._fallback_mode = False
         agent2.azure_client = mock_azure
 
-        thread = agent2._get_or_create_thread("survive-test")
+        thread = await agent2._get_or_create_thread("survive-test")
         assert len(thread) == 2
         assert "dungeon" in thread[0]["content"].lower()
 
-    def test_persist_thread_is_noop_when_session_missing(
+    @pytest.mark.asyncio
+    async def test_persist_thread_is_noop_when_session_missing(
         self,
         dm_agent_with_db: DungeonMasterAgent,
     ) -> None:
         """_persist_thread should not raise for an unknown session."""
         # Should not raise
-        dm_agent_with_db._persist_thread("nonexistent-session")
+        await dm_agent_with_db._persist_thread("nonexistent-session")
 
     @pytest.mark.asyncio
     async def test_fallback_mode_also_persists(
@@ -416,13 +435,138 @@ class TestDatabaseThreadPersistence:
 
         await dm_agent_with_db.process_input("I explore", context)
 
+        assert len(_message_rows(_in_memory_db, "fallback-persist")) == 2
+
+
+class TestIncrementalPersistence:
+    """Each exchange appends rows instead of rewriting the history."""
+
+    @pytest.mark.asyncio
+    async def test_second_exchange_appends_only_new_rows(
+        self,
+        dm_agent_with_db: DungeonMasterAgent,
+        _in_memory_db: sessionmaker,
+    ) -> None:
+        context = {"session_id": "append-test"}
+        await dm_agent_with_db.process_input("First", context)
+        first_ids = [r.id for r in _message_rows(_in_memory_db, "append-test")]
+
+        await dm_agent_with_db.process_input("Second", context)
+        rows = _message_rows(_in_memory_db, "append-test")
+
+        assert [r.id for r in rows[:2]] == first_ids
+        assert [r.seq for r in rows] == [1, 2, 3, 4]
+
         session = _in_memory_db()
-        row = (
+        thread_row = (
             session.query(ConversationThread)
-            .filter(ConversationThread.session_id == "fallback-persist")
+            .filter(ConversationThread.session_id == "append-test")
             .first()
         )
         session.close()
+        assert thread_row.message_count == 4
+        assert thread_row.messages == []
 
-        assert row is not None
-        assert len(row.messages) == 2
+    @pytest.mark.asyncio
+    async def test_window_is_trimmed_after_persist(
+        self,
+        dm_agent_with_db: DungeonMasterAgent,
+        _in_memory_db: sessionmaker,
+    ) -> None:
+        context = {"session_id": "trim-test"}
+        thread = await dm_agent_with_db._get_or_create_thread("trim-test")
+        for i in range(40):
+            thread.append({"role": "user", "content": f"Message {i}"})
+
+        await dm_agent_with_db.process_input("Final", context)
+
+        window_size = (
+            dm_module.MAX_HISTORY_MESSAGES + dm_module.SUMMARY_SOURCE_MESSAGES
+        )
+        assert len(thread) == window_size
+        assert thread.offset == 42 - window_size
+        assert len(_message_rows(_in_memory_db, "trim-test")) == 42
+
+    @pytest.mark.asyncio
+    async def test_reload_fetches_only_recent_rows(
+        self,
+        _mock_azure_deps: tuple[Any, Any],
+        _patch_db_session: None,
+        _in_memory_db: sessionmaker,
+    ) -> None:
+        dm_module._dungeon_master = None
+        agent1 = dm_module.DungeonMasterAgent()
+        thread = await agent1._get_or_create_thread("reload-test")
+        for i in range(50):
+            thread.append({"role": "user", "content": f"Message {i}"})
+        await agent1._persist_thread("reload-test")
+
+        agent2 = dm_module.DungeonMasterAgent()
+        reloaded = await agent2._get_or_create_thread("reload-test")
+
+        window_size = (
+            dm_module.MAX_HISTORY_MESSAGES + dm_module.SUMMARY_SOURCE_MESSAGES
+        )
+        assert len(reloaded) == window_size
+        assert reloaded.offset == 50 - window_size
+        assert reloaded[-1]["content"] == "Message 49"
+
+    @pytest.mark.asyncio
+    async def test_legacy_inline_messages_are_migrated(
+        self,
+        dm_agent_with_db: DungeonMasterAgent,
+        _in_memory_db: sessionmaker,
+    ) -> None:
+        session = _in_memory_db()
+        session.add(
+            ConversationThread(
+                id="legacy-thread",
+                session_id="legacy-session",
+                agent_name="DM",
+                messages=[
+                    {"role": "user", "content": "Old question"},
+                    {"role": "assistant", "content": "Old answer"},
+                ],
+            )
+        )
+        session.commit()
+        session.close()
+
+        thread = await dm_agent_with_db._get_or_create_thread("legacy-session")
+        assert [m["content"] for m in thread] == ["Old question", "Old answer"]
+
+        await dm_agent_with_db.process_input("New", {"session_id": "legacy-session"})
+        rows = _message_rows(_in_memory_db, "legacy-session")
+        assert [r.seq for r in rows] == [1, 2, 3, 4]
+        assert rows[0].content == "Old question"
+
+
+class TestThreadCache:
+    """The in-memory thread cache is a bounded LRU."""
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_thread_is_evicted(
+        self, dm_agent: DungeonMasterAgent
+    ) -> None:
+        with patch.object(dm_module, "MAX_CACHED_THREADS", 2):
+            await dm_agent._get_or_create_thread("a")
+            await dm_agent._get_or_create_thread("b")
+            await dm_agent._get_or_create_thread("a")  # touch "a"
+            await dm_agent._get_or_create_thread("c")
+
+        assert list(dm_agent._threads) == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_evicted_thread_is_still_persisted(
+        self,
+        dm_agent_with_db: DungeonMasterAgent,
+        _in_memory_db: sessionmaker,
+    ) -> None:
+        thread = await dm_agent_with_db._get_or_create_thread("evicted")
+        dm_agent_with_db._threads.clear()
+        thread.append({"role": "user", "content": "Still saved"})
+
+        await dm_agent_with_db._persist_thread("evicted", thread)
+
+        rows = _message_rows(_in_memory_db, "evicted")
+        assert [r.content for r in rows] == ["Still saved"]
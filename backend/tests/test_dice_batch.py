@@ -0,0 +1,75 @@
+"""Tests for batch dice rolling."""
+
+import pytest
+from app.utils.dice_batch import BatchItem, make_generator, roll_batch
+from app.utils.dice_engine import DiceNotationError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+class TestRollBatch:
+    """roll_batch evaluates many expressions in one call."""
+
+    def test_totals_per_repetition(self):
+        results = roll_batch([BatchItem("1d20+4", 200, "goblins"), BatchItem("40d6")])
+        goblins, meteor = results
+        assert goblins.label == "goblins"
+        assert len(goblins.totals) == 200
+        assert all(5 <= t <= 24 for t in goblins.totals)
+        assert 40 <= meteor.totals[0] <= 240
+        assert goblins.rolls is None
+
+    def test_keep_drop_matches_returned_dice(self):
+        (result,) = roll_batch([BatchItem("4d6dl1", 50)], include_rolls=True)
+        for total, dice in zip(result.totals, result.rolls, strict=True):
+            assert len(dice) == 4
+            assert total == sum(dice) - min(dice)
+
+    def test_scalar_path_for_rerolls_and_explosions(self):
+        (result,) = roll_batch([BatchItem("1d6!+1d6r1", 100)], include_rolls=True)
+        for total, dice in zip(result.totals, result.rolls, strict=True):
+            assert len(dice) >= 2
+            assert total >= 3
+
+    def test_seeded_batches_are_reproducible(self):
+        items = [BatchItem("2d20kh1", 20), BatchItem("8d6", 5)]
+        first = roll_batch(items, make_generator(42))
+        second = roll_batch(items, make_generator(42))
+        assert [r.totals for r in first] == [r.totals for r in second]
+
+    def test_limits(self):
+        with pytest.raises(DiceNotationError, match="dice per batch"):
+            roll_batch([BatchItem("1000d6", 1000)])
+        with pytest.raises(DiceNotationError, match="Roll count"):
+            roll_batch([BatchItem("1d6", 0)])
+
+
+class TestBatchEndpoint:
+    """POST /game/dice/roll-batch."""
+
+    @pytest.fixture()
+    def client(self):
+        from app.api.routes.dice_routes import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/game")
+        return TestClient(app)
+
+    def test_batch_roll(self, client):
+        response = client.post(
+            "/game/dice/roll-batch",
+            json={"rolls": [{"notation": "1d20+5", "count": 30}, {"notation": "3d6"}], "seed": 7},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_rolls"] == 31
+        assert len(data["results"][0]["totals"]) == 30
+        again = client.post(
+            "/game/dice/roll-batch",
+            json={"rolls": [{"notation": "1d20+5", "count": 30}, {"notation": "3d6"}], "seed": 7},
+        )
+        assert again.json() == data
+
+    def test_invalid_notation_is_400(self, client):
+        response = client.post("/game/dice/roll-batch", json={"rolls": [{"notation": "2x6"}]})
+        assert response.status_code == 400
@@ -0,0 +1,138 @@
+"""Tests for the compiled dice-expression engine."""
+
+import random
+
+import pytest
+from app.utils.dice import DiceRoller
+from app.utils.dice_engine import (
+    BinOp,
+    Const,
+    DiceNotationError,
+    DicePool,
+    compile_dice,
+    roll,
+)
+
+
+class FixedRolls:
+    """A random source that replays a fixed sequence of die faces."""
+
+    def __init__(self, *faces: int) -> None:
+        self.faces = list(faces)
+
+    def randint(self, a: int, b: int) -> int:
+        face = self.faces.pop(0)
+        assert a <= face <= b
+        return face
+
+
+class TestParsing:
+    """Notation compiles to the expected AST."""
+
+    def test_pool_with_modifier(self):
+        assert compile_dice("2d6+3").ast == BinOp("+", DicePool(2, 6), Const(3))
+
+    def test_count_defaults_and_percentile(self):
+        assert compile_dice("d20").ast == DicePool(1, 20)
+        assert compile_dice("1d%").ast == DicePool(1, 100)
+
+    def test_pool_modifiers(self):
+        assert compile_dice("4d6kh3").ast == DicePool(4, 6, keep=("kh", 3))
+        assert compile_dice("2d20k1").ast == DicePool(2, 20, keep=("kh", 1))
+        assert compile_dice("2d6r<2").ast == DicePool(2, 6, reroll=("<", 2))
+        assert compile_dice("1d20ro1").ast == DicePool(1, 20, reroll=("=", 1), reroll_once=True)
+        assert compile_dice("1d6!").ast == DicePool(1, 6, explode=(">", 6))
+
+    def test_operator_precedence(self):
+        ast = compile_dice("1+2*3").ast
+        assert ast == BinOp("+", Const(1), BinOp("*", Const(2), Const(3)))
+
+    def test_case_and_whitespace_are_ignored(self):
+        assert compile_dice(" 2D6 + 3 ") is compile_dice("2d6+3")
+
+    @pytest.mark.parametrize(
+        "notation",
+        ["", "d", "2d0", "2x6", "(1d6", "1d6+", "1001d6", "1d6r<6", "1d6!>1", "2d6kh1kl1"],
+    )
+    def test_invalid_notation_is_rejected(self, notation):
+        with pytest.raises(DiceNotationError):
+            compile_dice(notation)
+
+
+class TestEvaluation:
+    """Compiled expressions roll from a pluggable random source."""
+
+    def test_keep_and_drop(self):
+        result = roll("4d6dl1", FixedRolls(3, 1, 6, 4))
+        assert result.rolls == [3, 1, 6, 4]
+        assert result.pools[0].dropped == [1]
+        assert result.total == 13
+        assert roll("2d20kl1", FixedRolls(15, 4)).total == 4
+
+    def test_reroll_and_reroll_once(self):
+        result = roll("1d6r1", FixedRolls(1, 1, 5))
+        assert result.total == 5
+        assert [r["original"] for r in result.pools[0].rerolls] == [1, 1]
+        assert roll("1d20ro1", FixedRolls(1, 1)).total == 1
+
+    def test_exploding_dice(self):
+        result = roll("2d6!", FixedRolls(6, 2, 6, 3))
+        assert result.rolls == [6, 2, 6, 3]
+        assert result.pools[0].exploded == 2
+        assert result.total == 17
+
+    def test_arithmetic_and_terms(self):
+        result = roll("2d6+1d4-1", FixedRolls(3, 4, 2))
+        assert result.total == 8
+        assert result.modifier == -1
+        assert roll("(1d6+2)*2", FixedRolls(5)).total == 14
+        assert roll("3d6/2", FixedRolls(1, 2, 4)).total == 3
+
+    def test_critical_dice_drop_flat_modifiers(self):
+        extra = compile_dice("2d6+1d4+3").critical_dice()
+        assert extra.notation == "2d6+1d4"
+        assert compile_dice("5").critical_dice() is None
+
+    def test_seeded_source_is_reproducible(self):
+        first = roll("8d6!kh4", random.Random(7))  # noqa: S311
+        second = roll("8d6!kh4", random.Random(7))  # noqa: S311
+        assert first.rolls == second.rolls
+        assert first.total == second.total
+
+
+class TestCallers:
+    """DiceRoller and the rules engine plugin share the engine."""
+
+    def test_dice_roller_understands_full_notation(self):
+        result = DiceRoller.roll_dice("2d20kh1+5", FixedRolls(8, 17))
+        assert result["rolls"] == [8, 17]
+        assert result["modifier"] == 5
+        assert result["total"] == 22
+
+    def test_dice_roller_raises_value_error(self):
+        with pytest.raises(ValueError, match="Invalid dice notation"):
+            DiceRoller.roll_dice("banana")
+
+    def test_roll_d20_reports_natural_roll(self):
+        result = DiceRoller.roll_d20(3, advantage=True, rng=FixedRolls(6, 14))
+        assert result["rolls"] == [6, 14]
+        assert result["natural"] == 14
+        assert result["total"] == 17
+
+    def test_parse_dice_from_text(self):
+        result = DiceRoller.parse_dice_from_text("I roll 4d6kh3 + 2 for strength")
+        assert result["notation"] == "4d6kh3+2"
+        assert len(result["rolls"]) == 4
+
+    def test_plugin_critical_damage_rolls_dice_only(self):
+        from app.plugins.rules_engine_plugin import RulesEnginePlugin
+
+        result = RulesEnginePlugin().calculate_damage("2d6+3", is_critical=True)
+        assert len(result["critical_rolls"]) == 2
+        assert result["total"] == sum(result["rolls"]) + sum(result["critical_rolls"]) + 3
+
+    def test_plugin_reports_invalid_notation(self):
+        from app.plugins.rules_engine_plugin import RulesEnginePlugin
+
+        result = RulesEnginePlugin().roll_dice("2d6+")
+        assert result["error"] == "Invalid dice notation: 2d6+"
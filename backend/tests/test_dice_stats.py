@@ -0,0 +1,149 @@
+"""Tests for exact dice distributions and attack odds."""
+
+import itertools
+import json
+
+import pytest
+from app.utils.dice_engine import DiceNotationError
+from app.utils.dice_stats import attack_odds, check_odds, dice_distribution
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def enumerate_pmf(sides: int, count: int, total) -> dict[int, float]:
+    """Brute-force PMF over every ordered outcome of *count* dice."""
+    pmf: dict[int, float] = {}
+    outcomes = list(itertools.product(range(1, sides + 1), repeat=count))
+    for faces in outcomes:
+        value = total(faces)
+        pmf[value] = pmf.get(value, 0.0) + 1 / len(outcomes)
+    return pmf
+
+
+def assert_pmf(notation: str, expected: dict[int, float]) -> None:
+    actual = dict(dice_distribution(notation).items())
+    assert actual.keys() == expected.keys()
+    for total, p in expected.items():
+        assert actual[total] == pytest.approx(p)
+
+
+def diff_pmf() -> dict[int, float]:
+    """Brute-force PMF of 2d6-1d4."""
+    pmf: dict[int, float] = {}
+    for a, b, c in itertools.product(range(1, 7), range(1, 7), range(1, 5)):
+        pmf[a + b - c] = pmf.get(a + b - c, 0.0) + 1 / 144
+    return pmf
+
+
+class TestDistributions:
+    """PMFs match brute-force enumeration and known values."""
+
+    def test_sums_and_arithmetic(self):
+        assert_pmf("3d4", enumerate_pmf(4, 3, sum))
+        assert_pmf("2d6-1d4", diff_pmf())
+        assert_pmf("(1d4+1)*2", {4: 0.25, 6: 0.25, 8: 0.25, 10: 0.25})
+
+    @pytest.mark.parametrize(
+        ("notation", "total"),
+        [
+            ("4d4kh3", lambda f: sum(sorted(f)[1:])),
+            ("4d4dl1", lambda f: sum(sorted(f)[1:])),
+            ("4d4kl2", lambda f: sum(sorted(f)[:2])),
+            ("4d4dh1", lambda f: sum(sorted(f)[:3])),
+        ],
+    )
+    def test_keep_and_drop(self, notation, total):
+        assert_pmf(notation, enumerate_pmf(4, 4, total))
+
+    def test_advantage_and_disadvantage(self):
+        assert dice_distribution("2d20kh1").mean == pytest.approx(13.825)
+        assert dice_distribution("2d20kl1").mean == pytest.approx(7.175)
+
+    def test_rerolls(self):
+        assert_pmf("1d4r1", {2: 1 / 3, 3: 1 / 3, 4: 1 / 3})
+        assert_pmf("1d4ro1", {1: 1 / 16, 2: 5 / 16, 3: 5 / 16, 4: 5 / 16})
+
+    def test_exploding_die_mean(self):
+        # Expected value of a d6 that explodes on 6 is 3.5 divided by 5/6
+        assert dice_distribution("1d6!").mean == pytest.approx(4.2, rel=1e-9)
+
+    def test_summary_statistics(self):
+        dist = dice_distribution("2d6+3")
+        assert (dist.min, dist.max) == (5, 15)
+        assert dist.mean == pytest.approx(10)
+        assert dist.variance == pytest.approx(35 / 6)
+        assert dist.percentile(50) == 10
+        assert dist.prob_at_least(13) == pytest.approx(6 / 36)
+
+    def test_memoized_per_expression(self):
+        assert dice_distribution("2D6 + 3") is dice_distribution("2d6+3")
+
+    def test_unsupported_expressions(self):
+        with pytest.raises(DiceNotationError, match="keep/drop"):
+            dice_distribution("4d6!kh3")
+        with pytest.raises(DiceNotationError, match="too many possible totals"):
+            dice_distribution("200d100*200d100")
+
+
+class TestOdds:
+    """Hit and check chances from the d20 distributions."""
+
+    def test_attack_odds(self):
+        assert attack_odds(5, 15)["hit_probability"] == pytest.approx(0.55)
+        assert attack_odds(5, 15, advantage=True)["hit_probability"] == pytest.approx(1 - 0.45**2)
+        assert attack_odds(5, 15, disadvantage=True)["hit_probability"] == pytest.approx(0.55**2)
+
+    def test_natural_one_and_twenty(self):
+        assert attack_odds(30, 10)["hit_probability"] == pytest.approx(0.95)
+        assert attack_odds(0, 40)["hit_probability"] == pytest.approx(0.05)
+
+    def test_expected_damage_counts_critical_dice(self):
+        odds = attack_odds(5, 15, damage_dice="1d8+3")
+        assert odds["expected_damage"] == pytest.approx(0.55 * 7.5 + 0.05 * 4.5)
+
+    def test_check_odds(self):
+        assert check_odds(2, 12) == pytest.approx(0.55)
+        assert check_odds(0, 25) == 0
+
+
+class TestStatsEndpoints:
+    """POST /game/dice/stats and /game/dice/attack-odds."""
+
+    @pytest.fixture()
+    def client(self):
+        from app.api.routes.dice_routes import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/game")
+        return TestClient(app)
+
+    def test_stats(self, client):
+        response = client.post(
+            "/game/dice/stats",
+            json={"notation": "2d6+3", "target": 13, "include_distribution": True},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["mean"] == pytest.approx(10)
+        assert data["percentiles"]["50"] == 10
+        assert data["probability_at_least"] == pytest.approx(1 / 6)
+        assert len(data["distribution"]) == 11
+
+    def test_stats_rejects_bad_notation(self, client):
+        response = client.post("/game/dice/stats", json={"notation": "2x6"})
+        assert response.status_code == 400
+
+    def test_attack_odds(self, client):
+        response = client.post(
+            "/game/dice/attack-odds",
+            json={"attack_bonus": 5, "target_ac": 15, "advantage": True},
+        )
+        assert response.status_code == 200
+        assert response.json()["hit_probability"] == pytest.approx(0.7975)
+
+    def test_combat_tool_reports_odds(self):
+        from app.agents.combat_mc_agent import resolve_attack
+
+        result = json.loads(resolve_attack(5, 15, "1d8+3"))
+        assert result["hit_probability"] == pytest.approx(0.55)
+        assert "expected_damage" in result
@@ -0,0 +1,101 @@
+"""Tests for the round-indexed effect scheduler."""
+
+import random
+
+from app.effect_scheduler import EffectKind, EffectScheduler
+from app.models.map_models import MapEffect
+from app.plugins.rules_engine_plugin import RulesEnginePlugin
+
+
+class TestEffectScheduler:
+    def test_expires_only_the_effects_due(self):
+        scheduler = EffectScheduler()
+        scheduler.schedule(EffectKind.CONDITION, "orc", 2, name="poisoned")
+        scheduler.schedule(EffectKind.CONCENTRATION, "wizard", 1, data={"spell": "Bless"})
+        scheduler.schedule(EffectKind.MAP_EFFECT, "fog", 3)
+        assert [e.owner for e in scheduler.advance()] == ["wizard"]
+        assert scheduler.advance()[0].key == (EffectKind.CONDITION, "orc", "poisoned")
+        assert len(scheduler) == 1
+        assert scheduler.advance_to(10)[0].expiry_event() == {
+            "type": "effect_expired",
+            "kind": "map_effect",
+            "owner": "fog",
+            "name": "",
+            "expires_round": 3,
+            "data": {},
+        }
+        assert scheduler.advance() == []
+
+    def test_matches_countdown(self):
+        rng = random.Random(2)  # noqa: S311
+        scheduler = EffectScheduler()
+        countdown: dict[str, int] = {}
+        for round_number in range(1, 60):
+            for _ in range(rng.randint(0, 4)):
+                owner = f"c{rng.randint(0, 20)}"
+                duration = rng.randint(1, 10)
+                op = rng.random()
+                if op < 0.2:
+                    scheduler.cancel(EffectKind.CONDITION, owner, "stunned")
+                    countdown.pop(owner, None)
+                else:
+                    scheduler.schedule(EffectKind.CONDITION, owner, duration, name="stunned")
+                    countdown[owner] = duration
+            expected = sorted(owner for owner, left in countdown.items() if left == 1)
+            countdown = {owner: left - 1 for owner, left in countdown.items() if left > 1}
+            assert sorted(e.owner for e in scheduler.advance()) == expected
+            assert scheduler.round == round_number
+            assert {e.owner: scheduler.remaining(e) for e in scheduler.effects()} == countdown
+
+    def test_replace_cancel_and_compaction(self):
+        scheduler = EffectScheduler()
+        scheduler.schedule(EffectKind.CONDITION, "orc", 1, name="prone")
+        scheduler.schedule(EffectKind.CONDITION, "orc", 4, name="prone")
+        assert scheduler.advance() == []
+        assert scheduler.remaining(scheduler.get(EffectKind.CONDITION, "orc", "prone")) == 3
+
+        for i in range(200):
+            scheduler.schedule(EffectKind.MAP_EFFECT, f"e{i}", 5)
+            scheduler.cancel(EffectKind.MAP_EFFECT, f"e{i}")
+        assert len(scheduler._heap) <= 2 * len(scheduler) + EffectScheduler._COMPACT_SLACK + 1
+        assert [e.owner for e in scheduler.cancel_owner("orc")] == ["orc"]
+        assert scheduler.cancel(EffectKind.CONDITION, "orc", "prone") is None
+        assert scheduler.advance(10) == []
+
+    def test_snapshot_round_trip(self):
+        scheduler = EffectScheduler(current_round=4)
+        scheduler.schedule(EffectKind.CONCENTRATION, "wizard", 3, data={"spell": "Haste"})
+        scheduler.schedule(EffectKind.CONDITION, "orc", 1, name="blinded")
+        restored = EffectScheduler.restore(scheduler.snapshot(), current_round=4)
+        assert restored.snapshot() == scheduler.snapshot()
+        assert [e.name for e in restored.advance()] == ["blinded"]
+        assert restored.advance_to(7)[0].data == {"spell": "Haste"}
+
+
+class TestRulesEnginePlugin:
+    def test_concentration_expires_on_schedule(self):
+        plugin = RulesEnginePlugin()
+        spell = {"name": "Hold Person", "requires_concentration": True}
+        plugin.start_concentration("cleric", spell, 2)
+        plugin.start_concentration("wizard", {"name": "Web", "requires_concentration": True}, 5)
+        plugin.end_concentration("wizard")
+
+        first = plugin.advance_concentration_round()
+        assert (first["expired_spells"], first["total_concentrating"]) == ([], 1)
+        assert [c["character_id"] for c in plugin.list_concentration()] == ["cleric"]
+        second = plugin.advance_concentration_round()
+        assert second["expired_spells"] == [{"character_id": "cleric", "spell": "Hold Person"}]
+        assert [e["owner"] for e in second["expired_effects"]] == ["cleric"]
+        assert plugin.check_concentration("cleric")["is_concentrating"] is False
+
+    def test_timed_conditions_and_map_effects(self):
+        plugin = RulesEnginePlugin()
+        plugin.apply_timed_condition("rogue", "poisoned", 1)
+        fog = MapEffect(type="aoe_circle", origin_x=3, origin_y=4, radius=4, label="Fog Cloud", duration_rounds=2)
+        assert plugin.add_map_effect(fog)["expires_round"] == 2
+        assert plugin.add_map_effect(MapEffect(type="aoe_cone", origin_x=0, origin_y=0))["success"] is False
+
+        expired = plugin.advance_concentration_round()["expired_effects"]
+        assert [(e["kind"], e["owner"], e["name"]) for e in expired] == [("condition", "rogue", "poisoned")]
+        expired = plugin.advance_concentration_round()["expired_effects"]
+        assert [(e["kind"], e["owner"], e["data"]["label"]) for e in expired] == [("map_effect", fog.id, "Fog Cloud")]
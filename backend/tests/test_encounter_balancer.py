@@ -8,16 +8,27 @@ Covers:
 - Encounter difficulty labelling
 - XP award calculation
 - Encounter generation
+- Knapsack encounter builder
+- Batch encounter generation
 """
 
+import statistics
+import time
+from unittest.mock import patch
 
+import pytest
+from app import encounter_balancer
 from app.encounter_balancer import (
     CR_TO_XP,
     ENCOUNTER_DIFFICULTY_THRESHOLDS,
+    EncounterSpec,
+    MonsterPool,
+    build_encounter,
     calculate_encounter_xp,
     calculate_xp_award,
     cr_to_xp,
     generate_balanced_encounter,
+    generate_encounters,
     get_encounter_difficulty,
     get_encounter_multiplier,
     get_party_xp_budget,
@@ -322,3 +333,162 @@ class TestGenerateBalancedEncounter:
             [], "medium", available_monsters=_SAMPLE_MONSTERS
         )
         assert result["party_size"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Knapsack builder
+# ---------------------------------------------------------------------------
+
+
+def _large_pool(size: int) -> list[dict]:
+    crs = [cr for cr in CR_TO_XP if cr != "30"]
+    return [
+        {"id": f"m{i}", "name": f"Monster {i}", "cr": crs[i % len(crs)], "type": "undead"}
+        for i in range(size)
+    ]
+
+
+class TestBuildEncounter:
+    def test_exact_fit_when_reachable(self) -> None:
+        # Six CR 1/4 monsters: 300 raw XP x2 = 600 adjusted
+        pool = MonsterPool(_SAMPLE_MONSTERS)
+        selected = build_encounter(pool, 600, 4, 1.0)
+        assert calculate_encounter_xp(selected, 4)["adjusted_xp"] == 600
+
+    def test_closest_fit_beats_greedy_stop(self) -> None:
+        # The greedy builder stopped at 80% of budget; the knapsack finds better.
+        for levels, difficulty in [([1] * 4, "hard"), ([2] * 5, "deadly"), ([4] * 3, "medium")]:
+            budget = get_party_xp_budget(levels, difficulty)
+            selected = build_encounter(
+                MonsterPool(_large_pool(500)), budget, len(levels), sum(levels) / len(levels)
+            )
+            adjusted = calculate_encounter_xp(selected, len(levels))["adjusted_xp"]
+            assert abs(adjusted - budget) <= budget * 0.1
+
+    def test_max_monsters(self) -> None:
+        pool = MonsterPool([{"id": "goblin", "cr": "1/4", "xp": 50}])
+        selected = build_encounter(pool, 5000, 4, 1.0, max_monsters=3)
+        assert len(selected) == 3
+
+    def test_max_copies_spreads_stat_blocks(self) -> None:
+        pool = MonsterPool(
+            [{"id": f"g{i}", "cr": "1/4", "xp": 50} for i in range(6)]
+        )
+        selected = build_encounter(pool, 400, 4, 1.0, max_copies=1)
+        ids = [m["id"] for m in selected]
+        assert len(ids) == len(set(ids)) > 1
+
+    def test_max_per_cr_mixes_challenge_ratings(self) -> None:
+        pool = MonsterPool(_large_pool(100))
+        selected = build_encounter(pool, 3000, 4, 4.0, max_per_cr=1)
+        crs = [m["cr"] for m in selected]
+        assert len(crs) == len(set(crs))
+
+    def test_no_appropriate_monsters(self) -> None:
+        pool = MonsterPool([{"id": "dragon", "cr": "20", "xp": 25000}])
+        assert build_encounter(pool, 200, 4, 1.0) == []
+        assert build_encounter(MonsterPool([]), 200, 4, 1.0) == []
+
+    def test_generate_honours_limits(self) -> None:
+        result = generate_balanced_encounter(
+            [5, 5, 5, 5], "deadly", available_monsters=_large_pool(200), max_monsters=2
+        )
+        assert 1 <= len(result["monsters"]) <= 2
+
+    @pytest.mark.slow
+    def test_benchmark_large_pool(self) -> None:
+        pool = MonsterPool(_large_pool(10_000))
+        timings = []
+        for _ in range(200):
+            started = time.perf_counter()
+            build_encounter(pool, 7200, 4, 8.0)
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        print(f"\nbuild_encounter, 10,000 monsters: {median * 1000:.3f} ms median")
+        assert median < 0.001
+
+
+# ---------------------------------------------------------------------------
+# Batch generation
+# ---------------------------------------------------------------------------
+
+
+class TestGenerateEncounters:
+    def _specs(self) -> list[dict]:
+        return [
+            {"party_levels": [1] * (i % 5 + 1), "difficulty": d, "location": loc}
+            for i, (d, loc) in enumerate(
+                [("easy", "dungeon"), ("hard", "forest"), ("medium", "dungeon"), ("deadly", "forest")] * 5
+            )
+        ]
+
+    def test_results_in_input_order_with_timing(self) -> None:
+        specs = self._specs()
+        results = generate_encounters(specs, available_monsters=_SAMPLE_MONSTERS)
+        assert [r["party_size"] for r in results] == [len(s["party_levels"]) for s in specs]
+        assert all(r["elapsed_ms"] >= 0 for r in results)
+        assert all(r["monsters"] for r in results)
+
+    def test_location_pools_built_once(self) -> None:
+        with patch.object(
+            encounter_balancer, "_location_pool", wraps=encounter_balancer._location_pool
+        ) as build_pool:
+            generate_encounters(self._specs(), available_monsters=_SAMPLE_MONSTERS)
+        assert build_pool.call_count == 2
+
+    def test_accepts_spec_objects(self) -> None:
+        (result,) = generate_encounters([EncounterSpec((3, 3), "hard", max_monsters=1)], _SAMPLE_MONSTERS)
+        assert len(result["monsters"]) == 1
+
+    def test_too_many_specs(self) -> None:
+        with pytest.raises(ValueError):
+            generate_encounters([EncounterSpec((1,))] * (encounter_balancer.MAX_BATCH_SPECS + 1))
+
+    def test_replays_as_single_encounters(self) -> None:
+        from app.rng import replay, seed_stream, use_stream
+
+        stream = seed_stream("batch", 11)
+        with use_stream(stream):
+            generate_encounters(self._specs()[:4], available_monsters=_SAMPLE_MONSTERS)
+        recording = stream.recording()
+        assert len(recording["entries"]) == 4
+        assert replay(recording).mismatches == []
+
+    @pytest.mark.slow
+    def test_process_pool_matches_order(self) -> None:
+        from app.rng import RollStream, use_stream
+
+        specs = self._specs()
+        with use_stream(RollStream(5)):
+            first = generate_encounters(specs, _SAMPLE_MONSTERS, workers=2)
+        with use_stream(RollStream(5)):
+            second = generate_encounters(specs, _SAMPLE_MONSTERS, workers=2)
+        assert [r["party_size"] for r in first] == [len(s["party_levels"]) for s in specs]
+        assert [r["monsters"] for r in first] == [r["monsters"] for r in second]
+
+
+class TestGenerateBatchRoute:
+    def test_generate_batch(self) -> None:
+        from app.api.routes.combat_routes import router
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        app = FastAPI()
+        app.include_router(router, prefix="/game")
+        client = TestClient(app)
+
+        body = {
+            "encounters": [
+                {"party_levels": [2, 2, 2], "difficulty": "hard", "location": "forest"},
+                {"party_levels": [5, 5, 5, 5]},
+            ]
+        }
+        response = client.post("/game/encounter/generate-batch", json=body)
+        assert response.status_code == 200
+        data = response.json()
+        assert [e["party_size"] for e in data["encounters"]] == [3, 4]
+        assert all("elapsed_ms" in e for e in data["encounters"])
+
+        bad = {"encounters": [{"party_levels": [1], "difficulty": "impossible"}]}
+        assert client.post("/game/encounter/generate-batch", json=bad).status_code == 422
+
@@ -0,0 +1,168 @@
+"""Tests for the Monte Carlo encounter simulator."""
+
+import pytest
+from app.encounter_balancer import generate_balanced_encounter
+from app.encounter_simulator import MAX_ROUNDS, Combatant, simulate_encounter
+from app.rng import RollStream, use_stream
+from app.rules_engine import calculate_damage, resolve_attack
+from app.services.game_context_service import build_game_context
+from app.srd_data import get_monster_by_id
+from app.utils.dice_stats import attack_odds
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+PARTY = [
+    Combatant("Fighter", 12, 18, 5, "1d8+3"),
+    Combatant("Rogue", 9, 14, 5, "1d6+3"),
+    Combatant("Cleric", 10, 18, 4, "1d6+2"),
+    Combatant("Wizard", 7, 12, 4, "1d10"),
+]
+
+# Never hurts anyone and never goes down, so the fight runs MAX_ROUNDS
+DUMMY = Combatant("Dummy", 1_000_000, 15, -20, "0")
+
+
+class TestMechanics:
+    """Vectorized attacks follow rules_engine.resolve_attack/calculate_damage."""
+
+    def test_damage_per_attack_matches_exact_odds(self):
+        attacker = Combatant("Orc", 1_000_000, 10, 5, "1d12+3")
+        result = simulate_encounter([DUMMY], [attacker], trials=4000, seed=3)
+        per_attack = result.characters[0].expected_hp_loss / MAX_ROUNDS
+        expected = attack_odds(5, 15, damage_dice="1d12+3")["expected_damage"]
+        assert per_attack == pytest.approx(expected, rel=0.02)
+        assert result.win_probability == result.loss_probability == 0.0
+        assert result.expected_rounds == MAX_ROUNDS
+
+    def test_matches_scalar_rules_engine(self):
+        attacker = Combatant("Ogre", 1_000_000, 10, 6, "2d8+4")
+        result = simulate_encounter([DUMMY], [attacker], trials=2000, seed=4)
+        per_attack = result.characters[0].expected_hp_loss / MAX_ROUNDS
+
+        samples = 20000
+        total = 0
+        for _ in range(samples):
+            attack = resolve_attack(6, 15)
+            if attack["hit"]:
+                total += calculate_damage("2d8", 4, critical=attack["critical"])["total"]
+        assert per_attack == pytest.approx(total / samples, rel=0.05)
+
+    def test_multiattack(self):
+        single = Combatant("Wolf", 1_000_000, 10, 4, "2d4+2")
+        double = Combatant("Wolf", 1_000_000, 10, 4, "2d4+2", attacks=2)
+        one = simulate_encounter([DUMMY], [single], trials=2000, seed=5)
+        two = simulate_encounter([DUMMY], [double], trials=2000, seed=5)
+        ratio = two.characters[0].expected_hp_loss / one.characters[0].expected_hp_loss
+        assert ratio == pytest.approx(2.0, rel=0.05)
+
+
+class TestOutcomes:
+    def test_overmatched_monsters_lose(self):
+        goblin = Combatant.from_monster(get_monster_by_id("goblin"))
+        result = simulate_encounter(PARTY, [goblin], trials=2000, seed=1)
+        assert result.win_probability > 0.99
+        assert 1 <= result.expected_rounds <= 3
+        assert [c.name for c in result.characters] == ["Fighter", "Rogue", "Cleric", "Wizard"]
+
+    def test_overmatched_party_loses(self):
+        troll = Combatant.from_monster(get_monster_by_id("troll"))
+        result = simulate_encounter(PARTY, [troll, troll], trials=2000, seed=1)
+        assert result.loss_probability > 0.95
+        assert all(c.down_probability > 0.9 for c in result.characters)
+
+    def test_difficulty_is_monotonic(self):
+        goblin = Combatant.from_monster(get_monster_by_id("goblin"))
+        wins = [
+            simulate_encounter(PARTY, [goblin] * n, trials=2000, seed=2).win_probability
+            for n in (2, 4, 6)
+        ]
+        assert wins[0] > wins[1] > wins[2]
+
+    def test_seed_and_campaign_stream_reproduce(self):
+        goblin = Combatant.from_monster(get_monster_by_id("goblin"))
+        assert simulate_encounter(PARTY, [goblin] * 4, 500, seed=9) == simulate_encounter(
+            PARTY, [goblin] * 4, 500, seed=9
+        )
+        with use_stream(RollStream(7)):
+            first = simulate_encounter(PARTY, [goblin] * 4, 500)
+        with use_stream(RollStream(7)):
+            assert simulate_encounter(PARTY, [goblin] * 4, 500) == first
+
+    def test_invalid_input(self):
+        with pytest.raises(ValueError):
+            simulate_encounter(PARTY, [], trials=10)
+        with pytest.raises(ValueError):
+            simulate_encounter(PARTY, [DUMMY], trials=0)
+
+
+class TestCombatants:
+    def test_from_monster(self):
+        spider = Combatant.from_monster(get_monster_by_id("giant_spider"))
+        assert (spider.hp, spider.ac, spider.attack_bonus, spider.damage_dice) == (26, 14, 5, "1d8+3")
+        assert spider.initiative_bonus == 3
+
+    async def test_from_game_context(self):
+        character = {
+            "name": "Ayla",
+            "level": 3,
+            "abilities": {"strength": 16, "dexterity": 12},
+            "hit_points": {"current": 20, "maximum": 28},
+            "computed_ac": 16,
+            "equipped_weapon": {"name": "longsword", "damage_dice": "1d8", "properties": []},
+        }
+        context = await build_game_context("char-1", "", character_data=character)
+        fighter = Combatant.from_context(context)
+        assert fighter == Combatant("Ayla", 20, 16, 5, "1d8+3")
+
+
+class TestRefinement:
+    def test_generate_with_party_reports_simulation(self):
+        party = [
+            {
+                "character_name": member.name,
+                "current_hp": member.hp,
+                "armor_class": member.ac,
+                "attack_bonus": member.attack_bonus,
+                "equipped_weapon_damage": member.damage_dice.split("+")[0],
+                "damage_modifier": int(member.damage_dice.partition("+")[2] or 0),
+            }
+            for member in PARTY
+        ]
+        result = generate_balanced_encounter([1, 1, 1, 1], "hard", "forest", party=party)
+        simulation = result["simulation"]
+        assert simulation["trials"] == 500
+        assert 0.0 <= simulation["win_probability"] <= 1.0
+        assert len(simulation["characters"]) == 4
+
+    def test_generate_without_party_skips_simulation(self):
+        assert "simulation" not in generate_balanced_encounter([1, 1, 1, 1], "hard", "forest")
+
+
+class TestSimulateRoute:
+    @pytest.fixture
+    def client(self):
+        from app.api.routes.combat_routes import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/game")
+        return TestClient(app)
+
+    def test_simulate(self, client):
+        party = [
+            {"name": m.name, "hp": m.hp, "ac": m.ac, "attack_bonus": m.attack_bonus, "damage_dice": m.damage_dice}
+            for m in PARTY
+        ]
+        body = {"party": party, "monster_ids": ["goblin", "goblin"], "trials": 1000, "seed": 1}
+        response = client.post("/game/encounter/simulate", json=body)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["win_probability"] > 0.9
+        assert [c["name"] for c in data["characters"]] == [m.name for m in PARTY]
+
+    def test_errors(self, client):
+        party = [{"name": "A", "hp": 10, "ac": 12, "attack_bonus": 3, "damage_dice": "1d6"}]
+        assert client.post("/game/encounter/simulate", json={"party": party}).status_code == 400
+        missing = {"party": party, "monster_ids": ["tarrasque"]}
+        assert client.post("/game/encounter/simulate", json=missing).status_code == 404
+        bad_dice = {"party": party, "monsters": [{**party[0], "damage_dice": "banana"}]}
+        assert client.post("/game/encounter/simulate", json=bad_dice).status_code == 400
@@ -0,0 +1,276 @@
+"""Tests for the character/campaign read-through cache."""
+
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import pytest
+from app import entity_cache
+from app.database import Base, unit_of_work
+from app.entity_cache import EntityCache, get_entity_cache_stats
+from app.models.db_models import Campaign as CampaignDB
+from app.models.db_models import Character as CharacterDB
+from app.models.game_models import Campaign
+from app.services.campaign_service import campaign_service, campaign_to_dict
+from app.services.game_context_service import build_game_context
+from sqlalchemy import create_engine, delete, event, update
+from sqlalchemy.orm import sessionmaker
+
+# ---------------------------------------------------------------------------
+# EntityCache unit tests
+# ---------------------------------------------------------------------------
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestEntityCache:
+    """LRU, TTL, counters and invalidation on the cache primitive."""
+
+    def test_hit_and_miss_counters(self):
+        cache = EntityCache("t")
+        assert cache.get("a") is None
+        cache.put("a", {"v": 1})
+        assert cache.get("a") == {"v": 1}
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = EntityCache("t", max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        clock = _FakeClock()
+        cache = EntityCache("t", ttl_seconds=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+
+    def test_returned_values_are_copies(self):
+        cache = EntityCache("t")
+        cache.put("a", {"inventory": []})
+        cache.get("a")["inventory"].append("sword")
+        assert cache.get("a") == {"inventory": []}
+
+    def test_invalidate_discards_in_flight_load(self):
+        cache = EntityCache("t")
+        generation = cache.generation("a")
+        cache.invalidate("a")  # a write lands while the load is running
+        assert cache.put("a", "stale", generation=generation) is False
+        assert cache.get("a") is None
+
+    def test_zero_capacity_disables_caching(self):
+        cache = EntityCache("t", max_entries=0)
+        assert cache.put("a", 1) is False
+        assert cache.get("a") is None
+
+    def test_uncopied_values_are_shared(self):
+        cache = EntityCache("t", copy_values=False)
+        value = {"inventory": []}
+        cache.put("a", value)
+        assert cache.get("a") is value
+
+    async def test_version_probe_is_skipped_when_recently_checked(self):
+        clock = _FakeClock()
+        cache = EntityCache("t", revalidate_seconds=10, clock=clock)
+        probes = []
+
+        async def _loader():
+            return "value", 1
+
+        async def _version():
+            probes.append(1)
+            return 1
+
+        await cache.get_or_load("a", _loader, _version)
+        await cache.get_or_load("a", _loader, _version)
+        assert len(probes) == 1  # outside a unit of work every hit is checked
+        async with unit_of_work():
+            clock.now = 9.0
+            await cache.get_or_load("a", _loader, _version)
+            assert len(probes) == 1
+        async with unit_of_work():
+            clock.now = 20.0
+            await cache.get_or_load("a", _loader, _version)
+            await cache.get_or_load("a", _loader, _version)
+            assert len(probes) == 2  # checked once, then trusted for the turn
+
+    async def test_get_or_load_does_not_cache_missing_entities(self):
+        cache = EntityCache("t")
+        calls = []
+
+        async def _loader():
+            calls.append(1)
+
+        assert await cache.get_or_load("a", _loader) is None
+        assert await cache.get_or_load("a", _loader) is None
+        assert len(calls) == 2
+
+
+# ---------------------------------------------------------------------------
+# Integration with the scribe, campaign service and game context
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def db(tmp_path):
+    """File-backed SQLite database wired into get_session_context."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'cache.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    @contextmanager
+    def _ctx():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    session = factory()
+    campaign = Campaign(id="camp-1", name="Cached", setting="Coast")
+    session.add(
+        CampaignDB(
+            id="camp-1", name="Cached", setting="Coast", data=campaign_to_dict(campaign)
+        )
+    )
+    session.add(
+        CharacterDB(
+            id="char-1",
+            name="Tess",
+            data={"id": "char-1", "name": "Tess", "abilities": {}, "inventory": []},
+        )
+    )
+    session.commit()
+    session.close()
+
+    with patch("app.database.get_session_context", _ctx):
+        yield engine
+    engine.dispose()
+
+
+def _count_selects(engine):
+    """Count SELECTs, and those that load a full row's JSON ``data`` column."""
+    counter = {"selects": 0, "row_loads": 0}
+
+    def _before(conn, cursor, statement, *args):  # noqa: ARG001
+        if statement.lstrip().upper().startswith("SELECT"):
+            counter["selects"] += 1
+            if "characters.data" in statement or "campaigns.data" in statement:
+                counter["row_loads"] += 1
+
+    event.listen(engine, "before_cursor_execute", _before)
+    return counter
+
+
+async def _play_turn() -> None:
+    """Mirror the reads one /game/input turn makes."""
+    from app.agents.scribe_agent import get_scribe
+
+    async with unit_of_work():
+        character = await get_scribe().get_character("char-1")
+        await build_game_context("char-1", "camp-1", character_data=character)
+
+
+class TestCacheIntegration:
+    """Reads go through the cache and writes invalidate it."""
+
+    async def test_character_update_invalidates(self, db):
+        from app.agents.scribe_agent import get_scribe
+
+        scribe = get_scribe()
+        assert (await scribe.get_character("char-1"))["name"] == "Tess"
+        await scribe.update_character("char-1", {"name": "Tessa"})
+        assert (await scribe.get_character("char-1"))["name"] == "Tessa"
+
+    async def test_inventory_mutation_invalidates(self, db):
+        from app.agents.scribe_agent import get_scribe
+
+        scribe = get_scribe()
+        await scribe.get_character("char-1")
+        await scribe.add_to_inventory("char-1", {"name": "Rope"})
+        character = await scribe.get_character("char-1")
+        assert [i["name"] for i in character["inventory"]] == ["Rope"]
+
+    async def test_campaign_update_invalidates(self, db):
+        assert (await campaign_service.get_campaign("camp-1")).name == "Cached"
+        await campaign_service.update_campaign("camp-1", {"name": "Renamed"})
+        assert (await campaign_service.get_campaign("camp-1")).name == "Renamed"
+
+    async def test_cache_halves_per_turn_selects(self, db, monkeypatch):
+        counter = _count_selects(db)
+
+        monkeypatch.setattr(entity_cache.get_character_cache(), "max_entries", 0)
+        monkeypatch.setattr(entity_cache.get_campaign_cache(), "max_entries", 0)
+        for _ in range(5):
+            await _play_turn()
+        uncached = dict(counter)
+
+        monkeypatch.undo()
+        entity_cache.clear_entity_caches()
+        counter.update(selects=0, row_loads=0)
+        for _ in range(5):
+            await _play_turn()
+
+        assert counter["selects"] * 2 <= uncached["selects"]
+        assert counter["row_loads"] * 2 <= uncached["row_loads"]
+
+    async def test_cached_campaign_is_not_copied(self, db):
+        first = await campaign_service.get_campaign("camp-1")
+        assert await campaign_service.get_campaign("camp-1") is first
+
+    async def test_out_of_band_character_write_is_not_served(self, db):
+        from app.agents.scribe_agent import get_scribe
+
+        scribe = get_scribe()
+        assert (await scribe.get_character("char-1"))["name"] == "Tess"
+        # Another worker writes the row; this process's invalidation hooks never run
+        with db.begin() as conn:
+            conn.execute(
+                update(CharacterDB)
+                .where(CharacterDB.id == "char-1")
+                .values(data={"id": "char-1", "name": "Elsewhere", "abilities": {}, "inventory": []})
+            )
+        assert (await scribe.get_character("char-1"))["name"] == "Elsewhere"
+        assert get_entity_cache_stats()["characters"]["stale"] == 1
+
+    async def test_out_of_band_campaign_write_is_not_served(self, db):
+        assert (await campaign_service.get_campaign("camp-1")).name == "Cached"
+        renamed = campaign_to_dict(Campaign(id="camp-1", name="Moved", setting="Coast"))
+        with db.begin() as conn:
+            conn.execute(
+                update(CampaignDB)
+                .where(CampaignDB.id == "camp-1")
+                .values(data=renamed, updated_at=datetime.now(UTC))
+            )
+        assert (await campaign_service.get_campaign("camp-1")).name == "Moved"
+
+    async def test_deleted_row_is_not_served(self, db):
+        assert await entity_cache.load_character_data("char-1") is not None
+        with db.begin() as conn:
+            conn.execute(delete(CharacterDB).where(CharacterDB.id == "char-1"))
+        assert await entity_cache.load_character_data("char-1") is None
+
+    async def test_stats_report_hits(self, db):
+        await _play_turn()
+        await _play_turn()
+        stats = get_entity_cache_stats()
+        assert stats["characters"]["hits"] >= 1
+        assert stats["campaigns"]["hits"] >= 1
@@ -113,12 +113,12 @@ def fighter_character_data() -> dict:
 class TestBuildGameContext:
     """Tests for build_game_context producing a rich context dict."""
 
-    def test_context_includes_combat_stats_from_character(
+    async def test_context_includes_combat_stats_from_character(
         self, db_session, fighter_character_data
     ):
         """build_game_context returns combat-relevant values from character data."""
         # Pre-load character dict (simulating Scribe fetch)
-        context = build_game_context(
+        context = await build_game_context(
             character_id="char-fighter-1",
             campaign_id="campaign-1",
             character_data=fighter_character_data,
@@ -145,9 +145,9 @@ class TestBuildGameContext:
         assert context["attack_bonus"] == 5
         assert context["damage_modifier"] == 3  # STR modifier
 
-    def test_context_computes_ac_from_equipment(self, fighter_character_data):
+    async def test_context_computes_ac_from_equipment(self, fighter_character_data):
         """AC is calculated from equipped armor and shield."""
-        context = build_game_context(
+        context = await build_game_context(
             character_id="char-fighter-1",
             campaign_id="campaign-1",
             character_data=fighter_character_data,
@@ -155,7 +155,7 @@ class TestBuildGameContext:
         # Chain mail = 16 AC (no DEX), + 2 shield = 18
         assert context["armor_class"] == 18
 
-    def test_context_fallback_for_missing_character(self):
+    async def test_context_fallback_for_missing_character(self):
         """When character data is sparse, context has safe defaults."""
         minimal_char = {
             "id": "char-unknown",
@@ -163,7 +163,7 @@ class TestBuildGameContext:
             "class": "Wizard",
             "level": 1,
         }
-        context = build_game_context(
+        context = await build_game_context(
             character_id="char-unknown",
             campaign_id="campaign-1",
             character_data=minimal_char,
@@ -173,7 +173,7 @@ class TestBuildGameContext:
         assert context["character_level"] == "1"
         assert context["attack_bonus"] == 2  # 0 mod + 2 proficiency
 
-    def test_context_finesse_weapon_uses_higher_mod(self):
+    async def test_context_finesse_weapon_uses_higher_mod(self):
         """A finesse weapon should use the higher of STR/DEX modifiers."""
         char = {
             "id": "char-rogue",
@@ -201,7 +201,7 @@ class TestBuildGameContext:
                 "equipment": {"main_hand": "item-rapier"},
             },
         }
-        context = build_game_context(
+        context = await build_game_context(
             character_id="char-rogue",
             campaign_id="campaign-1",
             character_data=char,
@@ -219,7 +219,7 @@ class TestBuildGameContext:
 class TestConversationThreadCampaignId:
     """Tests that campaign_id is wired into ConversationThread records."""
 
-    def test_new_thread_gets_campaign_id(self, db_session):
+    async def test_new_thread_gets_campaign_id(self, db_session):
         """When a new thread is created it should have the campaign_id set."""
         from app.agents.dungeon_master_agent import DungeonMasterAgent
 
@@ -238,12 +238,12 @@ class TestConversationThreadCampaignId:
 
             return _session()
 
-        with patch("app.agents.dungeon_master_agent.get_session_context", _ctx):
+        with patch("app.database.get_session_context", _ctx):
             dm = DungeonMasterAgent.__new__(DungeonMasterAgent)
             dm._threads = {}
             dm._fallback_mode = True
 
-            dm._get_or_create_thread("session-123", campaign_id="campaign-abc")
+            await dm._get_or_create_thread("session-123", campaign_id="campaign-abc")
 
             # Verify the DB record
             row = (
@@ -255,7 +255,7 @@ class TestConversationThreadCampaignId:
             assert row.campaign_id == "campaign-abc"
             assert row.agent_name == "DM"
 
-    def test_existing_thread_updated_with_campaign_id(self, db_session):
+    async def test_existing_thread_updated_with_campaign_id(self, db_session):
         """If a thread exists without campaign_id, it gets back-filled."""
         # Pre-create a thread without campaign_id
         thread = ConversationThread(
@@ -284,12 +284,12 @@ class TestConversationThreadCampaignId:
 
             return _session()
 
-        with patch("app.agents.dungeon_master_agent.get_session_context", _ctx):
+        with patch("app.database.get_session_context", _ctx):
             dm = DungeonMasterAgent.__new__(DungeonMasterAgent)
             dm._threads = {}
             dm._fallback_mode = True
 
-            dm._get_or_create_thread("session-456", campaign_id="campaign-xyz")
+            await dm._get_or_create_thread("session-456", campaign_id="campaign-xyz")
 
             db_session.refresh(thread)
             assert thread.campaign_id == "campaign-xyz"
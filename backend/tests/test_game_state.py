@@ -11,9 +11,11 @@ Covers:
 """
 
 import uuid
+from contextlib import contextmanager
+from unittest.mock import patch
 
 import pytest
-from app.database import Base, get_session
+from app.database import Base
 from app.main import app
 from app.models.db_models import (
     NPC as NPCDB,
@@ -64,16 +66,12 @@ def db_session():
 def client(db_session):
     """Return a TestClient that uses the in-memory DB session."""
 
-    def override_get_session():
-        try:
-            yield db_session
-        finally:
-            pass
+    @contextmanager
+    def _ctx():
+        yield db_session
 
-    app.dependency_overrides[get_session] = override_get_session
-    with TestClient(app) as c:
+    with patch("app.database.get_session_context", _ctx), TestClient(app) as c:
         yield c
-    app.dependency_overrides.clear()
 
 
 @pytest.fixture()
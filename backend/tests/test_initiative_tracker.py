@@ -0,0 +1,166 @@
+"""Tests for the sorted initiative tracker."""
+
+import random
+
+import pytest
+from app.initiative_tracker import InitiativeTracker
+from app.rules_engine import advance_turn, remove_combatant
+
+
+def _entries(count, seed=0):
+    rng = random.Random(seed)  # noqa: S311
+    entries = [
+        {"id": f"c{i}", "initiative": rng.randint(1, 25), "dex_modifier": rng.randint(-1, 4)}
+        for i in range(count)
+    ]
+    # roll_initiative's order: initiative, then DEX, then as listed
+    entries.sort(key=lambda e: (e["initiative"], e["dex_modifier"]), reverse=True)
+    return entries
+
+
+class TestMatchesRulesEngine:
+    """Same results as the list-based helpers in rules_engine."""
+
+    def test_advance_wraps_rounds(self):
+        entries = _entries(5)
+        tracker = InitiativeTracker.from_entries(entries)
+        turn, round_number = 0, 1
+        for _ in range(12):
+            expected = advance_turn(entries, turn, round_number)
+            result = tracker.advance()
+            assert {k: result[k] for k in expected} == expected
+            assert result["active"] == entries[expected["current_turn"]]["id"]
+            turn, round_number = expected["current_turn"], expected["current_round"]
+
+    def test_random_mutations(self):
+        rng = random.Random(1)  # noqa: S311
+        entries = _entries(30, seed=1)
+        tracker = InitiativeTracker.from_entries(entries)
+        turn, round_number, joined = 0, 1, 0
+        for _ in range(300):
+            op = rng.random()
+            if op < 0.4 and entries:
+                result = advance_turn(entries, turn, round_number)
+                turn, round_number = result["current_turn"], result["current_round"]
+                tracker.advance()
+            elif op < 0.7 and entries:
+                victim = rng.choice(entries)["id"]
+                result = remove_combatant(entries, turn, victim)
+                entries, turn = result["turn_order"], result["current_turn"]
+                tracker.remove(victim)
+            else:
+                joined += 1
+                newcomer = {"id": f"j{joined}", "initiative": rng.randint(1, 25), "dex_modifier": rng.randint(-1, 4)}
+                active = entries[turn]["id"] if entries else None
+                entries.append(newcomer)
+                entries.sort(key=lambda e: (e["initiative"], e["dex_modifier"]), reverse=True)
+                turn = next(i for i, e in enumerate(entries) if e["id"] == active) if active else 0
+                tracker.add(newcomer["id"], newcomer["initiative"], newcomer["dex_modifier"])
+            assert tracker.order() == [e["id"] for e in entries]
+            assert tracker.current_turn == turn
+            assert tracker.round == round_number
+
+    def test_empty(self):
+        tracker = InitiativeTracker()
+        assert (tracker.active, tracker.current_turn, tracker.order()) == (None, 0, [])
+        with pytest.raises(ValueError):
+            tracker.advance()
+        tracker.add("a", 10)
+        assert tracker.remove("a") and not tracker.remove("a")
+        assert tracker.active is None
+
+
+class TestOrdering:
+    def test_tie_breaks(self):
+        tracker = InitiativeTracker()
+        tracker.add("first", 15, 2)
+        tracker.add("faster", 15, 3)
+        tracker.add("rolled_off", 15, 2, tie_break=12)
+        tracker.add("second", 15, 2)
+        assert tracker.order() == ["faster", "rolled_off", "first", "second"]
+        with pytest.raises(ValueError):
+            tracker.add("first", 3)
+
+    def test_active_survives_mutations(self):
+        tracker = InitiativeTracker.from_entries(_entries(6), current_turn=3)
+        active = tracker.active
+        tracker.add("summon", 99)
+        tracker.add("straggler", -5)
+        tracker.remove(tracker.order()[0])
+        assert tracker.active == active
+
+    def test_from_entries_keeps_the_active_combatant(self):
+        # Saved order disagrees with DEX tie-breaks (older combats sorted on initiative only)
+        entries = [
+            {"id": "a", "initiative": 12, "dex_modifier": 0},
+            {"id": "b", "initiative": 12, "dex_modifier": 3},
+        ]
+        tracker = InitiativeTracker.from_entries(entries, current_turn=0, current_round=4)
+        assert (tracker.active, tracker.current_turn, tracker.round) == ("a", 1, 4)
+
+
+class TestDelayAndReady:
+    def _tracker(self):
+        tracker = InitiativeTracker()
+        for name, initiative in (("a", 20), ("b", 15), ("c", 10), ("d", 5)):
+            tracker.add(name, initiative)
+        return tracker
+
+    def test_delay_then_resume_before_the_active_combatant(self):
+        tracker = self._tracker()
+        tracker.advance()
+        result = tracker.delay("b")
+        assert (result["active"], tracker.order()) == ("c", ["a", "c", "d"])
+        tracker.advance()
+        tracker.resume("b")
+        assert (tracker.active, tracker.order()) == ("b", ["a", "c", "b", "d"])
+        assert tracker.initiative("b") == 5
+        assert tracker.advance()["active"] == "d"
+
+    def test_resume_twice_before_the_same_combatant(self):
+        tracker = self._tracker()
+        tracker.delay("a")
+        tracker.delay("b")
+        tracker.resume("a")
+        tracker.resume("b")
+        assert tracker.order() == ["b", "a", "c", "d"]
+        assert [tracker.advance()["active"] for _ in range(2)] == ["a", "c"]
+
+    def test_delay_rules(self):
+        tracker = self._tracker()
+        with pytest.raises(ValueError):
+            tracker.delay("c")
+        for _ in range(3):
+            tracker.advance()
+        assert tracker.delay("d")["round_advanced"]
+        assert tracker.round == 2
+        with pytest.raises(KeyError):
+            tracker.resume("c")
+        assert tracker.remove("d") and "d" not in tracker.delayed
+
+    def test_readied_action_lapses_at_next_turn(self):
+        tracker = self._tracker()
+        tracker.ready("a", "shoot the first goblin through the door")
+        tracker.advance()
+        assert tracker.trigger("a") == "shoot the first goblin through the door"
+        assert tracker.trigger("a") is None
+        tracker.ready("b")
+        for _ in range(4):
+            tracker.advance()
+        assert "b" not in tracker.readied
+        with pytest.raises(KeyError):
+            tracker.ready("nobody")
+
+
+@pytest.mark.slow
+def test_large_battle_mutations_are_fast():
+    import time
+
+    tracker = InitiativeTracker.from_entries(_entries(2000, seed=3))
+    start = time.perf_counter()
+    for i in range(2000):
+        tracker.add(f"summon{i}", i % 30, i % 5)
+        tracker.advance()
+        tracker.remove(f"summon{i}")
+    per_round = (time.perf_counter() - start) / 2000
+    assert per_round < 0.0005
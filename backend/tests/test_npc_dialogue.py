@@ -1,7 +1,10 @@
 """Tests for the NPC dialogue system with conversation memory."""
 
+from contextlib import contextmanager
+from unittest.mock import patch
+
 import pytest
-from app.database import Base, get_session
+from app.database import Base
 from app.main import app
 from app.services.npc_dialogue_service import NPCDialogueService
 from fastapi.testclient import TestClient
@@ -43,16 +46,16 @@ def db(test_session_factory) -> Session:
 def client(test_session_factory):
     """Test client backed by an isolated in-memory database."""
 
-    def override_get_session():
+    @contextmanager
+    def _ctx():
         session = test_session_factory()
         try:
             yield session
         finally:
             session.close()
 
-    app.dependency_overrides[get_session] = override_get_session
-    yield TestClient(app)
-    app.dependency_overrides.pop(get_session, None)
+    with patch("app.database.get_session_context", _ctx):
+        yield TestClient(app)
 
 
 @pytest.fixture
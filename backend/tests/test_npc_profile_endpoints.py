@@ -1,7 +1,10 @@
 """Tests for the NPC Profile and NPCRelationship endpoints."""
 
+from contextlib import contextmanager
+from unittest.mock import patch
+
 import pytest
-from app.database import Base, get_session
+from app.database import Base
 from app.main import app
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -31,16 +34,16 @@ def client():
     """Test client backed by an isolated in-memory database."""
     testing_session_local = _make_test_db()
 
-    def override_get_session():
+    @contextmanager
+    def _ctx():
         db = testing_session_local()
         try:
             yield db
         finally:
             db.close()
 
-    app.dependency_overrides[get_session] = override_get_session
-    yield TestClient(app)
-    app.dependency_overrides.pop(get_session, None)
+    with patch("app.database.get_session_context", _ctx):
+        yield TestClient(app)
 
 
 @pytest.fixture
@@ -1,65 +1,147 @@
-"""Tests for rest endpoint character update call."""
+"""Tests for the rest endpoint's partial character update."""
 
-from unittest.mock import AsyncMock, patch
+from contextlib import contextmanager
+from unittest.mock import patch
 
 import pytest
-from app.models.game_models import (
-    Abilities,
-    CharacterSheet,
-    HitPoints,
-)
+from app.database import Base
+from app.models.db_models import Character as CharacterDB
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
 
-@pytest.mark.asyncio
-async def test_rest_endpoint_calls_update_with_character_id_and_data():
-    """update_character must be called with (character_id, updates) not just (character)."""
+@pytest.fixture()
+def client(tmp_path):
+    """Rest router over a database holding one wounded fighter."""
     from app.api.routes.rest_routes import router
+    from app.entity_cache import clear_entity_caches
     from fastapi import FastAPI
     from fastapi.testclient import TestClient
 
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'rest.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    session = factory()
+    session.add(
+        CharacterDB(
+            id="char_123",
+            name="TestHero",
+            data={
+                "id": "char_123",
+                "name": "TestHero",
+                "race": "human",
+                "character_class": "fighter",
+                "level": 1,
+                "hit_points": {"current": 5, "maximum": 10},
+                "hit_dice": "1d10",
+                "hit_dice_remaining": 1,
+                "abilities": {
+                    "strength": 10,
+                    "dexterity": 10,
+                    "constitution": 14,
+                    "intelligence": 10,
+                    "wisdom": 10,
+                    "charisma": 10,
+                },
+                "inventory": [{"id": "rope", "name": "Rope", "type": "misc"}],
+            },
+        )
+    )
+    session.commit()
+    session.close()
+
+    @contextmanager
+    def _ctx():
+        s = factory()
+        try:
+            yield s
+        finally:
+            s.close()
+
     app = FastAPI()
     app.include_router(router, prefix="/game")
+    clear_entity_caches()
+    with patch("app.database.get_session_context", _ctx):
+        yield TestClient(app), factory
+    clear_entity_caches()
+    engine.dispose()
+
+
+def test_long_rest_writes_only_rest_fields(client):
+    """The rest is persisted as a partial update of the fields it changes."""
+    test_client, factory = client
+    written = []
+
+    from app import character_store
+
+    real_patch = character_store.patch_character
+
+    def _spy(db, character_id, ops, expected_version=None):
+        written.extend(op["path"] for op in ops)
+        return real_patch(db, character_id, ops, expected_version)
+
+    with patch("app.character_store.patch_character", _spy):
+        response = test_client.post(
+            "/game/game/rest",
+            json={"character_id": "char_123", "rest_type": "long"},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["hp_recovered"] == 5
+    assert written == ["/hit_points/current"]
 
-    # Build a real CharacterSheet so calculate_long_rest works
-    character = CharacterSheet(
-        id="char_123",
-        name="TestHero",
-        race="human",
-        character_class="fighter",
-        level=1,
-        hit_points=HitPoints(current=5, maximum=10),
-        hit_dice="1d10",
-        hit_dice_remaining=1,
-        abilities=Abilities(
-            strength=10,
-            dexterity=10,
-            constitution=14,
-            intelligence=10,
-            wisdom=10,
-            charisma=10,
-        ),
+    session = factory()
+    row = session.get(CharacterDB, "char_123")
+    assert row.data["hit_points"] == {"current": 10, "maximum": 10}
+    assert row.data["inventory"] == [{"id": "rope", "name": "Rope", "type": "misc"}]
+    assert row.version == 2
+    session.close()
+
+
+def test_rest_for_unknown_character_is_404(client):
+    test_client, _ = client
+    response = test_client.post(
+        "/game/game/rest", json={"character_id": "ghost", "rest_type": "short"}
     )
+    assert response.status_code == 404
+
 
-    mock_scribe = AsyncMock()
-    mock_scribe.get_character = AsyncMock(return_value=character)
-    mock_scribe.update_character = AsyncMock(return_value={"success": True})
+def test_rest_conflict_is_409(client):
+    from app.character_store import VersionConflictError
 
+    test_client, _ = client
     with patch(
-        "app.agents.scribe_agent.get_scribe", return_value=mock_scribe
+        "app.character_store.patch_character",
+        side_effect=VersionConflictError("char_123", 1),
     ):
-        client = TestClient(app)
-        client.post(
+        response = test_client.post(
+            "/game/game/rest", json={"character_id": "char_123", "rest_type": "long"}
+        )
+    assert response.status_code == 409
+
+
+def test_short_rest_rolls_hit_dice_from_campaign_stream(client):
+    """Hit-dice healing draws from, and is journaled on, the campaign stream."""
+    from app.rng import clear_streams, replay, seed_stream
+
+    test_client, _ = client
+    stream = seed_stream("c1", 7)
+    try:
+        response = test_client.post(
             "/game/game/rest",
             json={
                 "character_id": "char_123",
-                "rest_type": "long",
+                "rest_type": "short",
+                "hit_dice_to_spend": 1,
+                "campaign_id": "c1",
             },
         )
-
-    # Verify update_character was called with character_id AND updates dict
-    assert mock_scribe.update_character.called, "update_character was not called"
-    args = mock_scribe.update_character.call_args[0]
-    assert len(args) == 2, (
-        f"update_character should take 2 positional args, got {len(args)}"
-    )
-    assert args[0] == "char_123", "First arg should be character_id"
+        assert response.status_code == 200
+        assert stream.position > 0
+        assert [e.op for e in stream.journal] == ["rules.spend_hit_dice"]
+        assert replay(stream.recording()).mismatches == []
+    finally:
+        clear_streams()
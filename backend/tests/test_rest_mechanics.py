@@ -46,7 +46,7 @@ def test_short_rest_spend_hit_dice_recovers_hp():
     """Spending hit dice on a short rest recovers HP."""
     char = _make_character(current_hp=20, max_hp=40, hit_dice_remaining=5)
     # Patch random to return a known value: Fighter d10, CON mod +2 => 5+2=7 per die
-    with patch("app.api.routes.rest_routes.random.randint", return_value=5):
+    with patch("app.rules_engine.random.randint", return_value=5):
         result = calculate_short_rest(char, hit_dice_to_spend=2)
     assert result["hp_recovered"] == 14  # 2 dice * (5+2)
     assert result["hit_dice_remaining"] == 3
@@ -56,7 +56,7 @@ def test_short_rest_spend_hit_dice_recovers_hp():
 def test_short_rest_hp_cannot_exceed_maximum():
     """HP recovery is capped at the character's maximum HP."""
     char = _make_character(current_hp=38, max_hp=40, hit_dice_remaining=5)
-    with patch("app.api.routes.rest_routes.random.randint", return_value=10):
+    with patch("app.rules_engine.random.randint", return_value=10):
         result = calculate_short_rest(char, hit_dice_to_spend=2)
     assert char.hit_points.current == 40
     assert result["hp_recovered"] == 2  # Only 2 HP were needed to reach max
@@ -65,7 +65,7 @@ def test_short_rest_hp_cannot_exceed_maximum():
 def test_short_rest_cannot_spend_more_dice_than_available():
     """Requesting more dice than available spends only what's available."""
     char = _make_character(current_hp=10, max_hp=40, hit_dice_remaining=2)
-    with patch("app.api.routes.rest_routes.random.randint", return_value=5):
+    with patch("app.rules_engine.random.randint", return_value=5):
         result = calculate_short_rest(char, hit_dice_to_spend=5)
     # Should only spend 2 dice (all that's available)
     assert result["hit_dice_remaining"] == 0
@@ -0,0 +1,207 @@
+"""Tests for per-campaign random streams, journaling and replay."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from app import rng
+from app.config import get_config
+from app.rng import (
+    RollStream,
+    active_stream,
+    campaign_rng,
+    clear_streams,
+    get_stream,
+    replay,
+    seed_stream,
+    use_stream,
+)
+from app.rules_engine import calculate_damage, resolve_attack, roll_initiative
+from app.utils.dice_engine import compile_dice
+from app.utils.spells import check_concentration
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(autouse=True)
+def _fresh_streams():
+    clear_streams()
+    yield
+    clear_streams()
+
+
+class TestRollStream:
+    """A stream is a pure function of (seed, position)."""
+
+    def test_same_seed_same_draws(self):
+        a, b = RollStream(7), RollStream(7)
+        assert [a.randint(1, 20) for _ in range(50)] == [b.randint(1, 20) for _ in range(50)]
+        assert [RollStream(8).randint(1, 20) for _ in range(50)] != [RollStream(7).randint(1, 20)] * 50
+
+    def test_seek_to_any_position(self):
+        stream = RollStream(99)
+        draws = [stream.randint(1, 100) for _ in range(10)]
+        resumed = RollStream(99, position=6)
+        assert [resumed.randint(1, 100) for _ in range(4)] == draws[6:]
+
+    def test_ranges(self):
+        stream = RollStream(1)
+        values = {stream.randint(1, 6) for _ in range(600)}
+        assert values == set(range(1, 7))
+        assert all(0.0 <= stream.random() < 1.0 for _ in range(100))
+        with pytest.raises(ValueError):
+            stream.randint(5, 4)
+
+    def test_shuffle_is_a_permutation(self):
+        items = list(range(20))
+        RollStream(3).shuffle(items)
+        assert sorted(items) == list(range(20))
+
+
+class TestActiveStream:
+    """Mechanics draw from the active stream, else from global random."""
+
+    def test_dice_draw_from_active_stream(self):
+        with campaign_rng("c1"):
+            first = compile_dice("4d6").roll().rolls
+        seed_stream("c2", get_stream("c1").seed)
+        with campaign_rng("c2"):
+            assert compile_dice("4d6").roll().rolls == first
+        assert active_stream() is None
+
+    def test_falls_back_to_global_random(self):
+        with patch("app.rules_engine.random.randint", return_value=4):
+            assert calculate_damage("2d6")["rolls"] == [4, 4]
+        with campaign_rng(None):
+            assert active_stream() is None
+
+    def test_streams_are_isolated(self):
+        seed_stream("a", 5)
+        seed_stream("b", 5)
+        with campaign_rng("a"):
+            compile_dice("10d6").roll()
+        assert get_stream("a").position == 10
+        assert get_stream("b").position == 0
+
+    def test_registry_is_bounded(self):
+        with patch.object(rng, "MAX_STREAMS", 3):
+            for key in "abcd":
+                get_stream(key)
+        assert set(rng._streams) == {"b", "c", "d"}
+
+
+class TestJournalAndReplay:
+    """Recorded sessions replay to identical results."""
+
+    def _session(self):
+        stream = seed_stream("campaign-1", 1234)
+        with use_stream(stream):
+            resolve_attack(5, 14)
+            calculate_damage("2d6", 3, critical=True)
+            check_concentration(2, 22)
+            roll_initiative([{"name": "Ayla", "dex_modifier": 3}, {"name": "Goblin", "dex_modifier": 2}])
+            compile_dice("4d6dl1").roll()
+        return stream
+
+    def test_only_outermost_calls_are_journaled(self):
+        ops = [entry.op for entry in self._session().journal]
+        assert ops == [
+            "rules.resolve_attack",
+            "rules.calculate_damage",
+            "spells.check_concentration",
+            "rules.roll_initiative",
+            "dice.roll",
+        ]
+
+    def test_replay_matches_after_json_round_trip(self):
+        recording = json.loads(json.dumps(self._session().recording()))
+        report = replay(recording, repeat=3)
+        assert report.mismatches == []
+        assert report.operations == 15
+        assert report.draws > 0
+
+    def test_replay_detects_divergence(self):
+        recording = self._session().recording()
+        recording["entries"][1]["result"]["total"] += 100
+        assert replay(recording).mismatches == [1]
+
+    def test_journal_is_bounded(self):
+        with patch.object(rng, "_journal_limit", return_value=2):
+            stream = seed_stream("small", 1)
+        with use_stream(stream):
+            for _ in range(5):
+                compile_dice("1d20").roll()
+        assert [e.op for e in stream.journal] == ["dice.roll", "dice.roll", "journal.full"]
+        assert replay(stream.recording()).mismatches == []
+
+    def test_rng_state_in_plugin_history(self):
+        from app.plugins.rules_engine_plugin import RulesEnginePlugin
+
+        plugin = RulesEnginePlugin()
+        with campaign_rng("c1"):
+            plugin.roll_dice("1d20")
+        assert plugin.get_roll_history()[-1]["rng"]["stream"] == "c1"
+
+
+class TestThreadSafety:
+    """A stream shared across threads keeps a consistent journal."""
+
+    def test_concurrent_recorded_calls_replay(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        stream = seed_stream("shared", 5)
+
+        def roll_many(_):
+            with use_stream(stream):
+                for _ in range(200):
+                    compile_dice("3d6").roll()
+                    stream.randint(1, 20)  # unrecorded draws interleave too
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(roll_many, range(8)))
+
+        assert stream.position == 8 * 200 * 4
+        assert len(stream.journal) == 8 * 200
+        assert all(entry.end - entry.start == 3 for entry in stream.journal)
+        assert replay(stream.recording()).mismatches == []
+
+
+class TestEndpoints:
+    """Dice routes honour campaign_id; stream admin routes are opt-in."""
+
+    @pytest.fixture
+    def app(self):
+        from app.api.routes.dice_routes import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/game")
+        return app
+
+    @pytest.fixture
+    def client(self, app):
+        return TestClient(app)
+
+    def test_admin_endpoints_hidden_by_default(self, client):
+        assert client.put("/game/campaign/c1/rng", json={"seed": 1}).status_code == 404
+        assert client.get("/game/campaign/c1/rng/recording").status_code == 404
+
+    def test_seeded_campaign_rolls_reproduce(self, app, client, test_config):
+        enabled = test_config.model_copy(update={"rng_admin_endpoints": True})
+        app.dependency_overrides[get_config] = lambda: enabled
+        state = client.put("/game/campaign/c1/rng", json={"seed": 42}).json()
+        assert state == {"stream": "c1", "seed": 42, "position": 0}
+        first = client.post("/game/dice/roll", json={"notation": "3d6", "campaign_id": "c1"}).json()
+        client.put("/game/campaign/c1/rng", json={"seed": 42})
+        second = client.post("/game/dice/roll", json={"notation": "3d6", "campaign_id": "c1"}).json()
+        recording = client.get("/game/campaign/c1/rng/recording").json()
+        assert first["rolls"] == second["rolls"]
+        assert recording["seed"] == 42
+        assert replay(recording).mismatches == []
+
+    def test_campaign_batches_reproduce(self, client):
+        body = {"rolls": [{"notation": "1d20", "count": 10}], "campaign_id": "c1"}
+        seed_stream("c1", 9)
+        first = client.post("/game/dice/roll-batch", json=body).json()
+        seed_stream("c1", 9)
+        assert client.post("/game/dice/roll-batch", json=body).json() == first
+
@@ -324,7 +324,7 @@ class TestConcentrationTracking:
         result = self.plugin.advance_concentration_round()
 
         assert result["success"] is True
-        assert len(result["continuing_spells"]) == 2
+        assert len(self.plugin.list_concentration()) == 2
         assert len(result["expired_spells"]) == 0
         assert result["total_concentrating"] == 2
 
@@ -339,7 +339,9 @@ class TestConcentrationTracking:
         result2 = self.plugin.advance_concentration_round()
         assert len(result2["expired_spells"]) == 1
         assert result2["expired_spells"][0]["character_id"] == "char2"
-        assert len(result2["continuing_spells"]) == 1
+        assert self.plugin.list_concentration() == [
+            {"character_id": "char1", "spell": self.concentration_spell["name"], "duration_remaining": 1}
+        ]
 
         # Verify char2 is no longer concentrating
         char2_status_after = self.plugin.check_concentration("char2")
@@ -4,14 +4,16 @@ Tests for the save slot API endpoints.
 Covers: create, retrieve, list, delete, load and business rules
 (max 5 slots per campaign, slot-number reuse after delete).
 
-Uses an in-memory SQLite database via FastAPI dependency injection override so
-the tests are hermetic and require no external DB setup.
+Uses an in-memory SQLite database patched in for the routes' sessions so the
+tests are hermetic and require no external DB setup.
 """
 
 import uuid
+from contextlib import contextmanager
+from unittest.mock import patch
 
 import pytest
-from app.database import Base, get_session
+from app.database import Base
 from app.main import app
 from app.models.db_models import Campaign as CampaignDB
 from fastapi.testclient import TestClient
@@ -51,16 +53,12 @@ def db_session():
 def client(db_session):
     """Return a TestClient that uses the in-memory DB session."""
 
-    def override_get_session():
-        try:
-            yield db_session
-        finally:
-            pass  # session lifecycle managed by db_session fixture
+    @contextmanager
+    def _ctx():
+        yield db_session  # session lifecycle managed by db_session fixture
 
-    app.dependency_overrides[get_session] = override_get_session
-    with TestClient(app) as c:
+    with patch("app.database.get_session_context", _ctx), TestClient(app) as c:
         yield c
-    app.dependency_overrides.clear()
 
 
 @pytest.fixture()
@@ -0,0 +1,249 @@
+"""Tests for the compressed, content-deduplicated save-slot section store."""
+
+import uuid
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from app.database import Base
+from app.main import app
+from app.models.db_models import Campaign as CampaignDB
+from app.models.db_models import Character as CharacterDB
+from app.models.db_models import SaveSection
+from app.models.db_models import SaveSlot as SaveSlotDB
+from app.save_store import (
+    LazySaveState,
+    load_sections,
+    prune_unreferenced_sections,
+    split_sections,
+    store_state,
+)
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def db_session():
+    """Fresh in-memory SQLite database."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture()
+def client(db_session):
+    @contextmanager
+    def _ctx():
+        yield db_session
+
+    with patch("app.database.get_session_context", _ctx), TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture()
+def campaign_id(db_session) -> str:
+    """A campaign with one character and a long session log."""
+    cid = str(uuid.uuid4())
+    db_session.add(
+        CharacterDB(id="hero", name="Hero", data={"level": 3, "notes": "n" * 2000})
+    )
+    db_session.add(
+        CampaignDB(
+            id=cid,
+            name="Dedup Campaign",
+            setting="coast",
+            tone="heroic",
+            data={
+                "name": "Dedup Campaign",
+                "setting": "coast",
+                "characters": ["hero"],
+                "current_location": "Harbour",
+                "session_log": [
+                    {"role": "dm", "content": f"Turn {n} " + "lorem " * 40}
+                    for n in range(40)
+                ],
+            },
+        )
+    )
+    db_session.commit()
+    return cid
+
+
+def _section_count(db) -> int:
+    return db.query(func.count(SaveSection.hash)).scalar()
+
+
+# ---------------------------------------------------------------------------
+# Store primitives
+# ---------------------------------------------------------------------------
+
+
+class TestSaveStore:
+    """Splitting, dedup, compression and lazy reads."""
+
+    STATE = {
+        "version": 1,
+        "campaign_data": {"name": "C", "session_log": [{"n": 1}]},
+        "characters": [{"id": "a", "data": {"hp": 10}}],
+    }
+
+    def test_session_log_is_its_own_section(self):
+        sections = split_sections(self.STATE)
+        assert sections["campaign_data"] == {"name": "C"}
+        assert sections["campaign_data.session_log"] == [{"n": 1}]
+        assert "session_log" in self.STATE["campaign_data"]  # input untouched
+
+    def test_round_trip(self, db_session):
+        refs = store_state(db_session, self.STATE)
+        db_session.commit()
+        assert LazySaveState(db_session, refs).materialize() == self.STATE
+
+    def test_identical_sections_are_stored_once(self, db_session):
+        store_state(db_session, self.STATE)
+        changed = {**self.STATE, "version": 2}
+        store_state(db_session, changed)
+        db_session.commit()
+        # 4 sections, then only the changed "version" section is new
+        assert _section_count(db_session) == 5
+
+    def test_sections_are_compressed(self, db_session):
+        big = {"campaign_data": {"session_log": ["same text " * 50] * 50}}
+        store_state(db_session, big)
+        db_session.commit()
+        row = max(db_session.query(SaveSection), key=lambda r: r.raw_size)
+        assert len(row.data) * 10 < row.raw_size
+
+    def test_lazy_state_inflates_only_accessed_sections(self, db_session):
+        refs = store_state(db_session, self.STATE)
+        db_session.commit()
+        state = LazySaveState(db_session, refs)
+        assert set(state) == {"version", "campaign_data", "characters"}
+        assert state["version"] == 1
+        assert state.loaded_keys == {"version"}
+        assert state.get("missing") is None
+
+    def test_missing_section_raises(self, db_session):
+        with pytest.raises(LookupError):
+            load_sections(db_session, ["0" * 64])
+
+    def test_prune_keeps_referenced_sections(self, db_session, campaign_id):
+        kept = store_state(db_session, {"a": 1})
+        store_state(db_session, {"b": 2})
+        db_session.add(
+            SaveSlotDB(
+                id="s", campaign_id=campaign_id, slot_number=1, section_refs=kept
+            )
+        )
+        db_session.commit()
+        assert prune_unreferenced_sections(db_session, grace_seconds=0) == 1
+        assert load_sections(db_session, kept.values())
+
+    def test_prune_skips_recently_stored_sections(self, db_session):
+        store_state(db_session, {"a": 1})
+        db_session.commit()
+        assert prune_unreferenced_sections(db_session, grace_seconds=60) == 0
+
+    def test_reused_section_survives_prune_before_its_slot_commits(self, db_session):
+        refs = store_state(db_session, {"a": 1})
+        db_session.query(SaveSection).update(
+            {SaveSection.referenced_at: datetime.now(UTC) - timedelta(hours=1)}
+        )
+        db_session.commit()
+        # A second save reuses the orphaned section; its slot is not written yet
+        assert store_state(db_session, {"a": 1}) == refs
+        assert prune_unreferenced_sections(db_session, grace_seconds=60) == 0
+        assert load_sections(db_session, refs.values())
+
+
+# ---------------------------------------------------------------------------
+# Save routes
+# ---------------------------------------------------------------------------
+
+
+class TestSaveRoutesUseSectionStore:
+    """Capture/restore/summary go through the section store."""
+
+    def test_consecutive_captures_share_sections(self, client, db_session, campaign_id):
+        assert client.post(f"/game/campaign/{campaign_id}/saves/capture").status_code == 201
+        first = _section_count(db_session)
+        assert client.post(f"/game/campaign/{campaign_id}/saves/capture").status_code == 201
+        # Only captured_at changed between the two saves
+        assert _section_count(db_session) == first + 1
+
+        slot = db_session.query(SaveSlotDB).filter_by(slot_number=1).one()
+        assert slot.save_data == {}
+        assert slot.section_refs
+
+    def test_capture_response_and_load_return_full_state(self, client, campaign_id):
+        captured = client.post(f"/game/campaign/{campaign_id}/saves/capture").json()
+        assert len(captured["save_data"]["campaign_data"]["session_log"]) == 40
+
+        loaded = client.post(f"/game/campaign/{campaign_id}/saves/1/load").json()
+        assert loaded["save_data"] == captured["save_data"]
+
+    def test_summary_does_not_inflate_state(self, client, db_session, campaign_id, monkeypatch):
+        client.post(f"/game/campaign/{campaign_id}/saves/capture")
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("summary inflated a section")
+
+        monkeypatch.setattr("app.save_store.load_sections", _fail)
+        summary = client.get(f"/game/campaign/{campaign_id}/saves/1/summary").json()
+        assert summary["campaign_name"] == "Dedup Campaign"
+        assert summary["characters"] == ["Hero"]
+
+    def test_restore_from_sections(self, client, db_session, campaign_id):
+        client.post(f"/game/campaign/{campaign_id}/saves/capture")
+        hero = db_session.get(CharacterDB, "hero")
+        hero.data = {"level": 9}
+        db_session.commit()
+
+        response = client.post(f"/game/campaign/{campaign_id}/saves/1/restore")
+        assert response.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(CharacterDB, "hero").data["level"] == 3
+
+    def test_legacy_inline_slot_still_loads(self, client, db_session, campaign_id):
+        db_session.add(
+            SaveSlotDB(
+                id="legacy",
+                campaign_id=campaign_id,
+                slot_number=1,
+                save_data={"version": 1, "campaign_data": {"name": "Old"}},
+            )
+        )
+        db_session.commit()
+        loaded = client.post(f"/game/campaign/{campaign_id}/saves/1/load").json()
+        assert loaded["save_data"]["campaign_data"] == {"name": "Old"}
+        summary = client.get(f"/game/campaign/{campaign_id}/saves/1/summary").json()
+        assert summary["campaign_name"] == "Old"
+
+    def test_delete_prunes_orphaned_sections(self, client, db_session, campaign_id):
+        client.post(f"/game/campaign/{campaign_id}/saves/capture")
+        client.post(f"/game/campaign/{campaign_id}/saves/capture")
+        count = _section_count(db_session)
+        # Sections inside the grace period outlive the slot that used them
+        assert client.delete(f"/game/campaign/{campaign_id}/saves/2").status_code == 204
+        assert _section_count(db_session) == count
+        db_session.query(SaveSection).update(
+            {SaveSection.referenced_at: datetime.now(UTC) - timedelta(hours=1)}
+        )
+        db_session.commit()
+        assert client.delete(f"/game/campaign/{campaign_id}/saves/1").status_code == 204
+        assert _section_count(db_session) == 0
@@ -0,0 +1,70 @@
+"""Tests for the Scribe's SDK tool functions and database accessors."""
+
+import json
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from app.agents.scribe_agent import (
+    ScribeAgent,
+    get_character_tool,
+    get_inventory_tool,
+    get_npc_tool,
+)
+from app.database import Base
+from app.models.db_models import NPC, Campaign, Character
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture()
+def db_session():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Character(id="c1", name="Aria", data={"name": "Aria", "inventory": ["rope"]}))
+    db.add(Campaign(id="k1", name="Keep", setting="fantasy", tone="heroic", data={}))
+    db.add(
+        NPC(id="n1", name="Bram", campaign_id="k1", data={"name": "Bram", "relationships": {}})
+    )
+    db.commit()
+
+    @contextmanager
+    def _ctx():
+        yield db
+
+    with patch("app.database.get_session_context", _ctx):
+        yield db
+    db.close()
+
+
+class TestToolFunctions:
+    """The tools are coroutines that read through run_in_session."""
+
+    async def test_character_tool(self, db_session):
+        assert json.loads(await get_character_tool("c1"))["name"] == "Aria"
+        assert "not found" in json.loads(await get_character_tool("missing"))["error"]
+
+    async def test_npc_and_inventory_tools(self, db_session):
+        assert json.loads(await get_npc_tool("n1"))["name"] == "Bram"
+        assert json.loads(await get_inventory_tool("c1")) == ["rope"]
+
+
+class TestScribeAccessors:
+    async def test_lookups_and_relationship_update(self, db_session):
+        scribe = ScribeAgent.__new__(ScribeAgent)
+        assert set(await scribe.get_characters()) == {"c1"}
+        assert set(await scribe.get_npcs()) == {"n1"}
+        assert await scribe.get_inventories() == {"c1": ["rope"]}
+
+        result = await scribe.update_npc_relationship("n1", "c1", 15)
+        assert (result["old_level"], result["new_level"]) == (0, 15)
+        interaction_id = await scribe.log_npc_interaction(
+            {"npc_id": "n1", "character_id": "c1", "summary": "Haggled"}
+        )
+        assert interaction_id
@@ -1,6 +1,7 @@
 """Tests for the multiplayer SessionManager service and REST endpoints."""
 
 import uuid
+from contextlib import contextmanager
 
 import pytest
 from app.database import Base, get_session
@@ -104,18 +105,12 @@ def manager(db_session) -> SessionManager:
     """Return a SessionManager that uses the test db_session."""
     from unittest.mock import patch
 
-    # Patch get_session_context to yield our test session
-    class FakeContext:
-        def __enter__(self) -> object:
-            return db_session
+    # Patch get_session_context so run_in_session yields our test session
+    @contextmanager
+    def _ctx():
+        yield db_session
 
-        def __exit__(self, *args: object) -> None:
-            pass
-
-    with patch(
-        "app.services.session_manager.get_session_context",
-        return_value=FakeContext(),
-    ):
+    with patch("app.database.get_session_context", _ctx):
         yield SessionManager()
 
 
@@ -125,28 +120,28 @@ def manager(db_session) -> SessionManager:
 
 
 class TestSessionManagerCreateSession:
-    def test_create_session(self, manager, campaign_id):
-        session = manager.create_session(campaign_id)
+    async def test_create_session(self, manager, campaign_id):
+        session = await manager.create_session(campaign_id)
         assert session["campaign_id"] == campaign_id
         assert session["status"] == "active"
         assert session["turn_order"] == []
         assert session["current_turn_index"] == 0
         assert "id" in session
 
-    def test_create_session_ends_existing_active(self, manager, campaign_id):
-        first = manager.create_session(campaign_id)
-        second = manager.create_session(campaign_id)
+    async def test_create_session_ends_existing_active(self, manager, campaign_id):
+        first = await manager.create_session(campaign_id)
+        second = await manager.create_session(campaign_id)
         assert second["id"] != first["id"]
         # First session should be ended now
-        old = manager.get_session(first["id"])
+        old = await manager.get_session(first["id"])
         assert old is not None
         assert old["status"] == "ended"
 
 
 class TestSessionManagerJoin:
-    def test_join_session(self, manager, campaign_id, character_id):
-        session = manager.create_session(campaign_id)
-        participant = manager.join_session(
+    async def test_join_session(self, manager, campaign_id, character_id):
+        session = await manager.create_session(campaign_id)
+        participant = await manager.join_session(
             session["id"], character_id, "Alice"
         )
         assert participant["player_name"] == "Alice"
@@ -154,95 +149,95 @@ class TestSessionManagerJoin:
         assert participant["is_dm"] is False
         assert participant["is_connected"] is True
 
-    def test_join_session_as_dm(self, manager, campaign_id, character_id):
-        session = manager.create_session(campaign_id)
-        participant = manager.join_session(
+    async def test_join_session_as_dm(self, manager, campaign_id, character_id):
+        session = await manager.create_session(campaign_id)
+        participant = await manager.join_session(
             session["id"], character_id, "DM Alice", is_dm=True
         )
         assert participant["is_dm"] is True
 
-    def test_join_session_reconnect(self, manager, campaign_id, character_id):
-        session = manager.create_session(campaign_id)
-        p1 = manager.join_session(session["id"], character_id, "Alice")
-        manager.leave_session(session["id"], p1["id"])
+    async def test_join_session_reconnect(self, manager, campaign_id, character_id):
+        session = await manager.create_session(campaign_id)
+        p1 = await manager.join_session(session["id"], character_id, "Alice")
+        await manager.leave_session(session["id"], p1["id"])
         # Rejoin with same character
-        p2 = manager.join_session(session["id"], character_id, "Alice")
+        p2 = await manager.join_session(session["id"], character_id, "Alice")
         assert p2["id"] == p1["id"]
         assert p2["is_connected"] is True
 
-    def test_join_nonexistent_session(self, manager, character_id):
+    async def test_join_nonexistent_session(self, manager, character_id):
         with pytest.raises(ValueError, match="not found"):
-            manager.join_session("fake-id", character_id, "Alice")
+            await manager.join_session("fake-id", character_id, "Alice")
 
 
 class TestSessionManagerLeave:
-    def test_leave_session(self, manager, campaign_id, character_id):
-        session = manager.create_session(campaign_id)
-        p = manager.join_session(session["id"], character_id, "Alice")
-        manager.leave_session(session["id"], p["id"])
-        participants = manager.get_participants(session["id"])
+    async def test_leave_session(self, manager, campaign_id, character_id):
+        session = await manager.create_session(campaign_id)
+        p = await manager.join_session(session["id"], character_id, "Alice")
+        await manager.leave_session(session["id"], p["id"])
+        participants = await manager.get_participants(session["id"])
         assert participants[0]["is_connected"] is False
 
 
 class TestSessionManagerGetSession:
-    def test_get_session_with_participants(
+    async def test_get_session_with_participants(
         self, manager, campaign_id, character_id
     ):
-        session = manager.create_session(campaign_id)
-        manager.join_session(session["id"], character_id, "Alice")
-        result = manager.get_session(session["id"])
+        session = await manager.create_session(campaign_id)
+        await manager.join_session(session["id"], character_id, "Alice")
+        result = await manager.get_session(session["id"])
         assert result is not None
         assert len(result["participants"]) == 1
 
-    def test_get_nonexistent_session(self, manager):
-        assert manager.get_session("fake") is None
+    async def test_get_nonexistent_session(self, manager):
+        assert await manager.get_session("fake") is None
 
-    def test_get_active_session(self, manager, campaign_id):
-        session = manager.create_session(campaign_id)
-        result = manager.get_active_session(campaign_id)
+    async def test_get_active_session(self, manager, campaign_id):
+        session = await manager.create_session(campaign_id)
+        result = await manager.get_active_session(campaign_id)
         assert result is not None
         assert result["id"] == session["id"]
 
-    def test_get_active_session_none(self, manager):
-        assert manager.get_active_session("no-campaign") is None
+    async def test_get_active_session_none(self, manager):
+        assert await manager.get_active_session("no-campaign") is None
 
 
 class TestSessionManagerTurns:
-    def test_set_turn_order(self, manager, campaign_id, character_id, character_id_2):
-        session = manager.create_session(campaign_id)
-        updated = manager.set_turn_order(
+    async def test_set_turn_order(self, manager, campaign_id, character_id, character_id_2):
+        session = await manager.create_session(campaign_id)
+        updated = await manager.set_turn_order(
             session["id"], [character_id, character_id_2]
         )
         assert updated["turn_order"] == [character_id, character_id_2]
         assert updated["current_turn_index"] == 0
 
-    def test_advance_turn(self, manager, campaign_id, character_id, character_id_2):
-        session = manager.create_session(campaign_id)
-        manager.set_turn_order(session["id"], [character_id, character_id_2])
-        next_id = manager.advance_turn(session["id"])
+    async def test_advance_turn(self, manager, campaign_id, character_id, character_id_2):
+        session = await manager.create_session(campaign_id)
+        await manager.set_turn_order(session["id"], [character_id, character_id_2])
+        next_id = await manager.advance_turn(session["id"])
         assert next_id == character_id_2
         # Wrap around
-        next_id = manager.advance_turn(session["id"])
+        next_id = await manager.advance_turn(session["id"])
         assert next_id == character_id
 
-    def test_advance_turn_no_order(self, manager, campaign_id):
-        session = manager.create_session(campaign_id)
+    async def test_advance_turn_no_order(self, manager, campaign_id):
+        session = await manager.create_session(campaign_id)
         with pytest.raises(ValueError, match="no turn order"):
-            manager.advance_turn(session["id"])
+            await manager.advance_turn(session["id"])
 
 
 class TestSessionManagerEndSession:
-    def test_end_session(self, manager, campaign_id, character_id):
-        session = manager.create_session(campaign_id)
-        manager.join_session(session["id"], character_id, "Alice")
-        ended = manager.end_session(session["id"])
+    async def test_end_session(self, manager, campaign_id, character_id):
+        session = await manager.create_session(campaign_id)
+        await manager.join_session(session["id"], character_id, "Alice")
+        ended = await manager.end_session(session["id"])
         assert ended["status"] == "ended"
-        participants = manager.get_participants(session["id"])
+        participants = await manager.get_participants(session["id"])
         assert all(not p["is_connected"] for p in participants)
 
-    def test_end_nonexistent_session(self, manager):
+    async def test_end_nonexistent_session(self, manager):
         with pytest.raises(ValueError, match="not found"):
-            manager.end_session("fake")
+            await manager.end_session("fake")
 
 
 # ---------------------------------------------------------------------------
@@ -109,6 +109,46 @@ class TestSpellSystemEndpoints:
         for spell in data["spells"]:
             assert spell["level"] == 1
 
+    def test_get_spell_list_combined_filters(self, client) -> None:
+        """Class, level and school filters intersect."""
+        from app.srd_data import load_spells
+
+        response = client.get(
+            "/game/spells/list?character_class=wizard&spell_level=3&school=EVOCATION"
+        )
+        expected = [
+            s["id"]
+            for s in load_spells()
+            if "wizard" in s["available_classes"]
+            and s["level"] == 3
+            and s["school"] == "evocation"
+        ]
+        assert expected
+        assert [s["id"] for s in response.json()["spells"]] == expected
+
+    def test_get_spell_list_etag_and_not_modified(self, client) -> None:
+        """Spell lists carry a strong ETag and answer If-None-Match with 304."""
+        first = client.get("/game/spells/list?character_class=wizard")
+        etag = first.headers["etag"]
+        assert etag.startswith('"') and not etag.startswith("W/")
+        assert client.get("/game/spells/list?character_class=wizard").headers["etag"] == etag
+        assert client.get("/game/spells/list").headers["etag"] != etag
+
+        cached = client.get(
+            "/game/spells/list?character_class=wizard",
+            headers={"If-None-Match": f'"stale", W/{etag}'},
+        )
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+
+        stale = client.get(
+            "/game/spells/list?character_class=wizard",
+            headers={"If-None-Match": '"stale"'},
+        )
+        assert stale.status_code == 200
+        assert stale.json() == first.json()
+
     def test_calculate_spell_save_dc(self, client) -> None:
         """Test calculating spell save DC endpoint."""
         params = {
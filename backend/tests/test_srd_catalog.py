@@ -0,0 +1,106 @@
+"""Tests for the indexed, read-only SRD catalog."""
+
+import copy
+import json
+import pickle
+
+import pytest
+from app import srd_data
+from app.srd_catalog import FrozenRecord, SRDCatalog, thaw
+
+SPELLS = [
+    {"id": "fire_bolt", "name": "Fire Bolt", "level": 0, "school": "Evocation",
+     "available_classes": ["sorcerer", "wizard"]},
+    {"id": "cure_wounds", "name": "Cure Wounds", "level": 1, "school": "evocation",
+     "available_classes": ["cleric", "bard"]},
+]
+MONSTERS = [
+    {"id": "giant_rat", "name": "Giant Rat", "cr": "1/8", "type": "beast"},
+    {"id": "ogre", "name": "Ogre", "cr": 2, "type": "Giant"},
+]
+WEAPONS = {
+    "simple_melee": [{"id": "dagger", "name": "Dagger", "properties": ["finesse", "light"]}],
+    "martial_melee": [{"id": "rapier", "name": "Rapier", "properties": ["finesse"]}],
+}
+ARMOR = {"light": [{"id": "leather", "name": "Leather", "base_ac": 11}]}
+
+
+@pytest.fixture()
+def catalog() -> SRDCatalog:
+    return SRDCatalog(spells=SPELLS, monsters=MONSTERS, weapons=WEAPONS, armor=ARMOR)
+
+
+class TestIndexes:
+    """Every lookup is answered from an index with the old matching rules."""
+
+    def test_id_and_name_lookups(self, catalog):
+        assert catalog.spell_by_id("fire_bolt")["name"] == "Fire Bolt"
+        assert catalog.spell_by_name("FIRE BOLT")["id"] == "fire_bolt"
+        assert catalog.monster_by_id("Giant Rat")["id"] == "giant_rat"
+        assert catalog.monster_by_name("ogre")["id"] == "ogre"
+        assert catalog.weapon_by_id("DAGGER")["id"] == "dagger"
+        assert catalog.armor_by_id("Leather")["base_ac"] == 11
+        assert catalog.spell_by_id("wish") is None
+
+    def test_secondary_indexes(self, catalog):
+        assert [s["id"] for s in catalog.spells_by_class("Wizard")] == ["fire_bolt"]
+        assert [s["id"] for s in catalog.spells_by_level(1)] == ["cure_wounds"]
+        assert len(catalog.spells_by_school("EVOCATION")) == 2
+        assert [m["id"] for m in catalog.monsters_by_cr("2")] == ["ogre"]
+        assert [m["id"] for m in catalog.monsters_by_type("giant")] == ["ogre"]
+        assert [w["id"] for w in catalog.weapons_with_property("finesse")] == [
+            "dagger",
+            "rapier",
+        ]
+        assert [w["id"] for w in catalog.weapons_by_category("Martial_Melee")] == ["rapier"]
+        assert [w["id"] for w in catalog.weapons] == ["dagger", "rapier"]
+        assert catalog.armor_by_category("heavy") == ()
+
+
+class TestImmutability:
+    """Shared records cannot be corrupted by callers."""
+
+    def test_records_and_results_are_read_only(self, catalog):
+        dagger = catalog.weapon_by_id("dagger")
+        with pytest.raises(TypeError):
+            dagger["damage_dice"] = "1d12"
+        with pytest.raises(TypeError):
+            dagger.update(name="Sword")
+        with pytest.raises(AttributeError):
+            dagger["properties"].append("heavy")
+        assert isinstance(catalog.weapons_with_property("finesse"), tuple)
+        assert SPELLS[0]["available_classes"] == ["sorcerer", "wizard"]
+
+    def test_copies_are_plain_and_mutable(self, catalog):
+        spell = catalog.spell_by_id("fire_bolt")
+        for clone in (copy.deepcopy(spell), spell.copy()):
+            assert type(clone) is dict
+            clone["available_classes"].append("warlock")
+        assert spell["available_classes"] == ("sorcerer", "wizard")
+
+    def test_records_serialise_and_pickle(self, catalog):
+        ogre = catalog.monster_by_id("ogre")
+        assert json.loads(json.dumps(ogre)) == thaw(ogre) == MONSTERS[1]
+        restored = pickle.loads(pickle.dumps(catalog))  # noqa: S301
+        assert isinstance(restored.monster_by_id("ogre"), FrozenRecord)
+        assert restored.monster_by_id("ogre") == ogre
+
+
+class TestModuleWrappers:
+    """srd_data's query functions delegate to the shared catalog."""
+
+    def test_wrappers_share_one_catalog(self):
+        assert srd_data.get_srd_catalog() is srd_data.get_srd_catalog()
+        goblin = srd_data.get_monster_by_id("goblin")
+        assert goblin is srd_data.get_srd_catalog().monster_by_id("goblin")
+        assert goblin in srd_data.get_monsters_by_cr("1/4")
+
+    def test_matches_a_linear_scan_of_the_json(self):
+        for spell in srd_data.load_spells():
+            assert thaw(srd_data.get_spell_by_id(spell["id"])) == spell
+        wizard = [s["id"] for s in srd_data.load_spells()
+                  if "wizard" in s.get("available_classes", [])]
+        assert [s["id"] for s in srd_data.get_spells_by_class("wizard")] == wizard
+        heavy = [w["id"] for ws in srd_data.load_weapons().values() for w in ws
+                 if "heavy" in w.get("properties", [])]
+        assert [w["id"] for w in srd_data.get_weapons_with_property("heavy")] == heavy
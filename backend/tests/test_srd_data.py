@@ -278,7 +278,7 @@ class TestWeapons:
                 )
 
     def test_properties_is_list(self) -> None:
-        for weapon in get_all_weapons():
+        for weapon in (w for ws in load_weapons().values() for w in ws):
             assert isinstance(weapon["properties"], list), (
                 f"Weapon '{weapon.get('id')}' properties is not a list"
             )
@@ -323,7 +323,7 @@ class TestWeapons:
 
     def test_get_all_weapons_flat_list(self) -> None:
         all_weapons = get_all_weapons()
-        assert isinstance(all_weapons, list)
+        assert isinstance(all_weapons, tuple)
         assert len(all_weapons) >= 30
 
 
@@ -440,5 +440,5 @@ class TestArmor:
 
     def test_get_all_armor_flat_list(self) -> None:
         all_armor = get_all_armor()
-        assert isinstance(all_armor, list)
+        assert isinstance(all_armor, tuple)
         assert len(all_armor) >= 13
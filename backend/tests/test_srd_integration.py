@@ -43,7 +43,7 @@ class TestSRDIntegration:
             },
         }
 
-        with patch("app.agents.scribe_agent.get_session_context") as mock_session:
+        with patch("app.database.get_session_context") as mock_session:
             mock_db = MagicMock()
             mock_session.return_value.__enter__.return_value = mock_db
 
@@ -135,7 +135,7 @@ class TestSRDIntegration:
             },
         }
 
-        with patch("app.agents.scribe_agent.get_session_context") as mock_session:
+        with patch("app.database.get_session_context") as mock_session:
             mock_db = MagicMock()
             mock_session.return_value.__enter__.return_value = mock_db
 
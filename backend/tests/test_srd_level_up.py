@@ -61,7 +61,7 @@ class TestSRDLevelUp:
             ],
         }
 
-        with patch("app.agents.scribe_agent.get_session_context") as mock_session:
+        with patch("app.database.get_session_context") as mock_session:
             mock_db = MagicMock()
             mock_character = MagicMock()
             mock_character.data = fighter_data
@@ -150,7 +150,7 @@ class TestSRDLevelUp:
             ],
         }
 
-        with patch("app.agents.scribe_agent.get_session_context") as mock_session:
+        with patch("app.database.get_session_context") as mock_session:
             mock_db = MagicMock()
             mock_character = MagicMock()
             mock_character.data = wizard_data
@@ -215,7 +215,7 @@ class TestSRDLevelUp:
             ],
         }
 
-        with patch("app.agents.scribe_agent.get_session_context") as mock_session:
+        with patch("app.database.get_session_context") as mock_session:
             mock_db = MagicMock()
             mock_character = MagicMock()
             mock_character.data = rogue_data
@@ -0,0 +1,121 @@
+"""Tests for BM25 full-text search over the SRD catalog."""
+
+import json
+import time
+
+import pytest
+from app.srd_catalog import SRDCatalog
+from app.srd_search import SRDSearchIndex, get_srd_search_index, tokenize
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture()
+def index() -> SRDSearchIndex:
+    return get_srd_search_index()
+
+
+class TestRanking:
+    """BM25 scores with name boosts and prefix matching."""
+
+    def test_loose_reference_resolves(self, index):
+        hits = index.search("that fire spell")
+        assert hits[0].kind == "spell"
+        assert hits[0].id == "fireball"
+
+    def test_prefix_matches_for_autocomplete(self, index):
+        assert index.search("fireb")[0].id == "fireball"
+        assert {h.id for h in index.search("long", kinds=["weapon"])} >= {
+            "longsword",
+            "longbow",
+        }
+
+    def test_name_match_outranks_other_fields(self, index):
+        hits = index.search("goblin")
+        assert hits[0].id == "goblin"
+        assert all(h.score <= hits[0].score for h in hits)
+
+    def test_properties_and_tags_are_searchable(self, index):
+        finesse = index.search("finesse", kinds=["weapon"], limit=50)
+        assert {"dagger", "rapier"} <= {h.id for h in finesse}
+        assert index.search("heavy armor")[0].kind == "armor"
+        assert {h.id for h in index.search("undead", limit=3)} >= {"skeleton", "zombie"}
+
+    def test_kind_filter_and_limit(self, index):
+        hits = index.search("light", kinds=["armor"], limit=2)
+        assert len(hits) <= 2
+        assert all(h.kind == "armor" for h in hits)
+
+    def test_no_match_and_stopword_only_queries(self, index):
+        assert index.search("xyzzy") == []
+        assert index.search("the of that") == []
+        assert tokenize("The Fire-Bolt!") == ["fire", "bolt"]
+
+    def test_exact_term_beats_prefix_only_match(self):
+        catalog = SRDCatalog(
+            spells=[
+                {"id": "a", "name": "Ward", "description": ""},
+                {"id": "b", "name": "Warden", "description": ""},
+            ]
+        )
+        hits = SRDSearchIndex(catalog).search("ward")
+        assert [h.id for h in hits] == ["a", "b"]
+
+    def test_queries_only_read_matching_postings(self):
+        from app.srd_data import get_srd_catalog
+
+        index = SRDSearchIndex(get_srd_catalog())
+        read = []
+
+        class _CountingPostings(dict):
+            def __getitem__(self, term: str) -> tuple:
+                postings = super().__getitem__(term)
+                read.append(len(postings))
+                return postings
+
+        index._postings = _CountingPostings(index._postings)
+        for query in ["that fire spell", "fireb", "finesse light", "undead poison", "plate"]:
+            read.clear()
+            index.search(query)
+            assert 0 < sum(read) < len(index) / 2
+
+    @pytest.mark.slow
+    def test_queries_take_under_a_millisecond(self, index):
+        queries = ["that fire spell", "fireb", "finesse light", "undead poison", "plate"]
+        start = time.perf_counter()
+        for _ in range(200):
+            for query in queries:
+                index.search(query)
+        per_query = (time.perf_counter() - start) / (200 * len(queries))
+        assert per_query < 0.001
+
+
+class TestSearchEndpoint:
+    """GET /game/srd/search."""
+
+    @pytest.fixture()
+    def client(self):
+        from app.api.routes.srd_routes import router
+
+        app = FastAPI()
+        app.include_router(router, prefix="/game")
+        return TestClient(app)
+
+    def test_search_returns_ranked_records(self, client):
+        response = client.get("/game/srd/search", params={"q": "fire", "kind": "spell"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["results"][0]["id"] == "fireball"
+        assert data["results"][0]["record"]["damage_type"] == "fire"
+        assert data["total_count"] == len(data["results"])
+
+    def test_unknown_kind_is_422(self, client):
+        response = client.get("/game/srd/search", params={"q": "fire", "kind": "vehicle"})
+        assert response.status_code == 422
+
+    def test_dm_tool_wraps_search(self):
+        from app.agents.dungeon_master_agent import lookup_srd
+
+        results = json.loads(lookup_srd("goblin", kind="monster"))
+        assert results[0]["id"] == "goblin"
+        assert results[0]["kind"] == "monster"
@@ -0,0 +1,109 @@
+"""Tests for the prebuilt SRD snapshot and startup warm-up."""
+
+import json
+import shutil
+
+import pytest
+from app import srd_data
+from app.srd_snapshot import (
+    DATA_DIR,
+    SRD_TABLES,
+    SnapshotError,
+    build_snapshot,
+    load_snapshot,
+    read_tables,
+    validate_tables,
+)
+
+
+@pytest.fixture()
+def data_dir(tmp_path):
+    """A private copy of the SRD JSON files."""
+    target = tmp_path / "data"
+    target.mkdir()
+    for table in SRD_TABLES:
+        shutil.copy(DATA_DIR / f"{table}.json", target / f"{table}.json")
+    return target
+
+
+@pytest.fixture()
+def cold_srd_data(monkeypatch):
+    """Reset srd_data's module caches for one test, restoring them after."""
+    for name in (
+        "_class_features_data",
+        "_racial_traits_data",
+        "_backgrounds_data",
+        "_spells_data",
+        "_monsters_data",
+        "_weapons_data",
+        "_armor_data",
+        "_catalog",
+    ):
+        monkeypatch.setattr(srd_data, name, None)
+
+
+class TestSnapshotFile:
+    """Build, validate and load the binary snapshot."""
+
+    def test_round_trip(self, data_dir):
+        path = data_dir / "srd.snapshot"
+        built = build_snapshot(data_dir, path)
+        loaded = load_snapshot(path, data_dir)
+
+        assert loaded is not None
+        assert loaded.source_hash == built.source_hash
+        assert loaded.tables == read_tables(data_dir)
+        assert loaded.catalog.monster_by_id("goblin") == built.catalog.monster_by_id("goblin")
+        assert len(loaded.catalog.spells_by_class("wizard")) > 0
+
+    def test_missing_snapshot_is_none(self, data_dir):
+        assert load_snapshot(data_dir / "srd.snapshot", data_dir) is None
+
+    def test_stale_snapshot_is_ignored(self, data_dir):
+        path = data_dir / "srd.snapshot"
+        build_snapshot(data_dir, path)
+        monsters = json.loads((data_dir / "monsters.json").read_text())
+        monsters[0]["hp"] += 1
+        (data_dir / "monsters.json").write_text(json.dumps(monsters))
+        assert load_snapshot(path, data_dir) is None
+
+    def test_corrupt_payload_is_ignored(self, data_dir):
+        path = data_dir / "srd.snapshot"
+        build_snapshot(data_dir, path)
+        blob = bytearray(path.read_bytes())
+        blob[-1] ^= 0xFF
+        path.write_bytes(bytes(blob))
+        assert load_snapshot(path, data_dir) is None
+
+    def test_validation_rejects_duplicate_ids(self, data_dir):
+        tables = read_tables(data_dir)
+        tables["spells"].append(dict(tables["spells"][0]))
+        with pytest.raises(SnapshotError, match="duplicate id"):
+            validate_tables(tables)
+
+    def test_validation_rejects_wrong_shape(self, data_dir):
+        tables = read_tables(data_dir)
+        tables["weapons"] = []
+        with pytest.raises(SnapshotError, match="weapons"):
+            validate_tables(tables)
+
+
+class TestWarmUp:
+    """warm_srd_data fills every table before the first request."""
+
+    def test_warm_from_snapshot(self, data_dir, cold_srd_data, monkeypatch):
+        path = data_dir / "srd.snapshot"
+        build_snapshot(data_dir, path)
+        monkeypatch.setattr(
+            srd_data, "load_snapshot", lambda: load_snapshot(path, data_dir)
+        )
+
+        assert srd_data.warm_srd_data() == "snapshot"
+        assert srd_data._spells_data is not None
+        assert srd_data.get_monster_by_id("goblin")["name"] == "Goblin"
+        assert srd_data.warm_srd_data() == "warm"
+
+    def test_warm_without_snapshot_parses_json(self, cold_srd_data, monkeypatch):
+        monkeypatch.setattr(srd_data, "load_snapshot", lambda: None)
+        assert srd_data.warm_srd_data() == "json"
+        assert srd_data.get_class_info("fighter")["hit_die"]
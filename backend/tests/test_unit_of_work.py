@@ -0,0 +1,277 @@
+"""Tests for the request-scoped unit of work shared by run_in_session."""
+
+import asyncio
+from contextlib import ExitStack, contextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app import entity_cache
+from app.database import (
+    Base,
+    configure_sqlite_engine,
+    current_unit_of_work,
+    run_in_session,
+    unit_of_work,
+)
+from app.models.db_models import Campaign as CampaignDB
+from app.models.db_models import Character as CharacterDB
+from app.models.game_models import Campaign
+from app.services.campaign_service import campaign_to_dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def db(tmp_path):
+    """File-backed SQLite database wired into get_session_context.
+
+    Yields the engine together with counters for sessions opened and
+    transactions committed.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'uow.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    configure_sqlite_engine(engine)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counts = {"sessions": 0, "commits": 0}
+
+    @contextmanager
+    def _ctx():
+        counts["sessions"] += 1
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    session = factory()
+    campaign = Campaign(id="camp-1", name="Keep", setting="Hills")
+    session.add(
+        CampaignDB(id="camp-1", name="Keep", setting="Hills", data=campaign_to_dict(campaign))
+    )
+    session.add(
+        CharacterDB(
+            id="char-1",
+            name="Ada",
+            data={"id": "char-1", "name": "Ada", "abilities": {}, "inventory": []},
+        )
+    )
+    session.commit()
+    session.close()
+
+    event.listen(engine, "commit", lambda conn: counts.__setitem__("commits", counts["commits"] + 1))
+    with patch("app.database.get_session_context", _ctx):
+        yield engine, counts
+    engine.dispose()
+
+
+def _rename(db: Session, name: str) -> None:
+    db.get(CharacterDB, "char-1").name = name
+    db.commit()
+
+
+def _name(db: Session) -> str:
+    return db.get(CharacterDB, "char-1").name
+
+
+def _insert_duplicate(db: Session) -> None:
+    db.add(CharacterDB(id="char-1", name="Dup", data={}))
+    db.commit()
+
+
+# ---------------------------------------------------------------------------
+# UnitOfWork semantics
+# ---------------------------------------------------------------------------
+
+
+class TestUnitOfWork:
+    """Sharing, commit and rollback behaviour."""
+
+    async def test_calls_share_one_session_and_one_commit(self, db):
+        _, counts = db
+        async with unit_of_work():
+            await run_in_session(_rename, "Bea")
+            await run_in_session(_rename, "Cy")
+            assert await run_in_session(_name) == "Cy"
+        assert counts == {"sessions": 1, "commits": 1}
+        assert await run_in_session(_name) == "Cy"
+
+    async def test_writes_are_invisible_until_commit(self, db):
+        engine, _ = db
+        async with unit_of_work():
+            await run_in_session(_rename, "Bea")
+            with engine.connect() as other:
+                row = other.exec_driver_sql(
+                    "SELECT name FROM characters WHERE id = 'char-1'"
+                ).scalar()
+            assert row == "Ada"
+        assert await run_in_session(_name) == "Bea"
+
+    async def test_exception_rolls_back_everything(self, db):
+        with pytest.raises(RuntimeError):
+            async with unit_of_work():
+                await run_in_session(_rename, "Bea")
+                raise RuntimeError("boom")
+        assert await run_in_session(_name) == "Ada"
+
+    async def test_failed_call_only_rolls_back_its_savepoint(self, db):
+        async with unit_of_work():
+            await run_in_session(_rename, "Bea")
+            with pytest.raises(IntegrityError):
+                await run_in_session(_insert_duplicate)
+            assert await run_in_session(_name) == "Bea"
+        assert await run_in_session(_name) == "Bea"
+
+    async def test_uncommitted_changes_in_a_call_are_discarded(self, db):
+        def _rename_without_commit(session: Session) -> None:
+            session.get(CharacterDB, "char-1").name = "Ghost"
+            session.flush()
+
+        async with unit_of_work():
+            await run_in_session(_rename_without_commit)
+        assert await run_in_session(_name) == "Ada"
+
+    async def test_concurrent_calls_are_serialised(self, db):
+        async with unit_of_work():
+            names = await asyncio.gather(*(run_in_session(_name) for _ in range(5)))
+        assert names == ["Ada"] * 5
+
+    async def test_nested_unit_of_work_joins_outer(self, db):
+        _, counts = db
+        async with unit_of_work() as outer:
+            async with unit_of_work() as inner:
+                assert inner is outer
+                await run_in_session(_rename, "Bea")
+            assert counts["commits"] == 0
+        assert counts["commits"] == 1
+
+    async def test_deferred_work_runs_before_commit(self, db):
+        _, counts = db
+        seen = []
+
+        async def _deferred():
+            seen.append(counts["commits"])
+            await run_in_session(_rename, "Late")
+
+        async with unit_of_work() as uow:
+            uow.defer(_deferred)
+        assert seen == [0]
+        assert counts["commits"] == 1
+        assert await run_in_session(_name) == "Late"
+
+    async def test_no_session_opened_when_unused(self, db):
+        _, counts = db
+        async with unit_of_work() as uow:
+            pass
+        assert not uow.started
+        assert counts["sessions"] == 0
+        assert current_unit_of_work() is None
+
+    async def test_cache_is_invalidated_after_rollback(self, db):
+        from app.agents.scribe_agent import get_scribe
+
+        scribe = get_scribe()
+        with pytest.raises(RuntimeError):
+            async with unit_of_work():
+                await scribe.update_character("char-1", {"name": "Phantom"})
+                # Read back inside the turn caches the uncommitted write
+                assert (await scribe.get_character("char-1"))["name"] == "Phantom"
+                raise RuntimeError("boom")
+        assert entity_cache.get_character_cache().get("char-1") is None
+        assert (await scribe.get_character("char-1"))["name"] == "Ada"
+
+
+# ---------------------------------------------------------------------------
+# /game/input
+# ---------------------------------------------------------------------------
+
+
+class TestGameInputUnitOfWork:
+    """The whole turn, model call included, is one unit of work."""
+
+    def _post_turn(self, dm_turn, *patches):
+        from app.auto_save import reset_interaction_counter
+        from app.config import Settings, init_settings, set_settings
+        from app.main import app
+        from fastapi.testclient import TestClient
+
+        set_settings(
+            Settings(
+                auto_save_interval=1,
+                azure_openai_endpoint="",
+                azure_openai_api_key="",
+                azure_openai_chat_deployment="",
+                azure_openai_embedding_deployment="",
+            )
+        )
+        reset_interaction_counter("camp-1")
+        mock_dm = MagicMock(process_input=AsyncMock(side_effect=dm_turn))
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(
+                    patch("app.api.routes.session_routes.get_dungeon_master", return_value=mock_dm)
+                )
+                stack.enter_context(
+                    patch(
+                        "app.api.routes.session_routes.prompt_shield_service.check_user_input",
+                        AsyncMock(return_value=MagicMock(attack_detected=False)),
+                    )
+                )
+                for extra in patches:
+                    stack.enter_context(extra)
+                client = TestClient(app)
+                return client.post(
+                    "/game/input",
+                    json={
+                        "message": "I knock",
+                        "character_id": "char-1",
+                        "campaign_id": "camp-1",
+                    },
+                )
+        finally:
+            reset_interaction_counter("camp-1")
+            init_settings()
+
+    def test_turn_shares_one_session_and_one_commit(self, db):
+        from app.agents.scribe_agent import get_character_tool
+
+        _, counts = db
+        dm_saw_unit_of_work = []
+
+        async def _dm_turn(message, context):
+            dm_saw_unit_of_work.append(current_unit_of_work())
+            # Stands in for a tool read and the DM persisting its thread
+            assert '"Ada"' in await get_character_tool("char-1")
+            await run_in_session(_rename, "Ada the Bold")
+            return {"message": "You enter the keep.", "visuals": []}
+
+        response = self._post_turn(_dm_turn)
+
+        assert response.status_code == 200
+        assert response.json()["state_updates"]["auto_saved"] is True
+        assert dm_saw_unit_of_work[0] is not None
+        assert counts == {"sessions": 1, "commits": 1}
+        assert asyncio.run(run_in_session(_name)) == "Ada the Bold"
+
+    def test_dm_write_rolls_back_with_the_turn(self, db):
+        async def _dm_turn(message, context):
+            await run_in_session(_rename, "Ada the Bold")
+            return {"message": "You enter the keep.", "visuals": []}
+
+        response = self._post_turn(
+            _dm_turn,
+            patch(
+                "app.api.routes.session_routes.check_and_schedule_auto_save",
+                side_effect=RuntimeError("disk full"),
+            ),
+        )
+
+        assert response.status_code == 500
+        assert asyncio.run(run_in_session(_name)) == "Ada"